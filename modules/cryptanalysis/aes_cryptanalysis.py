@@ -7,6 +7,11 @@ import time
 from typing import List, Tuple, Dict
 import matplotlib.pyplot as plt
 import seaborn as sns
+from modules.hash_functions.hashing.avalanche_ui import (
+    AVALANCHE_SAMPLES, format_count, render_avalanche_report, run_avalanche_analysis
+)
+from modules.hash_functions.hashing import avalanche
+from modules.modern_crypto.block_modes.ciphers import BLOCK_CIPHERS, create_block_cipher
 
 class AESCryptanalysisModule(CryptoModule):
     def __init__(self):
@@ -218,6 +223,8 @@ class AESCryptanalysisModule(CryptoModule):
         if st.button("Показать лавинный эффект", key="avalanche_btn"):
             if original_text and original_key:
                 self.demo_avalanche_effect(original_text, original_key)
+
+        self.render_avalanche_statistics()
         
         # Анализ S-блоков
         st.markdown("---")
@@ -511,28 +518,22 @@ class AESCryptanalysisModule(CryptoModule):
     def demo_avalanche_effect(self, text: str, key: str):
         """Демонстрация лавинного эффекта"""
         try:
-            from modules.modern_crypto.aes import AESCipher
-            aes = AESCipher()
-            
-            # Шифруем исходный текст
-            if len(text) != 16:
-                text = text[:16].ljust(16, ' ')
+            aes = create_block_cipher("AES-128", bytes.fromhex(key))
             
-            original_cipher = aes.aes_encrypt(text, key, "128 бит")
+            # Шифруем исходный текст (один блок 16 байт)
+            text_bytes = bytearray(text.encode('utf-8')[:16].ljust(16, b' '))
+            original_bytes = aes.encrypt_block(bytes(text_bytes))
             
             # Меняем один бит в тексте
-            text_bytes = bytearray(text.encode('utf-8'))
             text_bytes[0] ^= 1  # Меняем первый бит первого байта
-            modified_text = text_bytes.decode('utf-8', errors='ignore')
-            
-            modified_cipher = aes.aes_encrypt(modified_text, key, "128 бит")
+            modified_bytes = aes.encrypt_block(bytes(text_bytes))
+            original_cipher, modified_cipher = original_bytes.hex(), modified_bytes.hex()
             
             # Сравниваем шифротексты
-            original_bits = bin(int(original_cipher, 16))[2:].zfill(128)
-            modified_bits = bin(int(modified_cipher, 16))[2:].zfill(128)
+            diff_bits = avalanche.bit_difference(original_bytes, modified_bytes)
             
             # Считаем количество различных битов
-            diff_count = sum(1 for a, b in zip(original_bits, modified_bits) if a != b)
+            diff_count = int(diff_bits.sum())
             diff_percentage = (diff_count / 128) * 100
             
             col1, col2 = st.columns(2)
@@ -558,20 +559,50 @@ class AESCryptanalysisModule(CryptoModule):
             fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 4))
             
             # Исходный шифротекст
-            original_matrix = np.array([int(bit) for bit in original_bits]).reshape(8, 16)
+            original_matrix = np.unpackbits(np.frombuffer(original_bytes, dtype=np.uint8)).reshape(8, 16)
             sns.heatmap(original_matrix, ax=ax1, cmap="Blues", cbar=False)
             ax1.set_title("Исходный шифротекст")
             
             # Различия
-            diff_matrix = np.array([1 if a != b else 0 for a, b in zip(original_bits, modified_bits)]).reshape(8, 16)
+            diff_matrix = diff_bits.reshape(8, 16)
             sns.heatmap(diff_matrix, ax=ax2, cmap="Reds", cbar=False)
             ax2.set_title("Измененные биты (красные)")
             
             st.pyplot(fig)
             
-        except ImportError:
-            st.error("Модуль AES не доступен для демонстрации")
+        except ValueError:
+            st.error("Ключ должен состоять из 32 шестнадцатеричных символов (128 бит)")
     
+    def render_avalanche_statistics(self):
+        """Строгий лавинный критерий блочных шифров по множеству пар"""
+        st.markdown("### 📊 Лавинный эффект по множеству пар")
+        st.markdown(
+            "Одна пара текстов может случайно дать и 40%, и 60% изменений. Статистика по тысячам "
+            "случайных блоков с одним инвертированным битом показывает, выполняется ли строгий "
+            "лавинный критерий для каждой пары входной/выходной бит."
+        )
+        cipher_names = list(BLOCK_CIPHERS)
+        col1, col2 = st.columns(2)
+        with col1:
+            cipher_name = st.selectbox(
+                "Блочный шифр:",
+                cipher_names,
+                index=cipher_names.index("AES-128"),
+                key="avalanche_cipher"
+            )
+        with col2:
+            samples = st.select_slider(
+                "Число пар:",
+                options=AVALANCHE_SAMPLES,
+                value=100_000,
+                format_func=format_count,
+                key="avalanche_cipher_samples"
+            )
+        st.caption(f"{cipher_name}: {BLOCK_CIPHERS[cipher_name].description}. Ключ выбирается случайно.")
+        if st.button("📊 Статистический анализ", key="avalanche_cipher_btn"):
+            result = run_avalanche_analysis(avalanche.cipher_primitive(cipher_name), samples)
+            render_avalanche_report(result)
+
     def render_sbox_analysis(self):
         """Анализ S-блоков"""
         st.markdown("### 🔍 Анализ S-блоков AES")
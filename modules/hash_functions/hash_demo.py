@@ -7,7 +7,17 @@ import hashlib
 import time
 import binascii
 from collections import Counter
-import random
+import math
+import os
+from modules.hash_functions.hashing import avalanche, benchmark, collisions, rho, streaming
+from modules.hash_functions.hashing.avalanche_ui import (
+    AVALANCHE_SAMPLES, format_count, render_avalanche_report, run_avalanche_analysis
+)
+from modules.protocols.blockchain import merkle
+
+RHO_MAX_BITS = 44         # ожидаемая работа ~5·10^6 вычислений f, около 10 с на процесс
+RHO_BUDGET_FACTOR = 10    # Флойд тратит до ~5× ожидаемой работы; дальше поиск прерывается
+
 
 class HashDemoModule(CryptoModule):
     def __init__(self):
@@ -59,7 +69,7 @@ class HashDemoModule(CryptoModule):
         # Выбор режима работы
         mode = st.radio(
             "Режим работы:",
-            ["🔍 Сравнение хеш-функций", "🌊 Лавинный эффект", "🎯 Поиск коллизий", "🔐 Практические применения"],
+            ["🔍 Сравнение хеш-функций", "🌊 Лавинный эффект", "🎯 Поиск коллизий", "🔐 Практические применения", "⚡ Производительность"],
             horizontal=True
         )
         
@@ -69,8 +79,10 @@ class HashDemoModule(CryptoModule):
             self.render_avalanche_effect()
         elif mode == "🎯 Поиск коллизий":
             self.render_collision_search()
-        else:
+        elif mode == "🔐 Практические применения":
             self.render_practical_uses()
+        else:
+            self.render_benchmark()
     
     def render_hash_comparison(self):
         """Режим сравнения хеш-функций"""
@@ -111,6 +123,7 @@ class HashDemoModule(CryptoModule):
         # Таца результатов
         results = []
         performance_data = []
+        report = benchmark.load_cached()
         
         for hash_name in selected_hashes:
             hash_func = self.hash_functions[hash_name]
@@ -124,11 +137,13 @@ class HashDemoModule(CryptoModule):
             hash_bin = bin(int(hash_hex, 16))[2:].zfill(len(hash_hex) * 4)
             hash_time = (end_time - start_time) * 1000  # в миллисекундах
             
+            throughput = report.throughput(hash_name) if report else None
             results.append({
                 'Алгоритм': hash_name,
                 'Размер выхода (бит)': len(hash_bin),
                 'Хеш (HEX)': hash_hex,
-                'Время (мс)': f"{hash_time:.6f}"
+                'Время (мс)': f"{hash_time:.6f}",
+                'Скорость (МБ/с)': f"{throughput:.0f}" if throughput else "—"
             })
             
             performance_data.append({
@@ -140,6 +155,13 @@ class HashDemoModule(CryptoModule):
         # Показываем таблицу
         df = pd.DataFrame(results)
         st.dataframe(df, use_container_width=True, hide_index=True)
+        if report:
+            st.caption(
+                f"Скорость - замер на этом компьютере для сообщений {benchmark.format_size(report.reference_size)} "
+                f"(режим «⚡ Производительность»)"
+            )
+        else:
+            st.caption("Скорость появится после замера в режиме «⚡ Производительность»")
         
         # Визуализация производительности
         st.markdown("### ⚡ Производительность хеш-функций")
@@ -211,6 +233,33 @@ class HashDemoModule(CryptoModule):
             
             with st.spinner("Анализирую лавинный эффект..."):
                 self.show_avalanche_effect(original_text, modified_text, selected_hash)
+
+        st.markdown("---")
+        st.markdown("### 📊 Статистический анализ по множеству пар")
+        st.markdown(
+            "Одна пара текстов показывает лишь случайный пример. Здесь хешируются тысячи случайных "
+            "сообщений и их копий с одним инвертированным битом (по очереди во всех позициях), а затем "
+            "строится матрица строгого лавинного критерия (SAC)."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            samples = st.select_slider(
+                "Число пар:",
+                options=AVALANCHE_SAMPLES,
+                value=100_000,
+                format_func=format_count,
+                key="avalanche_samples"
+            )
+        with col2:
+            input_bytes = st.select_slider(
+                "Длина сообщения (байт):",
+                options=[4, 8, 16, 32, 64],
+                value=16,
+                key="avalanche_input_bytes"
+            )
+        if st.button("📊 Статистический анализ", key="avalanche_statistics"):
+            result = run_avalanche_analysis(avalanche.hash_primitive(selected_hash, input_bytes), samples)
+            render_avalanche_report(result)
     
     def show_avalanche_effect(self, original_text, modified_text, hash_name):
         """Показывает лавинный эффект"""
@@ -220,16 +269,18 @@ class HashDemoModule(CryptoModule):
         hash_func = self.hash_functions[hash_name]
         
         # Вычисляем хеши
-        hash_original = hash_func(original_text.encode('utf-8')).hexdigest()
-        hash_modified = hash_func(modified_text.encode('utf-8')).hexdigest()
+        digest_original = hash_func(original_text.encode('utf-8')).digest()
+        digest_modified = hash_func(modified_text.encode('utf-8')).digest()
+        hash_original, hash_modified = digest_original.hex(), digest_modified.hex()
         
-        # Преобразуем в бинарный вид
-        bin_original = bin(int(hash_original, 16))[2:].zfill(len(hash_original) * 4)
-        bin_modified = bin(int(hash_modified, 16))[2:].zfill(len(hash_modified) * 4)
+        # Биты дайджестов и их разность
+        bits_original = np.unpackbits(np.frombuffer(digest_original, dtype=np.uint8))
+        bits_modified = np.unpackbits(np.frombuffer(digest_modified, dtype=np.uint8))
+        diff_mask = avalanche.bit_difference(digest_original, digest_modified)
         
         # Считаем различия
-        differences = sum(1 for a, b in zip(bin_original, bin_modified) if a != b)
-        total_bits = len(bin_original)
+        differences = int(diff_mask.sum())
+        total_bits = len(diff_mask)
         difference_percent = (differences / total_bits) * 100
         
         # Показываем результаты
@@ -247,14 +298,12 @@ class HashDemoModule(CryptoModule):
         
         # Показываем первые 128 бит для наглядности
         display_bits = 128
-        bin_orig_display = bin_original[:display_bits]
-        bin_mod_display = bin_modified[:display_bits]
         
         # Создаем визуализацию
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(15, 8))
         
         # График 1: Исходный хеш
-        bits_orig = [int(bit) for bit in bin_orig_display]
+        bits_orig = bits_original[:display_bits]
         colors_orig = ['green' if bit == 1 else 'red' for bit in bits_orig]
         ax1.bar(range(len(bits_orig)), bits_orig, color=colors_orig, alpha=0.7)
         ax1.set_title(f'Исходный хеш ({hash_name}) - первые {display_bits} бит')
@@ -262,7 +311,7 @@ class HashDemoModule(CryptoModule):
         ax1.set_ylim(0, 1)
         
         # График 2: Измененный хеш
-        bits_mod = [int(bit) for bit in bin_mod_display]
+        bits_mod = bits_modified[:display_bits]
         colors_mod = ['green' if bit == 1 else 'red' for bit in bits_mod]
         ax2.bar(range(len(bits_mod)), bits_mod, color=colors_mod, alpha=0.7)
         ax2.set_title(f'Измененный хеш ({hash_name}) - первые {display_bits} бит')
@@ -270,10 +319,10 @@ class HashDemoModule(CryptoModule):
         ax2.set_ylim(0, 1)
         
         # График 3: Различия
-        diff_bits = [1 if a != b else 0 for a, b in zip(bin_orig_display, bin_mod_display)]
+        diff_bits = diff_mask[:display_bits]
         colors_diff = ['orange' if diff == 1 else 'gray' for diff in diff_bits]
         ax3.bar(range(len(diff_bits)), [1] * len(diff_bits), color=colors_diff, alpha=0.7)
-        ax3.set_title(f'Различия между хешами ({sum(diff_bits)} из {display_bits} бит изменено)')
+        ax3.set_title(f'Различия между хешами ({int(diff_bits.sum())} из {display_bits} бит изменено)')
         ax3.set_ylabel('Изменен')
         ax3.set_ylim(0, 1)
         ax3.set_xlabel('Позиция бита')
@@ -318,78 +367,195 @@ class HashDemoModule(CryptoModule):
         with col2:
             search_mode = st.selectbox(
                 "Режим поиска:",
-                ["Частичные коллизии (первые N бит)", "Полные коллизии (учебные)"],
+                ["Частичные коллизии (первые N бит)", "Ро-метод и различимые точки", "Полные коллизии (учебные)"],
                 index=0
             )
         
+        workers = 1
         if search_mode == "Частичные коллизии (первые N бит)":
-            collision_bits = st.slider("Количество бит для совпадения:", 8, 32, 16)
-            max_attempts = st.slider("Максимальное количество попыток:", 1000, 100000, 10000)
+            collision_bits = st.slider("Количество бит для совпадения:", 8, 48, 32)
+            expected = collisions.expected_birthday_work(collision_bits)
+            max_power = collisions.max_hashes_for_memory().bit_length() - 1
+            max_attempts = st.select_slider(
+                "Максимальное количество хешей:",
+                options=[1 << power for power in range(12, max_power + 1)],
+                value=1 << min(max_power, max(12, math.ceil(math.log2(expected * 4)))),
+                format_func=lambda value: f"2^{value.bit_length() - 1} ({format_count(value)})",
+                key=f"collision_max_attempts_{collision_bits}"
+            )
+            workers = st.slider(
+                "Процессов:",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 8),
+                value=os.cpu_count() or 1,
+                key="collision_workers"
+            )
+            st.caption(
+                f"Парадокс дней рождения: ожидается около √(π/2 · 2^{collision_bits}) ≈ {format_count(expected)} хешей, "
+                f"память - до {collisions.BYTES_PER_HASH} байт на хеш, не больше "
+                f"{collisions.MEMORY_BUDGET >> 20} МБ (2^{max_power} хешей)"
+            )
+            report = benchmark.load_cached()
+            measurement = report.get(hash_algorithm, min(report.sizes)) if report else None
+            if measurement:
+                st.caption(
+                    f"По замеру на этом компьютере ({format_count(measurement.hash_rate)} хешей/с для коротких "
+                    f"сообщений в одном потоке) это не меньше {expected / measurement.hash_rate:.2f} с"
+                )
+        elif search_mode == "Ро-метод и различимые точки":
+            rho_settings = self.render_rho_settings()
         else:
             st.info("Будут показаны известные учебные примеры коллизий")
         
         if st.button("🎯 Начать поиск коллизий", type="primary"):
-            with st.spinner("Ищу коллизии..."):
-                if search_mode == "Частичные коллизии (первые N бит)":
-                    self.find_partial_collisions(hash_algorithm, collision_bits, max_attempts)
-                else:
-                    self.show_educational_collisions(hash_algorithm)
+            if search_mode == "Частичные коллизии (первые N бит)":
+                self.find_partial_collisions(hash_algorithm, collision_bits, max_attempts, workers)
+            elif search_mode == "Ро-метод и различимые точки":
+                self.find_rho_collisions(hash_algorithm, **rho_settings)
+            else:
+                self.show_educational_collisions(hash_algorithm)
+    
+    def render_rho_settings(self):
+        """Параметры поиска коллизий без таблицы хешей"""
+        st.markdown("""
+        Таблица всех хешей требует памяти на каждый вычисленный хеш. Ро-метод
+        рассматривает блуждание x → f(x), где f - первые n бит хеша: оно зацикливается,
+        а вход в цикл дает коллизию. Флойд и Брент хранят две точки, метод
+        различимых точек ван Ооршота-Винера - только точки с d нулевыми старшими битами
+        и хорошо распараллеливается.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            method = st.selectbox("Метод:", list(rho.METHODS), index=2, key="rho_method")
+            bits = st.slider("Бит усеченного хеша:", 16, RHO_MAX_BITS, 36, key="rho_bits")
+        with col2:
+            distinguished_bits = rho.default_distinguished_bits(bits)
+            workers = 1
+            if method == "Различимые точки":
+                distinguished_bits = st.slider(
+                    "Бит различимой точки (d):", 0, max(bits // 2, 1), distinguished_bits,
+                    key=f"rho_distinguished_{bits}",
+                    help="Больше d - меньше памяти, но длиннее блуждания"
+                )
+                workers = st.slider(
+                    "Процессов:",
+                    min_value=1,
+                    max_value=max(os.cpu_count() or 1, 8),
+                    value=os.cpu_count() or 1,
+                    key="rho_workers"
+                )
+            compare_all = st.checkbox("Сравнить все хеш-функции", value=False, key="rho_compare_all")
+        expected = collisions.expected_birthday_work(bits)
+        memory = expected / (1 << distinguished_bits) if method == "Различимые точки" else 2
+        st.caption(f"Ожидаемая работа √(π/2 · 2^{bits}) ≈ {format_count(expected)} вычислений, "
+                   f"память ≈ {format_count(memory)} точек; поиск прерывается после "
+                   f"{format_count(RHO_BUDGET_FACTOR * expected)} вычислений")
+        return {
+            "method": method,
+            "bits": bits,
+            "distinguished_bits": distinguished_bits,
+            "workers": workers,
+            "compare_all": compare_all,
+        }
+    
+    def run_rho_method(self, hash_algorithm, method, bits, distinguished_bits, workers, progress=None):
+        """Запуск выбранного метода поиска коллизии с бюджетом, кратным ожидаемой работе"""
+        max_evaluations = math.ceil(RHO_BUDGET_FACTOR * collisions.expected_birthday_work(bits))
+        if method == "Различимые точки":
+            return rho.distinguished_point_collision(
+                hash_algorithm, bits, distinguished_bits, workers=workers,
+                max_evaluations=max_evaluations, progress=progress
+            )
+        return rho.METHODS[method](hash_algorithm, bits, max_evaluations=max_evaluations)
     
-    def find_partial_collisions(self, hash_algorithm, collision_bits, max_attempts):
+    def find_rho_collisions(self, hash_algorithm, method, bits, distinguished_bits, workers, compare_all):
+        """Поиск коллизии усеченного хеша ро-методом или различимыми точками"""
+        st.markdown("---")
+        algorithms = list(self.hash_functions) if compare_all else [hash_algorithm]
+        status_text = st.empty()
+        
+        def report(evaluations, points, elapsed):
+            status_text.text(f"Вычислений f: {format_count(evaluations)}, различимых точек: {format_count(points)}, "
+                             f"{elapsed:.1f} с")
+        
+        results = []
+        for algorithm in algorithms:
+            status_text.text(f"{algorithm}: поиск...")
+            results.append(self.run_rho_method(algorithm, method, bits, distinguished_bits, workers, report))
+        status_text.empty()
+        
+        st.dataframe(pd.DataFrame([{
+            "Алгоритм": result.algorithm,
+            "Метод": result.method,
+            "Вычислений f": result.evaluations,
+            "Ожидалось √(π/2·2ⁿ)": round(result.expected),
+            "Отношение": round(result.work_ratio, 2),
+            "Память (точек)": result.memory,
+            "Время, с": round(result.elapsed, 2),
+        } for result in results]), use_container_width=True)
+        
+        for result in results:
+            if not result.found:
+                st.warning(f"{result.algorithm}: коллизия не найдена за {format_count(result.evaluations)} "
+                           f"вычислений ({RHO_BUDGET_FACTOR}× ожидаемой работы)")
+                continue
+            message1, message2 = result.messages
+            hash1, hash2 = result.digests
+            with st.expander(f"{result.algorithm}: коллизия первых {bits} бит", expanded=len(results) == 1):
+                st.code(f"x = {message1.hex()}\nH(x) = {hash1}\n\n"
+                        f"y = {message2.hex()}\nH(y) = {hash2}")
+    
+    def find_partial_collisions(self, hash_algorithm, collision_bits, max_attempts, workers=1):
         """Ищет частичные коллизии"""
         st.markdown("---")
         st.markdown(f"## 🎯 Поиск частичных коллизий для {hash_algorithm}")
         st.info(f"Ищем совпадение первых {collision_bits} бит")
         
-        hash_func = self.hash_functions[hash_algorithm]
-        found = False
-        attempts = 0
-        progress_bar = st.progress(0)
+        progress_bar = st.progress(0.0)
         status_text = st.empty()
         
-        # Генерируем случайные сообщения и ищем коллизии
-        hashes_seen = {}
+        def report(done, elapsed):
+            progress_bar.progress(min(done / max_attempts, 1.0))
+            rate = done / elapsed if elapsed else 0.0
+            status_text.text(f"Вычислено хешей: {format_count(done)} из {format_count(max_attempts)} ({rate / 1e6:.2f} млн/с)")
         
-        for i in range(max_attempts):
-            attempts = i + 1
-            progress = attempts / max_attempts
-            progress_bar.progress(progress)
-            status_text.text(f"Попытка {attempts}/{max_attempts}")
-            
-            # Генерируем случайное сообщение
-            message = f"message_{random.randint(0, 10**9)}"
-            hash_hex = hash_func(message.encode('utf-8')).hexdigest()
-            hash_bin = bin(int(hash_hex, 16))[2:].zfill(len(hash_hex) * 4)
-            prefix = hash_bin[:collision_bits]
-            
-            if prefix in hashes_seen:
-                # Нашли коллизию!
-                found = True
-                previous_message = hashes_seen[prefix]
-                st.success(f"🎉 Найдена коллизия после {attempts} попыток!")
-                
-                st.markdown("#### 📊 Результаты коллизии:")
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.error(f"**Сообщение 1:** {previous_message}")
-                    st.error(f"**Хеш 1:** {hash_func(previous_message.encode('utf-8')).hexdigest()}")
-                
-                with col2:
-                    st.error(f"**Сообщение 2:** {message}")
-                    st.error(f"**Хеш 2:** {hash_hex}")
-                
-                st.info(f"**Совпадающие биты:** {collision_bits} бит")
-                break
-            else:
-                hashes_seen[prefix] = message
+        result = collisions.find_partial_collision(
+            hash_algorithm, collision_bits, max_attempts, workers=workers, progress=report
+        )
         
         progress_bar.empty()
         status_text.empty()
         
-        if not found:
-            st.warning(f"Коллизии не найдены за {attempts} попыток")
-            st.info("Попробуйте уменьшить количество бит или увеличить максимальное количество попыток")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Хешей вычислено", format_count(result.hashes))
+        col2.metric("Ожидалось ≈", format_count(result.expected))
+        col3.metric("Время", f"{result.elapsed:.2f} с")
+        col4.metric("Скорость", f"{result.rate / 1e6:.2f} млн/с")
+        
+        if result.found:
+            message1, message2 = result.messages
+            hash1, hash2 = result.digests
+            st.success(
+                f"🎉 Найдена коллизия на {format_count(result.attempts)}-м хеше "
+                f"({result.attempts / result.expected:.2f} от ожидаемого)!"
+            )
+            
+            st.markdown("#### 📊 Результаты коллизии:")
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.error(f"**Сообщение 1:** {message1.decode()}")
+                st.error(f"**Хеш 1:** {hash1}")
+            
+            with col2:
+                st.error(f"**Сообщение 2:** {message2.decode()}")
+                st.error(f"**Хеш 2:** {hash2}")
+            
+            st.info(f"**Совпадающие биты:** {collision_bits} бит (первые {collision_bits // 4} hex-символов"
+                    f"{' и еще ' + str(collision_bits % 4) + ' бит' if collision_bits % 4 else ''})")
+        else:
+            st.warning(f"Коллизии не найдены за {format_count(result.hashes)} хешей")
+            st.info("Попробуйте уменьшить количество бит или увеличить максимальное количество хешей")
     
     def show_educational_collisions(self, hash_algorithm):
         """Показывает учебные примеры коллизий"""
@@ -492,7 +658,208 @@ class HashDemoModule(CryptoModule):
                     st.success("✅ Целостность сохранена")
             else:
                 st.info("Измените содержимое файла чтобы увидеть разницу в хеше")
-    
+
+        st.markdown("---")
+        self.show_file_checksums()
+
+    def show_file_checksums(self):
+        """Контрольные суммы файла за один проход по всем алгоритмам"""
+        st.markdown("#### 💿 Контрольные суммы файла")
+        st.caption(
+            "Файл читается один раз порциями по 1 МБ; каждая порция подается всем выбранным "
+            "алгоритмам. Многогигабайтные ISO-образы удобнее проверять без интерфейса: "
+            "`python -m modules.hash_functions.hashing.streaming image.iso --expect <hex>` - "
+            "файлы с диска от 64 МБ отображаются в память."
+        )
+
+        uploaded_file = st.file_uploader("Файл:", type=None, key="checksum_upload")
+
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            algorithms = st.multiselect(
+                "Алгоритмы:",
+                list(streaming.ALGORITHMS),
+                default=list(streaming.ALGORITHMS),
+                key="checksum_algorithms"
+            )
+        with col2:
+            workers = st.slider(
+                "Потоков:",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 8),
+                value=os.cpu_count() or 1,
+                key="checksum_workers"
+            )
+        expected = st.text_input(
+            "Опубликованная контрольная сумма (необязательно):",
+            placeholder="hex или строка вида 'SHA256 (image.iso) = ...'",
+            key="checksum_expected"
+        )
+
+        if not st.button("🧮 Вычислить контрольные суммы", key="checksum_run"):
+            return
+        if not algorithms:
+            st.error("Выберите хотя бы один алгоритм")
+            return
+        if uploaded_file is None:
+            st.error("Загрузите файл")
+            return
+
+        progress_bar = st.progress(0.0)
+        total = uploaded_file.size
+        last_report = 0.0
+
+        def progress(done: int) -> None:
+            nonlocal last_report
+            now = time.perf_counter()
+            if total and now - last_report >= collisions.PROGRESS_INTERVAL:
+                last_report = now
+                progress_bar.progress(min(done / total, 1.0))
+
+        result = streaming.hash_stream(uploaded_file, algorithms, workers=workers, progress=progress)
+        progress_bar.progress(1.0)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Размер", f"{format_count(result.size)} байт")
+        with col2:
+            st.metric("Время", f"{result.elapsed:.2f} с")
+        with col3:
+            st.metric("Скорость прохода", f"{result.total_throughput:.0f} МБ/с")
+
+        matched = result.matching(expected) if expected.strip() else []
+        st.dataframe(pd.DataFrame([
+            {
+                "Алгоритм": algorithm,
+                "Дайджест": digest,
+                "МБ/с": round(result.throughput(algorithm), 1),
+                "Совпадает": "✅" if algorithm in matched else "",
+            }
+            for algorithm, digest in result.digests.items()
+        ]), use_container_width=True, hide_index=True)
+        st.caption(f"Файл: {uploaded_file.name}")
+
+        if expected.strip():
+            if matched:
+                st.success(f"✅ Контрольная сумма совпадает ({', '.join(matched)})")
+            else:
+                st.error("❌ Контрольная сумма не совпадает ни с одним алгоритмом - файл поврежден или подменен")
+
+    def render_benchmark(self):
+        """Режим замера пропускной способности хеш-функций"""
+        st.markdown("### ⚡ Производительность хеш-функций")
+        st.markdown(
+            "Пропускная способность каждого алгоритма на сообщениях от 16 байт до 64 МБ в одном "
+            "и нескольких потоках. На коротких сообщениях время уходит на вызов функции и "
+            "финализацию, на длинных - на сжатие блоков; hashlib отпускает GIL для буферов "
+            "длиннее 2 КБ, поэтому потоки ускоряют только большие сообщения."
+        )
+
+        report = benchmark.load_cached()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            threads = st.slider(
+                "Потоков в многопоточном режиме:",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 8),
+                value=os.cpu_count() or 1,
+                key="benchmark_threads"
+            )
+        with col2:
+            max_size = st.select_slider(
+                "Наибольшее сообщение:",
+                options=list(benchmark.SIZES),
+                value=benchmark.SIZES[-1],
+                format_func=benchmark.format_size,
+                key="benchmark_max_size"
+            )
+        with col3:
+            min_time = st.select_slider(
+                "Время на замер (с):",
+                options=[0.02, 0.05, 0.1, 0.2, 0.5],
+                value=benchmark.DEFAULT_MIN_TIME,
+                key="benchmark_min_time"
+            )
+
+        label = "🔄 Повторить замер" if report else "⚡ Запустить замер"
+        if st.button(label, type="primary", key="benchmark_run"):
+            sizes = [size for size in benchmark.SIZES if size <= max_size]
+            progress_bar = st.progress(0.0)
+            status = st.empty()
+
+            def progress(done, total):
+                progress_bar.progress(done / total)
+                status.text(f"Ячеек матрицы: {done}/{total}")
+
+            report = benchmark.run_benchmark(benchmark.ALGORITHMS, sizes, threads, min_time, progress)
+            try:
+                benchmark.save(report)
+            except OSError as e:
+                st.warning(f"Не удалось сохранить результаты: {e}")
+            status.empty()
+
+        if report is None:
+            st.info("Замер еще не выполнялся на этом компьютере. Результаты сохранятся и будут "
+                    "использоваться в таблицах сравнения и оценках времени поиска коллизий.")
+            return
+
+        st.caption(
+            f"{report.host['cpu']}, ядер: {report.host['cpus']}, Python {report.host['python']}, "
+            f"{report.host['openssl']}; замер от {time.strftime('%d.%m.%Y %H:%M', time.localtime(report.created))}"
+        )
+        self.show_benchmark_report(report)
+
+    def show_benchmark_report(self, report):
+        """Таблицы и графики матрицы замеров"""
+        sizes = report.sizes
+        tabs = st.tabs([f"Потоков: {threads}" for threads in report.thread_counts])
+        for tab, threads in zip(tabs, report.thread_counts):
+            with tab:
+                st.dataframe(pd.DataFrame(
+                    [[report.throughput(algorithm, size, threads) for size in sizes]
+                     for algorithm in report.algorithms],
+                    index=report.algorithms,
+                    columns=[benchmark.format_size(size) for size in sizes]
+                ).round(1), use_container_width=True)
+
+        fig, ax = plt.subplots(figsize=(12, 5))
+        for algorithm in report.algorithms:
+            for threads, style in zip(report.thread_counts, ['-', '--']):
+                values = [report.throughput(algorithm, size, threads) for size in sizes]
+                ax.plot(sizes, values, style, marker='o', markersize=3,
+                        label=algorithm if threads == 1 else f"{algorithm}, {threads} потоков")
+        ax.set_xscale('log', base=2)
+        ax.set_xticks(sizes)
+        ax.set_xticklabels([benchmark.format_size(size) for size in sizes], rotation=45)
+        ax.set_xlabel('Размер сообщения')
+        ax.set_ylabel('МБ/с')
+        ax.set_title('Пропускная способность')
+        ax.grid(True, alpha=0.3)
+        ax.legend(fontsize=8, ncol=2)
+        plt.tight_layout()
+        st.pyplot(fig)
+
+        largest = sizes[-1]
+        rows = []
+        for algorithm in report.algorithms:
+            single = report.get(algorithm, largest)
+            shortest = report.get(algorithm, sizes[0])
+            row = {
+                'Алгоритм': algorithm,
+                f'МБ/с ({benchmark.format_size(largest)})': round(single.throughput, 1),
+                f'Хешей/с ({benchmark.format_size(sizes[0])})': format_count(shortest.hash_rate),
+            }
+            cycles = report.cycles_per_byte(single)
+            row['Тактов на байт'] = round(cycles, 2) if cycles else "—"
+            if len(report.thread_counts) > 1:
+                parallel = report.get(algorithm, largest, report.thread_counts[-1])
+                row['Ускорение потоками'] = f"×{parallel.throughput / single.throughput:.2f}"
+            rows.append(row)
+        st.markdown("#### 📋 Сводка")
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        if report.cpu_hz:
+            st.caption(f"Такты на байт - по номинальной частоте {report.cpu_hz / 1e9:.2f} ГГц, без учета турборежима")
+
     def show_password_storage(self):
         """Демонстрация хранения паролей"""
         st.markdown("#### 🔐 Хранение паролей")
@@ -643,9 +1010,11 @@ class HashDemoModule(CryptoModule):
         
         st.info("""
         В блокчейне каждый блок содержит:
-        - Данные транзакций
+        - Корень дерева Меркла транзакций
         - Хеш предыдущего блока
         - Собственный хеш
+        
+        Несколько транзакций в блоке разделяйте точкой с запятой.
         """)
         
         # Инициализация состояния
@@ -673,12 +1042,16 @@ class HashDemoModule(CryptoModule):
                 'block2': block2_data
             }
             
+            # Блок фиксирует транзакции корнем дерева Меркла (32 байта при любом их числе)
+            block1_root = merkle.root_of(tx.strip().encode('utf-8') for tx in block1_data.split(';') if tx.strip())
+            block2_root = merkle.root_of(tx.strip().encode('utf-8') for tx in block2_data.split(';') if tx.strip())
+            
             # Блок 1
-            block1_content = f"Блок 1: {block1_data}"
+            block1_content = f"Блок 1 | Корень Меркла: {block1_root.hex()}"
             block1_hash = hashlib.sha256(block1_content.encode('utf-8')).hexdigest()
             
             # Блок 2 (содержит хеш блока 1)
-            block2_content = f"Блок 2: {block2_data} | Предыдущий хеш: {block1_hash}"
+            block2_content = f"Блок 2 | Корень Меркла: {block2_root.hex()} | Предыдущий хеш: {block1_hash}"
             block2_hash = hashlib.sha256(block2_content.encode('utf-8')).hexdigest()
             
             st.session_state.blockchain_hashes = {
@@ -0,0 +1,181 @@
+"""Статистика лавинного эффекта по множеству пар входов.
+
+Генерируется N случайных входов; в i-м входе инвертируется бит i mod m
+(m - число бит входа), так что каждая позиция получает одинаковое число
+пар. Выходы пар XOR-ятся, разности разворачиваются np.unpackbits, и по
+ним считаются расстояния Хэмминга и матрица строгого лавинного критерия
+(SAC): вероятность смены выходного бита j при инверсии входного бита i.
+У идеальной функции все элементы близки к 0.5, а расстояния распределены
+как Bin(n, 1/2).
+
+Поддерживаются хеш-функции hashlib и все блочные шифры из реестра
+block_modes.ciphers (они шифруют всю пачку блоков одним вызовом).
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional
+import math
+import secrets
+import time
+
+import numpy as np
+
+from modules.hash_functions.hashing.collisions import hash_constructor
+from modules.modern_crypto.block_modes.ciphers import BLOCK_CIPHERS, create_block_cipher
+
+DEFAULT_SAMPLES = 100_000
+CHUNK_ROWS = 1 << 14  # строк разностей в одной порции unpackbits
+
+
+@dataclass
+class Primitive:
+    """Функция, отображающая пачку входов (n, input_bytes) в выходы (n, output_bytes)"""
+    name: str
+    input_bytes: int
+    output_bytes: int
+    apply: Callable[[np.ndarray], np.ndarray]
+
+    @property
+    def input_bits(self) -> int:
+        return self.input_bytes * 8
+
+    @property
+    def output_bits(self) -> int:
+        return self.output_bytes * 8
+
+
+def hash_primitive(algorithm: str, input_bytes: int = 16) -> Primitive:
+    """Хеш-функция на сообщениях фиксированной длины"""
+    constructor = hash_constructor(algorithm)
+    digest_size = constructor().digest_size
+
+    def apply(inputs: np.ndarray) -> np.ndarray:
+        data = inputs.tobytes()
+        digests = b"".join([constructor(data[offset:offset + input_bytes]).digest()
+                            for offset in range(0, len(data), input_bytes)])
+        return np.frombuffer(digests, dtype=np.uint8).reshape(-1, digest_size)
+
+    return Primitive(algorithm, input_bytes, digest_size, apply)
+
+
+def cipher_primitive(name: str, key: Optional[bytes] = None) -> Primitive:
+    """Блочный шифр из реестра с фиксированным (по умолчанию случайным) ключом"""
+    cipher_class = BLOCK_CIPHERS[name]
+    cipher = create_block_cipher(name, key if key is not None else secrets.token_bytes(cipher_class.key_size))
+    block_size = cipher.block_size
+
+    def apply(inputs: np.ndarray) -> np.ndarray:
+        return np.frombuffer(cipher.encrypt_blocks(inputs.tobytes()), dtype=np.uint8).reshape(-1, block_size)
+
+    return Primitive(name, block_size, block_size, apply)
+
+
+@dataclass
+class AvalancheResult:
+    """Расстояния Хэмминга всех пар и матрица SAC"""
+    name: str
+    input_bits: int
+    output_bits: int
+    distances: np.ndarray      # (N,) число изменившихся выходных бит в каждой паре
+    sac: np.ndarray            # (input_bits, output_bits) доля пар, где бит изменился
+    elapsed: float
+
+    @property
+    def samples(self) -> int:
+        return len(self.distances)
+
+    @property
+    def samples_per_bit(self) -> int:
+        return self.samples // self.input_bits
+
+    @property
+    def mean_distance(self) -> float:
+        return float(self.distances.mean())
+
+    @property
+    def mean_ratio(self) -> float:
+        """Средняя доля изменившихся бит (идеал - 0.5)"""
+        return self.mean_distance / self.output_bits
+
+    @property
+    def std_distance(self) -> float:
+        return float(self.distances.std())
+
+    @property
+    def expected_std(self) -> float:
+        """Стандартное отклонение Bin(n, 1/2)"""
+        return math.sqrt(self.output_bits) / 2
+
+    @property
+    def sac_max_deviation(self) -> float:
+        """Наибольшее отклонение элемента матрицы SAC от 0.5"""
+        return float(np.abs(self.sac - 0.5).max())
+
+    @property
+    def sac_rms_deviation(self) -> float:
+        return float(np.sqrt(np.mean((self.sac - 0.5) ** 2)))
+
+    @property
+    def sac_noise(self) -> float:
+        """Ожидаемое случайное отклонение элемента SAC: sqrt(0.25 / пар на бит)"""
+        return math.sqrt(0.25 / max(self.samples_per_bit, 1))
+
+    @property
+    def sac_threshold(self) -> float:
+        """Допустимое наибольшее отклонение: ожидаемый максимум шума по всем элементам плюс запас"""
+        cells = self.sac.size
+        return (math.sqrt(2 * math.log(2 * cells)) + 1) * self.sac_noise
+
+    @property
+    def passes_sac(self) -> bool:
+        return self.sac_max_deviation <= self.sac_threshold
+
+    def histogram(self) -> np.ndarray:
+        """Число пар для каждого расстояния 0..output_bits"""
+        return np.bincount(self.distances, minlength=self.output_bits + 1)
+
+    def binomial_expectation(self) -> np.ndarray:
+        """Ожидаемое число пар для каждого расстояния при Bin(n, 1/2)"""
+        n = self.output_bits
+        log_pmf = np.array([math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+                            for k in range(n + 1)]) - n * math.log(2)
+        return self.samples * np.exp(log_pmf)
+
+
+def analyze(primitive: Primitive, samples: int = DEFAULT_SAMPLES, seed: Optional[int] = None,
+            progress: Optional[Callable[[int, int], None]] = None) -> AvalancheResult:
+    """Лавинный эффект primitive по samples парам (округляется вверх до кратного числу бит входа).
+
+    progress(обработано_пар, всего_пар) вызывается после каждой порции.
+    """
+    rng = np.random.default_rng(seed)
+    m = primitive.input_bits
+    rounds = max(1, math.ceil(samples / m))
+    total = rounds * m
+    rounds_per_chunk = max(1, CHUNK_ROWS // m)
+    positions = np.arange(m)
+    byte_index, bit_mask = positions // 8, (0x80 >> (positions % 8)).astype(np.uint8)
+
+    distances = np.empty(total, dtype=np.int64)
+    flips = np.zeros((m, primitive.output_bits), dtype=np.int64)
+    start_time = time.perf_counter()
+    for first_round in range(0, rounds, rounds_per_chunk):
+        count = min(rounds_per_chunk, rounds - first_round)
+        base = rng.integers(0, 256, size=(count, m, primitive.input_bytes), dtype=np.uint8)
+        flipped = base.copy()
+        flipped[:, positions, byte_index] ^= bit_mask
+        difference = (primitive.apply(base.reshape(count * m, -1))
+                      ^ primitive.apply(flipped.reshape(count * m, -1)))
+        bits = np.unpackbits(difference, axis=1)
+        rows = slice(first_round * m, (first_round + count) * m)
+        distances[rows] = bits.sum(axis=1, dtype=np.int64)
+        flips += bits.reshape(count, m, -1).sum(axis=0, dtype=np.int64)
+        if progress is not None:
+            progress(rows.stop, total)
+
+    return AvalancheResult(primitive.name, m, primitive.output_bits, distances,
+                           flips / rounds, time.perf_counter() - start_time)
+
+
+def bit_difference(first: bytes, second: bytes) -> np.ndarray:
+    """Побитовая разность двух строк байт как массив 0/1"""
+    return np.unpackbits(np.frombuffer(first, dtype=np.uint8) ^ np.frombuffer(second, dtype=np.uint8))
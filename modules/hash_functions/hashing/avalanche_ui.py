@@ -0,0 +1,76 @@
+"""Общие элементы Streamlit для лавинного анализа: страницы хеш-функций и AES"""
+import matplotlib.pyplot as plt
+import numpy as np
+import streamlit as st
+
+from modules.hash_functions.hashing import avalanche
+
+
+def format_count(value) -> str:
+    """Целое число с пробелами между разрядами"""
+    return f"{round(value):,}".replace(",", " ")
+
+
+AVALANCHE_SAMPLES = [10_000, 50_000, 100_000, 200_000, 500_000]
+
+
+def run_avalanche_analysis(primitive, samples):
+    """Статистический анализ с индикатором прогресса"""
+    progress_bar = st.progress(0.0)
+
+    def progress(done, total):
+        progress_bar.progress(done / total)
+
+    result = avalanche.analyze(primitive, samples, progress=progress)
+    progress_bar.empty()
+    return result
+
+
+def render_avalanche_report(result):
+    """Метрики, распределение расстояний Хэмминга и матрица SAC"""
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Пар входов", format_count(result.samples), f"{result.elapsed:.2f} с", delta_color="off")
+    with col2:
+        st.metric("Изменено бит в среднем", f"{result.mean_ratio:.2%}", f"{result.mean_ratio - 0.5:+.2%} от 50%",
+                  delta_color="off")
+    with col3:
+        st.metric("Ст. отклонение", f"{result.std_distance:.2f}", f"идеал {result.expected_std:.2f}",
+                  delta_color="off")
+    with col4:
+        st.metric("Макс. отклонение SAC", f"{result.sac_max_deviation:.3f}", f"допуск {result.sac_threshold:.3f}",
+                  delta_color="off")
+
+    if result.passes_sac:
+        st.success(f"✅ {result.name}: строгий лавинный критерий выполняется - каждый входной бит меняет "
+                   f"каждый выходной с вероятностью ≈ 1/2")
+    else:
+        st.error(f"❌ {result.name}: строгий лавинный критерий нарушен - есть пары бит, зависимость "
+                 f"между которыми видна статистически")
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5), gridspec_kw={'width_ratios': [1, 1.3]})
+
+    histogram = result.histogram()
+    expected = result.binomial_expectation()
+    used = np.flatnonzero((histogram > 0) | (expected >= 1))
+    span = np.arange(used.min(), used.max() + 1)
+    ax1.bar(span, histogram[span], color='skyblue', alpha=0.8, label='Наблюдаемое')
+    ax1.plot(span, expected[span], color='red', label=f'Bin({result.output_bits}, 1/2)')
+    ax1.set_title('Распределение расстояний Хэмминга')
+    ax1.set_xlabel('Изменено выходных бит')
+    ax1.set_ylabel('Число пар')
+    ax1.legend()
+
+    image = ax2.imshow(result.sac, aspect='auto', cmap='coolwarm', vmin=0, vmax=1, interpolation='nearest')
+    ax2.set_title('Матрица SAC: P(выходной бит j изменился | инвертирован входной бит i)')
+    ax2.set_xlabel('Выходной бит j')
+    ax2.set_ylabel('Входной бит i')
+    fig.colorbar(image, ax=ax2)
+
+    plt.tight_layout()
+    st.pyplot(fig)
+    st.caption(
+        f"Пар на каждый входной бит: {format_count(result.samples_per_bit)}; случайное отклонение элемента "
+        f"матрицы - около {result.sac_noise:.3f}. Однотонная матрица около 0.5 - хорошее перемешивание, "
+        f"полосы и пятна - зависимость выходных бит от входных."
+    )
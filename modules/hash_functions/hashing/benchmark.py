@@ -0,0 +1,286 @@
+"""Замер пропускной способности хеш-функций на сообщениях от 16 байт до 64 МБ.
+
+Каждая ячейка матрицы (алгоритм, размер, потоки) измеряется как в
+timeit.autorange: число повторов растет, пока замер не займет
+min_time секунд, и берется лучший из нескольких замеров. В многопоточном режиме потоки хешируют один и тот же
+буфер (memoryview без копий); hashlib отпускает GIL на сообщениях длиннее
+2 КБ, поэтому выигрыш от потоков виден только на больших размерах.
+Такты на байт считаются по номинальной частоте процессора (без учета
+турборежима) и поэтому приблизительны.
+
+Результаты кэшируются в JSON-файле для каждого компьютера (имя узла,
+процессор, число ядер, версии Python и OpenSSL). Запуск без интерфейса:
+
+    python -m modules.hash_functions.hashing.benchmark --threads 4
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+import argparse
+import hashlib
+import json
+import os
+import platform
+import ssl
+import sys
+import time
+
+from modules.hash_functions.hashing.collisions import HASHLIB_NAMES, hash_constructor
+
+ALGORITHMS = tuple(HASHLIB_NAMES)
+SIZES = (16, 64, 256, 1 << 10, 4 << 10, 16 << 10, 64 << 10, 1 << 20, 16 << 20, 64 << 20)
+DEFAULT_MIN_TIME = 0.05
+REFERENCE_SIZE = 1 << 20  # размер для сводных "скоростей" в таблицах сравнения
+CACHE_ENV = "CRYPTOLAB_CACHE_DIR"
+
+
+@dataclass
+class Measurement:
+    """Одна ячейка матрицы"""
+    algorithm: str
+    size: int
+    threads: int
+    hashes: int
+    seconds: float
+
+    @property
+    def throughput(self) -> float:
+        """МБ/с"""
+        return self.hashes * self.size / self.seconds / 1e6 if self.seconds else 0.0
+
+    @property
+    def hash_rate(self) -> float:
+        """Хешей в секунду"""
+        return self.hashes / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class BenchmarkReport:
+    """Матрица замеров одного компьютера"""
+    host: Dict[str, str]
+    cpu_hz: Optional[float]
+    created: float
+    measurements: List[Measurement] = field(default_factory=list)
+
+    def get(self, algorithm: str, size: int, threads: int = 1) -> Optional[Measurement]:
+        for item in self.measurements:
+            if (item.algorithm, item.size, item.threads) == (algorithm, size, threads):
+                return item
+        return None
+
+    def throughput(self, algorithm: str, size: Optional[int] = None, threads: int = 1) -> Optional[float]:
+        """МБ/с; по умолчанию - для reference_size"""
+        item = self.get(algorithm, self.reference_size if size is None else size, threads)
+        return item.throughput if item else None
+
+    @property
+    def reference_size(self) -> int:
+        """REFERENCE_SIZE или наибольший замеренный размер, если до него не дошли"""
+        return min(REFERENCE_SIZE, max(self.sizes))
+
+    def cycles_per_byte(self, item: Measurement) -> Optional[float]:
+        """Такты на байт одного потока (None, если частота неизвестна)"""
+        if not self.cpu_hz or not item.throughput:
+            return None
+        return self.cpu_hz * min(item.threads, os.cpu_count() or 1) / (item.throughput * 1e6)
+
+    @property
+    def algorithms(self) -> List[str]:
+        return list(dict.fromkeys(item.algorithm for item in self.measurements))
+
+    @property
+    def sizes(self) -> List[int]:
+        return sorted({item.size for item in self.measurements})
+
+    @property
+    def thread_counts(self) -> List[int]:
+        return sorted({item.threads for item in self.measurements})
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BenchmarkReport":
+        return cls(data["host"], data.get("cpu_hz"), data["created"],
+                   [Measurement(**item) for item in data["measurements"]])
+
+
+def format_size(size: int) -> str:
+    """16 Б, 4 КБ, 64 МБ"""
+    for unit, scale in (("МБ", 1 << 20), ("КБ", 1 << 10)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale} {unit}"
+    return f"{size} Б"
+
+
+def cpu_frequency() -> Optional[float]:
+    """Номинальная частота процессора в Гц, если ее удается узнать (Linux)"""
+    try:
+        with open("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq") as stream:
+            return int(stream.read()) * 1e3
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/proc/cpuinfo") as stream:
+            for line in stream:
+                if line.lower().startswith("cpu mhz"):
+                    return float(line.split(":")[1]) * 1e6
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as stream:
+            for line in stream:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_info() -> Dict[str, str]:
+    """Признаки компьютера, от которых зависят результаты"""
+    return {
+        "node": platform.node(),
+        "cpu": _cpu_model(),
+        "cpus": str(os.cpu_count() or 1),
+        "python": platform.python_version(),
+        "openssl": ssl.OPENSSL_VERSION,
+    }
+
+
+def cache_path(host: Optional[Dict[str, str]] = None) -> str:
+    """Файл кэша для компьютера ($CRYPTOLAB_CACHE_DIR или ~/.cache/cryptolab)"""
+    host = host or host_info()
+    directory = os.environ.get(CACHE_ENV) or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cryptolab")
+    key = hashlib.sha1(json.dumps(host, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(directory, f"hash_benchmark-{key}.json")
+
+
+def load_cached(path: Optional[str] = None) -> Optional[BenchmarkReport]:
+    """Сохраненные результаты этого компьютера или None"""
+    try:
+        with open(path or cache_path(), encoding="utf-8") as stream:
+            return BenchmarkReport.from_dict(json.load(stream))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save(report: BenchmarkReport, path: Optional[str] = None) -> str:
+    path = path or cache_path(report.host)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as stream:
+        json.dump(report.to_dict(), stream, ensure_ascii=False, indent=2)
+    os.replace(temporary, path)
+    return path
+
+
+def _hash_loop(constructor: Callable, data: memoryview, number: int) -> None:
+    for _ in range(number):
+        constructor(data).digest()
+
+
+def measure(algorithm: str, data: memoryview, threads: int = 1, min_time: float = DEFAULT_MIN_TIME,
+            executor: Optional[ThreadPoolExecutor] = None, repeats: int = 2) -> Measurement:
+    """Замер одной ячейки.
+
+    Число повторов растет, пока время не превысит min_time; затем замер
+    повторяется и берется лучший из repeats (меньше всего помех от ОС).
+    """
+    constructor = hash_constructor(algorithm)
+
+    def timed(number: int) -> float:
+        start = time.perf_counter()
+        if threads == 1:
+            _hash_loop(constructor, data, number)
+        else:
+            list(executor.map(_hash_loop, [constructor] * threads, [data] * threads, [number] * threads))
+        return time.perf_counter() - start
+
+    number = 1
+    seconds = timed(number)
+    while seconds < min_time:
+        number *= 2 if seconds * 4 >= min_time else 8
+        seconds = timed(number)
+    for _ in range(repeats - 1):
+        seconds = min(seconds, timed(number))
+    return Measurement(algorithm, len(data), threads, number * threads, seconds)
+
+
+def run_benchmark(algorithms: Sequence[str] = ALGORITHMS, sizes: Sequence[int] = SIZES,
+                  threads: int = 1, min_time: float = DEFAULT_MIN_TIME,
+                  progress: Optional[Callable[[int, int], None]] = None) -> BenchmarkReport:
+    """Матрица замеров: однопоточный и (при threads > 1) многопоточный режим.
+
+    progress(готово_ячеек, всего_ячеек) вызывается после каждой ячейки.
+    """
+    thread_counts = [1] + ([threads] if threads > 1 else [])
+    buffer = memoryview(os.urandom(max(sizes)))
+    report = BenchmarkReport(host_info(), cpu_frequency(), time.time())
+    total = len(algorithms) * len(sizes) * len(thread_counts)
+    executor = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+    try:
+        for count in thread_counts:
+            for algorithm in algorithms:
+                for size in sizes:
+                    report.measurements.append(measure(algorithm, buffer[:size], count, min_time, executor))
+                    if progress is not None:
+                        progress(len(report.measurements), total)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пропускная способность хеш-функций")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES), help="размеры сообщений в байтах")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="потоков в многопоточном режиме")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="секунд на ячейку")
+    parser.add_argument("--cached", action="store_true", help="показать сохраненные результаты без замера")
+    parser.add_argument("--json", help="сохранить результаты также в этот файл ('-' - стандартный вывод)")
+    args = parser.parse_args(argv)
+
+    if args.cached:
+        report = load_cached()
+        if report is None:
+            print(f"Нет сохраненных результатов ({cache_path()})", file=sys.stderr)
+            return 1
+    else:
+        def progress(done: int, total: int) -> None:
+            print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+        report = run_benchmark(args.algorithms, args.sizes, args.threads, args.min_time, progress)
+        print(file=sys.stderr)
+        print(f"Сохранено: {save(report)}", file=sys.stderr)
+
+    if args.json == "-":
+        json.dump(report.to_dict(), sys.stdout, ensure_ascii=False, indent=2)
+    elif args.json:
+        save(report, args.json)
+
+    sizes = report.sizes
+    for threads in report.thread_counts:
+        print(f"\nМБ/с, потоков: {threads}")
+        print(f"{'':10s}" + "".join(f"{format_size(size):>10s}" for size in sizes))
+        for algorithm in report.algorithms:
+            cells = (report.throughput(algorithm, size, threads) for size in sizes)
+            print(f"{algorithm:10s}" + "".join(f"{cell:10.1f}" if cell else f"{'-':>10s}" for cell in cells))
+    largest = sizes[-1]
+    if report.cpu_hz:
+        print(f"\nТактов на байт ({format_size(largest)}, {report.cpu_hz / 1e9:.2f} ГГц):")
+        for algorithm in report.algorithms:
+            item = report.get(algorithm, largest)
+            if item:
+                print(f"{algorithm:10s}{report.cycles_per_byte(item):10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
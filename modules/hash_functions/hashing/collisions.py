@@ -0,0 +1,218 @@
+"""Поиск частичных коллизий хеш-функций (совпадение первых n бит).
+
+Сообщения строятся из случайной соли и счетчика, поэтому их не нужно
+хранить: i-е сообщение восстанавливается по номеру. Хешируются пакеты
+сообщений, префиксы дайджестов извлекаются как целые uint64 одним вызовом
+np.frombuffer. Каждый пакет сортируется и проверяется через searchsorted
+по отсортированным сериям уже просмотренных префиксов. Серии сливаются,
+как разряды двоичного счетчика (последняя - с предыдущей, пока та не
+длиннее), поэтому серий O(log n) и каждый префикс сливается O(log n) раз
+вместо вставки в один массив за O(n) на пакет. Пиковая память - до
+BYTES_PER_HASH байт на хеш, поэтому max_hashes ограничен бюджетом памяти.
+Пакеты могут считаться в пуле процессов.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+import hashlib
+import math
+import secrets
+import time
+
+import numpy as np
+
+# Отображаемые имена -> имена hashlib (имена передаются в рабочие процессы)
+HASHLIB_NAMES = {
+    "MD5": "md5",
+    "SHA-1": "sha1",
+    "SHA-256": "sha256",
+    "SHA-512": "sha512",
+    "SHA-3-256": "sha3_256",
+    "BLAKE2b": "blake2b",
+}
+
+MAX_PREFIX_BITS = 64
+DEFAULT_BATCH = 1 << 16
+PROGRESS_INTERVAL = 0.1  # не чаще 10 раз в секунду
+# Общий массив префиксов (8) + серии (8) + результат слияния (8) + буфер stable-сортировки (4)
+BYTES_PER_HASH = 28
+MEMORY_BUDGET = 1 << 30  # 1 ГБ
+
+
+def hash_constructor(algorithm: str) -> Callable:
+    """Конструктор hashlib по отображаемому имени или имени hashlib"""
+    return getattr(hashlib, HASHLIB_NAMES.get(algorithm, algorithm))
+
+
+def expected_birthday_work(bits: int) -> float:
+    """Ожидаемое число хешей до первой коллизии n-битного значения: sqrt(pi/2 * 2^n)"""
+    return math.sqrt(math.pi / 2 * 2.0 ** bits)
+
+
+def max_hashes_for_memory(memory_budget: int = MEMORY_BUDGET) -> int:
+    """Наибольшее число хешей, при котором поиск укладывается в memory_budget байт"""
+    return memory_budget // BYTES_PER_HASH
+
+
+def digest_prefixes(digests: bytes, digest_size: int, bits: int) -> np.ndarray:
+    """Первые bits бит каждого дайджеста из склеенного буфера как uint64"""
+    rows = np.frombuffer(digests, dtype=np.uint8).reshape(-1, digest_size)
+    head = np.zeros((len(rows), 8), dtype=np.uint8)
+    width = min(digest_size, 8)
+    head[:, :width] = rows[:, :width]
+    return head.view('>u8').reshape(-1).astype(np.uint64) >> np.uint64(MAX_PREFIX_BITS - bits)
+
+
+def message(salt: bytes, counter: int) -> bytes:
+    """Сообщение с номером counter"""
+    return b"%s-%d" % (salt, counter)
+
+
+def hash_batch(algorithm: str, bits: int, salt: bytes, start: int, count: int) -> np.ndarray:
+    """Префиксы хешей сообщений start..start+count-1 (выполняется и в рабочих процессах)"""
+    constructor = hash_constructor(algorithm)
+    digest_size = constructor().digest_size
+    prefix = salt + b"-"
+    digests = b"".join([constructor(b"%s%d" % (prefix, counter)).digest()
+                        for counter in range(start, start + count)])
+    return digest_prefixes(digests, digest_size, bits)
+
+
+def _first_duplicate(prefixes: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Пара (i, j), i < j, с наименьшим j среди совпадающих префиксов"""
+    order = np.argsort(prefixes, kind='stable')
+    ordered = prefixes[order]
+    same = np.flatnonzero(ordered[1:] == ordered[:-1])
+    if not len(same):
+        return None
+    # В группе равных значений stable-сортировка сохраняет порядок индексов,
+    # поэтому order[k + 1] - более поздний элемент пары
+    later = order[same + 1]
+    best = int(np.argmin(later))
+    group_value = ordered[same[best]]
+    first = int(order[np.searchsorted(ordered, group_value)])
+    return first, int(later[best])
+
+
+@dataclass
+class PartialCollisionResult:
+    """Итог поиска частичной коллизии"""
+    algorithm: str
+    bits: int
+    salt: bytes
+    hashes: int                        # сколько хешей вычислено
+    elapsed: float
+    pair: Optional[Tuple[int, int]] = None  # номера сообщений
+
+    @property
+    def found(self) -> bool:
+        return self.pair is not None
+
+    @property
+    def attempts(self) -> int:
+        """Номер хеша, на котором коллизия возникла впервые"""
+        return self.pair[1] + 1 if self.pair else self.hashes
+
+    @property
+    def messages(self) -> Tuple[bytes, bytes]:
+        return message(self.salt, self.pair[0]), message(self.salt, self.pair[1])
+
+    @property
+    def digests(self) -> Tuple[str, str]:
+        constructor = hash_constructor(self.algorithm)
+        return tuple(constructor(item).hexdigest() for item in self.messages)
+
+    @property
+    def expected(self) -> float:
+        return expected_birthday_work(self.bits)
+
+    @property
+    def rate(self) -> float:
+        """Хешей в секунду"""
+        return self.hashes / self.elapsed if self.elapsed else 0.0
+
+
+def _contains(run: np.ndarray, ordered: np.ndarray) -> bool:
+    """Есть ли среди отсортированных ordered значение из отсортированной серии run"""
+    positions = np.minimum(np.searchsorted(run, ordered), len(run) - 1)
+    return bool(np.any(run[positions] == ordered))
+
+
+def find_partial_collision(algorithm: str, bits: int, max_hashes: int,
+                           batch_size: Optional[int] = None, workers: int = 1,
+                           salt: Optional[bytes] = None,
+                           memory_budget: int = MEMORY_BUDGET,
+                           progress: Optional[Callable[[int, float], None]] = None) -> PartialCollisionResult:
+    """Ищет два сообщения с одинаковыми первыми bits битами хеша.
+
+    progress(вычислено_хешей, прошло_секунд) вызывается не чаще PROGRESS_INTERVAL.
+    При workers > 1 пакеты хешируются в пуле процессов (не больше 2 * workers
+    пакетов одновременно). По умолчанию размер пакета - четверть ожидаемой
+    работы, но не больше DEFAULT_BATCH. max_hashes сверх бюджета памяти
+    memory_budget (байт) отклоняется до выделения массивов.
+    """
+    if not 1 <= bits <= MAX_PREFIX_BITS:
+        raise ValueError(f"Число бит должно быть от 1 до {MAX_PREFIX_BITS}")
+    salt = salt if salt is not None else secrets.token_hex(4).encode()
+    max_hashes = max(int(max_hashes), 2)
+    if max_hashes > max_hashes_for_memory(memory_budget):
+        raise ValueError(
+            f"{max_hashes} хешей потребуют около {max_hashes * BYTES_PER_HASH >> 20} МБ - "
+            f"больше бюджета {memory_budget >> 20} МБ")
+    if batch_size is None:
+        batch_size = int(min(DEFAULT_BATCH, max(1024, expected_birthday_work(bits) / 4)))
+    batch_size = max(1, min(batch_size, max_hashes))
+
+    prefixes = np.empty(max_hashes, dtype=np.uint64)
+    runs: List[np.ndarray] = []  # отсортированные серии префиксов принятых пакетов, длины убывают
+    filled = 0
+    pair = None
+    start_time = last_report = time.perf_counter()
+
+    def accept(batch: np.ndarray) -> bool:
+        """Сохраняет пакет; True, если он дал коллизию"""
+        nonlocal filled, pair, last_report
+        prefixes[filled:filled + len(batch)] = batch
+        filled += len(batch)
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress(filled, now - start_time)
+
+        ordered = np.sort(batch)
+        if np.any(ordered[1:] == ordered[:-1]) or any(_contains(run, ordered) for run in runs):
+            # Совпадение есть - точную первую пару ищем один раз по всем префиксам
+            pair = _first_duplicate(prefixes[:filled])
+            return True
+        runs.append(ordered)
+        while len(runs) > 1 and len(runs[-2]) <= len(runs[-1]):
+            # Сортировка на месте: не держим одновременно склейку и ее отсортированную копию
+            merged = np.concatenate((runs[-2], runs.pop()))
+            merged.sort(kind='stable')
+            runs[-1] = merged
+        return False
+
+    starts = range(0, max_hashes, batch_size)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for start in starts:
+                pending.append(executor.submit(
+                    hash_batch, algorithm, bits, salt, start, min(batch_size, max_hashes - start)))
+                if len(pending) >= 2 * workers and accept(pending.popleft().result()):
+                    break
+            else:
+                while pending and not accept(pending.popleft().result()):
+                    pass
+            for future in pending:
+                future.cancel()
+    else:
+        for start in starts:
+            if accept(hash_batch(algorithm, bits, salt, start, min(batch_size, max_hashes - start))):
+                break
+
+    elapsed = time.perf_counter() - start_time
+    if progress is not None:
+        progress(filled, elapsed)
+    return PartialCollisionResult(algorithm, bits, salt, filled, elapsed, pair)
@@ -0,0 +1,277 @@
+"""Поиск коллизий усеченного хеша без таблицы всех значений.
+
+f(x) - первые n бит хеша n-битного числа x (записанного в ceil(n/8) байт).
+Последовательность x, f(x), f(f(x)), ... зацикливается ("ро"), а точка
+входа в цикл дает коллизию: у нее два разных прообраза. Методы Флойда и
+Брента находят цикл с O(1) памяти. Метод различимых точек ван Ооршота-Винера
+запускает много независимых блужданий (в том числе в пуле процессов) до
+точек с d нулевыми старшими битами; память - число сохраненных различимых
+точек, около работы / 2^d.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import random
+import time
+
+from modules.hash_functions.hashing.collisions import (
+    MAX_PREFIX_BITS, PROGRESS_INTERVAL, expected_birthday_work, hash_constructor,
+)
+
+WALKS_PER_TASK = 32
+MAX_WALK_FACTOR = 20  # блуждание длиннее 20 * 2^d считается зациклившимся
+
+
+def truncated_hash(algorithm: str, bits: int) -> Callable[[int], int]:
+    """f(x): первые bits бит хеша от x, записанного в ceil(bits/8) байт"""
+    if not 1 <= bits <= MAX_PREFIX_BITS:
+        raise ValueError(f"Число бит должно быть от 1 до {MAX_PREFIX_BITS}")
+    constructor = hash_constructor(algorithm)
+    width = (bits + 7) // 8
+    shift = MAX_PREFIX_BITS - bits
+    if constructor().digest_size < 8:
+        raise ValueError("Дайджест короче 64 бит")
+
+    def f(x: int) -> int:
+        return int.from_bytes(constructor(x.to_bytes(width, 'big')).digest()[:8], 'big') >> shift
+
+    return f
+
+
+def encode_point(x: int, bits: int) -> bytes:
+    """Сообщение, соответствующее точке x"""
+    return x.to_bytes((bits + 7) // 8, 'big')
+
+
+@dataclass
+class RhoResult:
+    """Итог поиска коллизии одним из методов"""
+    algorithm: str
+    bits: int
+    method: str
+    evaluations: int       # вычислений f
+    elapsed: float
+    memory: int            # сколько точек хранилось одновременно
+    pair: Optional[Tuple[int, int]] = None
+
+    @property
+    def found(self) -> bool:
+        return self.pair is not None
+
+    @property
+    def expected(self) -> float:
+        return expected_birthday_work(self.bits)
+
+    @property
+    def work_ratio(self) -> float:
+        """Фактическая работа относительно sqrt(pi/2 * 2^n)"""
+        return self.evaluations / self.expected
+
+    @property
+    def messages(self) -> Tuple[bytes, bytes]:
+        return encode_point(self.pair[0], self.bits), encode_point(self.pair[1], self.bits)
+
+    @property
+    def digests(self) -> Tuple[str, str]:
+        constructor = hash_constructor(self.algorithm)
+        return tuple(constructor(item).hexdigest() for item in self.messages)
+
+
+class _Counted:
+    """Обертка f с подсчетом вызовов и ограничением работы"""
+
+    def __init__(self, f: Callable[[int], int], limit: Optional[int]):
+        self.f = f
+        self.calls = 0
+        self.limit = limit
+
+    def __call__(self, x: int) -> int:
+        self.calls += 1
+        if self.limit is not None and self.calls > self.limit:
+            raise TimeoutError
+        return self.f(x)
+
+
+def _locate_entry(f: Callable[[int], int], start: int, lead: int) -> Optional[Tuple[int, int]]:
+    """Ищет точку входа в цикл двумя указателями на расстоянии lead.
+
+    Возвращает (x, y), x != y, f(x) == f(y), или None, если начальная точка
+    уже лежала на цикле (коллизии на этом пути нет).
+    """
+    slow, fast = start, start
+    for _ in range(lead):
+        fast = f(fast)
+    if slow == fast:
+        return None
+    while True:
+        next_slow, next_fast = f(slow), f(fast)
+        if next_slow == next_fast:
+            return slow, fast
+        slow, fast = next_slow, next_fast
+
+
+def _cycle_collision(algorithm: str, bits: int, method: str, find_cycle: Callable,
+                     seed: Optional[int], max_evaluations: Optional[int]) -> RhoResult:
+    f = _Counted(truncated_hash(algorithm, bits), max_evaluations)
+    rng = random.Random(seed)
+    start_time = time.perf_counter()
+    pair = None
+    try:
+        while pair is None:
+            start = rng.getrandbits(bits)
+            pair = _locate_entry(f, start, find_cycle(f, start))
+    except TimeoutError:
+        pass
+    return RhoResult(algorithm, bits, method, min(f.calls, max_evaluations or f.calls),
+                     time.perf_counter() - start_time, memory=2, pair=pair)
+
+
+def _floyd_lead(f: Callable[[int], int], start: int) -> int:
+    """Флойд: черепаха и заяц встречаются на шаге i, кратном длине цикла"""
+    tortoise, hare = f(start), f(f(start))
+    steps = 1
+    while tortoise != hare:
+        tortoise, hare = f(tortoise), f(f(hare))
+        steps += 1
+    return steps
+
+
+def _brent_lead(f: Callable[[int], int], start: int) -> int:
+    """Брент: длина цикла lambda за степени двойки, один вызов f на шаг"""
+    power = length = 1
+    tortoise, hare = start, f(start)
+    while tortoise != hare:
+        if power == length:
+            tortoise = hare
+            power *= 2
+            length = 0
+        hare = f(hare)
+        length += 1
+    return length
+
+
+def floyd_collision(algorithm: str, bits: int, seed: Optional[int] = None,
+                    max_evaluations: Optional[int] = None) -> RhoResult:
+    """Коллизия методом Флойда (около 3 вызовов f на шаг блуждания)"""
+    return _cycle_collision(algorithm, bits, "Флойд", _floyd_lead, seed, max_evaluations)
+
+
+def brent_collision(algorithm: str, bits: int, seed: Optional[int] = None,
+                    max_evaluations: Optional[int] = None) -> RhoResult:
+    """Коллизия методом Брента (один вызов f на шаг при поиске цикла)"""
+    return _cycle_collision(algorithm, bits, "Брент", _brent_lead, seed, max_evaluations)
+
+
+# --- Различимые точки ----------------------------------------------------
+
+def default_distinguished_bits(bits: int) -> int:
+    """d, при котором ожидается около 1000 различимых точек"""
+    return max(0, bits // 2 - 10)
+
+
+def walk_to_distinguished(algorithm: str, bits: int, distinguished_bits: int,
+                          starts: List[int]) -> List[Tuple[int, Optional[int], int]]:
+    """Блуждания из starts до различимых точек: [(старт, точка или None, длина)]"""
+    f = truncated_hash(algorithm, bits)
+    mask = ((1 << distinguished_bits) - 1) << (bits - distinguished_bits)
+    limit = MAX_WALK_FACTOR << distinguished_bits
+    results = []
+    for start in starts:
+        x, length = f(start), 1
+        while x & mask and length < limit:
+            x = f(x)
+            length += 1
+        results.append((start, x if not x & mask else None, length))
+    return results
+
+
+def _merge_walks(f: Callable[[int], int], first: Tuple[int, int], second: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    """Два блуждания пришли в одну различимую точку: ищем точку слияния"""
+    (start_a, length_a), (start_b, length_b) = sorted([first, second], key=lambda walk: -walk[1])
+    a, b = start_a, start_b
+    for _ in range(length_a - length_b):
+        a = f(a)
+    if a == b:
+        return None  # второй старт лежит на пути первого
+    while True:
+        next_a, next_b = f(a), f(b)
+        if next_a == next_b:
+            return a, b
+        a, b = next_a, next_b
+
+
+def distinguished_point_collision(algorithm: str, bits: int, distinguished_bits: Optional[int] = None,
+                                  workers: int = 1, seed: Optional[int] = None,
+                                  max_evaluations: Optional[int] = None,
+                                  progress: Optional[Callable[[int, int, float], None]] = None) -> RhoResult:
+    """Параллельный поиск коллизии ван Ооршота-Винера.
+
+    progress(вычислений, различимых_точек, секунд) вызывается не чаще
+    PROGRESS_INTERVAL. Память - словарь различимых точек.
+    """
+    if distinguished_bits is None:
+        distinguished_bits = default_distinguished_bits(bits)
+    distinguished_bits = max(0, min(distinguished_bits, bits - 1))
+    rng = random.Random(seed)
+    f = _Counted(truncated_hash(algorithm, bits), None)  # считает повторные проходы при слиянии
+
+    points: Dict[int, Tuple[int, int]] = {}
+    evaluations = 0
+    pair = None
+    start_time = last_report = time.perf_counter()
+
+    def next_task() -> List[int]:
+        return [rng.getrandbits(bits) for _ in range(WALKS_PER_TASK)]
+
+    def accept(walks: List[Tuple[int, Optional[int], int]]) -> bool:
+        nonlocal evaluations, pair, last_report
+        merge_calls = f.calls
+        for start, point, length in walks:
+            evaluations += length
+            if point is None:
+                continue
+            if point in points and points[point][0] != start:
+                merged = _merge_walks(f, points[point], (start, length))
+                if merged is not None:
+                    evaluations += f.calls - merge_calls
+                    pair = merged
+                    return True
+            points[point] = (start, length)
+        evaluations += f.calls - merge_calls
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress(evaluations, len(points), now - start_time)
+        return max_evaluations is not None and evaluations >= max_evaluations
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(walk_to_distinguished, algorithm, bits, distinguished_bits, next_task())
+                       for _ in range(2 * workers)}
+            done_searching = False
+            while pending and not done_searching:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if accept(future.result()):
+                        done_searching = True
+                        break
+                    pending.add(executor.submit(
+                        walk_to_distinguished, algorithm, bits, distinguished_bits, next_task()))
+            for future in pending:
+                future.cancel()
+    else:
+        while not accept(walk_to_distinguished(algorithm, bits, distinguished_bits, next_task())):
+            pass
+
+    elapsed = time.perf_counter() - start_time
+    if progress is not None:
+        progress(evaluations, len(points), elapsed)
+    return RhoResult(algorithm, bits, f"Различимые точки (d={distinguished_bits})",
+                     evaluations, elapsed, memory=len(points), pair=pair)
+
+
+METHODS = {
+    "Флойд": floyd_collision,
+    "Брент": brent_collision,
+    "Различимые точки": distinguished_point_collision,
+}
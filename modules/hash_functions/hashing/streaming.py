@@ -0,0 +1,219 @@
+"""Однопроходное вычисление нескольких хешей и CRC32 для файла или потока.
+
+Данные читаются порциями фиксированного размера в один буфер, и каждая
+порция подается всем алгоритмам сразу - файл читается один раз. Большие
+файлы отображаются в память (mmap) и передаются срезами memoryview без
+копирования; у загруженных в память файлов (BytesIO) берется getbuffer().
+hashlib и zlib.crc32 отпускают GIL на больших буферах, поэтому при
+workers > 1 алгоритмы обновляются параллельно в пуле потоков.
+
+Проверка образа по опубликованной контрольной сумме без интерфейса:
+
+    python -m modules.hash_functions.hashing.streaming image.iso --expect <hex>
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Union
+import argparse
+import mmap
+import os
+import re
+import sys
+import time
+import zlib
+
+from modules.hash_functions.hashing.collisions import hash_constructor
+
+ALGORITHMS = ("MD5", "SHA-1", "SHA-256", "SHA-512", "SHA-3-256", "BLAKE2b", "CRC32")
+DEFAULT_CHUNK_SIZE = 1 << 20          # 1 МБ
+MMAP_THRESHOLD = 64 << 20             # файлы от 64 МБ отображаются в память
+DIGEST_HEX_LENGTHS = (8, 32, 40, 56, 64, 96, 128)  # CRC32, MD5, SHA-1, SHA-224 ... SHA-512
+
+
+class Crc32:
+    """CRC32 с интерфейсом объектов hashlib"""
+    name = "crc32"
+    digest_size = 4
+
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data) -> None:
+        self.value = zlib.crc32(data, self.value)
+
+    def digest(self) -> bytes:
+        return self.value.to_bytes(4, 'big')
+
+    def hexdigest(self) -> str:
+        return format(self.value, '08x')
+
+
+def new_hasher(algorithm: str):
+    """Объект с update/hexdigest для имени из ALGORITHMS"""
+    return Crc32() if algorithm == "CRC32" else hash_constructor(algorithm)()
+
+
+@dataclass
+class MultiHashResult:
+    """Дайджесты и время каждого алгоритма"""
+    digests: Dict[str, str]
+    size: int
+    elapsed: float
+    seconds: Dict[str, float] = field(default_factory=dict)
+    memory_mapped: bool = False
+
+    def throughput(self, algorithm: str) -> float:
+        """МБ/с для алгоритма (по чистому времени его обновлений)"""
+        seconds = self.seconds.get(algorithm, 0.0)
+        return self.size / seconds / 1e6 if seconds else 0.0
+
+    @property
+    def total_throughput(self) -> float:
+        """МБ/с всего прохода"""
+        return self.size / self.elapsed / 1e6 if self.elapsed else 0.0
+
+    def matching(self, checksum: str) -> List[str]:
+        """Алгоритмы, чей дайджест совпадает с опубликованной контрольной суммой"""
+        expected = normalize_checksum(checksum)
+        return [name for name, digest in self.digests.items() if digest == expected]
+
+
+def normalize_checksum(text: str) -> str:
+    """Извлекает hex-значение из строк форматов BSD ("SHA256 (f) = hex") и sha256sum ("hex  f").
+
+    В остальных строках берется первое hex-слово длины известного дайджеста:
+    имя файла может содержать более длинную hex-подобную последовательность.
+    """
+    text = text.strip()
+    bsd = re.fullmatch(r'[\w-]+ ?\(.*\) ?= ?([0-9a-fA-F]+)', text)
+    if bsd:
+        return bsd.group(1).lower()
+    for token in re.findall(r'\b[0-9a-fA-F]+\b', text):
+        if len(token) in DIGEST_HEX_LENGTHS:
+            return token.lower()
+    return text.lower()
+
+
+def _chunks_from_buffer(buffer: memoryview, chunk_size: int) -> Iterator[memoryview]:
+    for offset in range(0, len(buffer), chunk_size):
+        yield buffer[offset:offset + chunk_size]
+
+
+def _chunks_from_stream(stream: BinaryIO, chunk_size: int) -> Iterator[memoryview]:
+    """Чтение в один заранее выделенный буфер (порция действительна до следующей)"""
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        read = stream.readinto(buffer)
+        if not read:
+            return
+        yield view[:read]
+
+
+def hash_chunks(chunks: Iterator[memoryview], algorithms: Sequence[str] = ALGORITHMS,
+                workers: int = 1, progress: Optional[Callable[[int], None]] = None) -> MultiHashResult:
+    """Подает каждую порцию всем алгоритмам; progress(обработано_байт)"""
+    hashers = {name: new_hasher(name) for name in algorithms}
+    seconds = dict.fromkeys(algorithms, 0.0)
+    size = 0
+
+    def feed(name: str, chunk: memoryview) -> None:
+        start = time.perf_counter()
+        hashers[name].update(chunk)
+        seconds[name] += time.perf_counter() - start
+
+    start_time = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for chunk in chunks:
+            if executor is None:
+                for name in hashers:
+                    feed(name, chunk)
+            else:
+                # Буфер переиспользуется - ждем все алгоритмы перед следующим чтением
+                list(executor.map(feed, hashers, [chunk] * len(hashers)))
+            size += len(chunk)
+            if progress is not None:
+                progress(size)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return MultiHashResult(
+        digests={name: hasher.hexdigest() for name, hasher in hashers.items()},
+        size=size,
+        elapsed=time.perf_counter() - start_time,
+        seconds=seconds,
+    )
+
+
+def hash_stream(stream: BinaryIO, algorithms: Sequence[str] = ALGORITHMS,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+                progress: Optional[Callable[[int], None]] = None) -> MultiHashResult:
+    """Хеширует поток; у BytesIO (загрузки Streamlit) данные берутся без копии"""
+    if hasattr(stream, 'getbuffer'):
+        buffer = stream.getbuffer()
+        try:
+            return hash_chunks(_chunks_from_buffer(buffer, chunk_size), algorithms, workers, progress)
+        finally:
+            buffer.release()
+    return hash_chunks(_chunks_from_stream(stream, chunk_size), algorithms, workers, progress)
+
+
+def hash_file(path: Union[str, os.PathLike], algorithms: Sequence[str] = ALGORITHMS,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+              progress: Optional[Callable[[int], None]] = None,
+              mmap_threshold: int = MMAP_THRESHOLD) -> MultiHashResult:
+    """Хеширует файл на диске; файлы от mmap_threshold байт отображаются в память"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as stream:
+        if size < mmap_threshold or size == 0:
+            return hash_stream(stream, algorithms, chunk_size, workers, progress)
+        with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(mapped)
+            try:
+                result = hash_chunks(_chunks_from_buffer(view, chunk_size), algorithms, workers, progress)
+            finally:
+                view.release()
+    result.memory_mapped = True
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Однопроходное вычисление хешей файла")
+    parser.add_argument("path", help="файл (например, ISO-образ)")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument("--expect", help="опубликованная контрольная сумма для проверки")
+    parser.add_argument("--workers", type=int, default=1, help="потоков для параллельного обновления")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    total = os.path.getsize(args.path)
+    last_percent = -1
+
+    def progress(done: int) -> None:
+        nonlocal last_percent
+        percent = done * 100 // max(total, 1)
+        if percent != last_percent:
+            last_percent = percent
+            print(f"\r{percent:3d}%", end="", file=sys.stderr, flush=True)
+
+    result = hash_file(args.path, args.algorithms, args.chunk_size, args.workers, progress)
+    print(file=sys.stderr)
+    for name, digest in result.digests.items():
+        print(f"{name:10s} {digest}  {result.throughput(name):8.1f} МБ/с")
+    print(f"{result.size} байт за {result.elapsed:.2f} с ({result.total_throughput:.1f} МБ/с)", file=sys.stderr)
+
+    if args.expect:
+        matched = result.matching(args.expect)
+        if not matched:
+            print("Контрольная сумма НЕ совпадает ни с одним алгоритмом", file=sys.stderr)
+            return 1
+        print(f"Контрольная сумма совпадает: {', '.join(matched)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
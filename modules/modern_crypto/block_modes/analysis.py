@@ -0,0 +1,86 @@
+"""Поиск повторяющихся блоков шифротекста (признак режима ECB).
+
+Все блоки проходят через один словарь за один проход - время и память
+линейны по числу блоков, поэтому анализ работает и на многомегабайтных
+перехватах. Попарная матрица строится только для небольшого окна.
+"""
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+
+@dataclass
+class DuplicateBlockIndex:
+    """Результат индексации блоков"""
+    block_size: int
+    block_ids: np.ndarray     # номер группы одинаковых блоков для каждой позиции
+    blocks: List[bytes]       # значение блока для каждой группы
+    counts: np.ndarray        # число повторов каждой группы
+    first: np.ndarray         # первая позиция группы
+    last: np.ndarray          # последняя позиция группы
+
+    @property
+    def total_blocks(self) -> int:
+        return len(self.block_ids)
+
+    @property
+    def unique_blocks(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def repeated_blocks(self) -> int:
+        """Число блоков, совпадающих с каким-либо более ранним блоком"""
+        return self.total_blocks - self.unique_blocks
+
+    @property
+    def repeat_ratio(self) -> float:
+        return self.repeated_blocks / self.total_blocks if self.total_blocks else 0.0
+
+    def top_groups(self, limit: int = 20) -> np.ndarray:
+        """Номера групп, повторяющихся больше одного раза, по убыванию числа повторов"""
+        repeated = np.flatnonzero(self.counts > 1)
+        order = np.argsort(-self.counts[repeated], kind='stable')
+        return repeated[order[:limit]]
+
+    def runs(self) -> List[Tuple[int, int, int]]:
+        """Сжатое представление: (группа, начальная позиция, длина серии)"""
+        if not self.total_blocks:
+            return []
+        starts = np.flatnonzero(np.diff(self.block_ids, prepend=-1) != 0)
+        lengths = np.diff(np.append(starts, self.total_blocks))
+        return list(zip(self.block_ids[starts].tolist(), starts.tolist(), lengths.tolist()))
+
+    def window_matrix(self, start: int, size: int) -> np.ndarray:
+        """Матрица совпадений блоков для окна [start, start + size)"""
+        window = self.block_ids[start:start + size]
+        return (window[:, None] == window[None, :]).astype(np.uint8)
+
+
+def index_blocks(data: bytes, block_size: int) -> DuplicateBlockIndex:
+    """Группирует одинаковые блоки за один проход (неполный хвост отбрасывается)"""
+    view = memoryview(data).cast('B')
+    total = len(view) // block_size
+    raw = view[:total * block_size].tobytes()
+
+    groups = {}
+    block_ids = np.fromiter(
+        (groups.setdefault(raw[i:i + block_size], len(groups))
+         for i in range(0, len(raw), block_size)),
+        dtype=np.int64, count=total
+    )
+
+    # Номера групп выдаются в порядке первого появления, поэтому первая
+    # позиция группы - это место, где растет накопленный максимум
+    first = np.flatnonzero(np.diff(np.maximum.accumulate(block_ids), prepend=-1) > 0) if total else np.zeros(0, dtype=np.int64)
+    last = np.zeros(len(groups), dtype=np.int64)
+    np.maximum.at(last, block_ids, np.arange(total))
+
+    return DuplicateBlockIndex(
+        block_size=block_size,
+        block_ids=block_ids,
+        blocks=list(groups),
+        counts=np.bincount(block_ids, minlength=len(groups)),
+        first=first,
+        last=last,
+    )
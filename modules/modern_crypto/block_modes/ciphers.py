@@ -0,0 +1,551 @@
+"""Блочные шифры с единым интерфейсом для режимов работы.
+
+Каждый шифр умеет обрабатывать сразу пачку блоков (``encrypt_blocks`` /
+``decrypt_blocks``) - режимы ECB, CTR и дешифрование CBC/CFB используют
+именно пакетный вызов, а последовательные режимы работают поблочно.
+"""
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Type
+import hashlib
+import threading
+
+import numpy as np
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+try:
+    from cryptography.hazmat.decrepit.ciphers.algorithms import TripleDES
+except ImportError:
+    # Старые версии cryptography
+    TripleDES = algorithms.TripleDES
+
+
+class BlockCipher(ABC):
+    """Базовый класс блочного шифра"""
+
+    name = "Unnamed Cipher"
+    block_size = 16  # байт
+    key_size = 16  # байт
+    description = ""
+
+    def __init__(self, key: bytes):
+        if len(key) != self.key_size:
+            raise ValueError(
+                f"{self.name}: длина ключа должна быть {self.key_size} байт, получено {len(key)}"
+            )
+        self.key = bytes(key)
+
+    @abstractmethod
+    def encrypt_blocks(self, data) -> bytes:
+        """Шифрует целое число блоков за один вызов"""
+        pass
+
+    @abstractmethod
+    def decrypt_blocks(self, data) -> bytes:
+        """Дешифрует целое число блоков за один вызов"""
+        pass
+
+    def encrypt_block(self, block) -> bytes:
+        """Шифрует один блок"""
+        return self.encrypt_blocks(block)
+
+    def decrypt_block(self, block) -> bytes:
+        """Дешифрует один блок"""
+        return self.decrypt_blocks(block)
+
+    def check_length(self, data) -> None:
+        """Проверяет, что данные состоят из целых блоков"""
+        if len(data) % self.block_size:
+            raise ValueError(
+                f"{self.name}: длина данных ({len(data)}) не кратна размеру блока {self.block_size}"
+            )
+
+
+BLOCK_CIPHERS: Dict[str, Type[BlockCipher]] = {}
+
+
+def register_block_cipher(cls: Type[BlockCipher]) -> Type[BlockCipher]:
+    """Регистрирует шифр в общем реестре (используется как декоратор)"""
+    BLOCK_CIPHERS[cls.name] = cls
+    return cls
+
+
+def create_block_cipher(name: str, key: bytes) -> BlockCipher:
+    """Создает экземпляр зарегистрированного шифра"""
+    if name not in BLOCK_CIPHERS:
+        raise ValueError(f"Неизвестный блочный шифр: {name}")
+    return BLOCK_CIPHERS[name](key)
+
+
+def key_from_passphrase(passphrase: str, key_size: int) -> bytes:
+    """Получает ключ нужной длины из текстового пароля (SHA-256/SHA-512)"""
+    digest = hashlib.sha512(passphrase.encode('utf-8')).digest()
+    if key_size > len(digest):
+        raise ValueError(f"Слишком длинный ключ: {key_size} байт")
+    return digest[:key_size]
+
+
+# Шифры на базе OpenSSL (cryptography)
+
+class OpenSSLBlockCipher(BlockCipher):
+    """Шифр из библиотеки cryptography; пакетная обработка через ECB-контекст OpenSSL"""
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self._cipher = Cipher(self.make_algorithm(self.key), modes.ECB())
+        # Контексты OpenSSL не потокобезопасны - храним свои в каждом потоке
+        self._local = threading.local()
+
+    @abstractmethod
+    def make_algorithm(self, key: bytes):
+        """Создает объект алгоритма cryptography"""
+        pass
+
+    def _encryptor(self):
+        ctx = getattr(self._local, 'encryptor', None)
+        if ctx is None:
+            ctx = self._local.encryptor = self._cipher.encryptor()
+        return ctx
+
+    def _decryptor(self):
+        ctx = getattr(self._local, 'decryptor', None)
+        if ctx is None:
+            ctx = self._local.decryptor = self._cipher.decryptor()
+        return ctx
+
+    def encrypt_blocks(self, data) -> bytes:
+        self.check_length(data)
+        return self._encryptor().update(data)
+
+    def decrypt_blocks(self, data) -> bytes:
+        self.check_length(data)
+        return self._decryptor().update(data)
+
+
+@register_block_cipher
+class AES128(OpenSSLBlockCipher):
+    name = "AES-128"
+    block_size = 16
+    key_size = 16
+    description = "Advanced Encryption Standard, 128-битный ключ"
+
+    def make_algorithm(self, key: bytes):
+        return algorithms.AES(key)
+
+
+@register_block_cipher
+class AES192(AES128):
+    name = "AES-192"
+    key_size = 24
+    description = "Advanced Encryption Standard, 192-битный ключ"
+
+
+@register_block_cipher
+class AES256(AES128):
+    name = "AES-256"
+    key_size = 32
+    description = "Advanced Encryption Standard, 256-битный ключ"
+
+
+@register_block_cipher
+class DES(OpenSSLBlockCipher):
+    name = "DES"
+    block_size = 8
+    key_size = 8
+    description = "Data Encryption Standard (3DES с K1 = K2 = K3)"
+
+    def make_algorithm(self, key: bytes):
+        # EDE с тремя одинаковыми ключами эквивалентен одинарному DES
+        return TripleDES(key * (24 // len(key)))
+
+
+@register_block_cipher
+class TripleDES3Key(DES):
+    name = "3DES"
+    key_size = 24
+    description = "Triple DES EDE, три независимых ключа"
+
+
+# Шифры ГОСТ на NumPy
+
+def _bytes_to_u8(data) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+@register_block_cipher
+class Magma(BlockCipher):
+    """ГОСТ Р 34.12-2015 «Магма» (RFC 8891), 64-битный блок"""
+
+    name = "Магма"
+    block_size = 8
+    key_size = 32
+    description = "ГОСТ Р 34.12-2015, 64-битный блок, 32 раунда сети Фейстеля"
+
+    PI = [
+        [12, 4, 6, 2, 10, 5, 11, 9, 14, 8, 13, 7, 0, 3, 15, 1],
+        [6, 8, 2, 3, 9, 10, 5, 12, 1, 14, 4, 7, 11, 13, 0, 15],
+        [11, 3, 5, 8, 2, 15, 10, 13, 14, 1, 7, 4, 12, 9, 6, 0],
+        [12, 8, 2, 1, 13, 4, 15, 6, 7, 0, 10, 5, 3, 14, 9, 11],
+        [7, 15, 5, 10, 8, 1, 6, 13, 0, 9, 3, 14, 11, 4, 2, 12],
+        [5, 13, 15, 6, 9, 2, 12, 10, 11, 7, 8, 1, 4, 3, 14, 0],
+        [8, 14, 2, 5, 6, 9, 1, 12, 15, 4, 11, 0, 13, 10, 3, 7],
+        [1, 7, 14, 13, 0, 5, 8, 3, 4, 15, 10, 6, 9, 12, 11, 2],
+    ]
+
+    _tables = None
+
+    @classmethod
+    def _get_tables(cls) -> List[List[int]]:
+        """Таблицы g(x) по байтам: S-блоки и сдвиг на 11 бит объединены заранее"""
+        if cls._tables is None:
+            tables = []
+            for byte_index in range(4):
+                low_box = cls.PI[2 * byte_index]
+                high_box = cls.PI[2 * byte_index + 1]
+                table = []
+                for value in range(256):
+                    substituted = (low_box[value & 0xF] | (high_box[value >> 4] << 4)) << (8 * byte_index)
+                    table.append(((substituted << 11) | (substituted >> 21)) & 0xFFFFFFFF)
+                tables.append(table)
+            cls._tables = tables
+        return cls._tables
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        subkeys = [int.from_bytes(self.key[i:i + 4], 'big') for i in range(0, 32, 4)]
+        self.round_keys = subkeys * 3 + subkeys[::-1]
+        self._tables_np = [np.array(t, dtype=np.uint32) for t in self._get_tables()]
+
+    def _crypt_scalar(self, block, round_keys: List[int]) -> bytes:
+        t0, t1, t2, t3 = self._get_tables()
+        value = int.from_bytes(block, 'big')
+        a1, a0 = value >> 32, value & 0xFFFFFFFF
+        for k in round_keys[:-1]:
+            x = (a0 + k) & 0xFFFFFFFF
+            a1, a0 = a0, a1 ^ t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+        x = (a0 + round_keys[-1]) & 0xFFFFFFFF
+        a1 ^= t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+        return ((a1 << 32) | a0).to_bytes(8, 'big')
+
+    def _crypt_batch(self, data, round_keys: List[int]) -> bytes:
+        self.check_length(data)
+        if len(data) == 8:
+            return self._crypt_scalar(data, round_keys)
+        t0, t1, t2, t3 = self._tables_np
+        words = np.frombuffer(data, dtype='>u4').reshape(-1, 2).astype(np.uint32)
+        a1 = words[:, 0].copy()
+        a0 = words[:, 1].copy()
+        x = np.empty_like(a0)
+        for k in round_keys[:-1]:
+            np.add(a0, np.uint32(k), out=x)
+            g = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+            a1 ^= g
+            a1, a0 = a0, a1
+        np.add(a0, np.uint32(round_keys[-1]), out=x)
+        a1 ^= t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+        return np.stack([a1, a0], axis=1).astype('>u4').tobytes()
+
+    def encrypt_blocks(self, data) -> bytes:
+        return self._crypt_batch(data, self.round_keys)
+
+    def decrypt_blocks(self, data) -> bytes:
+        return self._crypt_batch(data, self.round_keys[::-1])
+
+    def encrypt_block(self, block) -> bytes:
+        return self._crypt_scalar(block, self.round_keys)
+
+    def decrypt_block(self, block) -> bytes:
+        return self._crypt_scalar(block, self.round_keys[::-1])
+
+
+@register_block_cipher
+class Kuznechik(BlockCipher):
+    """ГОСТ Р 34.12-2015 «Кузнечик» (RFC 7801), 128-битный блок"""
+
+    name = "Кузнечик"
+    block_size = 16
+    key_size = 32
+    description = "ГОСТ Р 34.12-2015, 128-битный блок, 10 раундов SP-сети"
+
+    PI = [
+        0xFC, 0xEE, 0xDD, 0x11, 0xCF, 0x6E, 0x31, 0x16, 0xFB, 0xC4, 0xFA, 0xDA, 0x23, 0xC5, 0x04, 0x4D,
+        0xE9, 0x77, 0xF0, 0xDB, 0x93, 0x2E, 0x99, 0xBA, 0x17, 0x36, 0xF1, 0xBB, 0x14, 0xCD, 0x5F, 0xC1,
+        0xF9, 0x18, 0x65, 0x5A, 0xE2, 0x5C, 0xEF, 0x21, 0x81, 0x1C, 0x3C, 0x42, 0x8B, 0x01, 0x8E, 0x4F,
+        0x05, 0x84, 0x02, 0xAE, 0xE3, 0x6A, 0x8F, 0xA0, 0x06, 0x0B, 0xED, 0x98, 0x7F, 0xD4, 0xD3, 0x1F,
+        0xEB, 0x34, 0x2C, 0x51, 0xEA, 0xC8, 0x48, 0xAB, 0xF2, 0x2A, 0x68, 0xA2, 0xFD, 0x3A, 0xCE, 0xCC,
+        0xB5, 0x70, 0x0E, 0x56, 0x08, 0x0C, 0x76, 0x12, 0xBF, 0x72, 0x13, 0x47, 0x9C, 0xB7, 0x5D, 0x87,
+        0x15, 0xA1, 0x96, 0x29, 0x10, 0x7B, 0x9A, 0xC7, 0xF3, 0x91, 0x78, 0x6F, 0x9D, 0x9E, 0xB2, 0xB1,
+        0x32, 0x75, 0x19, 0x3D, 0xFF, 0x35, 0x8A, 0x7E, 0x6D, 0x54, 0xC6, 0x80, 0xC3, 0xBD, 0x0D, 0x57,
+        0xDF, 0xF5, 0x24, 0xA9, 0x3E, 0xA8, 0x43, 0xC9, 0xD7, 0x79, 0xD6, 0xF6, 0x7C, 0x22, 0xB9, 0x03,
+        0xE0, 0x0F, 0xEC, 0xDE, 0x7A, 0x94, 0xB0, 0xBC, 0xDC, 0xE8, 0x28, 0x50, 0x4E, 0x33, 0x0A, 0x4A,
+        0xA7, 0x97, 0x60, 0x73, 0x1E, 0x00, 0x62, 0x44, 0x1A, 0xB8, 0x38, 0x82, 0x64, 0x9F, 0x26, 0x41,
+        0xAD, 0x45, 0x46, 0x92, 0x27, 0x5E, 0x55, 0x2F, 0x8C, 0xA3, 0xA5, 0x7D, 0x69, 0xD5, 0x95, 0x3B,
+        0x07, 0x58, 0xB3, 0x40, 0x86, 0xAC, 0x1D, 0xF7, 0x30, 0x37, 0x6B, 0xE4, 0x88, 0xD9, 0xE7, 0x89,
+        0xE1, 0x1B, 0x83, 0x49, 0x4C, 0x3F, 0xF8, 0xFE, 0x8D, 0x53, 0xAA, 0x90, 0xCA, 0xD8, 0x85, 0x61,
+        0x20, 0x71, 0x67, 0xA4, 0x2D, 0x2B, 0x09, 0x5B, 0xCB, 0x9B, 0x25, 0xD0, 0xBE, 0xE5, 0x6C, 0x52,
+        0x59, 0xA6, 0x74, 0xD2, 0xE6, 0xF4, 0xB4, 0xC0, 0xD1, 0x66, 0xAF, 0xC2, 0x39, 0x4B, 0x63, 0xB6,
+    ]
+    # Коэффициенты линейного преобразования l (от a15 к a0)
+    L_COEFFS = [148, 32, 133, 16, 194, 192, 1, 251, 1, 192, 194, 16, 133, 32, 148, 1]
+
+    _tables = None
+
+    @staticmethod
+    def _gf_mul_table() -> np.ndarray:
+        """Таблица умножения в GF(2^8) по модулю x^8 + x^7 + x^6 + x + 1"""
+        a = np.arange(256, dtype=np.uint16)[:, None].repeat(256, axis=1)
+        b = np.arange(256, dtype=np.uint16)[None, :].repeat(256, axis=0)
+        result = np.zeros((256, 256), dtype=np.uint16)
+        for _ in range(8):
+            result ^= np.where(b & 1, a, 0).astype(np.uint16)
+            b = b >> 1
+            a = a << 1
+            a = np.where(a & 0x100, a ^ 0x1C3, a).astype(np.uint16)
+        return result.astype(np.uint8)
+
+    @classmethod
+    def _linear(cls, state: List[int], mul: np.ndarray) -> List[int]:
+        """Преобразование L = R^16 над вектором из 16 байт (state[0] = a15)"""
+        state = list(state)
+        for _ in range(16):
+            top = 0
+            for coeff, value in zip(cls.L_COEFFS, state):
+                top ^= int(mul[coeff, value])
+            state = [top] + state[:-1]
+        return state
+
+    @classmethod
+    def _linear_inverse(cls, state: List[int], mul: np.ndarray) -> List[int]:
+        """Обратное преобразование L^-1"""
+        state = list(state)
+        for _ in range(16):
+            shifted = state[1:] + [state[0]]
+            bottom = 0
+            for coeff, value in zip(cls.L_COEFFS, shifted):
+                bottom ^= int(mul[coeff, value])
+            state = shifted[:-1] + [bottom]
+        return state
+
+    @classmethod
+    def _get_tables(cls) -> Dict[str, object]:
+        """Таблицы LS и L^-1 по позициям байтов (линейность L над GF(2^8))"""
+        if cls._tables is None:
+            mul = cls._gf_mul_table()
+            pi = np.array(cls.PI, dtype=np.uint8)
+            pi_inv = np.zeros(256, dtype=np.uint8)
+            pi_inv[pi] = np.arange(256, dtype=np.uint8)
+
+            ls = np.zeros((16, 256, 16), dtype=np.uint8)
+            l_inv = np.zeros((16, 256, 16), dtype=np.uint8)
+            for position in range(16):
+                unit = [0] * 16
+                unit[position] = 1
+                column = np.array(cls._linear(unit, mul), dtype=np.uint8)
+                column_inv = np.array(cls._linear_inverse(unit, mul), dtype=np.uint8)
+                # L(v * e_j) = v * L(e_j) покомпонентно
+                ls[position] = mul[pi][:, column]
+                l_inv[position] = mul[np.arange(256)][:, column_inv]
+
+            as_words = lambda t: t.reshape(16, 256, 2, 8).view('>u8').reshape(16, 256, 2).astype(np.uint64)
+            to_ints = lambda t: [[int.from_bytes(t[p, v].tobytes(), 'big') for v in range(256)] for p in range(16)]
+            cls._tables = {
+                'pi_inv': pi_inv,
+                'ls': as_words(ls),
+                'l_inv': as_words(l_inv),
+                'ls_int': to_ints(ls),
+                'l_inv_int': to_ints(l_inv),
+                'pi_inv_list': pi_inv.tolist(),
+            }
+        return cls._tables
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self.round_keys = self._expand_key(self.key)
+
+    def _lsx_scalar(self, value: int) -> int:
+        ls = self._get_tables()['ls_int']
+        result = 0
+        for position in range(16):
+            result ^= ls[position][(value >> (8 * (15 - position))) & 0xFF]
+        return result
+
+    def _expand_key(self, key: bytes) -> List[int]:
+        tables = self._get_tables()
+        constants = []
+        for i in range(1, 33):
+            # C_i = L(Vec128(i)); для i < 256 нужен только младший байт
+            constants.append(tables['ls_int'][15][self.PI.index(i)])
+        k1 = int.from_bytes(key[:16], 'big')
+        k2 = int.from_bytes(key[16:], 'big')
+        round_keys = [k1, k2]
+        for i in range(4):
+            for c in constants[8 * i:8 * i + 8]:
+                k1, k2 = self._lsx_scalar(k1 ^ c) ^ k2, k1
+            round_keys.extend([k1, k2])
+        return round_keys
+
+    def encrypt_block(self, block) -> bytes:
+        value = int.from_bytes(block, 'big')
+        for k in self.round_keys[:-1]:
+            value = self._lsx_scalar(value ^ k)
+        return (value ^ self.round_keys[-1]).to_bytes(16, 'big')
+
+    def decrypt_block(self, block) -> bytes:
+        tables = self._get_tables()
+        l_inv = tables['l_inv_int']
+        pi_inv = tables['pi_inv_list']
+        value = int.from_bytes(block, 'big')
+        for k in self.round_keys[:0:-1]:
+            value ^= k
+            mixed = 0
+            for position in range(16):
+                mixed ^= l_inv[position][(value >> (8 * (15 - position))) & 0xFF]
+            value = int.from_bytes(bytes(pi_inv[b] for b in mixed.to_bytes(16, 'big')), 'big')
+        return (value ^ self.round_keys[0]).to_bytes(16, 'big')
+
+    def _round_keys_np(self) -> np.ndarray:
+        return np.array(
+            [[k >> 64, k & 0xFFFFFFFFFFFFFFFF] for k in self.round_keys], dtype=np.uint64
+        )
+
+    def _apply_table(self, state: np.ndarray, table: np.ndarray) -> np.ndarray:
+        """XOR строк таблицы, выбранных байтами состояния (n, 2) uint64"""
+        state_bytes = state.astype('>u8').view(np.uint8).reshape(-1, 16)
+        result = np.zeros_like(state)
+        for position in range(16):
+            result ^= table[position][state_bytes[:, position]]
+        return result
+
+    def encrypt_blocks(self, data) -> bytes:
+        self.check_length(data)
+        if len(data) == 16:
+            return self.encrypt_block(data)
+        keys = self._round_keys_np()
+        ls = self._get_tables()['ls']
+        state = np.frombuffer(data, dtype='>u8').reshape(-1, 2).astype(np.uint64)
+        for k in keys[:-1]:
+            state = self._apply_table(state ^ k, ls)
+        state ^= keys[-1]
+        return state.astype('>u8').tobytes()
+
+    def decrypt_blocks(self, data) -> bytes:
+        self.check_length(data)
+        if len(data) == 16:
+            return self.decrypt_block(data)
+        keys = self._round_keys_np()
+        tables = self._get_tables()
+        pi_inv = tables['pi_inv']
+        state = np.frombuffer(data, dtype='>u8').reshape(-1, 2).astype(np.uint64)
+        for k in keys[:0:-1]:
+            state = self._apply_table(state ^ k, tables['l_inv'])
+            state_bytes = pi_inv[state.astype('>u8').view(np.uint8)]
+            state = state_bytes.view('>u8').reshape(-1, 2).astype(np.uint64)
+        state ^= keys[0]
+        return state.astype('>u8').tobytes()
+
+
+# Учебные шифры
+
+@register_block_cipher
+class ToyXORCipher(BlockCipher):
+    """Учебный шифр: блок XOR ключ (полностью сохраняет структуру данных)"""
+
+    name = "Учебный XOR"
+    block_size = 8
+    key_size = 8
+    description = "C = P ⊕ K - демонстрационный, нестойкий"
+
+    def encrypt_blocks(self, data) -> bytes:
+        self.check_length(data)
+        key = np.frombuffer(self.key, dtype=np.uint8)
+        return (_bytes_to_u8(data).reshape(-1, 8) ^ key).tobytes()
+
+    def decrypt_blocks(self, data) -> bytes:
+        return self.encrypt_blocks(data)
+
+    def encrypt_block(self, block) -> bytes:
+        return (int.from_bytes(block, 'big') ^ int.from_bytes(self.key, 'big')).to_bytes(8, 'big')
+
+    def decrypt_block(self, block) -> bytes:
+        return self.encrypt_block(block)
+
+
+@register_block_cipher
+class ToyFeistelCipher(BlockCipher):
+    """Учебная 4-раундовая сеть Фейстеля на 32-битных половинах"""
+
+    name = "Учебная сеть Фейстеля"
+    block_size = 8
+    key_size = 16
+    description = "4 раунда, F(R, k) = rotl((R · 0x9E3779B1) ⊕ k, 7) - демонстрационный"
+
+    def __init__(self, key: bytes):
+        super().__init__(key)
+        self.round_keys = [int.from_bytes(self.key[i:i + 4], 'big') for i in range(0, 16, 4)]
+
+    @staticmethod
+    def _round_function(right: np.ndarray, key: int) -> np.ndarray:
+        mixed = (right * np.uint32(0x9E3779B1)) ^ np.uint32(key)
+        return (mixed << np.uint32(7)) | (mixed >> np.uint32(25))
+
+    def _crypt(self, data, round_keys: List[int]) -> bytes:
+        self.check_length(data)
+        words = np.frombuffer(data, dtype='>u4').reshape(-1, 2).astype(np.uint32)
+        left = words[:, 0].copy()
+        right = words[:, 1].copy()
+        for k in round_keys:
+            left, right = right, left ^ self._round_function(right, k)
+        return np.stack([right, left], axis=1).astype('>u4').tobytes()
+
+    def _crypt_scalar(self, block, round_keys: List[int]) -> bytes:
+        value = int.from_bytes(block, 'big')
+        left, right = value >> 32, value & 0xFFFFFFFF
+        for k in round_keys:
+            mixed = ((right * 0x9E3779B1) & 0xFFFFFFFF) ^ k
+            left, right = right, left ^ (((mixed << 7) | (mixed >> 25)) & 0xFFFFFFFF)
+        return ((right << 32) | left).to_bytes(8, 'big')
+
+    def encrypt_blocks(self, data) -> bytes:
+        return self._crypt(data, self.round_keys)
+
+    def decrypt_blocks(self, data) -> bytes:
+        return self._crypt(data, self.round_keys[::-1])
+
+    def encrypt_block(self, block) -> bytes:
+        return self._crypt_scalar(block, self.round_keys)
+
+    def decrypt_block(self, block) -> bytes:
+        return self._crypt_scalar(block, self.round_keys[::-1])
+
+
+class FunctionBlockCipher(BlockCipher):
+    """Адаптер: блочный шифр из пары функций encrypt_block/decrypt_block"""
+
+    name = "Пользовательский шифр"
+
+    def __init__(self, block_size: int, encrypt_block: Callable[[bytes], bytes],
+                 decrypt_block: Callable[[bytes], bytes], name: str = None):
+        self.block_size = block_size
+        self.key_size = 0
+        self.key = b''
+        self._encrypt = encrypt_block
+        self._decrypt = decrypt_block
+        if name:
+            self.name = name
+
+    def _map_blocks(self, data, func: Callable[[bytes], bytes]) -> bytes:
+        self.check_length(data)
+        view = memoryview(data)
+        size = self.block_size
+        return b''.join(func(bytes(view[i:i + size])) for i in range(0, len(view), size))
+
+    def encrypt_blocks(self, data) -> bytes:
+        return self._map_blocks(data, self._encrypt)
+
+    def decrypt_blocks(self, data) -> bytes:
+        return self._map_blocks(data, self._decrypt)
+
+    def encrypt_block(self, block) -> bytes:
+        return self._encrypt(bytes(block))
+
+    def decrypt_block(self, block) -> bytes:
+        return self._decrypt(bytes(block))
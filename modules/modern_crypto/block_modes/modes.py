@@ -0,0 +1,430 @@
+"""Режимы работы ECB, CBC, CFB, OFB, CTR и GCM поверх любого BlockCipher.
+
+``BlockModeCipher`` повторяет интерфейс encryptor/decryptor из cryptography:
+``update`` / ``update_into`` обрабатывают очередную порцию данных, ``finalize``
+дописывает хвост (дополнение PKCS7, неполный блок, тег GCM).
+Режимы, допускающие параллельную обработку (ECB, CTR, GCM, дешифрование
+CBC и CFB), передают в шифр сразу все целые блоки порции.
+"""
+from typing import Optional, Tuple
+import hmac
+
+import numpy as np
+
+from modules.modern_crypto.block_modes.ciphers import BlockCipher
+
+MODES = {
+    "ECB": "Электронная кодовая книга",
+    "CBC": "Сцепление блоков шифротекста",
+    "CFB": "Обратная связь по шифротексту",
+    "OFB": "Обратная связь по выходу",
+    "CTR": "Режим счетчика",
+    "GCM": "Счетчик с аутентификацией (AEAD)",
+}
+
+# Режимы, которым нужно дополнение до целого блока
+PADDED_MODES = ("ECB", "CBC")
+
+# Режимы, в которых шифр обрабатывает все блоки порции одним вызовом
+BATCH_MODES = {
+    "ECB": "шифрование и дешифрование",
+    "CBC": "дешифрование",
+    "CFB": "дешифрование",
+    "OFB": "—",
+    "CTR": "шифрование и дешифрование",
+    "GCM": "шифрование и дешифрование",
+}
+
+
+def xor_into(out, a, b) -> None:
+    """out = a XOR b для буферов одинаковой длины (без промежуточных копий)"""
+    np.bitwise_xor(
+        np.frombuffer(a, dtype=np.uint8),
+        np.frombuffer(b, dtype=np.uint8),
+        out=np.frombuffer(out, dtype=np.uint8),
+    )
+
+
+def pkcs7_pad(data: bytes, block_size: int) -> bytes:
+    """Дополнение PKCS7"""
+    padding_length = block_size - (len(data) % block_size)
+    return bytes(data) + bytes([padding_length] * padding_length)
+
+
+def pkcs7_unpad(data: bytes, block_size: int) -> bytes:
+    """Удаление дополнения PKCS7 с проверкой корректности"""
+    if not data or len(data) % block_size:
+        raise ValueError("Неверная длина данных для снятия дополнения")
+    padding_length = data[-1]
+    if not 1 <= padding_length <= block_size or data[-padding_length:] != bytes([padding_length]) * padding_length:
+        raise ValueError("Некорректное дополнение PKCS7")
+    return data[:-padding_length]
+
+
+def counter_blocks(initial: bytes, count: int, counter_bits: Optional[int] = None) -> bytes:
+    """Блоки счетчика initial, initial+1, ... (инкремент младших counter_bits бит)"""
+    size = len(initial)
+    if size not in (8, 16):
+        raise ValueError("Режим счетчика поддерживает блоки 64 и 128 бит")
+    if counter_bits is None:
+        counter_bits = size * 8
+    value = int.from_bytes(initial, 'big')
+    mask = (1 << counter_bits) - 1
+    start = value & mask
+    prefix = value & ~mask
+    steps = np.arange(count, dtype=np.uint64)
+
+    if counter_bits <= 64:
+        low = np.uint64(start) + steps
+        if counter_bits < 64:
+            low &= np.uint64(mask)
+        low |= np.uint64(prefix & 0xFFFFFFFFFFFFFFFF)
+        if size == 8:
+            words = low[:, None]
+        else:
+            high = np.full(count, prefix >> 64, dtype=np.uint64)
+            words = np.stack([high, low], axis=1)
+    else:
+        start_low = np.uint64(start & 0xFFFFFFFFFFFFFFFF)
+        low = start_low + steps
+        carry = (low < start_low).astype(np.uint64)
+        high = np.uint64(start >> 64) + carry
+        words = np.stack([high, low], axis=1)
+    return words.astype('>u8').tobytes()
+
+
+def advance_counter(block: bytes, steps: int, counter_bits: Optional[int] = None) -> bytes:
+    """Сдвигает счетчик на steps позиций"""
+    size = len(block)
+    if counter_bits is None:
+        counter_bits = size * 8
+    value = int.from_bytes(block, 'big')
+    mask = (1 << counter_bits) - 1
+    value = (value & ~mask) | ((value + steps) & mask)
+    return value.to_bytes(size, 'big')
+
+
+class GHash:
+    """Универсальное хеширование GCM: умножение на H в GF(2^128) или GF(2^64)
+
+    Умножение выполняется по таблицам на каждый байт (16 x 256 значений),
+    поэтому на блок приходится 16 обращений к таблице вместо 128 сдвигов.
+    """
+
+    # Приведенные многочлены в отраженном представлении GCM
+    REDUCTION = {
+        16: 0xE1 << 120,  # x^128 + x^7 + x^2 + x + 1
+        8: 0xD8 << 56,    # x^64 + x^4 + x^3 + x + 1
+    }
+
+    def __init__(self, h: bytes):
+        self.size = len(h)
+        if self.size not in self.REDUCTION:
+            raise ValueError("GHASH поддерживает блоки 64 и 128 бит")
+        reduction = self.REDUCTION[self.size]
+
+        # powers[k] = H * x^k
+        powers = []
+        value = int.from_bytes(h, 'big')
+        for _ in range(self.size * 8):
+            powers.append(value)
+            value = (value >> 1) ^ reduction if value & 1 else value >> 1
+
+        self.tables = []
+        for position in range(self.size):
+            table = [0] * 256
+            for byte in range(1, 256):
+                lowest = byte & -byte
+                bit = 7 - (lowest.bit_length() - 1)
+                table[byte] = table[byte ^ lowest] ^ powers[8 * position + bit]
+            self.tables.append(table)
+        self.state = 0
+
+    def multiply(self, value: int) -> int:
+        """value * H"""
+        result = 0
+        shift = 8 * (self.size - 1)
+        for table in self.tables:
+            result ^= table[(value >> shift) & 0xFF]
+            shift -= 8
+        return result
+
+    def update(self, data) -> None:
+        """Добавляет данные (неполный последний блок дополняется нулями)"""
+        size = self.size
+        view = memoryview(data)
+        state = self.state
+        for offset in range(0, len(view), size):
+            chunk = view[offset:offset + size]
+            block = int.from_bytes(chunk, 'big') << (8 * (size - len(chunk)))
+            state = self.multiply(state ^ block)
+        self.state = state
+
+    def digest(self) -> bytes:
+        return self.state.to_bytes(self.size, 'big')
+
+
+class BlockModeCipher:
+    """Потоковое шифрование/дешифрование в заданном режиме"""
+
+    def __init__(self, cipher: BlockCipher, mode: str, iv: Optional[bytes] = None,
+                 encrypt: bool = True, padding: bool = True, aad: bytes = b"",
+                 tag: Optional[bytes] = None):
+        if mode not in MODES:
+            raise ValueError(f"Неизвестный режим: {mode}")
+
+        self.cipher = cipher
+        self.mode = mode
+        self.encrypting = encrypt
+        self.padding = padding and mode in PADDED_MODES
+        self.block_size = cipher.block_size
+        self._expected_tag = tag
+        self._tag = None
+        self._finalized = False
+
+        # Незавершенный блок между вызовами update
+        self._pending = bytearray()
+        # Общий выходной буфер update(): выделяется один раз и переиспользуется
+        self._out = bytearray()
+
+        size = self.block_size
+        if mode == "ECB":
+            self._register = None
+        elif mode == "GCM":
+            if not iv:
+                raise ValueError("Для режима GCM нужен одноразовый вектор (nonce)")
+            self._init_gcm(bytes(iv), bytes(aad))
+        else:
+            if iv is None or len(iv) != size:
+                raise ValueError(f"Для режима {mode} нужен IV длиной {size} байт")
+            self._register = bytes(iv)
+
+    # Инициализация GCM
+
+    def _init_gcm(self, nonce: bytes, aad: bytes) -> None:
+        size = self.block_size
+        hash_key = self.cipher.encrypt_block(bytes(size))
+        self._ghash = GHash(hash_key)
+        if len(nonce) == size - 4:
+            j0 = nonce + b'\x00\x00\x00\x01'
+        else:
+            nonce_hash = GHash(hash_key)
+            nonce_hash.update(nonce)
+            nonce_hash.update((len(nonce) * 8).to_bytes(size, 'big'))
+            j0 = nonce_hash.digest()
+        self._j0 = j0
+        self._register = advance_counter(j0, 1, 32)
+        self._aad_length = len(aad)
+        self._data_length = 0
+        self._ghash.update(aad)
+
+    # Обработка целых блоков
+
+    def _process_blocks(self, src: memoryview, dst: memoryview) -> None:
+        """Обрабатывает целое число блоков src -> dst, обновляя состояние режима"""
+        if not len(src):
+            return
+        size = self.block_size
+        cipher = self.cipher
+        mode = self.mode
+
+        if mode == "ECB":
+            func = cipher.encrypt_blocks if self.encrypting else cipher.decrypt_blocks
+            dst[:] = func(src)
+
+        elif mode == "CBC" and self.encrypting:
+            # Последовательная цепочка: Ci = E(Pi xor Ci-1)
+            previous = int.from_bytes(self._register, 'big')
+            for offset in range(0, len(src), size):
+                block = int.from_bytes(src[offset:offset + size], 'big') ^ previous
+                encrypted = cipher.encrypt_block(block.to_bytes(size, 'big'))
+                dst[offset:offset + size] = encrypted
+                previous = int.from_bytes(encrypted, 'big')
+            self._register = previous.to_bytes(size, 'big')
+
+        elif mode == "CBC":
+            # Pi = D(Ci) xor Ci-1 - все D(Ci) вычисляются одним вызовом
+            last = bytes(src[-size:])
+            decrypted = cipher.decrypt_blocks(src)
+            xor_into(dst[:size], decrypted[:size], self._register)
+            xor_into(dst[size:], decrypted[size:], src[:-size])
+            self._register = last
+
+        elif mode == "CFB" and self.encrypting:
+            register = self._register
+            for offset in range(0, len(src), size):
+                keystream = int.from_bytes(cipher.encrypt_block(register), 'big')
+                register = (int.from_bytes(src[offset:offset + size], 'big') ^ keystream).to_bytes(size, 'big')
+                dst[offset:offset + size] = register
+            self._register = register
+
+        elif mode == "CFB":
+            last = bytes(src[-size:])
+            keystream = cipher.encrypt_blocks(self._register + bytes(src[:-size]))
+            xor_into(dst, src, keystream)
+            self._register = last
+
+        elif mode == "OFB":
+            keystream = bytearray(len(src))
+            register = self._register
+            for offset in range(0, len(src), size):
+                register = cipher.encrypt_block(register)
+                keystream[offset:offset + size] = register
+            xor_into(dst, src, keystream)
+            self._register = register
+
+        else:  # CTR, GCM
+            counter_bits = 32 if mode == "GCM" else None
+            count = len(src) // size
+            if mode == "GCM" and not self.encrypting:
+                self._ghash.update(src)
+            keystream = cipher.encrypt_blocks(counter_blocks(self._register, count, counter_bits))
+            xor_into(dst, src, keystream)
+            self._register = advance_counter(self._register, count, counter_bits)
+            if mode == "GCM":
+                if self.encrypting:
+                    self._ghash.update(dst)
+                self._data_length += len(src)
+
+    def _process_tail(self, tail: bytes) -> bytes:
+        """Неполный последний блок в потоковых режимах"""
+        if not tail:
+            return b''
+        # CFB/OFB: E(регистр), CTR/GCM: E(счетчик) - регистр хранит нужный блок
+        keystream = self.cipher.encrypt_block(self._register)
+        result = bytearray(len(tail))
+        xor_into(result, tail, keystream[:len(tail)])
+        if self.mode == "GCM":
+            self._ghash.update(result if self.encrypting else tail)
+            self._data_length += len(tail)
+        return bytes(result)
+
+    # Публичный интерфейс
+
+    def update_into(self, data, out) -> int:
+        """Обрабатывает data и пишет результат в out; возвращает число записанных байт
+
+        Размер out должен быть не меньше len(data) + block_size - 1.
+        """
+        if self._finalized:
+            raise ValueError("Контекст уже завершен")
+        size = self.block_size
+        view = memoryview(data).cast('B')
+        out_view = memoryview(out).cast('B')
+        pending = len(self._pending)
+        total = pending + len(view)
+        blocks = total // size
+        # При дешифровании с дополнением последний целый блок придерживаем до finalize
+        if self.padding and not self.encrypting and blocks and total % size == 0:
+            blocks -= 1
+        if len(out_view) < blocks * size:
+            raise ValueError("Выходной буфер слишком мал")
+
+        written = 0
+        consumed = 0
+        if blocks and pending:
+            consumed = size - pending
+            head = bytes(self._pending) + bytes(view[:consumed])
+            self._pending.clear()
+            self._process_blocks(memoryview(head), out_view[:size])
+            written = size
+            blocks -= 1
+        if blocks:
+            length = blocks * size
+            self._process_blocks(view[consumed:consumed + length], out_view[written:written + length])
+            written += length
+            consumed += length
+        self._pending += view[consumed:]
+        return written
+
+    def update(self, data) -> bytes:
+        """Обрабатывает очередную порцию данных"""
+        needed = len(data) + self.block_size
+        if len(self._out) < needed:
+            self._out = bytearray(needed)
+        written = self.update_into(data, self._out)
+        return bytes(self._out[:written])
+
+    def finalize(self) -> bytes:
+        """Завершает обработку: дополнение, неполный блок, тег GCM"""
+        if self._finalized:
+            raise ValueError("Контекст уже завершен")
+        self._finalized = True
+        size = self.block_size
+        tail = bytes(self._pending)
+        self._pending.clear()
+
+        if self.mode in PADDED_MODES:
+            if self.padding and self.encrypting:
+                tail = pkcs7_pad(tail, size)
+            elif len(tail) % size:
+                raise ValueError(f"Длина данных не кратна размеру блока {size} байт")
+            result = bytearray(len(tail))
+            self._process_blocks(memoryview(tail), memoryview(result))
+            if self.padding and not self.encrypting:
+                return pkcs7_unpad(bytes(result), size)
+            return bytes(result)
+
+        result = self._process_tail(tail)
+        if self.mode == "GCM":
+            self._finish_gcm()
+        return result
+
+    def finalize_with_tag(self, tag: bytes) -> bytes:
+        """Завершает дешифрование GCM, когда тег стал известен только в конце потока"""
+        self._expected_tag = tag
+        return self.finalize()
+
+    def _finish_gcm(self) -> None:
+        half = self.block_size * 4  # длины в битах занимают по половине блока
+        lengths = ((self._aad_length * 8) << half) | (self._data_length * 8)
+        self._ghash.update(lengths.to_bytes(self.block_size, 'big'))
+        mask = self.cipher.encrypt_block(self._j0)
+        tag = bytearray(self.block_size)
+        xor_into(tag, self._ghash.digest(), mask)
+        self._tag = bytes(tag)
+        if not self.encrypting:
+            if self._expected_tag is None:
+                raise ValueError("Для проверки GCM нужен тег")
+            if not hmac.compare_digest(self._tag, bytes(self._expected_tag)):
+                raise ValueError("Тег аутентификации не совпадает: данные изменены")
+
+    @property
+    def tag(self) -> bytes:
+        """Тег аутентификации GCM (доступен после finalize)"""
+        if self._tag is None:
+            raise ValueError("Тег доступен только после finalize() в режиме GCM")
+        return self._tag
+
+
+def encrypt(cipher: BlockCipher, mode: str, data: bytes, iv: Optional[bytes] = None,
+            padding: bool = True, aad: bytes = b"") -> bytes:
+    """Шифрует данные целиком; в режиме GCM тег добавляется в конец"""
+    context = BlockModeCipher(cipher, mode, iv, encrypt=True, padding=padding, aad=aad)
+    out = bytearray(len(data) + 2 * cipher.block_size)
+    written = context.update_into(data, out)
+    final = context.finalize()
+    out[written:written + len(final)] = final
+    result = bytes(out[:written + len(final)])
+    if mode == "GCM":
+        result += context.tag
+    return result
+
+
+def decrypt(cipher: BlockCipher, mode: str, data: bytes, iv: Optional[bytes] = None,
+            padding: bool = True, aad: bytes = b"") -> bytes:
+    """Дешифрует данные целиком; в режиме GCM последние block_size байт - тег"""
+    tag = None
+    if mode == "GCM":
+        data, tag = split_tag(data, cipher.block_size)
+    context = BlockModeCipher(cipher, mode, iv, encrypt=False, padding=padding, aad=aad, tag=tag)
+    out = bytearray(len(data) + cipher.block_size)
+    written = context.update_into(data, out)
+    return bytes(out[:written]) + context.finalize()
+
+
+def split_tag(data: bytes, tag_size: int) -> Tuple[bytes, bytes]:
+    """Отделяет тег GCM от шифротекста"""
+    if len(data) < tag_size:
+        raise ValueError("Данные короче тега аутентификации")
+    return data[:-tag_size], data[-tag_size:]
@@ -0,0 +1,199 @@
+"""Атака оракула дополнения на режим CBC.
+
+Оракул сообщает только одно: корректно ли дополнение PKCS7 после
+дешифрования. Подбирая байт предыдущего блока, атакующий узнает
+промежуточное значение D(Ci), а из него - открытый текст Pi = D(Ci) xor Ci-1.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+import string
+import threading
+import time
+
+import numpy as np
+
+from modules.modern_crypto.block_modes.ciphers import BlockCipher
+from modules.modern_crypto.block_modes.modes import pkcs7_unpad
+
+
+def _candidate_order() -> bytes:
+    """Порядок перебора байтов открытого текста: сначала самые вероятные"""
+    preferred = (
+        b" etaoinshrdlcumwfgypbvkjxqz"
+        + string.ascii_uppercase.encode()
+        + string.digits.encode()
+        + string.punctuation.encode()
+        + bytes(range(1, 17))              # байты дополнения
+        + b"\xd0\xd1" + bytes(range(0x80, 0xc0))  # кириллица в UTF-8
+        + b"\n\r\t"
+    )
+    order = dict.fromkeys(preferred)
+    order.update(dict.fromkeys(range(256)))
+    return bytes(order)
+
+
+CANDIDATE_ORDER = np.frombuffer(_candidate_order(), dtype=np.uint8)
+
+
+class PaddingOracle:
+    """Локальный оракул дополнения с подсчетом запросов.
+
+    decrypt(iv, ciphertext) должен возбуждать ValueError при некорректном
+    дополнении. Если передан шифр, пакет вариантов проверяется одним
+    вызовом decrypt_blocks и векторной проверкой PKCS7; каждый вариант
+    по-прежнему считается отдельным запросом.
+    """
+
+    def __init__(self, decrypt: Callable[[bytes, bytes], bytes], block_size: int,
+                 cipher: Optional[BlockCipher] = None):
+        self.decrypt = decrypt
+        self.block_size = block_size
+        self.cipher = cipher
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def _count(self, amount: int) -> None:
+        with self._lock:
+            self.queries += amount
+
+    def check(self, previous: bytes, block: bytes) -> bool:
+        """Один запрос: корректно ли дополнение у D(block) xor previous"""
+        self._count(1)
+        try:
+            self.decrypt(bytes(previous), bytes(block))
+            return True
+        except ValueError:
+            return False
+
+    def check_batch(self, previous: np.ndarray, block: bytes) -> np.ndarray:
+        """Пакет запросов: previous - массив (k, block_size) вариантов предыдущего блока"""
+        if self.cipher is None:
+            return np.array([self.check(row.tobytes(), block) for row in previous], dtype=bool)
+
+        count, size = previous.shape
+        self._count(count)
+        decrypted = np.frombuffer(self.cipher.decrypt_blocks(bytes(block) * count), dtype=np.uint8)
+        plain = decrypted.reshape(count, size) ^ previous
+        padding = plain[:, -1].astype(np.int64)
+        covered = np.arange(size)[None, :] >= size - padding[:, None]
+        matches = (plain == padding[:, None]) | ~covered
+        return (padding >= 1) & (padding <= size) & matches.all(axis=1)
+
+
+@dataclass
+class PaddingOracleResult:
+    """Итог атаки"""
+    padded_plaintext: bytes
+    intermediate: List[bytes]
+    block_queries: List[int]
+    elapsed: float
+    reused_blocks: int = 0
+    queries: int = field(init=False)
+
+    def __post_init__(self):
+        self.queries = sum(self.block_queries)
+
+    @property
+    def plaintext(self) -> bytes:
+        """Открытый текст без дополнения (если оно корректно)"""
+        try:
+            return pkcs7_unpad(self.padded_plaintext, len(self.intermediate[0]))
+        except (ValueError, IndexError):
+            return self.padded_plaintext
+
+    @property
+    def queries_per_byte(self) -> float:
+        recovered = len(self.padded_plaintext)
+        return self.queries / recovered if recovered else 0.0
+
+
+def recover_intermediate(oracle: PaddingOracle, previous: bytes, block: bytes,
+                         batch_size: int = 16) -> Tuple[bytes, int]:
+    """Восстанавливает D(block) побайтно с конца; возвращает (D(block), число запросов)"""
+    size = oracle.block_size
+    previous = np.frombuffer(previous, dtype=np.uint8)
+    intermediate = np.zeros(size, dtype=np.uint8)
+    queries = 0
+
+    for position in range(size - 1, -1, -1):
+        pad = size - position
+        crafted = np.zeros(size, dtype=np.uint8)
+        crafted[position + 1:] = intermediate[position + 1:] ^ pad
+        # Вариант байта x дает открытый текст p = x xor pad xor previous[position]
+        candidates = CANDIDATE_ORDER ^ np.uint8(pad) ^ previous[position]
+
+        found = None
+        for start in range(0, 256, batch_size):
+            batch = candidates[start:start + batch_size]
+            trial = np.repeat(crafted[None, :], len(batch), axis=0)
+            trial[:, position] = batch
+            valid = oracle.check_batch(trial, block)
+            queries += len(batch)
+
+            for hit in np.flatnonzero(valid):
+                if pad == 1 and position > 0:
+                    # Исключаем ложное срабатывание вида ...\x02\x02
+                    probe = trial[hit].copy()
+                    probe[position - 1] ^= 0xFF
+                    queries += 1
+                    if not oracle.check_batch(probe[None, :], block)[0]:
+                        continue
+                found = batch[hit]
+                break
+            if found is not None:
+                break
+
+        if found is None:
+            raise ValueError(f"Оракул не подтвердил ни одного варианта для байта {position}")
+        intermediate[position] = found ^ pad
+
+    return intermediate.tobytes(), queries
+
+
+def padding_oracle_attack(oracle: PaddingOracle, iv: bytes, ciphertext: bytes,
+                          batch_size: int = 16, workers: int = 1,
+                          cache: Optional[Dict[bytes, bytes]] = None) -> PaddingOracleResult:
+    """Расшифровывает CBC шифротекст, используя только оракул дополнения.
+
+    Найденные D(Ci) сохраняются в cache: повторные блоки шифротекста (в том
+    числе в следующих атаках с тем же ключом) не требуют запросов. При
+    workers > 1 блоки атакуются одновременно на пуле потоков.
+    """
+    size = oracle.block_size
+    if not ciphertext or len(ciphertext) % size:
+        raise ValueError("Длина шифротекста должна быть кратна размеру блока")
+    cache = {} if cache is None else cache
+
+    chain = bytes(iv) + bytes(ciphertext)
+    blocks = [chain[offset:offset + size] for offset in range(size, len(chain), size)]
+    previous_blocks = [chain[offset - size:offset] for offset in range(size, len(chain), size)]
+
+    def attack_block(index: int) -> Tuple[bytes, int, bool]:
+        block = blocks[index]
+        if block in cache:
+            return cache[block], 0, True
+        intermediate, queries = recover_intermediate(oracle, previous_blocks[index], block, batch_size)
+        cache[block] = intermediate
+        return intermediate, queries, False
+
+    start_time = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(attack_block, range(len(blocks))))
+    else:
+        results = [attack_block(index) for index in range(len(blocks))]
+    elapsed = time.perf_counter() - start_time
+
+    intermediate = [result[0] for result in results]
+    plaintext = b"".join(
+        bytes(a ^ b for a, b in zip(value, previous))
+        for value, previous in zip(intermediate, previous_blocks)
+    )
+    return PaddingOracleResult(
+        padded_plaintext=plaintext,
+        intermediate=intermediate,
+        block_queries=[result[1] for result in results],
+        elapsed=elapsed,
+        reused_blocks=sum(result[2] for result in results),
+    )
@@ -0,0 +1,215 @@
+"""Потоковое шифрование файлов в любом режиме работы.
+
+Файл читается порциями фиксированного размера в один заранее выделенный
+буфер, результат пишется через второй буфер - объем памяти не зависит от
+размера файла. Формат выходного файла: ``IV | шифротекст | тег (для GCM)``.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Callable, Optional, Union
+import os
+import secrets
+
+from modules.modern_crypto.block_modes.ciphers import BlockCipher
+from modules.modern_crypto.block_modes.modes import BlockModeCipher, pkcs7_unpad, xor_into
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 МБ
+
+PathOrFile = Union[str, os.PathLike, BinaryIO]
+
+
+def _open(target: PathOrFile, mode: str):
+    """Открывает путь или возвращает уже открытый файловый объект без закрытия"""
+    if isinstance(target, (str, os.PathLike)):
+        return open(target, mode)
+    return _Borrowed(target)
+
+
+class _Borrowed:
+    """Контекстный менеджер для чужого файлового объекта (не закрывает его)"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+
+    def __enter__(self) -> BinaryIO:
+        return self.stream
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise ValueError("Файл поврежден: неожиданный конец данных")
+    return data
+
+
+def iv_size_for_mode(cipher: BlockCipher, mode: str) -> int:
+    """Длина IV/nonce, записываемого в заголовок файла"""
+    if mode == "ECB":
+        return 0
+    if mode == "GCM":
+        return cipher.block_size - 4
+    return cipher.block_size
+
+
+def transform_stream(context: BlockModeCipher, src: BinaryIO, dst: BinaryIO,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE, hold_back: int = 0,
+                     progress: Optional[Callable[[int], None]] = None) -> bytes:
+    """Прогоняет поток через контекст режима.
+
+    hold_back последних байт входа не обрабатываются и возвращаются
+    вызывающему (так отделяется тег GCM, записанный в конец файла).
+    """
+    size = context.block_size
+    in_buffer = bytearray(chunk_size + hold_back)
+    out_buffer = bytearray(chunk_size + hold_back + size)
+    in_view = memoryview(in_buffer)
+    out_view = memoryview(out_buffer)
+
+    carried = 0  # байты из предыдущей порции, придержанные под тег
+    processed = 0
+    while True:
+        read = src.readinto(in_view[carried:carried + chunk_size])
+        if not read:
+            break
+        available = carried + read
+        ready = max(available - hold_back, 0)
+        written = context.update_into(in_view[:ready], out_view)
+        dst.write(out_view[:written])
+        # Придержанный хвост переносим в начало буфера
+        in_view[:available - ready] = bytes(in_view[ready:available])
+        carried = available - ready
+        processed += ready
+        if progress:
+            progress(processed)
+
+    trailer = bytes(in_view[:carried])
+    if len(trailer) != hold_back:
+        raise ValueError("Файл слишком короткий")
+    if context.mode == "GCM" and not context.encrypting:
+        dst.write(context.finalize_with_tag(trailer))
+    else:
+        dst.write(context.finalize())
+    return trailer
+
+
+def encrypt_file(src: PathOrFile, dst: PathOrFile, cipher: BlockCipher, mode: str,
+                 iv: Optional[bytes] = None, aad: bytes = b"",
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: Optional[Callable[[int], None]] = None) -> bytes:
+    """Шифрует файл; IV пишется в начало, тег GCM - в конец. Возвращает IV"""
+    iv_size = iv_size_for_mode(cipher, mode)
+    if iv is None:
+        iv = secrets.token_bytes(iv_size)
+    elif len(iv) != iv_size:
+        raise ValueError(f"Для файлового формата в режиме {mode} нужен IV длиной {iv_size} байт")
+
+    context = BlockModeCipher(cipher, mode, iv or None, encrypt=True, aad=aad)
+    with _open(src, 'rb') as reader, _open(dst, 'wb') as writer:
+        writer.write(iv)
+        transform_stream(context, reader, writer, chunk_size, progress=progress)
+        if mode == "GCM":
+            writer.write(context.tag)
+    return iv
+
+
+def decrypt_file(src: PathOrFile, dst: PathOrFile, cipher: BlockCipher, mode: str,
+                 aad: bytes = b"", chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: Optional[Callable[[int], None]] = None) -> None:
+    """Дешифрует файл, записанный encrypt_file.
+
+    В режиме GCM открытый текст пишется до проверки тега; при несовпадении
+    тега возбуждается ValueError и результат нужно удалить.
+    """
+    iv_size = iv_size_for_mode(cipher, mode)
+    hold_back = cipher.block_size if mode == "GCM" else 0
+    with _open(src, 'rb') as reader, _open(dst, 'wb') as writer:
+        iv = _read_exact(reader, iv_size)
+        context = BlockModeCipher(cipher, mode, iv or None, encrypt=False, aad=aad)
+        transform_stream(context, reader, writer, chunk_size, hold_back=hold_back, progress=progress)
+
+
+def _read_full(stream: BinaryIO, size: int) -> bytes:
+    """Читает ровно size байт (меньше - только в конце потока)"""
+    data = stream.read(size)
+    while data and len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def cbc_decrypt_chunk(cipher: BlockCipher, chunk: bytes, previous: bytes) -> bytearray:
+    """Дешифрует порцию CBC независимо от остальных.
+
+    Pi = D(Ci) xor Ci-1, поэтому порции нужен только последний блок
+    шифротекста предыдущей порции (для первой - IV).
+    """
+    size = cipher.block_size
+    decrypted = cipher.decrypt_blocks(chunk)
+    out = bytearray(len(chunk))
+    xor_into(memoryview(out)[:size], decrypted[:size], previous)
+    xor_into(memoryview(out)[size:], decrypted[size:], memoryview(chunk)[:-size])
+    return out
+
+
+def decrypt_cbc_parallel(src: BinaryIO, dst: BinaryIO, cipher: BlockCipher, iv: bytes,
+                         padding: bool = True, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         workers: Optional[int] = None,
+                         progress: Optional[Callable[[int], None]] = None) -> None:
+    """Параллельное дешифрование CBC потока порциями на пуле потоков.
+
+    В работе одновременно не больше 2 * workers порций, результаты пишутся
+    по порядку - память ограничена независимо от размера входа. Последняя
+    порция придерживается до конца потока, чтобы снять дополнение.
+    """
+    size = cipher.block_size
+    chunk_size = max(chunk_size - chunk_size % size, size)
+    workers = workers or os.cpu_count() or 1
+
+    pending = deque()
+    held = None  # последний расшифрованный фрагмент (может содержать дополнение)
+    processed = 0
+
+    def emit(data: bytearray) -> None:
+        nonlocal held, processed
+        if held is not None:
+            dst.write(held)
+        held = data
+        processed += len(data)
+        if progress:
+            progress(processed)
+
+    previous = iv
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            chunk = _read_full(src, chunk_size)
+            if not chunk:
+                break
+            if len(chunk) % size:
+                raise ValueError("Длина шифротекста не кратна размеру блока")
+            pending.append(executor.submit(cbc_decrypt_chunk, cipher, chunk, previous))
+            previous = chunk[-size:]
+            if len(pending) >= 2 * workers:
+                emit(pending.popleft().result())
+        while pending:
+            emit(pending.popleft().result())
+
+    if held is None:
+        if padding:
+            raise ValueError("Пустой шифротекст")
+        return
+    dst.write(pkcs7_unpad(bytes(held), size) if padding else held)
+
+
+def decrypt_cbc_file_parallel(src: PathOrFile, dst: PathOrFile, cipher: BlockCipher,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None,
+                              progress: Optional[Callable[[int], None]] = None) -> None:
+    """Дешифрует CBC файл формата encrypt_file (IV | шифротекст) на пуле потоков"""
+    with _open(src, 'rb') as reader, _open(dst, 'wb') as writer:
+        iv = _read_exact(reader, cipher.block_size)
+        decrypt_cbc_parallel(reader, writer, cipher, iv, chunk_size=chunk_size,
+                             workers=workers, progress=progress)
@@ -6,9 +6,13 @@ import binascii
 from typing import List, Tuple
 import pandas as pd
 import numpy as np
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-from cryptography.hazmat.backends import default_backend
 import os
+import time
+import tempfile
+from modules.modern_crypto.block_modes.ciphers import BLOCK_CIPHERS, BlockCipher, create_block_cipher
+from modules.modern_crypto.block_modes import modes as block_modes
+from modules.modern_crypto.block_modes.padding_oracle import PaddingOracle, padding_oracle_attack
+from modules.modern_crypto.block_modes.streaming import encrypt_file, decrypt_file, decrypt_cbc_file_parallel
 
 class CBCModeModule(CryptoModule):
     def __init__(self):
@@ -50,7 +54,7 @@ class CBCModeModule(CryptoModule):
             - Устойчивость к некоторым атакам
 
             **Недостатки:**
-            - Последовательная обработка (не параллелизуется)
+            - Последовательное шифрование (дешифрование параллелизуется)
             - Требует синхронизации IV
 
             **Применение:**
@@ -65,7 +69,8 @@ class CBCModeModule(CryptoModule):
         # Выбор режима работы
         mode = st.radio(
             "Режим работы:",
-            ["🔐 Шифрование/Дешифрование", "🎯 Визуализация процесса", "📊 Сравнение с ECB"],
+            ["🔐 Шифрование/Дешифрование", "🎯 Визуализация процесса", "📊 Сравнение с ECB", "🧩 Все режимы работы",
+             "🕳️ Атака оракула дополнения"],
             horizontal=True
         )
 
@@ -73,8 +78,12 @@ class CBCModeModule(CryptoModule):
             self.render_encryption_section()
         elif mode == "🎯 Визуализация процесса":
             self.render_visualization_section()
-        else:
+        elif mode == "📊 Сравнение с ECB":
             self.render_comparison_section()
+        elif mode == "🧩 Все режимы работы":
+            self.render_modes_section()
+        else:
+            self.render_padding_oracle_section()
 
     def render_encryption_section(self):
         """Секция шифрования/дешифрования в CBC режиме"""
@@ -100,22 +109,24 @@ class CBCModeModule(CryptoModule):
         # Выбор алгоритма
         algorithm = st.selectbox(
             "Алгоритм шифрования:",
-            ["AES", "DES"],
+            list(BLOCK_CIPHERS),
             key="cbc_enc_algo"
         )
+        cipher_cls = BLOCK_CIPHERS[algorithm]
+        key_length = cipher_cls.key_size * 2
+        iv_length = cipher_cls.block_size * 2
 
         # Генерация ключа и IV
         col_key, col_iv = st.columns(2)
 
         with col_key:
             if 'cbc_enc_key' not in st.session_state:
-                st.session_state.cbc_enc_key = secrets.token_hex(16)
+                st.session_state.cbc_enc_key = secrets.token_hex(32)
             
-            key_length = 32 if algorithm == "AES" else 16
             key = st.text_input(
                 f"Ключ ({key_length} hex символов):",
                 st.session_state.cbc_enc_key[:key_length],
-                key="cbc_enc_key_input"
+                key=f"cbc_enc_key_input_{algorithm}"
             )
 
         with col_iv:
@@ -123,17 +134,16 @@ class CBCModeModule(CryptoModule):
                 st.session_state.cbc_enc_iv = secrets.token_hex(16)
             
             iv = st.text_input(
-                "IV (32 hex символа):",
-                st.session_state.cbc_enc_iv,
-                key="cbc_enc_iv_input"
+                f"IV ({iv_length} hex символов):",
+                st.session_state.cbc_enc_iv[:iv_length],
+                key=f"cbc_enc_iv_input_{algorithm}"
             )
 
         # Кнопки генерации
         col_gen1, col_gen2 = st.columns(2)
         with col_gen1:
             if st.button("🎲 Сгенерировать ключ", key="gen_cbc_key", use_container_width=True):
-                key_length_bytes = 16 if algorithm == "AES" else 8
-                st.session_state.cbc_enc_key = secrets.token_hex(key_length_bytes)
+                st.session_state.cbc_enc_key = secrets.token_hex(32)
                 st.rerun()
 
         with col_gen2:
@@ -145,15 +155,12 @@ class CBCModeModule(CryptoModule):
             if plaintext and key and iv:
                 try:
                     # Проверки
-                    if algorithm == "AES" and len(key) != 32:
-                        st.error("Для AES ключ должен быть 32 hex символа (128 бит)")
-                        return
-                    elif algorithm == "DES" and len(key) != 16:
-                        st.error("Для DES ключ должен быть 16 hex символа (64 бит)")
+                    if len(key) != key_length:
+                        st.error(f"Для {algorithm} ключ должен быть {key_length} hex символов ({key_length * 4} бит)")
                         return
                     
-                    if len(iv) != 32:
-                        st.error("IV должен быть 32 hex символа (128 бит)")
+                    if len(iv) != iv_length:
+                        st.error(f"IV должен быть {iv_length} hex символов ({iv_length * 4} бит)")
                         return
 
                     # Шифрование
@@ -182,18 +189,20 @@ class CBCModeModule(CryptoModule):
 
         algorithm = st.selectbox(
             "Алгоритм шифрования:",
-            ["AES", "DES"],
+            list(BLOCK_CIPHERS),
             key="cbc_dec_algo"
         )
+        cipher_cls = BLOCK_CIPHERS[algorithm]
+        key_length = cipher_cls.key_size * 2
+        iv_length = cipher_cls.block_size * 2
 
-        key_length = 32 if algorithm == "AES" else 16
         key = st.text_input(
             f"Ключ ({key_length} hex символов):",
             key="cbc_dec_key"
         )
 
         iv = st.text_input(
-            "IV (32 hex символа):",
+            f"IV ({iv_length} hex символов):",
             key="cbc_dec_iv"
         )
 
@@ -201,15 +210,12 @@ class CBCModeModule(CryptoModule):
             if ciphertext and key and iv:
                 try:
                     # Проверки
-                    if algorithm == "AES" and len(key) != 32:
-                        st.error("Для AES ключ должен быть 32 hex символа")
-                        return
-                    elif algorithm == "DES" and len(key) != 16:
-                        st.error("Для DES ключ должен быть 16 hex символа")
+                    if len(key) != key_length:
+                        st.error(f"Для {algorithm} ключ должен быть {key_length} hex символов")
                         return
                     
-                    if len(iv) != 32:
-                        st.error("IV должен быть 32 hex символа")
+                    if len(iv) != iv_length:
+                        st.error(f"IV должен быть {iv_length} hex символов")
                         return
 
                     # Дешифрование
@@ -233,10 +239,6 @@ class CBCModeModule(CryptoModule):
             key="demo_cbc_text"
         )
 
-        # Убедимся, что текст кратен 16 байтам для AES
-        if len(demo_text) % 16 != 0:
-            demo_text = demo_text.ljust((len(demo_text) // 16 + 1) * 16, ' ')
-
         demo_key = st.text_input(
             "Ключ (32 hex):",
             "2b7e151628aed2a6abf7158809cf4f3c",
@@ -345,6 +347,275 @@ class CBCModeModule(CryptoModule):
                 st.text(f"Шифротекст: {cbc_result}")
                 st.success("Одинаковые блоки → разный шифротекст!")
 
+    def render_modes_section(self):
+        """Все режимы работы поверх любого зарегистрированного блочного шифра"""
+        st.subheader("🧩 Режимы работы блочных шифров")
+
+        modes_data = []
+        for mode_name, title in block_modes.MODES.items():
+            modes_data.append({
+                'Режим': mode_name,
+                'Название': title,
+                'Пакетная обработка блоков': block_modes.BATCH_MODES[mode_name],
+                'Дополнение': 'PKCS7' if mode_name in block_modes.PADDED_MODES else 'Не требуется',
+                'IV / nonce': 'Нет' if mode_name == "ECB" else 'Да'
+            })
+        st.dataframe(pd.DataFrame(modes_data), use_container_width=True, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            algorithm = st.selectbox("Блочный шифр:", list(BLOCK_CIPHERS), key="modes_algo")
+        with col2:
+            mode = st.selectbox("Режим:", list(block_modes.MODES), index=1, key="modes_mode")
+
+        cipher_cls = BLOCK_CIPHERS[algorithm]
+        st.caption(f"{cipher_cls.description}. Блок: {cipher_cls.block_size * 8} бит, ключ: {cipher_cls.key_size * 8} бит")
+
+        if 'modes_key' not in st.session_state:
+            st.session_state.modes_key = secrets.token_hex(32)
+            st.session_state.modes_iv = secrets.token_hex(16)
+
+        iv_length = 0 if mode == "ECB" else (cipher_cls.block_size - 4 if mode == "GCM" else cipher_cls.block_size)
+
+        col_key, col_iv = st.columns(2)
+        with col_key:
+            key_hex = st.text_input(
+                f"Ключ ({cipher_cls.key_size * 2} hex):",
+                st.session_state.modes_key[:cipher_cls.key_size * 2],
+                key=f"modes_key_input_{algorithm}"
+            )
+        with col_iv:
+            iv_hex = st.text_input(
+                f"IV / nonce ({iv_length * 2} hex):",
+                st.session_state.modes_iv[:iv_length * 2],
+                disabled=(mode == "ECB"),
+                key=f"modes_iv_input_{algorithm}_{mode}"
+            )
+
+        if st.button("🎲 Новые ключ и IV", key="modes_regen"):
+            st.session_state.modes_key = secrets.token_hex(32)
+            st.session_state.modes_iv = secrets.token_hex(16)
+            st.rerun()
+
+        aad = b""
+        if mode == "GCM":
+            aad = st.text_input("Дополнительные аутентифицируемые данные (AAD):", "header", key="modes_aad").encode('utf-8')
+
+        try:
+            cipher = create_block_cipher(algorithm, bytes.fromhex(key_hex))
+            iv = bytes.fromhex(iv_hex) if mode != "ECB" else None
+            if iv is not None and len(iv) != iv_length:
+                raise ValueError(f"IV должен быть {iv_length * 2} hex символов")
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            return
+
+        tab_text, tab_file = st.tabs(["📝 Текст", "📁 Файл (потоковая обработка)"])
+
+        with tab_text:
+            col_enc, col_dec = st.columns(2)
+            with col_enc:
+                plaintext = st.text_area("Открытый текст:", "Одинаковые блоки! " * 4, key="modes_plain")
+                if st.button("Зашифровать", key="modes_enc_btn", use_container_width=True):
+                    ciphertext = block_modes.encrypt(cipher, mode, plaintext.encode('utf-8'), iv, aad=aad)
+                    st.code(ciphertext.hex(), language="text")
+                    if mode == "GCM":
+                        st.caption(f"Последние {cipher.block_size} байт - тег аутентификации")
+            with col_dec:
+                ciphertext_hex = st.text_area("Шифротекст (hex):", "", key="modes_cipher")
+                if st.button("Дешифровать", key="modes_dec_btn", use_container_width=True):
+                    try:
+                        plaintext_bytes = block_modes.decrypt(cipher, mode, bytes.fromhex(ciphertext_hex.strip()), iv, aad=aad)
+                        st.code(plaintext_bytes.decode('utf-8', errors='replace'), language="text")
+                    except ValueError as e:
+                        st.error(f"❌ Ошибка дешифрования: {e}")
+
+        with tab_file:
+            st.markdown(f"""
+            Файл обрабатывается порциями по 1 МБ через заранее выделенные буферы.
+            Формат результата: `IV | шифротекст | тег (GCM)`.
+            Результат пишется в безымянный временный файл, который живет, пока открыта
+            сессия, и читается только при нажатии «Скачать». Streamlit отдает скачиваемый файл целиком из памяти, поэтому размер
+            ограничен лимитом загрузки: {st.get_option("server.maxUploadSize")} МБ (`server.maxUploadSize`).
+            """)
+            workers = 1
+            if mode == "CBC":
+                workers = st.slider(
+                    "Потоков для дешифрования CBC:",
+                    min_value=1,
+                    max_value=max(os.cpu_count() or 1, 8),
+                    value=os.cpu_count() or 1,
+                    key="modes_cbc_workers",
+                    help="Pᵢ = Dₖ(Cᵢ) ⊕ Cᵢ₋₁ зависит только от шифротекста, поэтому порции дешифруются независимо"
+                )
+            uploaded_file = st.file_uploader("Файл:", key="modes_file")
+            if uploaded_file is not None:
+                col_fenc, col_fdec = st.columns(2)
+                with col_fenc:
+                    if st.button("🔒 Зашифровать файл", key="modes_file_enc", use_container_width=True):
+                        self.process_uploaded_file(uploaded_file, cipher, mode, aad, encrypt=True)
+                with col_fdec:
+                    if st.button("🔓 Дешифровать файл", key="modes_file_dec", use_container_width=True):
+                        self.process_uploaded_file(uploaded_file, cipher, mode, aad, encrypt=False, workers=workers)
+
+    def render_padding_oracle_section(self):
+        """Лаборатория атаки оракула дополнения на CBC"""
+        st.subheader("🕳️ Атака оракула дополнения (Padding Oracle)")
+
+        st.markdown("""
+        Сервер дешифрует присланный шифротекст и сообщает лишь одно: корректно ли дополнение PKCS7.
+        Подменяя байты предыдущего блока C'ᵢ₋₁, атакующий находит вариант с корректным дополнением
+        и узнает промежуточное значение Dₖ(Cᵢ), а затем и Pᵢ = Dₖ(Cᵢ) ⊕ Cᵢ₋₁ - без ключа.
+        Оракул здесь - `cbc_decrypt_bytes` со строгой проверкой `unpad_data`.
+        """)
+
+        col1, col2 = st.columns(2)
+        with col1:
+            algorithm = st.selectbox("Алгоритм жертвы:", list(BLOCK_CIPHERS), key="oracle_algo")
+            secret = st.text_area(
+                "Секретное сообщение:",
+                "Пароль администратора: correct horse battery staple",
+                key="oracle_secret"
+            )
+        with col2:
+            batch_size = st.select_slider(
+                "Вариантов в пакете запросов:",
+                options=[1, 4, 8, 16, 32, 64, 128, 256],
+                value=16,
+                key="oracle_batch"
+            )
+            workers = st.slider("Потоков (блоки атакуются одновременно):", 1, 8, 1, key="oracle_workers")
+            batched = st.checkbox(
+                "Пакетная проверка дополнения (NumPy)",
+                value=True,
+                key="oracle_batched",
+                help="Без нее каждый вариант проходит через полный вызов cbc_decrypt_bytes"
+            )
+            reuse = st.checkbox(
+                "Запоминать найденные Dₖ(Cᵢ) между атаками",
+                value=True,
+                key="oracle_reuse"
+            )
+
+        cipher_cls = BLOCK_CIPHERS[algorithm]
+        lab_keys = st.session_state.setdefault('oracle_keys', {})
+        if algorithm not in lab_keys:
+            lab_keys[algorithm] = secrets.token_bytes(cipher_cls.key_size)
+        cipher = create_block_cipher(algorithm, lab_keys[algorithm])
+        cache = st.session_state.setdefault('oracle_cache', {}).setdefault(algorithm, {})
+
+        if st.button("🎯 Перехватить шифротекст и атаковать", key="oracle_run", use_container_width=True):
+            iv = secrets.token_bytes(cipher.block_size)
+            ciphertext = block_modes.encrypt(cipher, "CBC", secret.encode('utf-8'), iv)
+
+            oracle = PaddingOracle(
+                lambda oracle_iv, data: self.cbc_decrypt_bytes(cipher, data, oracle_iv),
+                cipher.block_size,
+                cipher=cipher if batched else None
+            )
+            try:
+                result = padding_oracle_attack(
+                    oracle, iv, ciphertext,
+                    batch_size=batch_size,
+                    workers=workers,
+                    cache=cache if reuse else None
+                )
+            except ValueError as e:
+                st.error(f"❌ Атака не удалась: {e}")
+                return
+
+            st.markdown("**Перехваченный шифротекст:**")
+            st.code((iv + ciphertext).hex(), language="text")
+
+            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+            with col_m1:
+                st.metric("Запросов к оракулу", f"{result.queries:,}")
+            with col_m2:
+                st.metric("Запросов на байт", f"{result.queries_per_byte:.1f}")
+            with col_m3:
+                st.metric("Время атаки", f"{result.elapsed:.3f} с")
+            with col_m4:
+                st.metric("Запросов в секунду", f"{result.queries / max(result.elapsed, 1e-9):,.0f}")
+
+            recovered = result.plaintext.decode('utf-8', errors='replace')
+            if result.plaintext == secret.encode('utf-8'):
+                st.success(f"✅ Сообщение восстановлено без ключа: {recovered}")
+            else:
+                st.warning(f"⚠️ Восстановлено частично: {recovered}")
+
+            blocks_data = []
+            for index, (intermediate, queries) in enumerate(zip(result.intermediate, result.block_queries)):
+                offset = index * cipher.block_size
+                blocks_data.append({
+                    'Блок': index + 1,
+                    'Cᵢ': ciphertext[offset:offset + cipher.block_size].hex(),
+                    'Dₖ(Cᵢ)': intermediate.hex(),
+                    'Pᵢ': result.padded_plaintext[offset:offset + cipher.block_size].hex(),
+                    'Запросов': queries,
+                })
+            st.dataframe(pd.DataFrame(blocks_data), use_container_width=True, hide_index=True)
+            st.caption(
+                f"Блоков взято из кэша: {result.reused_blocks}. "
+                f"Без упорядочивания вариантов и пакетов в среднем нужно ~128 запросов на байт."
+            )
+
+        st.info("""
+        **Защита:** используйте аутентифицированное шифрование (GCM) или проверяйте MAC
+        до дешифрования (Encrypt-then-MAC), а ошибки дополнения и MAC не различайте.
+        """)
+
+    def process_uploaded_file(self, uploaded_file, cipher, mode: str, aad: bytes, encrypt: bool,
+                              workers: int = 1):
+        """Потоковая обработка загруженного файла и кнопка скачивания результата"""
+        uploaded_file.seek(0)
+        # Результат предыдущей обработки в этой сессии больше не нужен
+        previous = st.session_state.pop('modes_result', None)
+        if previous is not None:
+            previous.close()
+        # Файл без имени в каталоге: место освобождается при закрытии - вместе с сессией
+        # или при аварийном завершении процесса
+        result = tempfile.TemporaryFile(prefix="cryptolab-")
+        progress_bar = st.progress(0)
+        total = max(uploaded_file.size, 1)
+
+        def progress(processed: int):
+            progress_bar.progress(min(processed / total, 1.0))
+
+        start_time = time.perf_counter()
+        try:
+            if encrypt:
+                encrypt_file(uploaded_file, result, cipher, mode, aad=aad, progress=progress)
+            elif mode == "CBC" and workers > 1:
+                decrypt_cbc_file_parallel(uploaded_file, result, cipher, workers=workers, progress=progress)
+            else:
+                decrypt_file(uploaded_file, result, cipher, mode, aad=aad, progress=progress)
+        except ValueError as e:
+            st.error(f"❌ Ошибка обработки файла: {e}")
+            result.close()
+            return
+        result.flush()
+        st.session_state.modes_result = result
+        elapsed = time.perf_counter() - start_time
+        progress_bar.progress(1.0)
+
+        size_mb = uploaded_file.size / (1024 * 1024)
+        threads = f", потоков: {workers}" if not encrypt and mode == "CBC" else ""
+        st.success(f"✅ Обработано {size_mb:.2f} МБ за {elapsed:.3f} с ({size_mb / max(elapsed, 1e-9):.1f} МБ/с{threads})")
+        suffix = ".enc" if encrypt else ".dec"
+
+        def read_result(stream=result) -> bytes:
+            # pread не двигает позицию файла: повторные скачивания не мешают друг другу
+            return os.pread(stream.fileno(), os.fstat(stream.fileno()).st_size, 0)
+
+        # Файл читается при нажатии кнопки, а не при каждой отрисовке страницы
+        st.download_button(
+            "💾 Скачать результат",
+            read_result,
+            file_name=uploaded_file.name + suffix,
+            on_click="ignore",
+            key=f"modes_download_{suffix}"
+        )
+
     def cbc_encrypt(self, plaintext: str, key_hex: str, iv_hex: str, algorithm: str) -> str:
         """Шифрование в режиме CBC"""
         try:
@@ -354,18 +625,13 @@ class CBCModeModule(CryptoModule):
             iv_bytes = bytes.fromhex(iv_hex)
 
             # Выбираем алгоритм
-            if algorithm == "AES":
-                cipher = Cipher(algorithms.AES(key_bytes), modes.CBC(iv_bytes), backend=default_backend())
-            else:  # DES
-                cipher = Cipher(algorithms.TripleDES(key_bytes), modes.CBC(iv_bytes), backend=default_backend())
+            cipher = create_block_cipher(algorithm, key_bytes)
 
             # Дополняем данные до размера блока
-            block_size = 16 if algorithm == "AES" else 8
-            padded_data = self.pad_data(plaintext_bytes, block_size)
+            padded_data = self.pad_data(plaintext_bytes, cipher.block_size)
 
             # Шифруем
-            encryptor = cipher.encryptor()
-            ciphertext = encryptor.update(padded_data) + encryptor.finalize()
+            ciphertext = block_modes.encrypt(cipher, "CBC", padded_data, iv_bytes, padding=False)
 
             return ciphertext.hex()
 
@@ -381,33 +647,32 @@ class CBCModeModule(CryptoModule):
             iv_bytes = bytes.fromhex(iv_hex)
 
             # Выбираем алгоритм
-            if algorithm == "AES":
-                cipher = Cipher(algorithms.AES(key_bytes), modes.CBC(iv_bytes), backend=default_backend())
-            else:  # DES
-                cipher = Cipher(algorithms.TripleDES(key_bytes), modes.CBC(iv_bytes), backend=default_backend())
-
-            # Дешифруем
-            decryptor = cipher.decryptor()
-            decrypted_padded = decryptor.update(ciphertext_bytes) + decryptor.finalize()
+            cipher = create_block_cipher(algorithm, key_bytes)
 
-            # Убираем дополнение
-            plaintext_bytes = self.unpad_data(decrypted_padded)
+            plaintext_bytes = self.cbc_decrypt_bytes(cipher, ciphertext_bytes, iv_bytes)
 
             return plaintext_bytes.decode('utf-8')
 
         except Exception as e:
             raise Exception(f"Ошибка CBC дешифрования: {e}")
 
+    def cbc_decrypt_bytes(self, cipher: BlockCipher, ciphertext: bytes, iv: bytes) -> bytes:
+        """Дешифрование CBC с проверкой дополнения (ValueError при ошибке)"""
+        # Дешифруем (все блоки одним пакетным вызовом)
+        decrypted_padded = block_modes.decrypt(cipher, "CBC", ciphertext, iv, padding=False)
+
+        # Убираем дополнение
+        return self.unpad_data(decrypted_padded, cipher.block_size)
+
     def pad_data(self, data: bytes, block_size: int) -> bytes:
         """Дополнение данных по стандарту PKCS7"""
         padding_length = block_size - (len(data) % block_size)
         padding = bytes([padding_length] * padding_length)
         return data + padding
 
-    def unpad_data(self, data: bytes) -> bytes:
-        """Удаление дополнения PKCS7"""
-        padding_length = data[-1]
-        return data[:-padding_length]
+    def unpad_data(self, data: bytes, block_size: int = 16) -> bytes:
+        """Удаление дополнения PKCS7 с проверкой (ValueError при некорректном дополнении)"""
+        return block_modes.pkcs7_unpad(data, block_size)
 
     def show_encryption_details(self, plaintext: str, key: str, iv: str, ciphertext: str, algorithm: str):
         """Показывает детали процесса шифрования"""
@@ -420,7 +685,7 @@ class CBCModeModule(CryptoModule):
         with col1:
             st.metric("Алгоритм", algorithm)
         with col2:
-            st.metric("Размер блока", "128 бит" if algorithm == "AES" else "64 бита")
+            st.metric("Размер блока", f"{BLOCK_CIPHERS[algorithm].block_size * 8} бит")
         with col3:
             st.metric("Режим", "CBC")
         with col4:
@@ -440,7 +705,7 @@ class CBCModeModule(CryptoModule):
 
         # Показываем блоки
         plaintext_bytes = plaintext.encode('utf-8')
-        block_size = 16 if algorithm == "AES" else 8
+        block_size = BLOCK_CIPHERS[algorithm].block_size
         blocks = [plaintext_bytes[i:i+block_size] for i in range(0, len(plaintext_bytes), block_size)]
         
         st.markdown(f"**Блоки открытого текста ({len(blocks)}):**")
@@ -451,13 +716,15 @@ class CBCModeModule(CryptoModule):
         """Визуализирует процесс CBC шифрования по шагам"""
         st.markdown("### 🔄 Пошаговая визуализация CBC")
 
-        # Преобразуем в байты
-        plaintext_bytes = plaintext.encode('utf-8')
+        # Преобразуем в байты и дополняем по PKCS#7: кириллица занимает 2 байта на символ
+        block_size = 16  # AES
+        plaintext_bytes = block_modes.pkcs7_pad(plaintext.encode('utf-8'), block_size)
         key_bytes = bytes.fromhex(key_hex)
         iv_bytes = bytes.fromhex(iv_hex)
         
-        block_size = 16  # AES
         blocks = [plaintext_bytes[i:i+block_size] for i in range(0, len(plaintext_bytes), block_size)]
+        cipher = create_block_cipher("AES-128", key_bytes)
+        ciphertext_blocks = []
 
         # Начальное состояние
         st.markdown("**Начальные параметры:**")
@@ -489,12 +756,13 @@ class CBCModeModule(CryptoModule):
             
             with col2:
                 st.markdown("**После шифрования:**")
-                # Имитация шифрования (в реальности используем AES/DES)
-                encrypted_block = self.simulate_encryption(xor_result, key_bytes)
+                # Шифрование блока AES-128
+                encrypted_block = cipher.encrypt_block(xor_result)
                 st.text(f"Зашифр. блок: {encrypted_block.hex()}")
                 
                 # Обновляем состояние для следующего блока
                 current_state = encrypted_block
+                ciphertext_blocks.append(encrypted_block)
                 
                 st.success(f"Блок {i+1} завершен!")
 
@@ -503,13 +771,7 @@ class CBCModeModule(CryptoModule):
 
         # Финальный результат
         st.markdown("---")
-        st.success(f"**Итоговый шифротекст:** {current_state.hex()}")
-
-    def simulate_encryption(self, data: bytes, key: bytes) -> bytes:
-        """Имитация шифрования блока (для визуализации)"""
-        # В реальной реализации здесь было бы настоящее шифрование
-        # Для демонстрации используем простую трансформацию
-        return bytes((b + 1) % 256 for b in data)
+        st.success(f"**Итоговый шифротекст:** {b''.join(ciphertext_blocks).hex()}")
 
 # Для обратной совместимости
 class CBCMode(CBCModeModule):
@@ -3,10 +3,14 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import secrets
-from typing import List, Tuple
+import time
+from typing import List, Tuple, Optional
 import matplotlib.pyplot as plt
 from PIL import Image
 import io
+from modules.modern_crypto.block_modes.ciphers import BLOCK_CIPHERS, BlockCipher, key_from_passphrase
+from modules.modern_crypto.block_modes import modes as block_modes
+from modules.modern_crypto.block_modes.analysis import DuplicateBlockIndex, index_blocks
 
 class ECBModeModule(CryptoModule):
     def __init__(self):
@@ -17,6 +21,9 @@ class ECBModeModule(CryptoModule):
         self.category = "modern"
         self.icon = ""
         self.order = 6
+        
+        # Учебные преобразования + все зарегистрированные блочные шифры
+        self.cipher_options = ["XOR (демонстрационный)", "Простая замена"] + list(BLOCK_CIPHERS)
     
     def render(self):
         st.title("📝 Режим ECB (Electronic Codebook)")
@@ -109,7 +116,7 @@ class ECBModeModule(CryptoModule):
         # Выбор алгоритма
         cipher_type = st.selectbox(
             "Алгоритм шифрования:",
-            ["XOR (демонстрационный)", "Простая замена", "AES-128"],
+            self.cipher_options,
             key="ecb_cipher_type"
         )
         
@@ -142,6 +149,10 @@ class ECBModeModule(CryptoModule):
             key="ecb_block_size"
         )
         
+        if cipher_type in BLOCK_CIPHERS:
+            block_size = BLOCK_CIPHERS[cipher_type].block_size
+            st.caption(f"Для {cipher_type} размер блока фиксирован: {block_size} байт, ключ получается из пароля через SHA-512")
+        
         if st.button("Зашифровать ECB", key="ecb_enc_btn", use_container_width=True):
             if plaintext and key:
                 try:
@@ -183,7 +194,7 @@ class ECBModeModule(CryptoModule):
         
         cipher_type = st.selectbox(
             "Алгоритм шифрования:",
-            ["XOR (демонстрационный)", "Простая замена", "AES-128"],
+            self.cipher_options,
             key="ecb_dec_cipher_type"
         )
         
@@ -227,25 +238,25 @@ class ECBModeModule(CryptoModule):
             col1, col2 = st.columns(2)
             
             with col1:
-                block_size = st.slider(
-                    "Размер блока (пиксели):",
-                    min_value=4,
-                    max_value=32,
-                    value=8,
-                    key="ecb_image_block_size"
+                cipher_name = st.selectbox(
+                    "Блочный шифр:",
+                    list(BLOCK_CIPHERS),
+                    key="ecb_image_cipher"
+                )
+                st.caption(
+                    f"Байты пикселей (RGB, построчно) делятся на блоки по "
+                    f"{BLOCK_CIPHERS[cipher_name].block_size} байт"
                 )
                 
-                encryption_strength = st.slider(
-                    "Интенсивность шифрования:",
-                    min_value=1,
-                    max_value=10,
-                    value=5,
-                    key="ecb_encryption_strength"
+                compare_modes = st.checkbox(
+                    "Сравнить с CBC и CTR",
+                    value=True,
+                    key="ecb_image_compare"
                 )
             
             with col2:
                 if st.button("Зашифровать изображение ECB", key="ecb_image_enc_btn"):
-                    self.encrypt_image_ecb(image, block_size, encryption_strength)
+                    self.encrypt_image_ecb(image, cipher_name, compare_modes)
                 
                 if st.button("Показать уязвимости ECB", key="ecb_vulnerability_btn"):
                     self.demo_ecb_vulnerabilities(image)
@@ -281,18 +292,46 @@ class ECBModeModule(CryptoModule):
         что позволяет анализировать структуру данных даже без знания ключа.
         """)
         
-        # Демонстрация с простым текстом
-        demo_text = st.text_input(
-            "Текст для анализа шаблонов:",
-            "AAAAAAAABBBBBBBBAAAAAAAABBBBBBBB",
-            key="pattern_text"
+        source = st.radio(
+            "Источник данных:",
+            ["Демонстрационный текст", "Файл шифротекста"],
+            horizontal=True,
+            key="pattern_source"
         )
         
-        if st.button("Проанализировать шаблоны", key="pattern_btn"):
-            self.analyze_ecb_patterns(demo_text)
+        if source == "Демонстрационный текст":
+            # Демонстрация с простым текстом
+            demo_text = st.text_input(
+                "Текст для анализа шаблонов:",
+                "AAAAAAAABBBBBBBBAAAAAAAABBBBBBBB",
+                key="pattern_text"
+            )
+            
+            if st.button("Проанализировать шаблоны", key="pattern_btn"):
+                self.analyze_ecb_patterns(demo_text)
+        else:
+            uploaded_file = st.file_uploader(
+                "Файл с перехваченным шифротекстом:",
+                key="pattern_file"
+            )
+            block_size = st.selectbox(
+                "Размер блока (байт):",
+                [16, 8],
+                key="pattern_file_block_size"
+            )
+            
+            if uploaded_file is not None and st.button("Найти повторяющиеся блоки", key="pattern_file_btn"):
+                st.session_state.pattern_file_data = uploaded_file.getvalue()
+            
+            data = st.session_state.get('pattern_file_data')
+            if data:
+                self.show_duplicate_blocks(index_blocks(data, block_size))
     
     def ecb_encrypt_text(self, plaintext: str, key: str, block_size: int, cipher_type: str) -> Tuple[List[str], str]:
         """Шифрует текст в режиме ECB"""
+        if cipher_type in BLOCK_CIPHERS:
+            return self.block_cipher_encrypt_text(plaintext, key, cipher_type)
+        
         # Дополняем текст до кратного block_size
         padded_text = self.pad_text(plaintext, block_size)
         
@@ -304,10 +343,8 @@ class ECBModeModule(CryptoModule):
         for block in blocks:
             if cipher_type == "XOR (демонстрационный)":
                 encrypted_block = self.xor_encrypt(block, key)
-            elif cipher_type == "Простая замена":
+            else:  # Простая замена
                 encrypted_block = self.substitution_encrypt(block, key)
-            else:  # AES-128
-                encrypted_block = self.demo_aes_encrypt(block, key)
             
             encrypted_blocks.append(encrypted_block)
         
@@ -318,6 +355,9 @@ class ECBModeModule(CryptoModule):
     
     def ecb_decrypt_text(self, ciphertext: str, key: str, block_size: int, cipher_type: str) -> str:
         """Дешифрует текст в режиме ECB"""
+        if cipher_type in BLOCK_CIPHERS:
+            return self.block_cipher_decrypt_text(ciphertext, key, cipher_type)
+        
         # Разбиваем на блоки
         blocks = [ciphertext[i:i+block_size] for i in range(0, len(ciphertext), block_size)]
         
@@ -326,10 +366,8 @@ class ECBModeModule(CryptoModule):
         for block in blocks:
             if cipher_type == "XOR (демонстрационный)":
                 decrypted_block = self.xor_decrypt(block, key)
-            elif cipher_type == "Простая замена":
+            else:  # Простая замена
                 decrypted_block = self.substitution_decrypt(block, key)
-            else:  # AES-128
-                decrypted_block = self.demo_aes_decrypt(block, key)
             
             decrypted_blocks.append(decrypted_block)
         
@@ -403,29 +441,39 @@ class ECBModeModule(CryptoModule):
         
         return ''.join(result)
     
-    def demo_aes_encrypt(self, block: str, key: str) -> str:
-        """Демонстрационное AES-подобное шифрование"""
-        # Упрощенная версия для демонстрации
-        import hashlib
-        
-        # Используем хеш для имитации AES
-        combined = block + key
-        hash_obj = hashlib.md5(combined.encode())
-        return hash_obj.hexdigest()[:len(block)*2].upper()
+    def get_block_cipher(self, cipher_type: str, key: str) -> BlockCipher:
+        """Создает блочный шифр из реестра с ключом, полученным из пароля"""
+        cipher_cls = BLOCK_CIPHERS[cipher_type]
+        return cipher_cls(key_from_passphrase(key, cipher_cls.key_size))
+    
+    def block_cipher_encrypt_text(self, plaintext: str, key: str, cipher_type: str) -> Tuple[List[str], str]:
+        """ECB-шифрование настоящим блочным шифром, блоки в hex"""
+        cipher = self.get_block_cipher(cipher_type, key)
+        ciphertext = block_modes.encrypt(cipher, "ECB", plaintext.encode('utf-8'))
+        size = cipher.block_size
+        encrypted_blocks = [ciphertext[i:i+size].hex().upper() for i in range(0, len(ciphertext), size)]
+        return encrypted_blocks, ''.join(encrypted_blocks)
     
-    def demo_aes_decrypt(self, block: str, key: str) -> str:
-        """Демонстрационное AES-подобное дешифрование"""
-        # В реальном AES здесь было бы настоящее дешифрование
-        # Для демонстрации возвращаем фиктивный результат
-        return "A" * len(block)
+    def block_cipher_decrypt_text(self, ciphertext: str, key: str, cipher_type: str) -> str:
+        """ECB-дешифрование настоящим блочным шифром (шифротекст в hex)"""
+        cipher = self.get_block_cipher(cipher_type, key)
+        ciphertext_bytes = bytes.fromhex(''.join(ciphertext.split()))
+        return block_modes.decrypt(cipher, "ECB", ciphertext_bytes).decode('utf-8')
     
     def show_encryption_process(self, plaintext: str, encrypted_blocks: List[str], block_size: int, cipher_type: str):
         """Показывает процесс шифрования по блокам"""
         st.markdown("### 🔄 Процесс шифрования по блокам")
         
         # Разбиваем оригинальный текст на блоки
-        padded_text = self.pad_text(plaintext, block_size)
-        original_blocks = [padded_text[i:i+block_size] for i in range(0, len(padded_text), block_size)]
+        if cipher_type in BLOCK_CIPHERS:
+            padded_bytes = block_modes.pkcs7_pad(plaintext.encode('utf-8'), block_size)
+            original_blocks = [
+                padded_bytes[i:i+block_size].decode('utf-8', errors='replace')
+                for i in range(0, len(padded_bytes), block_size)
+            ]
+        else:
+            padded_text = self.pad_text(plaintext, block_size)
+            original_blocks = [padded_text[i:i+block_size] for i in range(0, len(padded_text), block_size)]
         
         # Создаем таблицу для отображения
         process_data = []
@@ -494,58 +542,70 @@ class ECBModeModule(CryptoModule):
             - Используйте режим аутентифицированного шифрования (GCM)
             """)
     
-    def encrypt_image_ecb(self, image: Image.Image, block_size: int, strength: int):
-        """Шифрует изображение в режиме ECB"""
-        st.markdown("### 🖼️ Результат ECB шифрования изображения")
+    def encrypt_image_bytes(self, pixels: np.ndarray, cipher: BlockCipher, mode: str,
+                            iv: Optional[bytes] = None) -> np.ndarray:
+        """Шифрует байты изображения одним пакетным вызовом, форма массива сохраняется"""
+        flat = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1)
+        size = cipher.block_size
+        
+        # Дополняем нулями до целого числа блоков (хвост потом отбрасывается)
+        buffer = np.zeros(-(-flat.size // size) * size, dtype=np.uint8)
+        buffer[:flat.size] = flat
+        
+        if mode == "ECB":
+            encrypted = cipher.encrypt_blocks(buffer)
+        else:
+            encrypted = block_modes.encrypt(cipher, mode, buffer, iv, padding=False)
         
-        # Конвертируем в RGB если нужно
+        return np.frombuffer(encrypted, dtype=np.uint8)[:flat.size].reshape(pixels.shape)
+    
+    def encrypt_image_modes(self, image: Image.Image, cipher_name: str, modes: List[str]) -> dict:
+        """Шифрует изображение в нескольких режимах одним ключом; возвращает изображения и время"""
         if image.mode != 'RGB':
             image = image.convert('RGB')
+        pixels = np.asarray(image)
+        
+        cipher_cls = BLOCK_CIPHERS[cipher_name]
+        cipher = cipher_cls(secrets.token_bytes(cipher_cls.key_size))
+        iv = secrets.token_bytes(cipher.block_size)
+        
+        results = {}
+        for mode in modes:
+            start_time = time.perf_counter()
+            encrypted = self.encrypt_image_bytes(pixels, cipher, mode, iv)
+            elapsed = time.perf_counter() - start_time
+            results[mode] = (Image.fromarray(encrypted, 'RGB'), elapsed)
+        return results
+    
+    def encrypt_image_ecb(self, image: Image.Image, cipher_name: str, compare_modes: bool = True):
+        """Шифрует изображение в режиме ECB настоящим блочным шифром"""
+        st.markdown("### 🖼️ Результат ECB шифрования изображения")
         
-        # Создаем копию для шифрования
-        encrypted_image = image.copy()
-        pixels = encrypted_image.load()
-        
-        width, height = image.size
-        
-        # Шифруем по блокам
-        blocks_processed = 0
-        
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        for y in range(0, height, block_size):
-            for x in range(0, width, block_size):
-                # Обрабатываем блок
-                for i in range(min(block_size, height - y)):
-                    for j in range(min(block_size, width - x)):
-                        # Простое "шифрование" - инвертируем цвета
-                        r, g, b = pixels[x + j, y + i]
-                        pixels[x + j, y + i] = (
-                            (r + strength * 25) % 256,
-                            (g + strength * 17) % 256, 
-                            (b + strength * 31) % 256
-                        )
-                
-                blocks_processed += 1
-                progress = blocks_processed / ((width // block_size + 1) * (height // block_size + 1))
-                progress_bar.progress(progress)
-        
-        status_text.text("✅ Шифрование завершено")
-        
-        # Показываем результаты
-        col1, col2 = st.columns(2)
+        modes = ["ECB", "CBC", "CTR"] if compare_modes else ["ECB"]
+        results = self.encrypt_image_modes(image, cipher_name, modes)
         
-        with col1:
+        columns = st.columns(len(modes) + 1)
+        with columns[0]:
             st.image(image, caption="Оригинальное изображение", use_column_width=True)
+        for column, mode in zip(columns[1:], modes):
+            encrypted_image, elapsed = results[mode]
+            with column:
+                st.image(encrypted_image, caption=f"{cipher_name}-{mode} ({elapsed * 1000:.0f} мс)", use_column_width=True)
         
-        with col2:
-            st.image(encrypted_image, caption="Зашифрованное в ECB", use_column_width=True)
+        width, height = image.size
+        size_mb = width * height * 3 / (1024 * 1024)
+        ecb_time = results["ECB"][1]
+        st.caption(
+            f"{width}×{height} пикселей, {size_mb:.2f} МБ данных, "
+            f"ECB: {size_mb / max(ecb_time, 1e-9):.1f} МБ/с"
+        )
         
         st.warning("""
         **Наблюдение:** Несмотря на шифрование, структура изображения остается видимой!
         Это демонстрирует главную уязвимость режима ECB - отсутствие диффузии.
         """)
+        if compare_modes:
+            st.info("В режимах CBC и CTR одинаковые блоки пикселей дают разный шифротекст - изображение превращается в шум.")
     
     def demo_ecb_vulnerabilities(self, image: Image.Image):
         """Демонстрирует уязвимости ECB на изображениях"""
@@ -553,41 +613,23 @@ class ECBModeModule(CryptoModule):
         
         # Создаем простое изображение с повторяющимися паттернами
         pattern_size = 50
-        demo_image = Image.new('RGB', (200, 200), color='white')
-        pixels = demo_image.load()
-        
-        # Создаем шахматный паттерн
-        for y in range(200):
-            for x in range(200):
-                if (x // pattern_size + y // pattern_size) % 2 == 0:
-                    pixels[x, y] = (0, 0, 0)  # Черный
-                else:
-                    pixels[x, y] = (255, 255, 255)  # Белый
-        
-        # "Шифруем" в ECB
-        encrypted_demo = demo_image.copy()
-        enc_pixels = encrypted_demo.load()
-        block_size = 10
-        
-        for y in range(0, 200, block_size):
-            for x in range(0, 200, block_size):
-                # Применяем простое преобразование к каждому блоку
-                for i in range(min(block_size, 200 - y)):
-                    for j in range(min(block_size, 200 - x)):
-                        r, g, b = enc_pixels[x + j, y + i]
-                        enc_pixels[x + j, y + i] = (
-                            (r + 128) % 256,
-                            (g + 64) % 256,
-                            (b + 192) % 256
-                        )
+        y, x = np.mgrid[0:200, 0:200]
+        checkerboard = ((x // pattern_size + y // pattern_size) % 2).astype(np.uint8) * 255
+        demo_image = Image.fromarray(np.repeat(checkerboard[:, :, None], 3, axis=2), 'RGB')
         
-        col1, col2 = st.columns(2)
+        # Шифруем в ECB и CBC настоящим AES
+        results = self.encrypt_image_modes(demo_image, "AES-128", ["ECB", "CBC"])
+        
+        col1, col2, col3 = st.columns(3)
         
         with col1:
             st.image(demo_image, caption="Оригинал с паттернами", use_column_width=True)
         
         with col2:
-            st.image(encrypted_demo, caption="'Зашифрованный' ECB", use_column_width=True)
+            st.image(results["ECB"][0], caption="AES-128-ECB", use_column_width=True)
+        
+        with col3:
+            st.image(results["CBC"][0], caption="AES-128-CBC", use_column_width=True)
         
         st.error("""
         **Критическая уязвимость:** Паттерны оригинала полностью сохраняются в зашифрованном изображении!
@@ -666,51 +708,36 @@ class ECBModeModule(CryptoModule):
         # Шифруем текст
         encrypted_blocks, ciphertext = self.ecb_encrypt_text(text, key, block_size, "XOR (демонстрационный)")
         
-        # Анализируем частоты
-        original_blocks = [text[i:i+block_size] for i in range(0, len(self.pad_text(text, block_size)), block_size)]
-        
-        # Создаем тепловую карту схожести
-        similarity_matrix = np.zeros((len(original_blocks), len(original_blocks)))
-        
-        for i in range(len(original_blocks)):
-            for j in range(len(original_blocks)):
-                if original_blocks[i] == original_blocks[j]:
-                    similarity_matrix[i][j] = 1
-                elif encrypted_blocks[i] == encrypted_blocks[j]:
-                    similarity_matrix[i][j] = 0.5
-                else:
-                    similarity_matrix[i][j] = 0
+        # Индексируем блоки открытого текста и шифротекста
+        # (UTF-32 сохраняет границы блоков: каждый символ занимает 4 байта)
+        padded = self.pad_text(text, block_size)
+        original_index = index_blocks(padded.encode('utf-32-le'), block_size * 4)
+        encrypted_index = index_blocks(''.join(encrypted_blocks).encode('utf-32-le'), block_size * 4)
         
         # Визуализация
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
-        
-        # Тепловая карта оригинальных блоков
-        im1 = ax1.imshow(similarity_matrix, cmap='RdYlBu_r', interpolation='nearest')
-        ax1.set_title('Схожесть оригинальных блоков')
-        ax1.set_xlabel('Номер блока')
-        ax1.set_ylabel('Номер блока')
-        plt.colorbar(im1, ax=ax1)
-        
-        # График уникальности блоков
-        unique_blocks_orig = len(set(original_blocks))
-        unique_blocks_enc = len(set(encrypted_blocks))
+        fig, ax = plt.subplots(figsize=(6, 4))
         
         categories = ['Оригинальные блоки', 'Шифрованные блоки']
-        values = [unique_blocks_orig, unique_blocks_enc]
+        values = [original_index.unique_blocks, encrypted_index.unique_blocks]
         colors = ['blue', 'red']
         
-        bars = ax2.bar(categories, values, color=colors, alpha=0.7)
-        ax2.set_title('Уникальность блоков')
-        ax2.set_ylabel('Количество уникальных блоков')
+        bars = ax.bar(categories, values, color=colors, alpha=0.7)
+        ax.set_title('Уникальность блоков')
+        ax.set_ylabel('Количество уникальных блоков')
         
         # Добавляем значения на столбцы
         for bar, value in zip(bars, values):
-            ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, 
                     f'{value}', ha='center', va='bottom')
         
         st.pyplot(fig)
+        plt.close(fig)
+        
+        self.show_duplicate_blocks(encrypted_index, key_prefix="pattern_text")
         
         # Выводы
+        unique_blocks_orig = original_index.unique_blocks
+        unique_blocks_enc = encrypted_index.unique_blocks
         if unique_blocks_orig == unique_blocks_enc:
             st.error("""
             🚨 **Критическая уязвимость:** Количество уникальных блоков не изменилось!
@@ -726,6 +753,71 @@ class ECBModeModule(CryptoModule):
             ✅ **Хороший признак:** Увеличение уникальности блоков.
             Однако в ECB это не защищает от анализа шаблонов одинаковых блоков.
             """)
+    
+    def show_duplicate_blocks(self, index: DuplicateBlockIndex, key_prefix: str = "pattern_file",
+                              max_rows: int = 20, max_window: int = 64):
+        """Показывает повторяющиеся блоки, сжатые серии и карту совпадений для окна"""
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Всего блоков", f"{index.total_blocks:,}")
+        with col2:
+            st.metric("Уникальных", f"{index.unique_blocks:,}")
+        with col3:
+            st.metric("Повторов", f"{index.repeated_blocks:,}")
+        with col4:
+            st.metric("Доля повторов", f"{index.repeat_ratio:.2%}")
+        
+        if not index.total_blocks:
+            return
+        
+        if index.repeated_blocks:
+            st.error("🚨 Найдены повторяющиеся блоки - характерный признак режима ECB")
+        else:
+            st.success("✅ Повторяющихся блоков нет")
+        
+        # Самые частые блоки
+        top = index.top_groups(max_rows)
+        if len(top):
+            st.markdown("**Самые частые блоки:**")
+            st.dataframe(pd.DataFrame({
+                'Группа': top,
+                'Блок (hex)': [index.blocks[group].hex() for group in top],
+                'Повторов': index.counts[top],
+                'Первая позиция': index.first[top],
+                'Последняя позиция': index.last[top],
+            }), use_container_width=True)
+        
+        # Сжатое представление: подряд идущие одинаковые блоки сворачиваются
+        runs = index.runs()
+        st.markdown(f"**Сжатое представление** ({len(runs):,} серий):")
+        shown = ' '.join(
+            f"#{group}×{length}" if length > 1 else f"#{group}"
+            for group, _, length in runs[:200]
+        )
+        st.code(shown + (' …' if len(runs) > 200 else ''))
+        
+        # Карта совпадений только для окна блоков
+        window = min(max_window, index.total_blocks)
+        start = 0
+        if index.total_blocks > window:
+            start = st.slider(
+                "Начало окна (номер блока):",
+                min_value=0,
+                max_value=index.total_blocks - window,
+                value=min(int(index.first[top[0]]), index.total_blocks - window) if len(top) else 0,
+                key=f"{key_prefix}_window_start"
+            )
+        
+        fig, ax = plt.subplots(figsize=(6, 5))
+        extent = (start - 0.5, start + window - 0.5, start + window - 0.5, start - 0.5)
+        im = ax.imshow(index.window_matrix(start, window), cmap='RdYlBu_r',
+                       interpolation='nearest', extent=extent)
+        ax.set_title(f'Совпадения блоков шифротекста ({start}–{start + window - 1})')
+        ax.set_xlabel('Номер блока')
+        ax.set_ylabel('Номер блока')
+        plt.colorbar(im, ax=ax)
+        st.pyplot(fig)
+        plt.close(fig)
 
 # Для обратной совместимости
 class ECBMode(ECBModeModule):
@@ -7,6 +7,7 @@ import binascii
 import zlib
 import secrets
 from typing import Dict, List, Tuple
+from modules.hash_functions.hashing import streaming
 
 class EncodingModule(CryptoModule):
     def __init__(self):
@@ -470,8 +471,9 @@ class EncodingModule(CryptoModule):
             if uploaded_file is not None:
                 if st.button("Вычислить CRC32 файла", key="crc32_file_btn", use_container_width=True):
                     try:
-                        file_contents = uploaded_file.getvalue()
-                        crc32_value = zlib.crc32(file_contents) & 0xffffffff
+                        # Порциями по буферу загрузки, без копии всего файла
+                        result = streaming.hash_stream(uploaded_file, ("CRC32",))
+                        crc32_value = int(result.digests["CRC32"], 16)
                         
                         st.success(f"CRC32 для файла '{uploaded_file.name}':")
                         
@@ -481,7 +483,7 @@ class EncodingModule(CryptoModule):
                         with col_dec:
                             st.metric("Десятичный", crc32_value)
                         with col_size:
-                            st.metric("Размер файла", f"{len(file_contents)} байт")
+                            st.metric("Размер файла", f"{result.size} байт")
                         
                     except Exception as e:
                         st.error(f"Ошибка вычисления: {e}")
@@ -8,6 +8,8 @@ import numpy as np
 import binascii
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms
 from cryptography.hazmat.backends import default_backend
+from modules.modern_crypto.block_modes.ciphers import FunctionBlockCipher
+from modules.modern_crypto.block_modes import modes as block_modes
 
 class GOST28147Module(CryptoModule):
     def __init__(self):
@@ -587,121 +589,49 @@ class GOST28147Module(CryptoModule):
         # Финальная перестановка
         return struct.pack('<II', right, left)
 
-    # Режимы работы
+    # Режимы работы (общая реализация из block_modes)
+
+    def make_block_cipher(self, key: bytes) -> FunctionBlockCipher:
+        """Оборачивает раундовую функцию ГОСТ в интерфейс блочного шифра"""
+        key_hex = key.hex()
+        return FunctionBlockCipher(
+            8,
+            lambda block: self.encrypt_block(block, key_hex),
+            lambda block: self.decrypt_block(block, key_hex),
+            name="ГОСТ 28147-89"
+        )
 
     def ecb_encrypt(self, data: bytes, key: bytes) -> bytes:
         """Режим ECB"""
-        result = b''
-        key_hex = key.hex()
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            encrypted_block = self.encrypt_block(block, key_hex)
-            result += encrypted_block
-        
-        return result
+        return block_modes.encrypt(self.make_block_cipher(key), "ECB", data, padding=False)
 
     def ecb_decrypt(self, data: bytes, key: bytes) -> bytes:
         """Режим ECB (дешифрование)"""
-        result = b''
-        key_hex = key.hex()
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            decrypted_block = self.decrypt_block(block, key_hex)
-            result += decrypted_block
-        
-        return result
+        return block_modes.decrypt(self.make_block_cipher(key), "ECB", data, padding=False)
 
     def cbc_encrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим CBC"""
-        result = b''
-        key_hex = key.hex()
-        prev_block = iv
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            # XOR с предыдущим блоком
-            block = bytes(a ^ b for a, b in zip(block, prev_block))
-            encrypted_block = self.encrypt_block(block, key_hex)
-            result += encrypted_block
-            prev_block = encrypted_block
-        
-        return result
+        return block_modes.encrypt(self.make_block_cipher(key), "CBC", data, iv, padding=False)
 
     def cbc_decrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим CBC (дешифрование)"""
-        result = b''
-        key_hex = key.hex()
-        prev_block = iv
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            decrypted_block = self.decrypt_block(block, key_hex)
-            # XOR с предыдущим блоком
-            decrypted_block = bytes(a ^ b for a, b in zip(decrypted_block, prev_block))
-            result += decrypted_block
-            prev_block = block
-        
-        return result
+        return block_modes.decrypt(self.make_block_cipher(key), "CBC", data, iv, padding=False)
 
     def cfb_encrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим CFB"""
-        result = b''
-        key_hex = key.hex()
-        shift_register = iv
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            # Шифруем регистр сдвига
-            encrypted_register = self.encrypt_block(shift_register, key_hex)
-            # XOR с открытым текстом
-            cipher_block = bytes(a ^ b for a, b in zip(block, encrypted_register))
-            result += cipher_block
-            # Обновляем регистр сдвига
-            shift_register = cipher_block
-        
-        return result
+        return block_modes.encrypt(self.make_block_cipher(key), "CFB", data, iv)
 
     def cfb_decrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим CFB (дешифрование)"""
-        result = b''
-        key_hex = key.hex()
-        shift_register = iv
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            # Шифруем регистр сдвига
-            encrypted_register = self.encrypt_block(shift_register, key_hex)
-            # XOR с шифротекстом
-            plain_block = bytes(a ^ b for a, b in zip(block, encrypted_register))
-            result += plain_block
-            # Обновляем регистр сдвига
-            shift_register = block
-        
-        return result
+        return block_modes.decrypt(self.make_block_cipher(key), "CFB", data, iv)
 
     def ofb_encrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим OFB"""
-        result = b''
-        key_hex = key.hex()
-        shift_register = iv
-        
-        for i in range(0, len(data), 8):
-            block = data[i:i+8]
-            # Шифруем регистр сдвига
-            encrypted_register = self.encrypt_block(shift_register, key_hex)
-            # XOR с открытым текстом
-            cipher_block = bytes(a ^ b for a, b in zip(block, encrypted_register))
-            result += cipher_block
-            # Обновляем регистр сдвига
-            shift_register = encrypted_register
-        
-        return result
+        return block_modes.encrypt(self.make_block_cipher(key), "OFB", data, iv)
 
     def ofb_decrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
         """Режим OFB (дешифрование) - идентичен шифрованию"""
-        return self.ofb_encrypt(data, key, iv)
+        return block_modes.decrypt(self.make_block_cipher(key), "OFB", data, iv)
 
     def show_encryption_details(self, plaintext: str, key: str, ciphertext: str, mode: str):
         """Показывает детали шифрования"""
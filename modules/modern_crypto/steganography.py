@@ -1,4 +1,3 @@
-import random
 from modules.base_module import CryptoModule
 import streamlit as st
 import secrets
@@ -11,11 +10,17 @@ from typing import List, Tuple, Dict, Optional
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.subplots import make_subplots
 from dataclasses import dataclass
 import wave
 import struct
 import math
+import os
+import tempfile
+import time
 from cryptography.fernet import Fernet
+from modules.modern_crypto.stego import audio, batch, dct, lsb, steganalysis
+from modules.modern_crypto.stego import text as text_stego
 
 @dataclass
 class SteganographyMethod:
@@ -201,18 +206,35 @@ class SteganographyModule(CryptoModule):
                     on_change=update_image_method
                 )
                 
-                if st.button("🕵️ Скрыть сообщение", key="hide_image"):
+                if method == "LSB":
+                    bits_per_channel, channels = self.render_lsb_options(image, "hide")
+                    capacity = self.lsb_capacity(image, bits_per_channel, channels) if channels else 0
+                else:
+                    channels = None
+                    quality, coefficients = self.render_dct_options("hide")
+                    capacity = dct.capacity(image.size[::-1], coefficients)
+                
+                message_size = len(secret_message.encode('utf-8'))
+                st.caption(
+                    f"Емкость: {capacity:,} байт, сообщение: {message_size:,} байт "
+                    f"({message_size / max(capacity, 1):.2%})"
+                )
+                
+                if st.button("🕵️ Скрыть сообщение", key="hide_image", disabled=channels == []):
                     if method == "LSB":
                         try:
-                            stego_image = self.lsb_encode(image, secret_message)
+                            stego_image = self.lsb_encode(image, secret_message, bits_per_channel, channels)
                             st.session_state.stego_image = stego_image
                             st.success("✅ Сообщение скрыто в изображении методом LSB!")
                         except ValueError as e:
                             st.error(f"❌ Ошибка: {e}")
                     else:
-                        stego_image = self.dct_encode(image, secret_message)
-                        st.session_state.stego_image = stego_image
-                        st.success("✅ Сообщение скрыто в изображении методом DCT!")
+                        try:
+                            stego_image = self.dct_encode(image, secret_message, quality, coefficients)
+                            st.session_state.stego_image = stego_image
+                            st.success("✅ Сообщение скрыто в изображении методом DCT!")
+                        except ValueError as e:
+                            st.error(f"❌ Ошибка: {e}")
             
             # Извлечение сообщения
             st.subheader("📥 Извлечение сообщения")
@@ -234,11 +256,19 @@ class SteganographyModule(CryptoModule):
                     key="extract_method_select"
                 )
                 
-                if st.button("🔍 Извлечь сообщение", key="extract_image"):
+                extract_channels = None
+                if extract_method == "LSB":
+                    extract_bits, extract_channels = self.render_lsb_options(stego_img, "extract")
+                    if stego_img.format == 'JPEG':
+                        st.warning("⚠️ JPEG сжимает с потерями и разрушает LSB - используйте PNG")
+                else:
+                    extract_quality, extract_coefficients = self.render_dct_options("extract")
+                
+                if st.button("🔍 Извлечь сообщение", key="extract_image", disabled=extract_channels == []):
                     if extract_method == "LSB":
-                        message = self.lsb_decode(stego_img)
+                        message = self.lsb_decode(stego_img, extract_bits, extract_channels)
                     else:
-                        message = self.dct_decode(stego_img)
+                        message = self.dct_decode(stego_img, extract_quality, extract_coefficients)
                     
                     if message:
                         st.success(f"✅ Извлеченное сообщение: {message}")
@@ -251,12 +281,22 @@ class SteganographyModule(CryptoModule):
             if st.session_state.stego_image is not None:
                 st.image(st.session_state.stego_image, caption="Стего-изображение", use_column_width=True)
                 
+                stego_buffer = io.BytesIO()
+                st.session_state.stego_image.save(stego_buffer, format='PNG')
+                st.download_button(
+                    "💾 Скачать стего-изображение (PNG)",
+                    stego_buffer.getvalue(),
+                    file_name="stego.png",
+                    mime="image/png",
+                    key="download_stego_image"
+                )
+                
                 # Сравнение гистограмм
                 if uploaded_file and st.session_state.stego_image is not None:
                     st.subheader("📊 Сравнение гистограмм")
                     
                     # Конвертация изображений в numpy массивы
-                    original_arr = np.array(image)
+                    original_arr = np.array(self.prepare_image(image))
                     stego_arr = np.array(st.session_state.stego_image)
                     
                     # Создание гистограмм
@@ -311,27 +351,71 @@ class SteganographyModule(CryptoModule):
                 st.session_state.audio_data = audio_data
                 st.audio(audio_data, format='audio/wav')
             
+            carrier_file = st.file_uploader(
+                "Или загрузите WAV (PCM):",
+                type=['wav'],
+                key="audio_carrier_upload"
+            )
+            if carrier_file is not None and st.session_state.get('audio_carrier_name') != carrier_file.name:
+                st.session_state.audio_data = carrier_file.getvalue()
+                st.session_state.audio_carrier_name = carrier_file.name
+            
             if 'audio_data' in st.session_state:
+                try:
+                    info = audio.parse_wav(st.session_state.audio_data)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    return
+                
+                st.caption(
+                    f"{info.channels} кан., {info.sample_rate} Гц, {info.sample_width * 8} бит, "
+                    f"{info.duration:.1f} с"
+                )
+                
                 secret_audio_msg = st.text_input(
                     "Сообщение для скрытия в аудио:",
                     "Секретное аудио сообщение",
                     key="audio_msg"
                 )
+                audio_bits = st.slider("Бит на сэмпл:", 1, 4, 1, key="audio_bits")
+                capacity = audio.capacity(info, audio_bits)
+                st.caption(f"Емкость: {capacity:,} байт")
                 
                 if st.button("🔊 Скрыть в аудио", key="hide_audio"):
-                    stego_audio = self.lsb_audio_encode(st.session_state.audio_data, secret_audio_msg)
-                    st.session_state.stego_audio = stego_audio
-                    st.audio(stego_audio, format='audio/wav')
-                    st.success("✅ Сообщение скрыто в аудио!")
+                    try:
+                        stego_audio = self.lsb_audio_encode(st.session_state.audio_data, secret_audio_msg, audio_bits)
+                        st.session_state.stego_audio = stego_audio
+                        st.audio(stego_audio, format='audio/wav')
+                        st.success("✅ Сообщение скрыто в аудио!")
+                    except ValueError as e:
+                        st.error(f"❌ Ошибка: {e}")
         
         with col2:
             st.subheader("📥 Извлечение из аудио")
             
+            stego_file = st.file_uploader(
+                "Стего-аудио WAV:",
+                type=['wav'],
+                key="audio_stego_upload"
+            )
+            if stego_file is not None and st.session_state.get('audio_stego_name') != stego_file.name:
+                st.session_state.stego_audio = stego_file.getvalue()
+                st.session_state.audio_stego_name = stego_file.name
+            
             if 'stego_audio' in st.session_state:
                 st.audio(st.session_state.stego_audio, format='audio/wav')
+                st.download_button(
+                    "💾 Скачать стего-аудио",
+                    st.session_state.stego_audio,
+                    file_name="stego.wav",
+                    mime="audio/wav",
+                    key="download_stego_audio"
+                )
+                
+                extract_bits = st.slider("Бит на сэмпл:", 1, 4, 1, key="audio_extract_bits")
                 
                 if st.button("🎧 Извлечь сообщение", key="extract_audio"):
-                    message = self.lsb_audio_decode(st.session_state.stego_audio)
+                    message = self.lsb_audio_decode(st.session_state.stego_audio, extract_bits)
                     if message:
                         st.success(f"✅ Извлеченное сообщение: {message}")
                     else:
@@ -388,7 +472,23 @@ class SteganographyModule(CryptoModule):
             cover_text = st.text_area(
                 "Текст-носитель:",
                 "Это обычный текст, который будет использоваться для скрытия секретного сообщения. "
-                "Он должен быть достаточно длинным и содержать разнообразные слова и предложения.",
+                "Он должен быть достаточно длинным и содержать разнообразные слова и предложения.\n"
+                "Метод пробелов кодирует один бит в каждом промежутке между словами: одинарный пробел "
+                "означает ноль, а двойной пробел означает единицу. Перед сообщением записывается "
+                "заголовок из шести байт с сигнатурой и длиной, поэтому даже короткому секрету "
+                "нужно несколько сотен слов. Невидимые символы Unicode не занимают места на экране "
+                "и вставляются после каждого символа текста, так что их емкость почти не ограничена. "
+                "Оба метода легко разрушаются при копировании через редакторы, которые нормализуют "
+                "пробелы или удаляют символы нулевой ширины, и легко обнаруживаются простым "
+                "подсчетом таких символов. Зато они хорошо показывают главную идею стеганографии: "
+                "носитель выглядит как обычный документ, и сам факт передачи остается скрытым. "
+                "Длинные документы обрабатываются построчно, поэтому сообщение можно спрятать и "
+                "в файле размером в десятки мегабайт без загрузки его целиком в память. "
+                "Для извлечения достаточно прочитать строки до конца сообщения, длина которого "
+                "записана в заголовке, а остальная часть документа не читается вовсе. "
+                "Попробуйте изменить текст или сообщение и сравнить, сколько промежутков и "
+                "невидимых символов потребуется в каждом случае для одного и того же секрета. "
+                "Если текста не хватает, увеличьте его или выберите метод невидимых символов.",
                 height=150,
                 key="cover_text"
             )
@@ -399,16 +499,26 @@ class SteganographyModule(CryptoModule):
                 key="secret_text"
             )
             
+            if text_method == "Пробелы и табуляции":
+                capacity = text_stego.whitespace_capacity(cover_text.splitlines())
+                st.caption(f"Емкость текста: {capacity} байт (по биту на промежуток между словами)")
+            
             if st.button("📄 Скрыть в тексте", key="hide_text"):
-                if text_method == "Пробелы и табуляции":
-                    stego_text = self.whitespace_encode(cover_text, secret_text)
-                elif text_method == "Невидимые символы":
-                    stego_text = self.invisible_chars_encode(cover_text, secret_text)
+                try:
+                    if text_method == "Пробелы и табуляции":
+                        stego_text = self.whitespace_encode(cover_text, secret_text)
+                    elif text_method == "Невидимые символы":
+                        stego_text = self.invisible_chars_encode(cover_text, secret_text)
+                    else:
+                        stego_text = self.syntactic_encode(cover_text, secret_text)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
                 else:
-                    stego_text = self.syntactic_encode(cover_text, secret_text)
-                
-                st.session_state.stego_text = stego_text
-                st.success("✅ Сообщение скрыто в тексте!")
+                    st.session_state.stego_text = stego_text
+                    st.success("✅ Сообщение скрыто в тексте!")
+            
+            if text_method != "Синтаксические изменения":
+                self.render_text_document_encoding(text_method, secret_text)
         
         with col2:
             st.subheader("🔍 Анализ и извлечение")
@@ -459,6 +569,8 @@ class SteganographyModule(CryptoModule):
                     else:
                         st.error("❌ Не удалось извлечь сообщение")
             
+            self.render_text_document_decoding()
+            
             # Статистический анализ
             st.subheader("📊 Статистический анализ")
             
@@ -470,6 +582,51 @@ class SteganographyModule(CryptoModule):
                 st.write(f"- Подозрительные паттерны: {analysis['suspicious_patterns']}")
                 st.write(f"- Вероятность стеганографии: {analysis['stego_probability']}%")
     
+    def render_text_document_encoding(self, text_method: str, secret_text: str):
+        """Скрытие сообщения в загруженном документе (построчная обработка)"""
+        with st.expander("📁 Длинный документ (.txt)"):
+            document = st.file_uploader("Документ-носитель (UTF-8):", type=['txt'], key="text_cover_file")
+            if document is not None and st.button("📄 Скрыть в документе", key="hide_text_file"):
+                encode = (text_stego.whitespace_encode if text_method == "Пробелы и табуляции"
+                          else text_stego.zero_width_encode)
+                lines = io.TextIOWrapper(document, encoding='utf-8', newline='')
+                result = io.BytesIO()
+                try:
+                    for line in encode(lines, secret_text.encode('utf-8')):
+                        result.write(line.encode('utf-8'))
+                except (ValueError, UnicodeDecodeError) as e:
+                    st.error(f"❌ {e}")
+                else:
+                    st.download_button(
+                        "📥 Скачать документ",
+                        result.getvalue(),
+                        file_name="stego_" + document.name,
+                        mime="text/plain",
+                        key="download_stego_text"
+                    )
+                finally:
+                    lines.detach()
+
+    def render_text_document_decoding(self):
+        """Извлечение сообщения из загруженного документа"""
+        with st.expander("📁 Извлечь из документа (.txt)"):
+            document = st.file_uploader("Документ (UTF-8):", type=['txt'], key="text_stego_file")
+            if document is not None and st.button("🔍 Извлечь из документа", key="extract_text_file"):
+                for name, decode in (("невидимые символы", text_stego.zero_width_decode),
+                                     ("пробелы", text_stego.whitespace_decode)):
+                    document.seek(0)
+                    lines = io.TextIOWrapper(document, encoding='utf-8', newline='')
+                    try:
+                        payload = decode(lines)
+                    except (ValueError, UnicodeDecodeError):
+                        continue
+                    finally:
+                        lines.detach()
+                    st.success(f"✅ Извлеченное сообщение ({name}): {payload.decode('utf-8', errors='replace')}")
+                    break
+                else:
+                    st.error("❌ Не удалось извлечь сообщение")
+
     def render_steganalysis(self):
         """Обнаружение стеганографии"""
         st.header("🔍 Стеганоанализ")
@@ -494,8 +651,15 @@ class SteganographyModule(CryptoModule):
                 image = Image.open(analysis_file)
                 st.image(image, caption="Анализируемое изображение", use_column_width=True)
                 
+                window = st.select_slider(
+                    "Размер окна тепловых карт (пикселей):",
+                    options=[32, 64, 128, 256],
+                    value=64,
+                    key="analysis_window"
+                )
+                
                 if st.button("🔬 Проанализировать изображение", key="analyze_image"):
-                    analysis_results = self.analyze_image_steganography(image)
+                    analysis_results = self.analyze_image_steganography(image, window)
                     
                     st.subheader("📊 Результаты анализа")
                     
@@ -520,40 +684,56 @@ class SteganographyModule(CryptoModule):
                     st.write("**Обнаруженные артефакты:**")
                     for artifact in analysis_results['artifacts']:
                         st.write(f"- {artifact}")
+                    
+                    self.render_steganalysis_report(analysis_results['report'], "analysis_image")
         
         with col2:
             st.subheader("🎵 Анализ аудио")
             
             audio_file = st.file_uploader(
                 "Загрузите аудио файл для анализа:",
-                type=['wav', 'mp3'],
+                type=['wav'],
                 key="audio_analysis_upload"
             )
             
             if audio_file is not None:
-                st.audio(audio_file, format='audio/wav')
+                audio_bytes = audio_file.getvalue()
+                st.audio(audio_bytes, format='audio/wav')
                 
                 if st.button("🔊 Проанализировать аудио", key="analyze_audio"):
-                    analysis_results = self.analyze_audio_steganography(audio_file)
+                    try:
+                        analysis_results = self.analyze_audio_steganography(audio_bytes)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        analysis_results = None
                     
-                    st.subheader("📊 Результаты анализа аудио")
-                    
-                    fig = go.Figure(go.Indicator(
-                        mode = "gauge+number",
-                        value = analysis_results['confidence'] * 100,
-                        domain = {'x': [0, 1], 'y': [0, 1]},
-                        title = {'text': "Вероятность стеганографии"},
-                        gauge = {
-                            'axis': {'range': [None, 100]},
-                            'bar': {'color': "darkblue"},
-                            'steps': [
-                                {'range': [0, 40], 'color': "green"},
-                                {'range': [40, 80], 'color': "yellow"},
-                                {'range': [80, 100], 'color': "red"}
-                            ],
-                        }
-                    ))
-                    st.plotly_chart(fig, use_container_width=True)
+                    if analysis_results is not None:
+                        st.subheader("📊 Результаты анализа аудио")
+                        
+                        fig = go.Figure(go.Indicator(
+                            mode = "gauge+number",
+                            value = analysis_results['confidence'] * 100,
+                            domain = {'x': [0, 1], 'y': [0, 1]},
+                            title = {'text': "Вероятность стеганографии"},
+                            gauge = {
+                                'axis': {'range': [None, 100]},
+                                'bar': {'color': "darkblue"},
+                                'steps': [
+                                    {'range': [0, 40], 'color': "green"},
+                                    {'range': [40, 80], 'color': "yellow"},
+                                    {'range': [80, 100], 'color': "red"}
+                                ],
+                            }
+                        ))
+                        st.plotly_chart(fig, use_container_width=True)
+                        
+                        for artifact in analysis_results['artifacts']:
+                            st.write(f"- {artifact}")
+                        st.caption(
+                            "RS и SPA рассчитаны на гладкие сигналы: у громкой записи соседние "
+                            "сэмплы отличаются сильнее младшего бита, и оценка занижается."
+                        )
+                        self.render_steganalysis_report(analysis_results['report'], "analysis_audio")
             
             st.subheader("📈 Методы обнаружения")
             
@@ -568,6 +748,74 @@ class SteganographyModule(CryptoModule):
             for method, description in detection_methods:
                 with st.expander(f"🔍 {method}"):
                     st.write(description)
+        
+        st.markdown("---")
+        self.render_batch_steganalysis()
+
+    def render_batch_steganalysis(self):
+        """Пакетный анализ zip-архива изображений"""
+        st.subheader("📦 Пакетный анализ")
+        st.markdown("""
+        Архив с изображениями анализируется LSB-детекторами (хи-квадрат, RS, SPA) и
+        детектором DCT в пуле процессов. Для сотен файлов удобнее запуск без интерфейса:
+        
+        `python -m modules.modern_crypto.stego.batch images.zip --csv report.csv --json report.json`
+        """)
+        
+        archive = st.file_uploader("Zip-архив с изображениями:", type=['zip'], key="batch_analysis_upload")
+        workers = st.slider(
+            "Процессов:",
+            min_value=1,
+            max_value=max(os.cpu_count() or 1, 8),
+            value=os.cpu_count() or 1,
+            key="batch_analysis_workers"
+        )
+        
+        if archive is not None and st.button("🔬 Проанализировать архив", key="batch_analyze"):
+            with tempfile.NamedTemporaryFile(suffix=".zip") as stored:
+                stored.write(archive.getvalue())
+                stored.flush()
+                try:
+                    tasks = batch.list_images(stored.name)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    return
+                
+                progress_bar = st.progress(0.0)
+                start = time.perf_counter()
+                results = []
+                for done, result in enumerate(batch.iter_scan(tasks, workers), start=1):
+                    results.append(result)
+                    progress_bar.progress(done / len(tasks), text=f"{done}/{len(tasks)}: {result.name}")
+                elapsed = time.perf_counter() - start
+            results = batch.rank(results)
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Изображений", len(results))
+            col2.metric("Подозрительных", sum(result.suspected for result in results))
+            col3.metric("Время", f"{elapsed:.1f} с")
+            
+            st.dataframe(pd.DataFrame([{
+                "Файл": result.name,
+                "Подозрительность": round(result.suspicion, 3),
+                "LSB доля": round(result.lsb_rate, 3),
+                "Хи-квадрат p": round(result.chi_square_p, 3),
+                "DCT": round(result.dct_score, 3),
+                "Заголовок DCT": result.dct_header,
+                "Время, с": round(result.seconds, 3),
+                "Ошибка": result.error,
+            } for result in results]), use_container_width=True)
+            
+            csv_report, json_report = io.StringIO(), io.StringIO()
+            batch.write_csv(results, csv_report)
+            batch.write_json(results, json_report, elapsed)
+            col_csv, col_json = st.columns(2)
+            with col_csv:
+                st.download_button("📥 Отчет CSV", csv_report.getvalue().encode('utf-8'),
+                                   file_name="steganalysis_report.csv", mime="text/csv", key="batch_csv")
+            with col_json:
+                st.download_button("📥 Отчет JSON", json_report.getvalue().encode('utf-8'),
+                                   file_name="steganalysis_report.json", mime="application/json", key="batch_json")
 
     def render_methods_comparison(self):
         """Сравнение методов стеганографии"""
@@ -644,62 +892,85 @@ class SteganographyModule(CryptoModule):
 
     # Методы стеганографии для изображений
 
-    def lsb_encode(self, image: Image.Image, message: str) -> Image.Image:
+    def prepare_image(self, image: Image.Image) -> Image.Image:
+        """Приводит изображение к режиму L, RGB или RGBA"""
+        if image.mode in ('L', 'RGB', 'RGBA'):
+            return image
+        return image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    def lsb_encode(self, image: Image.Image, message: str, bits_per_channel: int = 1,
+                   channels: Optional[List[int]] = None) -> Image.Image:
         """Кодирование сообщения методом LSB в изображении"""
-        # Конвертируем сообщение в бинарный формат
-        binary_msg = ''.join(format(ord(c), '08b') for c in message)
-        binary_msg += '00000000'  # Добавляем маркер конца сообщения
-        
-        img_array = np.array(image)
-        flat_array = img_array.flatten()
-        
-        # Проверяем достаточность емкости
-        if len(binary_msg) > len(flat_array):
-            raise ValueError("Сообщение слишком длинное для данного изображения")
-        
-        # Заменяем LSB биты
-        for i in range(len(binary_msg)):
-            flat_array[i] = (flat_array[i] & 0xFE) | int(binary_msg[i])
-        
-        # Восстанавливаем форму массива
-        encoded_array = flat_array.reshape(img_array.shape)
-        return Image.fromarray(encoded_array.astype(np.uint8))
+        image = self.prepare_image(image)
+        stego_array = lsb.embed(np.asarray(image), message.encode('utf-8'), bits_per_channel, channels)
+        return Image.fromarray(stego_array)
 
-    def lsb_decode(self, image: Image.Image) -> str:
+    def lsb_decode(self, image: Image.Image, bits_per_channel: int = 1,
+                   channels: Optional[List[int]] = None) -> str:
         """Декодирование LSB сообщения из изображения"""
-        img_array = np.array(image)
-        flat_array = img_array.flatten()
-        
-        # Извлекаем LSB биты
-        binary_msg = ''
-        for pixel in flat_array:
-            binary_msg += str(pixel & 1)
-        
-        # Преобразуем бинарную строку в текст
-        message = ''
-        for i in range(0, len(binary_msg), 8):
-            byte = binary_msg[i:i+8]
-            if byte == '00000000':  # Маркер конца сообщения
-                break
-            message += chr(int(byte, 2))
-        
-        return message
+        image = self.prepare_image(image)
+        try:
+            payload = lsb.extract(np.asarray(image), bits_per_channel, channels)
+        except ValueError:
+            return ""
+        return payload.decode('utf-8', errors='replace')
 
-    def dct_encode(self, image: Image.Image, message: str) -> Image.Image:
-        """Упрощенная демонстрация DCT стеганографии"""
-        # В реальной реализации здесь было бы DCT преобразование
-        # Для демонстрации используем упрощенный подход
-        img_array = np.array(image)
-        
-        # Немного изменяем изображение для демонстрации
-        modified_array = img_array.astype(float)
-        modified_array[::10, ::10, 0] += 1  # Легкие изменения в красном канале
-        
-        return Image.fromarray(np.clip(modified_array, 0, 255).astype(np.uint8))
+    def lsb_capacity(self, image: Image.Image, bits_per_channel: int = 1,
+                     channels: Optional[List[int]] = None) -> int:
+        """Емкость изображения в байтах для выбранных параметров LSB"""
+        return lsb.capacity(np.asarray(self.prepare_image(image)), bits_per_channel, channels)
+
+    def render_lsb_options(self, image: Optional[Image.Image], key_prefix: str) -> Tuple[int, List[int]]:
+        """Параметры LSB: бит на канал и каналы (пустой список, если ни один не выбран)"""
+        bands = self.prepare_image(image).getbands() if image is not None else ('R', 'G', 'B')
+        col_bits, col_channels = st.columns(2)
+        with col_bits:
+            bits_per_channel = st.slider("Бит на канал:", 1, 4, 1, key=f"{key_prefix}_lsb_bits")
+        with col_channels:
+            selected = st.multiselect(
+                "Каналы:",
+                list(bands),
+                default=[band for band in bands if band != 'A'],
+                key=f"{key_prefix}_lsb_channels_{''.join(bands)}"
+            )
+        channels = [bands.index(band) for band in selected]
+        if not channels:
+            st.warning("⚠️ Выберите хотя бы один канал")
+        return bits_per_channel, channels
+
+    def dct_encode(self, image: Image.Image, message: str, quality: int = 50,
+                   coefficients: int = 2) -> Image.Image:
+        """Кодирование сообщения в коэффициентах DCT блоков 8x8 яркости"""
+        image = self.prepare_image(image)
+        stego_array = dct.embed(np.asarray(image), message.encode('utf-8'), quality, coefficients)
+        return Image.fromarray(stego_array)
+
+    def dct_decode(self, image: Image.Image, quality: int = 50, coefficients: int = 2) -> str:
+        """Извлечение сообщения из коэффициентов DCT"""
+        image = self.prepare_image(image)
+        try:
+            payload = dct.extract(np.asarray(image), quality, coefficients)
+        except ValueError:
+            return ""
+        return payload.decode('utf-8', errors='replace')
 
-    def dct_decode(self, image: Image.Image) -> str:
-        """Упрощенное извлечение из DCT"""
-        return "Демонстрационное сообщение из DCT"
+    def render_dct_options(self, key_prefix: str) -> Tuple[int, int]:
+        """Параметры DCT: качество таблицы квантования и число коэффициентов"""
+        col_quality, col_coefficients = st.columns(2)
+        with col_quality:
+            quality = st.slider(
+                "Качество квантования JPEG:",
+                10, dct.MAX_QUALITY, 50,
+                key=f"{key_prefix}_dct_quality",
+                help="Чем ниже качество, тем больше шаг квантования: сообщение устойчивее к пересжатию, но искажения заметнее"
+            )
+        with col_coefficients:
+            coefficients = st.slider(
+                "Коэффициентов на блок 8x8:",
+                1, len(dct.MID_FREQUENCIES), 2,
+                key=f"{key_prefix}_dct_coefficients"
+            )
+        return quality, coefficients
 
     def create_lsb_demo_image(self) -> Image.Image:
         """Создание демонстрационного изображения для LSB"""
@@ -776,123 +1047,87 @@ class SteganographyModule(CryptoModule):
         
         return buffer.getvalue()
 
-    def lsb_audio_encode(self, audio_data: bytes, message: str) -> bytes:
+    def lsb_audio_encode(self, audio_data: bytes, message: str, bits_per_sample: int = 1) -> bytes:
         """Кодирование сообщения в аудио методом LSB"""
-        # Демонстрационная реализация
-        return audio_data
+        return audio.embed(audio_data, message.encode('utf-8'), bits_per_sample)
 
-    def lsb_audio_decode(self, audio_data: bytes) -> str:
+    def lsb_audio_decode(self, audio_data: bytes, bits_per_sample: int = 1) -> str:
         """Декодирование сообщения из аудио"""
-        return "Демонстрационное аудио сообщение"
+        try:
+            payload = audio.extract(audio_data, bits_per_sample)
+        except ValueError:
+            return ""
+        return payload.decode('utf-8', errors='replace')
 
-    def create_audio_signal_plot(self, original_audio: bytes, stego_audio: bytes) -> go.Figure:
-        """Создание графика сравнения аудио сигналов"""
-        # Демонстрационные данные
-        x = list(range(1000))
-        original_signal = np.sin(np.array(x) * 0.1)
-        stego_signal = original_signal + 0.01 * np.random.randn(1000)
+    def create_audio_signal_plot(self, original_audio: bytes, stego_audio: bytes,
+                                 points: int = 2000) -> go.Figure:
+        """Создание графика сравнения аудио сигналов (прореженная огибающая первого канала)"""
+        original_info = audio.parse_wav(original_audio)
+        stego_info = audio.parse_wav(stego_audio)
+        original_signal = audio.channel_samples(original_audio, original_info)
+        stego_signal = audio.channel_samples(stego_audio, stego_info)
+        
+        fig = make_subplots(
+            rows=2, cols=1, shared_xaxes=True,
+            subplot_titles=("Огибающая сигнала", "Разность стего - оригинал"),
+            row_heights=[0.65, 0.35]
+        )
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=x, y=original_signal,
-            mode='lines',
-            name='Оригинальный сигнал',
-            line=dict(color='blue')
-        ))
-        fig.add_trace(go.Scatter(
-            x=x, y=stego_signal,
-            mode='lines',
-            name='Стего-сигнал',
-            line=dict(color='red')
-        ))
+        for signal, name, color in ((original_signal, 'Оригинальный сигнал', 'blue'),
+                                    (stego_signal, 'Стего-сигнал', 'red')):
+            x, y = audio.envelope(signal, points)
+            fig.add_trace(go.Scatter(
+                x=x / original_info.sample_rate, y=y,
+                mode='lines',
+                name=name,
+                line=dict(color=color, width=1)
+            ), row=1, col=1)
+        
+        if len(original_signal) == len(stego_signal):
+            # Разность в единицах младшего разряда
+            lsb_unit = 1 << (8 * original_info.sample_width - 1)
+            x, y = audio.envelope((stego_signal - original_signal) * lsb_unit, points)
+            fig.add_trace(go.Scatter(
+                x=x / original_info.sample_rate, y=y,
+                mode='lines',
+                name='Разность (ед. младшего разряда)',
+                line=dict(color='green', width=1)
+            ), row=2, col=1)
         
         fig.update_layout(
             title="Сравнение аудио сигналов",
-            xaxis_title="Сэмплы",
-            yaxis_title="Амплитуда",
-            height=300
+            height=450
         )
+        fig.update_xaxes(title_text="Время, с", row=2, col=1)
+        fig.update_yaxes(title_text="Амплитуда", row=1, col=1)
         
         return fig
 
     # Методы стеганографии для текста
 
     def whitespace_encode(self, text: str, message: str) -> str:
-        """Кодирование сообщения с помощью пробелов"""
-        binary_msg = ''.join(format(ord(c), '08b') for c in message)
-        
-        words = text.split()
-        encoded_text = []
-        
-        for i, word in enumerate(words):
-            if i < len(binary_msg):
-                # Добавляем дополнительный пробел если бит = 1
-                if binary_msg[i] == '1':
-                    encoded_text.append(word + ' ')
-                else:
-                    encoded_text.append(word)
-            else:
-                encoded_text.append(word)
-        
-        return ' '.join(encoded_text)
+        """Кодирование сообщения шириной промежутков между словами"""
+        return ''.join(text_stego.whitespace_encode(text.splitlines(keepends=True), message.encode('utf-8')))
 
     def whitespace_decode(self, text: str) -> str:
-        """Декодирование сообщения из пробелов"""
-        words = text.split()
-        binary_msg = ''
-        
-        for word in words:
-            if word.endswith(' '):
-                binary_msg += '1'
-            else:
-                binary_msg += '0'
-        
-        # Преобразуем бинарную строку в текст
-        message = ''
-        for i in range(0, len(binary_msg), 8):
-            if i + 8 <= len(binary_msg):
-                byte = binary_msg[i:i+8]
-                message += chr(int(byte, 2))
-        
-        return message
+        """Декодирование сообщения из промежутков между словами"""
+        try:
+            payload = text_stego.whitespace_decode(text.splitlines(keepends=True))
+        except ValueError:
+            return ""
+        return payload.decode('utf-8', errors='replace')
 
     def invisible_chars_encode(self, text: str, message: str) -> str:
-        """Кодирование с помощью невидимых символов Unicode"""
-        # Используем Zero Width Joiner и другие невидимые символы
-        invisible_chars = ['\u200b', '\u200c']  # ZWJ, ZWNJ
-        
-        binary_msg = ''.join(format(ord(c), '08b') for c in message)
-        encoded_text = list(text)
-        
-        # Вставляем невидимые символы после каждого символа текста
-        result = []
-        msg_index = 0
-        
-        for char in encoded_text:
-            result.append(char)
-            if msg_index < len(binary_msg):
-                result.append(invisible_chars[int(binary_msg[msg_index])])
-                msg_index += 1
-        
-        return ''.join(result)
+        """Кодирование с помощью невидимых символов Unicode (ZWSP - 0, ZWNJ - 1)"""
+        return ''.join(text_stego.zero_width_encode(text.splitlines(keepends=True), message.encode('utf-8')))
 
     def invisible_chars_decode(self, text: str) -> str:
         """Декодирование из невидимых символов"""
-        invisible_chars = ['\u200b', '\u200c']
-        binary_msg = ''
-        
-        for char in text:
-            if char in invisible_chars:
-                binary_msg += str(invisible_chars.index(char))
-        
-        # Преобразуем бинарную строку в текст
-        message = ''
-        for i in range(0, len(binary_msg), 8):
-            if i + 8 <= len(binary_msg):
-                byte = binary_msg[i:i+8]
-                message += chr(int(byte, 2))
-        
-        return message
+        try:
+            payload = text_stego.zero_width_decode(text.splitlines(keepends=True))
+        except ValueError:
+            return ""
+        return payload.decode('utf-8', errors='replace')
 
     def syntactic_encode(self, text: str, message: str) -> str:
         """Кодирование с помощью синтаксических изменений"""
@@ -901,38 +1136,22 @@ class SteganographyModule(CryptoModule):
 
     def auto_decode_text(self, text: str) -> str:
         """Автоматическое определение метода и декодирование"""
-        # Пробуем разные методы
-        try:
-            return self.whitespace_decode(text)
-        except:
-            try:
-                return self.invisible_chars_decode(text)
-            except:
-                return "Не удалось извлечь сообщение"
+        if text_stego.count_zero_width(text):
+            return self.invisible_chars_decode(text)
+        return self.whitespace_decode(text)
 
     def highlight_hidden_chars(self, text: str) -> str:
         """Подсветка скрытых символов в тексте"""
-        invisible_chars = ['\u200b', '\u200c']
-        highlighted = []
-        
-        for char in text:
-            if char in invisible_chars:
-                highlighted.append(f'[{invisible_chars.index(char)}]')
-            elif char == ' ':
-                highlighted.append('_')
-            else:
-                highlighted.append(char)
-        
-        return ''.join(highlighted)
+        return text_stego.highlight(text)
 
     def analyze_text_steganography(self, text: str) -> Dict:
         """Анализ текста на наличие стеганографии"""
         space_count = text.count(' ')
-        invisible_count = sum(1 for c in text if c in ['\u200b', '\u200c'])
+        invisible_count = text_stego.count_zero_width(text)
         total_chars = len(text)
         
         # Простая эвристика для определения вероятности
-        stego_probability = min(100, (invisible_count * 10 + (space_count / total_chars * 1000)))
+        stego_probability = min(100, (invisible_count * 10 + (space_count / max(total_chars, 1) * 1000)))
         
         return {
             'length': total_chars,
@@ -944,38 +1163,95 @@ class SteganographyModule(CryptoModule):
 
     # Методы стеганоанализа
 
-    def analyze_image_steganography(self, image: Image.Image) -> Dict:
-        """Анализ изображения на наличие стеганографии"""
-        img_array = np.array(image)
-        
-        # Простой анализ LSB (демонстрационный)
-        flat_array = img_array.flatten()
-        lsb_distribution = [pixel & 1 for pixel in flat_array[:1000]]
-        lsb_balance = sum(lsb_distribution) / len(lsb_distribution)
-        
-        # Эвристика для определения вероятности
-        confidence = abs(lsb_balance - 0.5) * 2  # Отклонение от равномерного распределения
-        
+    def steganalysis_confidence(self, report: steganalysis.SteganalysisReport,
+                                use_chi_square: bool = True) -> float:
+        """Сводная уверенность: p-значение хи-квадрат или оценка доли"""
+        return report.score(use_chi_square)
+
+    def steganalysis_artifacts(self, report: steganalysis.SteganalysisReport,
+                               use_chi_square: bool = True) -> List[str]:
+        """Текстовое описание найденных признаков LSB-замены"""
         artifacts = []
-        if confidence > 0.3:
-            artifacts.append("Неравномерное распределение LSB битов")
-        if len(img_array.shape) == 3 and img_array.shape[2] == 4:
+        if use_chi_square and report.chi_square_p > 0.5:
+            artifacts.append(
+                f"Хи-квадрат: частоты пар значений выровнены (p = {report.chi_square_p:.3f}), "
+                f"последовательное встраивание примерно в {report.chi_square_rate:.0%} носителей"
+            )
+        if report.rs_rate > 0.05:
+            artifacts.append(f"RS-анализ: оценка доли встраивания {report.rs_rate:.1%}")
+        if report.spa_rate > 0.05:
+            artifacts.append(f"Анализ пар отсчетов (SPA): оценка доли встраивания {report.spa_rate:.1%}")
+        if not artifacts:
+            artifacts.append("Статистических признаков LSB-замены не обнаружено")
+        return artifacts
+
+    def analyze_image_steganography(self, image: Image.Image, window: Optional[int] = 64) -> Dict:
+        """Анализ изображения на наличие LSB-стеганографии (хи-квадрат, RS, SPA)"""
+        img_array = np.asarray(self.prepare_image(image))
+        report = steganalysis.analyze(img_array, window=window, step=window // 2 if window else None)
+
+        artifacts = self.steganalysis_artifacts(report)
+        if img_array.ndim == 3 and img_array.shape[2] == 4:
             artifacts.append("Наличие альфа-канала может скрывать данные")
-        
+
         return {
-            'confidence': min(1.0, confidence),
+            'confidence': self.steganalysis_confidence(report),
             'artifacts': artifacts,
-            'lsb_balance': lsb_balance
+            'lsb_balance': float(np.mean(img_array & 1)),
+            'report': report
         }
 
-    def analyze_audio_steganography(self, audio_file) -> Dict:
-        """Анализ аудио на наличие стеганографии"""
-        # Демонстрационная реализация
+    def analyze_audio_steganography(self, audio_data: bytes) -> Dict:
+        """Анализ WAV на наличие LSB-стеганографии (первый канал)"""
+        info = audio.parse_wav(audio_data)
+        samples = audio.integer_samples(audio_data, info)
+        report = steganalysis.analyze(samples.reshape(1, -1), window=None)
+
+        # У 16-битного звука гистограмма гладкая и пары значений выровнены
+        # и без встраивания - хи-квадрат в сводную оценку не входит
         return {
-            'confidence': random.uniform(0.1, 0.8),
-            'artifacts': ["Возможное LSB кодирование", "Подозрительные спектральные характеристики"]
+            'confidence': self.steganalysis_confidence(report, use_chi_square=False),
+            'artifacts': self.steganalysis_artifacts(report, use_chi_square=False),
+            'lsb_balance': float(np.mean(samples & 1)),
+            'report': report
         }
 
+    def render_steganalysis_report(self, report: steganalysis.SteganalysisReport, key_prefix: str):
+        """Метрики детекторов, кривая хи-квадрат и тепловые карты"""
+        col_rate, col_chi, col_rs, col_spa = st.columns(4)
+        col_rate.metric("Оценка доли", f"{report.embedding_rate:.1%}")
+        col_chi.metric("Хи-квадрат p", f"{report.chi_square_p:.3f}")
+        col_rs.metric("RS", f"{report.rs_rate:.1%}")
+        col_spa.metric("SPA", f"{report.spa_rate:.1%}")
+
+        curve = report.chi_square_curve
+        fig = go.Figure(go.Scatter(
+            x=np.arange(1, len(curve) + 1) / len(curve) * 100, y=curve,
+            mode='lines', name='p-значение'
+        ))
+        fig.update_layout(
+            title="Хи-квадрат по растущей доле носителей",
+            xaxis_title="Проанализировано носителей, %",
+            yaxis_title="p-значение",
+            yaxis_range=[0, 1.05],
+            height=300
+        )
+        st.plotly_chart(fig, use_container_width=True, key=f"{key_prefix}_chi_curve")
+
+        if report.heatmaps:
+            st.write("**Тепловые карты (скользящее окно):**")
+            tabs = st.tabs(list(report.heatmaps))
+            for tab, (name, values) in zip(tabs, report.heatmaps.items()):
+                with tab:
+                    fig = px.imshow(values, zmin=0, zmax=1, color_continuous_scale='Reds', aspect='auto')
+                    fig.update_layout(height=350, margin=dict(l=0, r=0, t=10, b=0))
+                    st.plotly_chart(fig, use_container_width=True, key=f"{key_prefix}_{name}")
+
+        with st.expander("Доли групп RS"):
+            st.dataframe(pd.DataFrame(
+                {"Группа": list(report.rs_groups), "Доля": [round(value, 4) for value in report.rs_groups.values()]}
+            ), use_container_width=True)
+
 # Для обратной совместимости
 class SteganographyVisualizationModule(SteganographyModule):
     pass
@@ -0,0 +1,214 @@
+"""LSB-стеганография в несжатых WAV (PCM) файлах.
+
+Заголовок RIFF разбирается вручную, а область сэмплов отображается как
+массив NumPy без копирования: через numpy.memmap для файлов на диске или
+np.frombuffer поверх буфера для загруженных данных. Младший байт каждого
+сэмпла (little-endian) - это каждый sample_width-й байт области данных,
+поэтому встраивание - одно присваивание по срезу с шагом.
+"""
+from dataclasses import dataclass
+from typing import Tuple, Union
+import io
+import os
+import shutil
+import struct
+
+import numpy as np
+
+from modules.modern_crypto.stego.lsb import HEADER_SIZE, MAGIC, bytes_to_symbols, symbols_to_bytes
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+Buffer = Union[bytes, bytearray, memoryview, np.ndarray]
+
+
+@dataclass
+class WavInfo:
+    """Параметры PCM потока и положение данных в файле"""
+    channels: int
+    sample_rate: int
+    sample_width: int  # байт на сэмпл
+    data_offset: int
+    data_size: int
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.sample_width * self.channels)
+
+    @property
+    def samples(self) -> int:
+        return self.data_size // self.sample_width
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+
+def parse_wav(buffer: Buffer) -> WavInfo:
+    """Разбирает заголовок RIFF/WAVE; ValueError для не-PCM файлов"""
+    view = memoryview(buffer).cast('B')
+    if len(view) < 12 or view[:4] != b"RIFF" or view[8:12] != b"WAVE":
+        raise ValueError("Файл не является WAV (нет заголовка RIFF/WAVE)")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        chunk_size = struct.unpack_from('<I', view, offset + 4)[0]
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            fmt = struct.unpack_from('<HHIIHH', view, body)
+            if fmt[0] == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                # Подформат - первые 2 байта GUID
+                fmt = (struct.unpack_from('<H', view, body + 24)[0],) + fmt[1:]
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("Блок data встретился раньше блока fmt")
+            format_tag, channels, sample_rate, _, _, bits_per_sample = fmt
+            if format_tag != WAVE_FORMAT_PCM:
+                raise ValueError(f"Поддерживается только PCM, формат файла: 0x{format_tag:04x}")
+            # Потоковые записи иногда оставляют размер 0xFFFFFFFF
+            data_size = min(chunk_size, len(view) - body)
+            return WavInfo(channels, sample_rate, (bits_per_sample + 7) // 8, body, data_size)
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("В файле нет блока data")
+
+
+def _check_bits(bits: int) -> None:
+    if not 1 <= bits <= 4:
+        raise ValueError("Число бит на сэмпл должно быть от 1 до 4")
+
+
+def capacity(info: WavInfo, bits: int = 1) -> int:
+    """Сколько байт сообщения помещается в файл (без заголовка)"""
+    _check_bits(bits)
+    return max(info.samples * bits // 8 - HEADER_SIZE, 0)
+
+
+def _low_bytes(raw: np.ndarray, info: WavInfo) -> np.ndarray:
+    """Представление младших байтов всех сэмплов (без копирования)"""
+    return raw[info.data_offset:info.data_offset + info.samples * info.sample_width:info.sample_width]
+
+
+def _embed_into(raw: np.ndarray, info: WavInfo, payload: bytes, bits: int) -> None:
+    _check_bits(bits)
+    available = capacity(info, bits)
+    if len(payload) > available:
+        raise ValueError(f"Сообщение слишком длинное: {len(payload)} байт при емкости {available} байт")
+    symbols = bytes_to_symbols(MAGIC + len(payload).to_bytes(4, 'big') + payload, bits)
+    carriers = _low_bytes(raw, info)[:len(symbols)]
+    carriers[:] = (carriers & np.uint8(0xFF ^ ((1 << bits) - 1))) | symbols
+
+
+def _extract_from(raw: np.ndarray, info: WavInfo, bits: int) -> bytes:
+    _check_bits(bits)
+    carriers = _low_bytes(raw, info)
+    low_mask = np.uint8((1 << bits) - 1)
+
+    def read(byte_count: int) -> bytes:
+        count = -(-byte_count * 8 // bits)
+        return symbols_to_bytes(carriers[:count] & low_mask, bits)[:byte_count]
+
+    header = read(HEADER_SIZE)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("Скрытое сообщение не найдено (неверное число бит или пустой носитель)")
+    length = int.from_bytes(header[len(MAGIC):], 'big')
+    if length > capacity(info, bits):
+        raise ValueError("Поврежденный заголовок: длина превышает емкость файла")
+    return read(HEADER_SIZE + length)[HEADER_SIZE:]
+
+
+def embed(buffer: Buffer, payload: bytes, bits: int = 1) -> bytes:
+    """Встраивает сообщение в WAV из памяти; единственная копия - результат.
+
+    Копия делается в буфере BytesIO, а getvalue() без открытых представлений
+    отдает его внутренний объект bytes без второго копирования - Streamlit
+    принимает только bytes, и bytearray пришлось бы копировать еще раз.
+    """
+    info = parse_wav(buffer)
+    result = io.BytesIO(buffer)
+    with result.getbuffer() as view:
+        _embed_into(np.frombuffer(view, dtype=np.uint8), info, payload, bits)
+    return result.getvalue()
+
+
+def extract(buffer: Buffer, bits: int = 1) -> bytes:
+    """Извлекает сообщение из WAV в памяти без копирования сэмплов"""
+    info = parse_wav(buffer)
+    return _extract_from(np.frombuffer(memoryview(buffer).cast('B'), dtype=np.uint8), info, bits)
+
+
+def embed_file(src: Union[str, os.PathLike], dst: Union[str, os.PathLike],
+               payload: bytes, bits: int = 1) -> WavInfo:
+    """Копирует WAV на диске и встраивает сообщение через memmap (файл в память не читается)"""
+    shutil.copyfile(src, dst)
+    raw = np.memmap(dst, dtype=np.uint8, mode='r+')
+    try:
+        info = parse_wav(raw)
+        _embed_into(raw, info, payload, bits)
+        raw.flush()
+    finally:
+        del raw
+    return info
+
+
+def extract_file(path: Union[str, os.PathLike], bits: int = 1) -> bytes:
+    """Извлекает сообщение из WAV на диске через memmap"""
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    try:
+        return _extract_from(raw, parse_wav(raw), bits)
+    finally:
+        del raw
+
+
+def channel_samples(buffer: Buffer, info: WavInfo, channel: int = 0) -> np.ndarray:
+    """Сэмплы одного канала, нормированные к [-1, 1).
+
+    Для 16- и 32-битных данных используется представление без копии
+    (копируется только результат нормировки); 24-битные собираются из всех
+    трех байтов, иначе изменения младшего байта (LSB) на графике не видны.
+    """
+    raw = np.frombuffer(memoryview(buffer).cast('B'), dtype=np.uint8)
+    data = raw[info.data_offset:info.data_offset + info.samples * info.sample_width]
+    width, step = info.sample_width, info.channels
+
+    if width == 1:
+        return (data[channel::step].astype(np.float32) - 128) / 128
+    if width in (2, 4):
+        # float32 точно представляет 16-битные значения, для 32 бит нужен float64
+        samples = data.view(f'<i{width}')[channel::step]
+        return samples.astype(np.float32 if width == 2 else np.float64) / (1 << (8 * width - 1))
+    # float32 точно представляет 24-битные значения
+    return integer_samples(buffer, info, channel).astype(np.float32) / (1 << 23)
+
+
+def integer_samples(buffer: Buffer, info: WavInfo, channel: int = 0) -> np.ndarray:
+    """Целые сэмплы одного канала (для 8/16/32 бит - представление без копии).
+
+    24-битные сэмплы собираются в int32 из трех байтов.
+    """
+    raw = np.frombuffer(memoryview(buffer).cast('B'), dtype=np.uint8)
+    data = raw[info.data_offset:info.data_offset + info.samples * info.sample_width]
+    width, step = info.sample_width, info.channels
+    if width == 1:
+        return data[channel::step]
+    if width in (2, 4):
+        return data.view(f'<i{width}')[channel::step]
+    frames = data[:info.frames * step * width].reshape(-1, step, width)[:, channel]
+    values = frames[:, 0].astype(np.int32) | (frames[:, 1].astype(np.int32) << 8) | (frames[:, 2].astype(np.int32) << 16)
+    return np.where(values & 0x800000, values - 0x1000000, values).astype(np.int32)
+
+
+def envelope(samples: np.ndarray, points: int = 2000) -> Tuple[np.ndarray, np.ndarray]:
+    """Прореживание для графика: минимум и максимум в каждом из points интервалов"""
+    if len(samples) <= 2 * points:
+        return np.arange(len(samples)), samples
+    bucket = len(samples) // points
+    trimmed = samples[:bucket * points].reshape(points, bucket)
+    positions = np.repeat(np.arange(points) * bucket, 2)
+    values = np.empty(2 * points, dtype=samples.dtype)
+    values[0::2] = trimmed.min(axis=1)
+    values[1::2] = trimmed.max(axis=1)
+    return positions, values
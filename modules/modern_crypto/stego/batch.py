@@ -0,0 +1,223 @@
+"""Пакетный стеганоанализ каталога или zip-архива изображений.
+
+Список файлов собирается без чтения содержимого; каждое изображение
+открывается и декодируется уже в рабочем процессе пула, так что в
+родительском процессе одновременно не держится больше одного результата.
+Итог - отсортированный по подозрительности список с временем обработки.
+
+Запуск без интерфейса:
+
+    python -m modules.modern_crypto.stego.batch images.zip --csv report.csv --json report.json
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Callable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+
+import numpy as np
+from PIL import Image
+
+from modules.modern_crypto.stego import dct, steganalysis
+
+IMAGE_EXTENSIONS = ('.png', '.bmp', '.tif', '.tiff', '.jpg', '.jpeg', '.gif', '.webp')
+SUSPICION_THRESHOLD = 0.5
+
+# (путь к каталогу или архиву, имя файла внутри него)
+Task = Tuple[str, str]
+
+
+@dataclass
+class ScanResult:
+    """Результат анализа одного изображения"""
+    name: str
+    width: int = 0
+    height: int = 0
+    suspicion: float = 0.0
+    lsb_score: float = 0.0
+    lsb_rate: float = 0.0
+    chi_square_p: float = 0.0
+    rs_rate: float = 0.0
+    spa_rate: float = 0.0
+    dct_score: float = 0.0
+    dct_quality: int = 0
+    dct_header: bool = False
+    decode_seconds: float = 0.0
+    analysis_seconds: float = 0.0
+    error: str = ""
+
+    @property
+    def seconds(self) -> float:
+        return self.decode_seconds + self.analysis_seconds
+
+    @property
+    def suspected(self) -> bool:
+        return self.suspicion >= SUSPICION_THRESHOLD
+
+
+def _is_image(name: str) -> bool:
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def list_images(source: Union[str, os.PathLike]) -> List[Task]:
+    """Задачи для всех изображений каталога (рекурсивно) или zip-архива"""
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        tasks = []
+        for root, _, files in os.walk(source):
+            for file_name in files:
+                if _is_image(file_name):
+                    tasks.append((source, os.path.relpath(os.path.join(root, file_name), source)))
+        return sorted(tasks)
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return [(source, info.filename) for info in archive.infolist()
+                    if not info.is_dir() and _is_image(info.filename)]
+    raise ValueError(f"{source}: ожидается каталог или zip-архив")
+
+
+def load_image(task: Task) -> np.ndarray:
+    """Читает и декодирует изображение задачи; режимы приводятся к L, RGB или RGBA"""
+    source, name = task
+    if os.path.isdir(source):
+        image = Image.open(os.path.join(source, name))
+    else:
+        with zipfile.ZipFile(source) as archive:
+            image = Image.open(io.BytesIO(archive.read(name)))
+    if image.mode not in ('L', 'RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return np.asarray(image)
+
+
+def scan_image(task: Task) -> ScanResult:
+    """Анализ одного изображения LSB- и DCT-детекторами (выполняется в рабочем процессе)"""
+    result = ScanResult(name=task[1])
+    start = time.perf_counter()
+    try:
+        pixels = load_image(task)
+    except Exception as e:  # поврежденный файл не должен останавливать весь пакет
+        result.error = f"{type(e).__name__}: {e}"
+        result.decode_seconds = time.perf_counter() - start
+        return result
+    decoded = time.perf_counter()
+    result.decode_seconds = decoded - start
+    result.height, result.width = pixels.shape[:2]
+
+    try:
+        report = steganalysis.analyze(pixels, window=None)
+        detection = dct.detect(pixels)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    else:
+        result.lsb_score = report.score()
+        result.lsb_rate = report.embedding_rate
+        result.chi_square_p = report.chi_square_p
+        result.rs_rate = report.rs_rate
+        result.spa_rate = report.spa_rate
+        result.dct_score = detection.score
+        result.dct_quality = detection.quality
+        result.dct_header = detection.header_found
+        result.suspicion = 1.0 if detection.header_found else max(result.lsb_score, detection.score)
+    result.analysis_seconds = time.perf_counter() - decoded
+    return result
+
+
+def iter_scan(tasks: Sequence[Task], workers: Optional[int] = None) -> Iterator[ScanResult]:
+    """Результаты по мере готовности (в порядке задач)"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(scan_image, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(scan_image, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+
+
+def scan(source: Union[str, os.PathLike], workers: Optional[int] = None,
+         progress: Optional[Callable[[int, int], None]] = None) -> List[ScanResult]:
+    """Анализирует все изображения источника; результат отсортирован по убыванию подозрительности"""
+    tasks = list_images(source)
+    results = []
+    for done, result in enumerate(iter_scan(tasks, workers), start=1):
+        results.append(result)
+        if progress is not None:
+            progress(done, len(tasks))
+    return rank(results)
+
+
+def rank(results: List[ScanResult]) -> List[ScanResult]:
+    return sorted(results, key=lambda result: (-result.suspicion, result.name))
+
+
+def _rows(results: Sequence[ScanResult]) -> Iterator[dict]:
+    for place, result in enumerate(results, start=1):
+        row = {"rank": place, **asdict(result)}
+        row["seconds"] = result.seconds
+        row["suspected"] = result.suspected
+        yield row
+
+
+def write_csv(results: Sequence[ScanResult], stream: TextIO) -> None:
+    """CSV-отчет: одна строка на изображение в порядке ранжирования"""
+    columns = ["rank"] + [item.name for item in fields(ScanResult)] + ["seconds", "suspected"]
+    writer = csv.DictWriter(stream, fieldnames=columns)
+    writer.writeheader()
+    for row in _rows(results):
+        writer.writerow({key: round(value, 6) if isinstance(value, float) else value
+                         for key, value in row.items()})
+
+
+def write_json(results: Sequence[ScanResult], stream: TextIO, total_seconds: Optional[float] = None) -> None:
+    """JSON-отчет со сводкой и списком изображений"""
+    json.dump({
+        "images": len(results),
+        "suspected": sum(result.suspected for result in results),
+        "errors": sum(bool(result.error) for result in results),
+        "total_seconds": total_seconds,
+        "results": list(_rows(results)),
+    }, stream, ensure_ascii=False, indent=2)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетный стеганоанализ изображений (LSB и DCT)")
+    parser.add_argument("source", help="каталог или zip-архив с изображениями")
+    parser.add_argument("--csv", help="файл CSV-отчета ('-' - стандартный вывод)")
+    parser.add_argument("--json", help="файл JSON-отчета ('-' - стандартный вывод)")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию - все ядра)")
+    parser.add_argument("--top", type=int, default=10, help="сколько подозрительных файлов вывести")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r{done}/{total}", end="", file=sys.stderr, flush=True)
+
+    results = scan(args.source, args.workers, progress)
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+
+    for path, writer in ((args.csv, write_csv), (args.json, write_json)):
+        if not path:
+            continue
+        extra = {"total_seconds": elapsed} if writer is write_json else {}
+        if path == "-":
+            writer(results, sys.stdout, **extra)
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as stream:
+                writer(results, stream, **extra)
+
+    print(f"Изображений: {len(results)}, подозрительных: {sum(r.suspected for r in results)}, "
+          f"время: {elapsed:.1f} с", file=sys.stderr)
+    for result in results[:args.top]:
+        status = result.error or ("подозрительно" if result.suspected else "чисто")
+        print(f"{result.suspicion:6.3f}  {result.seconds:6.2f} с  {result.name}  [{status}]", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
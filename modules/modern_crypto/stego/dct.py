@@ -0,0 +1,290 @@
+"""Стеганография в коэффициентах DCT блоков 8x8 (как в JPEG).
+
+Яркость Y делится на блоки 8x8, которые преобразуются одним вызовом
+scipy.fft.dctn над массивом формы (H/8, W/8, 8, 8). Биты сообщения
+записываются в четность квантованных среднечастотных коэффициентов
+(квантование шагом таблицы JPEG для выбранного качества), затем
+выполняется обратное преобразование. Цветность Cb/Cr не изменяется.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+import numpy as np
+from scipy.fft import dctn, idctn
+
+from modules.modern_crypto.stego.lsb import HEADER_SIZE, MAGIC
+
+# Стандартная таблица квантования яркости JPEG (качество 50)
+JPEG_LUMINANCE = np.array([
+    [16, 11, 10, 16, 24, 40, 51, 61],
+    [12, 12, 14, 19, 26, 58, 60, 55],
+    [14, 13, 16, 24, 40, 57, 69, 56],
+    [14, 17, 22, 29, 51, 87, 80, 62],
+    [18, 22, 37, 56, 68, 109, 103, 77],
+    [24, 35, 55, 64, 81, 104, 113, 92],
+    [49, 64, 78, 87, 103, 121, 120, 101],
+    [72, 92, 95, 98, 112, 100, 103, 99],
+], dtype=np.float32)
+
+# Среднечастотные позиции: изменения в них мало заметны и переживают сжатие
+MID_FREQUENCIES = ((2, 1), (1, 2), (2, 2), (3, 1), (1, 3), (3, 2), (2, 3), (4, 1))
+
+# Контрольные позиции, в которые встраивание не пишет (для детектора)
+CONTROL_FREQUENCIES = ((1, 1), (0, 2), (2, 0), (0, 3), (3, 0), (4, 4))
+
+# Дополнительные проходы, исправляющие биты, испорченные округлением пикселей
+CORRECTION_PASSES = 4
+
+# Наименьший шаг квантования, четность которого переживает округление до uint8
+# (качество 80 и ниже); при шаге 4 и меньше часть бит не исправляется
+MIN_STEP = 5
+MAX_QUALITY = 80
+
+
+def quantization_steps(quality: int, coefficients: int) -> np.ndarray:
+    """Шаги квантования выбранных коэффициентов для качества JPEG 1..100"""
+    if not 1 <= quality <= 100:
+        raise ValueError("Качество должно быть от 1 до 100")
+    if not 1 <= coefficients <= len(MID_FREQUENCIES):
+        raise ValueError(f"Коэффициентов на блок: от 1 до {len(MID_FREQUENCIES)}")
+    scale = 5000 / quality if quality < 50 else 200 - 2 * quality
+    table = np.clip(np.floor((JPEG_LUMINANCE * scale + 50) / 100), 1, 255)
+    rows, cols = _positions(coefficients)
+    steps = table[rows, cols]
+    if steps.min() < MIN_STEP:
+        raise ValueError(f"При качестве {quality} шаг квантования меньше {MIN_STEP}: "
+                         f"биты не переживут округление пикселей (допустимо качество до {MAX_QUALITY})")
+    return steps
+
+
+def rgb_to_ycbcr(pixels: np.ndarray) -> np.ndarray:
+    """RGB -> YCbCr (JFIF), результат float32"""
+    rgb = pixels[..., :3].astype(np.float32)
+    y = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    cb = rgb @ np.array([-0.168736, -0.331264, 0.5], dtype=np.float32) + 128
+    cr = rgb @ np.array([0.5, -0.418688, -0.081312], dtype=np.float32) + 128
+    return np.stack([y, cb, cr], axis=-1)
+
+
+def ycbcr_to_rgb(ycbcr: np.ndarray) -> np.ndarray:
+    """YCbCr -> RGB (JFIF) с округлением до uint8"""
+    y, cb, cr = ycbcr[..., 0], ycbcr[..., 1] - 128, ycbcr[..., 2] - 128
+    rgb = np.stack([
+        y + 1.402 * cr,
+        y - 0.344136 * cb - 0.714136 * cr,
+        y + 1.772 * cb,
+    ], axis=-1)
+    return np.clip(np.rint(rgb), 0, 255).astype(np.uint8)
+
+
+def _luminance(pixels: np.ndarray) -> np.ndarray:
+    if pixels.ndim == 2:
+        return pixels.astype(np.float32)
+    return rgb_to_ycbcr(pixels)[..., 0]
+
+
+def _block_grid(shape: Tuple[int, ...]) -> Tuple[int, int]:
+    return shape[0] // 8, shape[1] // 8
+
+
+def block_dct(channel: np.ndarray) -> np.ndarray:
+    """DCT всех блоков 8x8 одним вызовом; результат формы (H/8, W/8, 8, 8)"""
+    rows, cols = _block_grid(channel.shape)
+    blocks = channel[:rows * 8, :cols * 8].reshape(rows, 8, cols, 8).swapaxes(1, 2)
+    return dctn(blocks - 128, axes=(2, 3), norm='ortho', workers=-1)
+
+
+def block_idct(coefficients: np.ndarray) -> np.ndarray:
+    """Обратное к block_dct преобразование; результат формы (H, W)"""
+    rows, cols = coefficients.shape[:2]
+    blocks = idctn(coefficients, axes=(2, 3), norm='ortho', workers=-1) + 128
+    return blocks.swapaxes(1, 2).reshape(rows * 8, cols * 8)
+
+
+def capacity(shape: Tuple[int, ...], coefficients: int = 2) -> int:
+    """Сколько байт сообщения помещается в изображение (без заголовка)"""
+    rows, cols = _block_grid(shape)
+    return max(rows * cols * coefficients // 8 - HEADER_SIZE, 0)
+
+
+def _positions(count: int) -> Tuple[list, list]:
+    """Строки и столбцы первых count среднечастотных коэффициентов"""
+    rows, cols = zip(*MID_FREQUENCIES[:count])
+    return list(rows), list(cols)
+
+
+def _read_bits(luminance: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """Четности квантованных коэффициентов в порядке блоков"""
+    coefficients = block_dct(luminance)
+    rows, cols = _positions(len(steps))
+    values = coefficients[:, :, rows, cols]
+    return (np.rint(values / steps).astype(np.int64) & 1).reshape(-1).astype(np.uint8)
+
+
+def _modulate(luminance: np.ndarray, bits: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """Задает четность коэффициентов; возвращает новую яркость"""
+    coefficients = block_dct(luminance)
+    rows, cols = _positions(len(steps))
+    values = np.ascontiguousarray(coefficients[:, :, rows, cols]).reshape(-1)
+    step = np.resize(steps, len(bits))
+
+    scaled = values[:len(bits)] / step
+    levels = np.rint(scaled)
+    wrong = (levels.astype(np.int64) & 1) != bits
+    # Сдвигаем на ближайший уровень нужной четности
+    levels[wrong] += np.where(scaled[wrong] >= levels[wrong], 1, -1)
+
+    values[:len(bits)] = levels * step
+    coefficients[:, :, rows, cols] = values.reshape(coefficients.shape[:2] + (len(steps),))
+
+    result = luminance.copy()
+    block_rows, block_cols = coefficients.shape[:2]
+    result[:block_rows * 8, :block_cols * 8] = block_idct(coefficients)
+    return result
+
+
+def _compose(pixels: np.ndarray, ycbcr: np.ndarray, luminance: np.ndarray) -> np.ndarray:
+    """Собирает изображение с новой яркостью (альфа-канал сохраняется)"""
+    if pixels.ndim == 2:
+        return np.clip(np.rint(luminance), 0, 255).astype(np.uint8)
+    ycbcr = ycbcr.copy()
+    ycbcr[..., 0] = luminance
+    rgb = ycbcr_to_rgb(ycbcr)
+    if pixels.shape[2] == 4:
+        return np.concatenate([rgb, pixels[..., 3:]], axis=-1)
+    return rgb
+
+
+def embed(pixels: np.ndarray, payload: bytes, quality: int = 50, coefficients: int = 2) -> np.ndarray:
+    """Встраивает сообщение в коэффициенты DCT яркости"""
+    steps = quantization_steps(quality, coefficients)
+    available = capacity(pixels.shape, coefficients)
+    if len(payload) > available:
+        raise ValueError(f"Сообщение слишком длинное: {len(payload)} байт при емкости {available} байт")
+
+    data = MAGIC + len(payload).to_bytes(4, 'big') + payload
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+
+    ycbcr = None if pixels.ndim == 2 else rgb_to_ycbcr(pixels)
+    original = _luminance(pixels) if ycbcr is None else ycbcr[..., 0]
+
+    stego = _compose(pixels, ycbcr, _modulate(original, bits, steps))
+    for _ in range(CORRECTION_PASSES):
+        # Округление до uint8 и обрезка могут сместить коэффициент через
+        # границу решения - повторяем модуляцию по уже округленному изображению
+        if np.array_equal(_read_bits(_luminance(stego), steps)[:len(bits)], bits):
+            break
+        stego = _compose(pixels, ycbcr, _modulate(_luminance(stego), bits, steps))
+    if not np.array_equal(_read_bits(_luminance(stego), steps)[:len(bits)], bits):
+        raise ValueError("Не удалось записать сообщение: округление пикселей портит биты "
+                         "(уменьшите качество или число коэффициентов)")
+    return stego
+
+
+def extract(pixels: np.ndarray, quality: int = 50, coefficients: int = 2) -> bytes:
+    """Извлекает сообщение; ValueError, если заголовок не найден"""
+    steps = quantization_steps(quality, coefficients)
+    bits = _read_bits(_luminance(pixels), steps)
+    data = np.packbits(bits[:len(bits) - len(bits) % 8]).tobytes()
+
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Скрытое сообщение не найдено (неверные параметры или изображение пересжато)")
+    length = int.from_bytes(data[len(MAGIC):HEADER_SIZE], 'big')
+    if length > capacity(pixels.shape, coefficients):
+        raise ValueError("Поврежденный заголовок: длина превышает емкость изображения")
+    return data[HEADER_SIZE:HEADER_SIZE + length]
+
+
+def bit_error_rate(pixels: np.ndarray, payload: bytes, quality: int = 50, coefficients: int = 2) -> float:
+    """Доля неверно прочитанных бит сообщения (для оценки устойчивости)"""
+    steps = quantization_steps(quality, coefficients)
+    data = MAGIC + len(payload).to_bytes(4, 'big') + payload
+    expected = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    actual = _read_bits(_luminance(pixels), steps)[:len(expected)]
+    return float(np.mean(actual != expected))
+
+
+@dataclass
+class DctDetection:
+    """Результат поиска следов встраивания в четность коэффициентов"""
+    score: float           # 0 - следов нет, 1 - все выбранные коэффициенты на решетке
+    quality: int           # качество, шаги которого лучше всего объясняют решетку
+    coefficients: int      # сколько первых позиций MID_FREQUENCIES выровнено
+    header_found: bool     # при этих параметрах читается заголовок MAGIC
+
+
+def _alignment(values: np.ndarray, step) -> float:
+    """Насколько ненулевые квантованные значения прижаты к решетке шага step.
+
+    Для естественного изображения расстояние до ближайшего уровня равномерно
+    на [0, 0.5] (среднее 0.25), после встраивания - близко к нулю.
+    """
+    scaled = values / step
+    levels = np.rint(scaled)
+    used = levels != 0
+    if not used.any():
+        return 0.0
+    return float(1 - np.abs(scaled - levels)[used].mean() / 0.25)
+
+
+def _parity_balance(values: np.ndarray, step) -> float:
+    """1 - если четных и нечетных уровней поровну (как у битов сообщения)"""
+    odd = np.mean(np.rint(values / step).astype(np.int64) & 1)
+    return float(1 - abs(2 * odd - 1))
+
+
+def detect(pixels: np.ndarray, qualities: Iterable[int] = range(10, MAX_QUALITY + 1, 5)) -> DctDetection:
+    """Ищет выравнивание среднечастотных коэффициентов по шагам таблицы JPEG.
+
+    DCT считается один раз. Встраивание идет по блокам подряд, поэтому, как
+    в хи-квадрат атаке, проверяются растущие префиксы блоков. Обычный JPEG
+    выровнен во всех позициях - выравнивание контрольных позиций вычитается;
+    кроме того, у сообщения четность уровней сбалансирована, а у JPEG
+    преобладают нулевые (четные) уровни.
+    """
+    coefficients = block_dct(_luminance(pixels))
+    if coefficients.size == 0:
+        return DctDetection(0.0, 0, 0, False)
+    rows, cols = _positions(len(MID_FREQUENCIES))
+    control_rows, control_cols = zip(*CONTROL_FREQUENCIES)
+    mid = coefficients[:, :, rows, cols].reshape(-1, len(MID_FREQUENCIES))
+    control = coefficients[:, :, list(control_rows), list(control_cols)].reshape(-1, len(CONTROL_FREQUENCIES))
+
+    tables = {}
+    for quality in qualities:
+        scale = 5000 / quality if quality < 50 else 200 - 2 * quality
+        tables[quality] = np.clip(np.floor((JPEG_LUMINANCE * scale + 50) / 100), 1, 255)
+    # Наибольшее выравнивание контрольных позиций среди всех качеств
+    control_steps = [table[list(control_rows), list(control_cols)] for table in tables.values()]
+    baseline = max(_alignment(control, steps) for steps in control_steps)
+
+    blocks = len(mid)
+    prefixes = sorted({max(1, blocks >> shift) for shift in range(6)})
+    best = DctDetection(0.0, 0, 0, False)
+    for quality, table in tables.items():
+        steps = table[rows, cols]
+        for prefix in prefixes:
+            part = mid[:prefix]
+            used = 0
+            evidence = []
+            for index in range(len(steps)):
+                value = ((_alignment(part[:, index], steps[index]) - baseline)
+                         * _parity_balance(part[:, index], steps[index]))
+                if value < 0.25:
+                    break
+                evidence.append(value)
+                used += 1
+            score = float(np.clip(np.mean(evidence), 0.0, 1.0)) if evidence else 0.0
+            if score > best.score:
+                best = DctDetection(score, quality, used, False)
+
+    if best.coefficients:
+        steps = quantization_steps(best.quality, best.coefficients)
+        levels = np.rint(mid[:, :best.coefficients] / steps).astype(np.int64)
+        header_bits = (levels.reshape(-1)[:HEADER_SIZE * 8] & 1).astype(np.uint8)
+        if len(header_bits) == HEADER_SIZE * 8:
+            header = np.packbits(header_bits).tobytes()
+            length = int.from_bytes(header[len(MAGIC):], 'big')
+            best.header_found = (header[:len(MAGIC)] == MAGIC
+                                 and length <= capacity(pixels.shape, best.coefficients))
+    return best
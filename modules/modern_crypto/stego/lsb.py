@@ -0,0 +1,113 @@
+"""LSB-стеганография в изображениях на векторных операциях NumPy.
+
+Сообщение записывается в младшие биты выбранных каналов после заголовка
+``MAGIC | длина (4 байта)``. Биты упаковываются через np.unpackbits /
+np.packbits, поэтому время не зависит от Python-циклов по пикселям.
+"""
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"SG"
+HEADER_SIZE = len(MAGIC) + 4  # байт
+CHANNEL_NAMES = ("R", "G", "B", "A")
+
+
+def _check_bits(bits: int) -> None:
+    if not 1 <= bits <= 4:
+        raise ValueError("Число бит на канал должно быть от 1 до 4")
+
+
+def _channels(pixels: np.ndarray, channels: Optional[Sequence[int]]) -> Tuple[int, ...]:
+    """Номера используемых каналов (по умолчанию - все)"""
+    available = 1 if pixels.ndim == 2 else pixels.shape[2]
+    if channels is None:
+        return tuple(range(available))
+    channels = tuple(sorted(set(channels)))
+    if not channels or channels[0] < 0 or channels[-1] >= available:
+        raise ValueError(f"Изображение содержит каналов: {available}")
+    return channels
+
+
+def _carrier_count(pixels: np.ndarray, channels: Tuple[int, ...]) -> int:
+    return pixels.shape[0] * pixels.shape[1] * len(channels)
+
+
+def capacity(pixels: np.ndarray, bits: int = 1, channels: Optional[Sequence[int]] = None) -> int:
+    """Сколько байт сообщения помещается в изображение (без заголовка)"""
+    _check_bits(bits)
+    carriers = _carrier_count(pixels, _channels(pixels, channels))
+    return max(carriers * bits // 8 - HEADER_SIZE, 0)
+
+
+def bytes_to_symbols(data: bytes, bits: int) -> np.ndarray:
+    """Разбивает байты на группы по bits бит (старшие биты первыми)"""
+    stream = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    stream = np.pad(stream, (0, -len(stream) % bits))
+    return np.packbits(stream.reshape(-1, bits), axis=1)[:, 0] >> (8 - bits)
+
+
+def symbols_to_bytes(symbols: np.ndarray, bits: int) -> bytes:
+    """Обратное к bytes_to_symbols преобразование (неполный байт отбрасывается)"""
+    stream = np.unpackbits(symbols.astype(np.uint8)[:, None], axis=1)[:, 8 - bits:].reshape(-1)
+    return np.packbits(stream[:len(stream) - len(stream) % 8]).tobytes()
+
+
+def _all_channels(pixels: np.ndarray, channels: Tuple[int, ...]) -> bool:
+    return pixels.ndim == 2 or len(channels) == pixels.shape[2]
+
+
+def _carriers(pixels: np.ndarray, channels: Tuple[int, ...]) -> np.ndarray:
+    """Плоский массив носителей; для всех каналов - представление без копии"""
+    if _all_channels(pixels, channels):
+        return pixels.reshape(-1)
+    return pixels[..., list(channels)].reshape(-1)
+
+
+def _rows_for(pixels: np.ndarray, channels: Tuple[int, ...], count: int) -> int:
+    """Сколько строк изображения нужно прочитать для count носителей"""
+    per_row = pixels.shape[1] * len(channels)
+    return -(-count // per_row)
+
+
+def embed(pixels: np.ndarray, payload: bytes, bits: int = 1,
+          channels: Optional[Sequence[int]] = None) -> np.ndarray:
+    """Возвращает копию пикселей с сообщением в младших битах"""
+    _check_bits(bits)
+    channels = _channels(pixels, channels)
+    if (HEADER_SIZE + len(payload)) * 8 > _carrier_count(pixels, channels) * bits:
+        raise ValueError(
+            f"Сообщение слишком длинное: {len(payload)} байт при емкости "
+            f"{capacity(pixels, bits, channels)} байт"
+        )
+
+    symbols = bytes_to_symbols(MAGIC + len(payload).to_bytes(4, 'big') + payload, bits)
+    result = np.array(pixels, dtype=np.uint8, copy=True)
+    carriers = _carriers(result, channels)
+    mask = np.uint8(0xFF ^ ((1 << bits) - 1))
+    carriers[:len(symbols)] = (carriers[:len(symbols)] & mask) | symbols
+
+    if not _all_channels(result, channels):
+        result[..., list(channels)] = carriers.reshape(result.shape[:2] + (len(channels),))
+    return result
+
+
+def extract(pixels: np.ndarray, bits: int = 1, channels: Optional[Sequence[int]] = None) -> bytes:
+    """Извлекает сообщение; ValueError, если заголовок не найден"""
+    _check_bits(bits)
+    channels = _channels(pixels, channels)
+    low_mask = np.uint8((1 << bits) - 1)
+
+    def read(byte_count: int) -> bytes:
+        count = -(-byte_count * 8 // bits)
+        carriers = _carriers(pixels[:_rows_for(pixels, channels, count)], channels)
+        return symbols_to_bytes(carriers[:count] & low_mask, bits)[:byte_count]
+
+    header = read(HEADER_SIZE)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("Скрытое сообщение не найдено (неверные параметры или пустой носитель)")
+    length = int.from_bytes(header[len(MAGIC):], 'big')
+    if length > capacity(pixels, bits, channels):
+        raise ValueError("Поврежденный заголовок: длина превышает емкость изображения")
+    return read(HEADER_SIZE + length)[HEADER_SIZE:]
+
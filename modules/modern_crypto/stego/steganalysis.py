@@ -0,0 +1,328 @@
+"""Статистический стеганоанализ LSB-замены.
+
+Три классических детектора по всему носителю:
+
+* хи-квадрат атака Вестфельда-Пфитцмана - выравнивание частот пар
+  значений (2k, 2k+1);
+* RS-анализ Фридрих - доли регулярных и сингулярных групп пикселей
+  при инвертировании LSB по маске;
+* анализ пар отсчетов (SPA) Думитреску-Ву-Ванга.
+
+Все подсчеты - векторные операции NumPy над всем массивом. Карты строятся
+из сумм по ячейкам шага step, суммы по окнам получаются из
+интегрального изображения, так что окна могут перекрываться без
+повторного прохода по пикселям.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.stats import chi2
+
+RS_MASK = np.array([0, 1, 1, 0], dtype=bool)
+CHI_SQUARE_MIN_COUNT = 5  # пары с меньшей суммарной частотой не учитываются
+
+
+@dataclass
+class SteganalysisReport:
+    """Результаты всех детекторов"""
+    chi_square_p: float
+    chi_square_curve: np.ndarray
+    chi_square_rate: float
+    rs_rate: float
+    rs_groups: Dict[str, float]
+    spa_rate: float
+    heatmaps: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @property
+    def embedding_rate(self) -> float:
+        """Итоговая оценка доли носителей со встроенными битами"""
+        return float(np.clip(np.mean([self.rs_rate, self.spa_rate]), 0.0, 1.0))
+
+    @property
+    def suspicious(self) -> bool:
+        return self.chi_square_p > 0.5 or self.embedding_rate > 0.05
+
+    def score(self, use_chi_square: bool = True) -> float:
+        """Сводная уверенность 0..1: p-значение хи-квадрат или оценка доли (20% и выше - максимум)"""
+        confidence = self.embedding_rate / 0.2
+        if use_chi_square:
+            confidence = max(confidence, self.chi_square_p)
+        return float(min(1.0, confidence))
+
+
+# --- Хи-квадрат ----------------------------------------------------------
+
+def chi_square_statistic(histograms: np.ndarray) -> np.ndarray:
+    """p-значение хи-квадрат атаки для гистограмм формы (..., 2k)
+
+    Близкое к 1 значение означает, что частоты внутри пар выровнены, -
+    характерный след LSB-замены.
+    """
+    even = histograms[..., 0::2].astype(np.float64)
+    odd = histograms[..., 1::2].astype(np.float64)
+    total = even + odd
+    used = total >= CHI_SQUARE_MIN_COUNT
+    expected = np.where(used, total / 2, 1.0)
+    statistic = np.where(used, (even - expected) ** 2 / expected, 0.0).sum(axis=-1)
+    degrees = used.sum(axis=-1) - 1
+    p_values = chi2.sf(statistic, np.maximum(degrees, 1))
+    return np.where(degrees > 0, p_values, 0.0)
+
+
+def _bins(values: np.ndarray) -> int:
+    return 1 << (8 * min(values.dtype.itemsize, 2))
+
+
+def _unsigned(values: np.ndarray) -> np.ndarray:
+    """Сдвиг знаковых отсчетов в неотрицательный диапазон (четность сохраняется)"""
+    if values.dtype.kind == 'i':
+        return values.astype(np.int64) + (1 << (8 * values.dtype.itemsize - 1))
+    return values
+
+
+def _histogram_values(values: np.ndarray) -> np.ndarray:
+    """Номера столбцов гистограммы: для отсчетов шире 16 бит - младшие 16 бит.
+
+    Пары (2k, 2k+1) при этом не разрываются, поэтому хи-квадрат не меняется
+    по смыслу, а число столбцов остается не больше 65536.
+    """
+    if values.dtype.itemsize > 2:
+        return _unsigned(values) & 0xFFFF
+    return _unsigned(values)
+
+
+def chi_square_attack(values: np.ndarray, segments: int = 100) -> Tuple[float, np.ndarray, float]:
+    """Атака на последовательное встраивание.
+
+    values - носители в порядке встраивания. Возвращает p-значение для всего
+    массива, кривую p-значений по растущим префиксам и оценку доли
+    встроенных данных (префикс, на котором p держится выше 0.5).
+    """
+    flat = _histogram_values(values.reshape(-1))
+    bins = _bins(values)
+    segments = max(1, min(segments, len(flat)))
+    bounds = np.linspace(0, len(flat), segments + 1).astype(np.int64)
+    segment_index = np.repeat(np.arange(segments), np.diff(bounds))
+
+    histograms = np.bincount(segment_index * bins + flat, minlength=segments * bins).reshape(segments, bins)
+    curve = chi_square_statistic(np.cumsum(histograms, axis=0))
+
+    below = np.flatnonzero(curve <= 0.5)
+    rate = 1.0 if not len(below) else below[0] / segments
+    return float(curve[-1]), curve, float(rate)
+
+
+def chi_square_map(values: np.ndarray, window: int, step: int) -> np.ndarray:
+    """p-значения хи-квадрат в скользящих окнах; values формы (H, W) или (H, W, C)"""
+    height, width = values.shape[:2]
+    rows, cols = height // step, width // step
+    bins = _bins(values)
+    # Номер ячейки внутри полосы высотой step - один и тот же для всех полос
+    band_index = np.repeat(np.arange(cols) * bins, step)[None, :]
+    if values.ndim == 3:
+        band_index = band_index[..., None]
+    histograms = np.empty((rows, cols, bins), dtype=np.int64)
+    for row in range(rows):
+        band = _histogram_values(values[row * step:(row + 1) * step, :cols * step])
+        histograms[row] = np.bincount(
+            (band_index + band).reshape(-1), minlength=cols * bins
+        ).reshape(cols, bins)
+    return chi_square_statistic(_window_sums(histograms, window // step))
+
+
+# --- RS-анализ -----------------------------------------------------------
+
+def flip_positive(values: np.ndarray) -> np.ndarray:
+    """F1: 2k <-> 2k+1"""
+    return values ^ 1
+
+
+def flip_negative(values: np.ndarray) -> np.ndarray:
+    """F-1: 2k-1 <-> 2k"""
+    return ((values + 1) ^ 1) - 1
+
+
+def _working_type(channel: np.ndarray) -> np.ndarray:
+    """int16 для 8-битных носителей (достаточно для разностей), иначе int64"""
+    return channel.astype(np.int16 if channel.dtype.itemsize == 1 else np.int64)
+
+
+def _rs_flags(channel: np.ndarray) -> Dict[str, np.ndarray]:
+    """Флаги R/S для каждой группы из 4 соседних пикселей строки в четырех условиях.
+
+    Маска RS_MASK меняет только два средних пикселя группы, поэтому гладкость
+    после инвертирования считается по столбцам-представлениям без np.where.
+    """
+    height, width = channel.shape
+    groups = _working_type(channel[:, :width - width % 4]).reshape(height, -1, 4)
+    flags = {}
+    for suffix, base in (("", groups), ("_inv", flip_positive(groups))):
+        first, second, third, fourth = (base[..., index] for index in range(4))
+        base_smoothness = np.abs(second - first) + np.abs(third - second) + np.abs(fourth - third)
+        for name, flip in (("M", flip_positive), ("-M", flip_negative)):
+            second_flipped, third_flipped = flip(second), flip(third)
+            changed = (np.abs(second_flipped - first) + np.abs(third_flipped - second_flipped)
+                       + np.abs(fourth - third_flipped))
+            flags[f"R{name}{suffix}"] = changed > base_smoothness
+            flags[f"S{name}{suffix}"] = changed < base_smoothness
+    return flags
+
+
+def rs_estimate(counts: Dict[str, np.ndarray], total) -> np.ndarray:
+    """Оценка доли встраивания по долям групп (работает и для массивов окон)"""
+    share = {name: value / np.maximum(total, 1) for name, value in counts.items()}
+    d0 = share["RM"] - share["SM"]
+    d1 = share["RM_inv"] - share["SM_inv"]
+    dn0 = share["R-M"] - share["S-M"]
+    dn1 = share["R-M_inv"] - share["S-M_inv"]
+
+    a = 2 * (d1 + d0)
+    b = dn0 - dn1 - d1 - 3 * d0
+    c = d0 - dn0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(b * b - 4 * a * c, 0))
+        roots = np.stack([(-b + root) / (2 * a), (-b - root) / (2 * a)])
+        linear = np.where(b != 0, -c / b, 0.0)
+        z = np.where(np.abs(a) > 1e-12, np.take_along_axis(
+            roots, np.argmin(np.abs(roots), axis=0)[None], axis=0)[0], linear)
+        rate = z / (z - 0.5)
+    return np.clip(np.nan_to_num(rate), 0.0, 1.0)
+
+
+def _rs_counts(flags: Dict[str, np.ndarray]) -> Tuple[float, Dict[str, float]]:
+    total = next(iter(flags.values())).size
+    counts = {name: np.count_nonzero(value) for name, value in flags.items()}
+    rate = float(rs_estimate(counts, total))
+    return rate, {name: count / max(total, 1) for name, count in counts.items()}
+
+
+def _rs_window_map(flags: Dict[str, np.ndarray], window: int, step: int) -> np.ndarray:
+    cells = {name: _cell_sums(value, step, step // 4) for name, value in flags.items()}
+    k = window // step
+    counts = {name: _window_sums(value, k) for name, value in cells.items()}
+    return rs_estimate(counts, (window * window) // 4)
+
+
+def rs_analysis(channel: np.ndarray) -> Tuple[float, Dict[str, float]]:
+    """RS-анализ одного канала; возвращает оценку доли и доли групп"""
+    return _rs_counts(_rs_flags(_unsigned(channel)))
+
+
+def rs_map(channel: np.ndarray, window: int, step: int) -> np.ndarray:
+    """RS-оценка доли встраивания в скользящих окнах (step кратен 4)"""
+    return _rs_window_map(_rs_flags(_unsigned(channel)), window, step)
+
+
+# --- Анализ пар отсчетов (SPA) ------------------------------------------
+
+def _spa_flags(channel: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Флаги X, Y и K для пар соседних по горизонтали отсчетов"""
+    values = _working_type(_unsigned(channel))
+    u, v = values[:, :-1], values[:, 1:]
+    v_even = (v & 1) == 0
+    less, greater = u < v, u > v
+    x = np.where(v_even, less, greater)
+    y = np.where(v_even, greater, less)
+    k = (u >> 1) == (v >> 1)
+    return x, y, k
+
+
+def spa_estimate(x, y, k, total) -> np.ndarray:
+    """Оценка SPA: меньший корень 2k·q² + 2(2x - P)·q + (y - x) = 0.
+
+    q - доля отсчетов с инвертированным LSB; при случайном сообщении
+    инвертируется половина носителей, поэтому доля встраивания равна 2q.
+    """
+    a = 2.0 * k
+    b = 2.0 * (2.0 * x - total)
+    c = y - x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        root = np.sqrt(np.maximum(b * b - 4 * a * c, 0))
+        flipped = np.minimum((-b + root) / (2 * a), (-b - root) / (2 * a))
+    return np.clip(np.nan_to_num(2 * flipped), 0.0, 1.0)
+
+
+def _spa_window_map(flags: Tuple[np.ndarray, ...], window: int, step: int) -> np.ndarray:
+    k = window // step
+    x, y, same = (_window_sums(_cell_sums(np.pad(flag, ((0, 0), (0, 1))), step, step), k) for flag in flags)
+    return spa_estimate(x, y, same, window * (window - 1))
+
+
+def spa_analysis(channel: np.ndarray) -> float:
+    """SPA-оценка доли встраивания по всему каналу"""
+    x, y, k = _spa_flags(channel)
+    return float(spa_estimate(np.count_nonzero(x), np.count_nonzero(y), np.count_nonzero(k), x.size))
+
+
+def spa_map(channel: np.ndarray, window: int, step: int) -> np.ndarray:
+    """SPA-оценка в скользящих окнах"""
+    return _spa_window_map(_spa_flags(channel), window, step)
+
+
+# --- Общие функции -------------------------------------------------------
+
+def _cell_sums(flags: np.ndarray, cell_height: int, cell_width: int) -> np.ndarray:
+    """Суммы по непересекающимся ячейкам (хвосты, не кратные ячейке, отбрасываются)"""
+    rows, cols = flags.shape[0] // cell_height, flags.shape[1] // cell_width
+    trimmed = flags[:rows * cell_height, :cols * cell_width]
+    return trimmed.reshape(rows, cell_height, cols, cell_width, *flags.shape[2:]).sum(axis=(1, 3))
+
+
+def _window_sums(cells: np.ndarray, k: int) -> np.ndarray:
+    """Суммы по всем окнам k x k ячеек через интегральное изображение"""
+    k = max(1, min(k, cells.shape[0], cells.shape[1]))
+    integral = np.zeros((cells.shape[0] + 1, cells.shape[1] + 1) + cells.shape[2:], dtype=np.int64)
+    integral[1:, 1:] = cells.cumsum(axis=0).cumsum(axis=1)
+    return integral[k:, k:] - integral[:-k, k:] - integral[k:, :-k] + integral[:-k, :-k]
+
+
+def analyze(values: np.ndarray, window: Optional[int] = 64, step: Optional[int] = 32,
+            segments: int = 100) -> SteganalysisReport:
+    """Полный анализ изображения (H, W[, C]) или аудио (1, N).
+
+    Хи-квадрат считается по всем каналам в порядке LSB-встраивания, RS и SPA -
+    по каждому каналу с усреднением. window=None отключает построение карт.
+    """
+    chi_p, curve, chi_rate = chi_square_attack(values, segments)
+    channels = [values] if values.ndim == 2 else [values[..., index] for index in range(values.shape[2])]
+
+    with_maps = bool(window) and values.shape[0] >= window and values.shape[1] >= window
+    if with_maps:
+        step = max(4, min(step or window, window) // 4 * 4)
+        window = window // step * step
+
+    # Флаги каждого канала считаются один раз: из них получаются и общие
+    # оценки, и суммы по ячейкам для карт
+    rs_results, spa_rates, rs_maps, spa_maps = [], [], [], []
+    for channel in channels:
+        flags = _rs_flags(_unsigned(channel))
+        rs_results.append(_rs_counts(flags))
+        if with_maps:
+            rs_maps.append(_rs_window_map(flags, window, step))
+        del flags
+
+        x, y, k = spa_flags = _spa_flags(channel)
+        spa_rates.append(float(spa_estimate(np.count_nonzero(x), np.count_nonzero(y), np.count_nonzero(k), x.size)))
+        if with_maps:
+            spa_maps.append(_spa_window_map(spa_flags, window, step))
+
+    rs_rate = float(np.mean([rate for rate, _ in rs_results]))
+    rs_groups = {name: float(np.mean([groups[name] for _, groups in rs_results])) for name in rs_results[0][1]}
+    spa_rate = float(np.mean(spa_rates))
+
+    heatmaps = {}
+    if with_maps:
+        heatmaps["Хи-квадрат (p)"] = chi_square_map(values, window, step)
+        heatmaps["RS (доля)"] = np.mean(rs_maps, axis=0)
+        heatmaps["SPA (доля)"] = np.mean(spa_maps, axis=0)
+
+    return SteganalysisReport(
+        chi_square_p=chi_p,
+        chi_square_curve=curve,
+        chi_square_rate=chi_rate,
+        rs_rate=rs_rate,
+        rs_groups=rs_groups,
+        spa_rate=spa_rate,
+        heatmaps=heatmaps,
+    )
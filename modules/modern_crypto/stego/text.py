@@ -0,0 +1,153 @@
+"""Текстовая стеганография: невидимые символы и пробелы между словами.
+
+Оба кодека записывают ``MAGIC | длина (4 байта) | сообщение`` и работают
+с итерируемыми строками (например, с открытым файлом): каждая строка
+обрабатывается и отдается сразу, поэтому память ограничена длиной строки
+и сообщения, а не документа. Биты переводятся в символы таблицами
+str.translate и собираются через join - без посимвольных конкатенаций.
+"""
+from typing import Iterable, Iterator, List, Tuple
+import re
+
+from modules.modern_crypto.stego.lsb import HEADER_SIZE, MAGIC
+
+ZERO_WIDTH = ('\u200b', '\u200c')  # бит 0 и бит 1
+WORD_GAPS = (' ', '  ')            # одинарный пробел - 0, двойной - 1
+
+_BYTE_BITS = [format(value, '08b') for value in range(256)]
+_ZERO_WIDTH_SYMBOLS = str.maketrans('01', ''.join(ZERO_WIDTH))
+_ZERO_WIDTH_BITS = str.maketrans({ZERO_WIDTH[0]: '0', ZERO_WIDTH[1]: '1'})
+_ZERO_WIDTH_PATTERN = re.compile(f"[{''.join(ZERO_WIDTH)}]+")
+_WORD_GAP_PATTERN = re.compile(r'(?<=\S)( {1,2})(?=\S)')
+_HIGHLIGHT = str.maketrans({ZERO_WIDTH[0]: '[0]', ZERO_WIDTH[1]: '[1]', ' ': '_'})
+
+
+def _bits(payload: bytes) -> str:
+    """Строка '0'/'1' для заголовка и сообщения"""
+    data = MAGIC + len(payload).to_bytes(4, 'big') + payload
+    return ''.join(map(_BYTE_BITS.__getitem__, data))
+
+
+def _split_ending(line: str) -> Tuple[str, str]:
+    """Отделяет перевод строки, чтобы не встраивать биты после него"""
+    body = line.rstrip('\r\n')
+    return body, line[len(body):]
+
+
+def _interleave(first: List[str], second: List[str]) -> str:
+    """first[0] second[0] first[1] second[1] ... (len(first) >= len(second))"""
+    merged = [''] * (2 * len(first))
+    merged[0::2] = first
+    merged[1:2 * len(second):2] = second
+    return ''.join(merged)
+
+
+class _BitCollector:
+    """Собирает биты до конца сообщения, длина которого известна из заголовка"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.count = 0
+        self.needed = HEADER_SIZE * 8
+
+    def add(self, bits: str) -> bool:
+        """Добавляет биты; True, когда сообщение собрано целиком"""
+        self.parts.append(bits)
+        self.count += len(bits)
+        if self.needed == HEADER_SIZE * 8 and self.count >= self.needed:
+            header = self._bytes(HEADER_SIZE * 8)
+            if header[:len(MAGIC)] != MAGIC:
+                raise ValueError("Скрытое сообщение не найдено")
+            self.needed += int.from_bytes(header[len(MAGIC):], 'big') * 8
+        return self.count >= self.needed
+
+    def _bytes(self, bit_count: int) -> bytes:
+        bits = ''.join(self.parts)
+        self.parts = [bits]
+        return int(bits[:bit_count], 2).to_bytes(bit_count // 8, 'big')
+
+    def payload(self) -> bytes:
+        if self.count < self.needed:
+            raise ValueError("Сообщение обрывается: текст поврежден или обрезан")
+        return self._bytes(self.needed)[HEADER_SIZE:]
+
+
+def zero_width_encode(lines: Iterable[str], payload: bytes) -> Iterator[str]:
+    """Вставляет по одному невидимому символу после каждого символа текста.
+
+    Биты, не поместившиеся в текст, дописываются в конец последней строки,
+    так что емкость не ограничена.
+    """
+    symbols = _bits(payload).translate(_ZERO_WIDTH_SYMBOLS)
+    position = 0
+    previous = None
+    for line in lines:
+        if previous is not None:
+            yield previous
+        body, ending = _split_ending(line)
+        count = min(len(body), len(symbols) - position)
+        chunk = _interleave(list(body[:count]), list(symbols[position:position + count]))
+        position += count
+        previous = chunk + body[count:] + ending
+    if previous is None:
+        previous = ""
+    body, ending = _split_ending(previous)
+    yield body + symbols[position:] + ending
+
+
+def zero_width_decode(lines: Iterable[str]) -> bytes:
+    """Извлекает сообщение из невидимых символов; читает строки только до конца сообщения"""
+    collector = _BitCollector()
+    for line in lines:
+        found = _ZERO_WIDTH_PATTERN.findall(line)
+        if found and collector.add(''.join(found).translate(_ZERO_WIDTH_BITS)):
+            break
+    return collector.payload()
+
+
+def whitespace_capacity(lines: Iterable[str]) -> int:
+    """Сколько байт сообщения помещается в промежутки между словами"""
+    gaps = sum(max(len(line.split()) - 1, 0) for line in lines)
+    return max(gaps // 8 - HEADER_SIZE, 0)
+
+
+def whitespace_encode(lines: Iterable[str], payload: bytes) -> Iterator[str]:
+    """Кодирует биты шириной промежутков между словами (пробел - 0, два пробела - 1).
+
+    Пробельные символы внутри строки нормализуются; ValueError, если
+    промежутков не хватило.
+    """
+    bits = _bits(payload)
+    position = 0
+    for line in lines:
+        body, ending = _split_ending(line)
+        words = body.split()
+        gaps = max(len(words) - 1, 0)
+        count = min(gaps, len(bits) - position)
+        separators = [WORD_GAPS[bit == '1'] for bit in bits[position:position + count]]
+        separators += [WORD_GAPS[0]] * (gaps - count)
+        position += count
+        yield _interleave(words, separators) + ending
+    if position < len(bits):
+        raise ValueError(
+            f"Текст слишком короткий: нужно {len(bits)} промежутков между словами, есть {position}"
+        )
+
+
+def whitespace_decode(lines: Iterable[str]) -> bytes:
+    """Извлекает сообщение из промежутков между словами"""
+    collector = _BitCollector()
+    for line in lines:
+        gaps = _WORD_GAP_PATTERN.findall(line)
+        if gaps and collector.add(''.join('1' if len(gap) == 2 else '0' for gap in gaps)):
+            break
+    return collector.payload()
+
+
+def highlight(text: str) -> str:
+    """Показывает невидимые символы как [0]/[1], пробелы - как _"""
+    return text.translate(_HIGHLIGHT)
+
+
+def count_zero_width(text: str) -> int:
+    return sum(text.count(symbol) for symbol in ZERO_WIDTH)
@@ -0,0 +1,435 @@
+"""Хранилище блоков на диске: журнал только для дозаписи и индексы через mmap.
+
+Каталог хранилища содержит три файла:
+
+* blocks.dat - журнал записей [магия 'BLK1' | длина | CRC32 | хеш блока | данные];
+* index.dat - записи фиксированной ширины (смещение, длина, хеш блока)
+  по высоте: запись блока h лежит по смещению h * 44, поэтому выборка по
+  высоте - O(1) без чтения журнала;
+* hashes.dat - хеш-таблица с открытой адресацией (хеш блока -> высота)
+  для выборки по хешу за O(1); она производная и перестраивается по
+  index.dat, если не совпадает с ним.
+
+Индексный файл и хеш-таблица отображаются в память (mmap), журнал читается
+os.pread, так что в памяти процесса остаются только страницы, к которым
+обращались. Запись блока: сначала данные в журнал, затем запись индекса.
+После сбоя хвост журнала без индекса проверяется по CRC и индексируется
+заново или обрезается, а записи индекса за концом журнала отбрасываются.
+
+Запись заново отображает индекс и перестраивает хеш-таблицу, закрывая
+старые отображения, поэтому чтение и запись из разных потоков
+выполняются под общей блокировкой хранилища (lock).
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+MAGIC = b'BLK1'
+RECORD_HEADER = struct.Struct('<4sII')     # магия, длина, CRC32
+INDEX_ENTRY = struct.Struct('<QI32s')      # смещение, длина, хеш блока
+HASH_HEADER = struct.Struct('<QQ')         # емкость, число записей
+HASH_SLOT = struct.Struct('<32sQ')         # хеш блока, высота + 1 (0 - пустая ячейка)
+CACHE_ENV = "CRYPTOLAB_CACHE_DIR"
+MIN_HASH_CAPACITY = 1 << 10
+CACHE_SIZE = 256
+SCAN_BATCH = 1024
+
+
+class BlockStoreError(Exception):
+    """Ошибка хранилища блоков"""
+
+
+def default_directory(name: str) -> str:
+    """Каталог хранилища цепочки: $CRYPTOLAB_CACHE_DIR или ~/.cache/cryptolab, подкаталог chains/<name>"""
+    base = os.environ.get(CACHE_ENV) or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "cryptolab")
+    return os.path.join(base, "chains", name)
+
+
+class BlockStore:
+    """Журнал сериализованных блоков с индексами по высоте и хешу"""
+
+    def __init__(self, directory: str, sync: bool = True):
+        self.directory = directory
+        self.sync = sync
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+        self._log = open(os.path.join(directory, 'blocks.dat'), 'a+b')
+        self._index = open(os.path.join(directory, 'index.dat'), 'a+b')
+        self._index_map: Optional[mmap.mmap] = None
+        self._hashes_map: Optional[mmap.mmap] = None
+        self._hashes_file = None
+        self._recover()
+        self._open_hash_table()
+
+    # Восстановление после сбоя
+
+    def _recover(self) -> None:
+        """Согласует индекс с журналом: отбрасывает висячие записи индекса и индексирует хвост журнала"""
+        log_size = os.fstat(self._log.fileno()).st_size
+        index_size = os.fstat(self._index.fileno()).st_size
+        count = index_size // INDEX_ENTRY.size
+        end = 0
+        while count:
+            offset, length, _ = self._read_entry_from_file(count - 1)
+            end = offset + RECORD_HEADER.size + length
+            if end <= log_size:
+                break
+            count -= 1
+            end = 0
+        if count * INDEX_ENTRY.size != index_size:
+            self._index.truncate(count * INDEX_ENTRY.size)
+
+        # Хвост журнала за последней проиндексированной записью
+        entries = []
+        offset = end
+        while offset + RECORD_HEADER.size <= log_size:
+            header = os.pread(self._log.fileno(), RECORD_HEADER.size, offset)
+            magic, length, checksum = RECORD_HEADER.unpack(header)
+            if magic != MAGIC or offset + RECORD_HEADER.size + length > log_size:
+                break
+            payload = os.pread(self._log.fileno(), length, offset + RECORD_HEADER.size)
+            if zlib.crc32(payload) != checksum:
+                break
+            entries.append(INDEX_ENTRY.pack(offset, length, payload[:32]))
+            offset += RECORD_HEADER.size + length
+        if offset != log_size:
+            self._log.truncate(offset)
+        if entries:
+            self._index.seek(0, os.SEEK_END)
+            self._index.write(b''.join(entries))
+        self._flush(self._log)
+        self._flush(self._index)
+        self._length = count + len(entries)
+        self._log_size = offset
+
+    def _read_entry_from_file(self, height: int) -> Tuple[int, int, bytes]:
+        return INDEX_ENTRY.unpack(os.pread(self._index.fileno(), INDEX_ENTRY.size, height * INDEX_ENTRY.size))
+
+    def _flush(self, stream) -> None:
+        stream.flush()
+        if self.sync:
+            os.fsync(stream.fileno())
+
+    # Индекс по высоте
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _entry(self, height: int) -> Tuple[int, int, bytes]:
+        if not 0 <= height < self._length:
+            raise IndexError(f"Блока с высотой {height} нет в хранилище")
+        if self._index_map is None or len(self._index_map) < (height + 1) * INDEX_ENTRY.size:
+            # Файл вырос после отображения - отображаем заново
+            if self._index_map is not None:
+                self._index_map.close()
+            self._index_map = mmap.mmap(self._index.fileno(), self._length * INDEX_ENTRY.size,
+                                        access=mmap.ACCESS_READ)
+        return INDEX_ENTRY.unpack_from(self._index_map, height * INDEX_ENTRY.size)
+
+    def block_hash(self, height: int) -> bytes:
+        with self.lock:
+            return self._entry(height)[2]
+
+    def get(self, height: int) -> bytes:
+        """Данные блока по высоте: одна запись индекса и одно чтение журнала"""
+        with self.lock:
+            offset, length, _ = self._entry(height)
+            return self._read_payload(offset, length)
+
+    def _read_payload(self, offset: int, length: int) -> bytes:
+        # Первые 32 байта записи - хеш блока
+        return os.pread(self._log.fileno(), length - 32, offset + RECORD_HEADER.size + 32)
+
+    def scan(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+        """(высота, данные) блоков [start, stop): журнал читается последовательно порциями по SCAN_BATCH записей"""
+        stop = self._length if stop is None else min(stop, self._length)
+        for batch_start in range(max(start, 0), stop, SCAN_BATCH):
+            # Блокировка берется на порцию, а не на весь обход: между порциями хранилище могут обрезать
+            with self.lock:
+                batch_stop = min(batch_start + SCAN_BATCH, stop, self._length)
+                if batch_start >= batch_stop:
+                    return
+                first_offset = self._entry(batch_start)[0]
+                last_offset, last_length, _ = self._entry(batch_stop - 1)
+                data = os.pread(self._log.fileno(), last_offset + RECORD_HEADER.size + last_length - first_offset,
+                                first_offset)
+            position = 0
+            for height in range(batch_start, batch_stop):
+                _, length, _ = RECORD_HEADER.unpack_from(data, position)
+                begin = position + RECORD_HEADER.size
+                yield height, data[begin + 32:begin + length]
+                position = begin + length
+
+    # Индекс по хешу
+
+    def _open_hash_table(self) -> None:
+        path = os.path.join(self.directory, 'hashes.dat')
+        if os.path.exists(path) and os.path.getsize(path) >= HASH_HEADER.size:
+            self._hashes_file = open(path, 'r+b')
+            self._hashes_map = mmap.mmap(self._hashes_file.fileno(), 0)
+            capacity, count = HASH_HEADER.unpack_from(self._hashes_map, 0)
+            if count == self._length and len(self._hashes_map) == HASH_HEADER.size + capacity * HASH_SLOT.size:
+                self._capacity, self._hash_count = capacity, count
+                return
+        self._rebuild_hash_table()
+
+    def _rebuild_hash_table(self, capacity: Optional[int] = None) -> None:
+        """Строит хеш-таблицу по index.dat заново (при расхождении или росте)"""
+        capacity = capacity or max(MIN_HASH_CAPACITY, 1 << (2 * self._length).bit_length())
+        path = os.path.join(self.directory, 'hashes.dat')
+        temporary = f"{path}.tmp"
+        with open(temporary, 'wb') as stream:
+            stream.truncate(HASH_HEADER.size + capacity * HASH_SLOT.size)
+        if self._hashes_map is not None:
+            self._hashes_map.close()
+            self._hashes_file.close()
+        os.replace(temporary, path)
+        self._hashes_file = open(path, 'r+b')
+        self._hashes_map = mmap.mmap(self._hashes_file.fileno(), 0)
+        self._capacity, self._hash_count = capacity, 0
+        for height in range(self._length):
+            self._hash_insert(self.block_hash(height), height)
+        self._write_hash_header()
+
+    def _write_hash_header(self) -> None:
+        HASH_HEADER.pack_into(self._hashes_map, 0, self._capacity, self._hash_count)
+
+    def _slot(self, block_hash: bytes) -> int:
+        # Младшие байты хеша: старшие у блоков с Proof of Work нулевые
+        return int.from_bytes(block_hash[-8:], 'little') & (self._capacity - 1)
+
+    def _slot_offset(self, slot: int) -> int:
+        return HASH_HEADER.size + slot * HASH_SLOT.size
+
+    def _hash_insert(self, block_hash: bytes, height: int) -> None:
+        slot = self._slot(block_hash)
+        while HASH_SLOT.unpack_from(self._hashes_map, self._slot_offset(slot))[1]:
+            slot = (slot + 1) & (self._capacity - 1)
+        HASH_SLOT.pack_into(self._hashes_map, self._slot_offset(slot), block_hash, height + 1)
+        self._hash_count += 1
+
+    def _hash_delete(self, block_hash: bytes, height: int) -> None:
+        """Удаление с обратным сдвигом (без меток удаления) для линейного пробирования"""
+        mask = self._capacity - 1
+        slot = self._slot(block_hash)
+        while True:
+            stored, value = HASH_SLOT.unpack_from(self._hashes_map, self._slot_offset(slot))
+            if not value:
+                return
+            if stored == block_hash and value == height + 1:
+                break
+            slot = (slot + 1) & mask
+        hole = slot
+        slot = (slot + 1) & mask
+        while True:
+            stored, value = HASH_SLOT.unpack_from(self._hashes_map, self._slot_offset(slot))
+            if not value:
+                break
+            home = self._slot(stored)
+            # Запись можно переместить в дыру, если дыра лежит между ее домашней ячейкой и текущей
+            if (slot - home) & mask >= (slot - hole) & mask:
+                HASH_SLOT.pack_into(self._hashes_map, self._slot_offset(hole), stored, value)
+                hole = slot
+            slot = (slot + 1) & mask
+        HASH_SLOT.pack_into(self._hashes_map, self._slot_offset(hole), bytes(32), 0)
+        self._hash_count -= 1
+
+    def height_of(self, block_hash: bytes) -> Optional[int]:
+        """Высота блока по хешу или None"""
+        with self.lock:
+            slot = self._slot(block_hash)
+            while True:
+                stored, value = HASH_SLOT.unpack_from(self._hashes_map, self._slot_offset(slot))
+                if not value:
+                    return None
+                if stored == block_hash:
+                    return value - 1
+                slot = (slot + 1) & (self._capacity - 1)
+
+    def get_by_hash(self, block_hash: bytes) -> Optional[bytes]:
+        with self.lock:
+            height = self.height_of(block_hash)
+            return None if height is None else self.get(height)
+
+    # Запись
+
+    def append(self, block_hash: bytes, payload: bytes) -> int:
+        """Дописывает блок; возвращает его высоту"""
+        return self.extend([(block_hash, payload)])
+
+    def extend(self, items: Sequence[Tuple[bytes, bytes]]) -> int:
+        """Дописывает пачку блоков с одной синхронизацией на диск; возвращает высоту последнего"""
+        if any(len(block_hash) != 32 for block_hash, _ in items):
+            raise BlockStoreError("Хеш блока должен занимать 32 байта")
+        with self.lock:
+            return self._extend(items)
+
+    def _extend(self, items: Sequence[Tuple[bytes, bytes]]) -> int:
+        records, entries = [], []
+        offset = self._log_size
+        for block_hash, payload in items:
+            data = block_hash + payload
+            records.append(RECORD_HEADER.pack(MAGIC, len(data), zlib.crc32(data)))
+            records.append(data)
+            entries.append(INDEX_ENTRY.pack(offset, len(data), block_hash))
+            offset += RECORD_HEADER.size + len(data)
+        # Порядок важен для восстановления: журнал на диске раньше индекса
+        self._log.seek(0, os.SEEK_END)
+        self._log.write(b''.join(records))
+        self._flush(self._log)
+        self._index.seek(0, os.SEEK_END)
+        self._index.write(b''.join(entries))
+        self._flush(self._index)
+        first = self._length
+        self._length += len(items)
+        self._log_size = offset
+        if (self._hash_count + len(items)) * 2 > self._capacity:
+            self._rebuild_hash_table(1 << (2 * self._length).bit_length())
+        else:
+            for height, (block_hash, _) in enumerate(items, start=first):
+                self._hash_insert(block_hash, height)
+            self._write_hash_header()
+        return self._length - 1
+
+    def truncate(self, height: int) -> None:
+        """Удаляет блоки с высоты height и выше (откат вершины при реорганизации)"""
+        with self.lock:
+            self._truncate(height)
+
+    def _truncate(self, height: int) -> None:
+        if not 0 <= height <= self._length:
+            raise IndexError(f"Высота {height} вне хранилища")
+        if height == self._length:
+            return
+        for removed in range(self._length - 1, height - 1, -1):
+            self._hash_delete(self.block_hash(removed), removed)
+        self._write_hash_header()
+        offset = self._entry(height)[0]
+        if self._index_map is not None:
+            self._index_map.close()
+            self._index_map = None
+        # Сначала индекс: запись журнала без индекса при сбое будет проиндексирована заново
+        self._index.truncate(height * INDEX_ENTRY.size)
+        self._flush(self._index)
+        self._log.truncate(offset)
+        self._flush(self._log)
+        self._length, self._log_size = height, offset
+
+    def disk_size(self) -> int:
+        """Байт на диске во всех трех файлах"""
+        with self.lock:
+            return (self._log_size + self._length * INDEX_ENTRY.size
+                    + HASH_HEADER.size + self._capacity * HASH_SLOT.size)
+
+    def close(self) -> None:
+        with self.lock:
+            self._close()
+
+    def _close(self) -> None:
+        for mapping in (self._index_map, self._hashes_map):
+            if mapping is not None:
+                mapping.close()
+        self._index_map = self._hashes_map = None
+        for stream in (self._log, self._index, self._hashes_file):
+            if stream is not None:
+                stream.close()
+
+    def __enter__(self) -> "BlockStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class StoredBlocks:
+    """Последовательность блоков поверх BlockStore с интерфейсом списка.
+
+    Блоки декодируются при обращении; последние CACHE_SIZE прочитанных
+    держатся в памяти. Кэш общий для потоков и меняется под блокировкой
+    хранилища.
+    """
+
+    def __init__(self, store: BlockStore, encode: Callable[[Any], Tuple[bytes, bytes]],
+                 decode: Callable[[bytes, bytes], Any]):
+        self.store = store
+        self.encode = encode    # блок -> (хеш, данные)
+        self.decode = decode    # (хеш, данные) -> блок
+        self._cache: "OrderedDict[int, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _load(self, height: int) -> Any:
+        with self.store.lock:
+            block = self._cache.get(height)
+            if block is None:
+                block = self.decode(self.store.block_hash(height), self.store.get(height))
+                self._remember(height, block)
+            else:
+                self._cache.move_to_end(height)
+            return block
+
+    def _remember(self, height: int, block: Any) -> None:
+        self._cache[height] = block
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self._load(height) for height in range(start, stop, step)]
+            return list(self.range(start, stop))
+        with self.store.lock:
+            height = item + len(self) if item < 0 else item
+            if not 0 <= height < len(self):
+                raise IndexError("Номер блока вне цепочки")
+            return self._load(height)
+
+    def range(self, start: int, stop: Optional[int] = None) -> Iterator[Any]:
+        """Блоки [start, stop) последовательным чтением"""
+        for height, payload in self.store.scan(start, stop):
+            with self.store.lock:
+                block = self._cache.get(height)
+                block_hash = None if block is not None else self.store.block_hash(height)
+            yield block if block is not None else self.decode(block_hash, payload)
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.range(0)
+
+    def by_hash(self, block_hash: bytes) -> Optional[Any]:
+        with self.store.lock:
+            height = self.store.height_of(block_hash)
+            return None if height is None else self._load(height)
+
+    def append(self, block: Any) -> None:
+        self.extend([block])
+
+    def extend(self, blocks: Sequence[Any]) -> None:
+        blocks = list(blocks)
+        if not blocks:
+            return
+        encoded = [self.encode(block) for block in blocks]
+        with self.store.lock:
+            first = len(self)
+            self.store.extend(encoded)
+            for height, block in enumerate(blocks, start=first):
+                self._remember(height, block)
+
+    def pop(self) -> Any:
+        with self.store.lock:
+            block = self[-1]
+            height = len(self) - 1
+            self.store.truncate(height)
+            self._cache.pop(height, None)
+            return block
+
+    def tail(self, count: int) -> List[Any]:
+        with self.store.lock:
+            start = max(0, len(self) - count)
+        return self[start:]
@@ -0,0 +1,389 @@
+"""Индексированное состояние цепочки с инкрементной проверкой блоков.
+
+Состояние хранит словари: хеш транзакции -> (высота, позиция), выход
+(UTXO) -> (адрес, сумма), адрес -> его выходы и баланс. Транзакции демо-цепочки записаны как переводы со счета на счет,
+поэтому если транзакция не перечисляет входы (inputs), они выбираются при
+подключении блока: тратятся старейшие выходы отправителя. Получатель
+получает выход 0, сдача возвращается отправителю выходом 1, а комиссии
+блока - майнеру выходом coinbase.
+
+Проверка нового блока смотрит только на сам блок и индексы (O(число
+транзакций в блоке)), не перебирая цепочку. Для каждого подключенного блока
+сохраняется запись отката (потраченные и созданные выходы), так что
+отключение вершины и реорганизация не требуют пересчета с генезиса.
+Суммы хранятся в целых единицах (10^-8 монеты), чтобы сравнения балансов
+не страдали от ошибок округления float.
+
+Подписи транзакций проверяются пачкой после остальных (дешевых) проверок
+блока, в пуле из signature_workers потоков; для каждого блока
+записывается BlockValidation - сколько времени заняли подписи и вся
+проверка, так что видно, что подписи составляют основную ее стоимость.
+
+Блоки хранятся в переданной последовательности: в списке или в
+block_store.StoredBlocks на диске; записей отката держится не больше
+undo_depth, глубже реорганизация невозможна. Снимок индексов (to_dict)
+позволяет не проигрывать всю цепочку заново при открытии хранилища.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Container, Dict, Iterable, List, MutableSequence, Optional, Sequence, Tuple, Union
+import time
+
+from modules.protocols.blockchain import merkle, proof_of_work, signatures
+
+UNITS = 10 ** 8
+GENESIS_OUTPOINT = "genesis"
+COINBASE_PREFIX = "coinbase:"
+DEFAULT_UNDO_DEPTH = 100
+VALIDATION_HISTORY = 100  # отчетов о проверке последних блоков
+
+Outpoint = Tuple[str, int]  # (хеш транзакции, номер выхода)
+Allocations = Dict[str, Union[float, Sequence[float]]]  # адрес -> сумма или суммы нескольких выходов генезиса
+
+
+class ValidationError(ValueError):
+    """Блок или транзакция не проходят проверку"""
+
+
+def to_units(amount: float) -> int:
+    return round(amount * UNITS)
+
+
+def from_units(units: int) -> float:
+    return units / UNITS
+
+
+@dataclass
+class UndoRecord:
+    """Все, что нужно для отключения блока"""
+    block_hash: str
+    tx_hashes: List[str]
+    spent: List[Tuple[Outpoint, str, int]] = field(default_factory=list)  # (выход, адрес, сумма)
+    created: List[Outpoint] = field(default_factory=list)
+
+
+@dataclass
+class BlockValidation:
+    """Время проверки блока и доля проверки подписей в нем"""
+    index: int
+    transactions: int
+    signature_seconds: float
+    total_seconds: float
+    workers: int
+
+    @property
+    def signatures_per_second(self) -> float:
+        return self.transactions / self.signature_seconds if self.signature_seconds else 0.0
+
+    @property
+    def signature_share(self) -> float:
+        return self.signature_seconds / self.total_seconds if self.total_seconds else 0.0
+
+
+class ChainState:
+    """Состояние основной цепочки: индексы транзакций и непотраченных выходов"""
+
+    def __init__(self, genesis: Any, allocations: Optional[Allocations] = None, check_pow: bool = True,
+                 blocks: Optional[MutableSequence] = None, undo_depth: int = DEFAULT_UNDO_DEPTH,
+                 check_signatures: bool = True, signature_workers: int = 1):
+        self.check_pow = check_pow
+        self.check_signatures = check_signatures
+        self.signature_workers = signature_workers
+        self._executor: Optional[ThreadPoolExecutor] = None  # создается при первой проверке в несколько потоков
+        self._executor_workers = 0
+        self.validations: "deque[BlockValidation]" = deque(maxlen=VALIDATION_HISTORY)
+        self.blocks: MutableSequence = blocks if blocks is not None else [genesis]
+        self.height = 0
+        self.tip = genesis
+        self.tx_index: Dict[str, Tuple[int, int]] = {}
+        self.utxos: Dict[Outpoint, Tuple[str, int]] = {}
+        self.address_utxos: Dict[str, Dict[Outpoint, int]] = {}
+        self.balances: Dict[str, int] = {}
+        self.undo: "deque[UndoRecord]" = deque(maxlen=undo_depth)
+        number = 0
+        for address, amounts in (allocations or {}).items():
+            for amount in amounts if isinstance(amounts, (list, tuple)) else [amounts]:
+                self._add_output((GENESIS_OUTPOINT, number), address, to_units(amount))
+                number += 1
+
+    @classmethod
+    def from_blocks(cls, blocks: Sequence[Any], allocations: Optional[Allocations] = None,
+                    check_pow: bool = True, check_signatures: bool = True) -> "ChainState":
+        """Состояние по готовой цепочке в новом списке (каждый блок после генезиса проверяется)"""
+        state = cls(blocks[0], allocations, check_pow, check_signatures=check_signatures)
+        for block in blocks[1:]:
+            state.connect_block(block)
+        return state
+
+    @classmethod
+    def replay(cls, blocks: MutableSequence, allocations: Optional[Allocations] = None,
+               check_pow: bool = True, undo_depth: int = DEFAULT_UNDO_DEPTH,
+               snapshot: Optional[dict] = None,
+               progress: Optional[Callable[[int, int], None]] = None,
+               check_signatures: bool = True, signature_workers: int = 1) -> "ChainState":
+        """Состояние поверх уже записанных блоков (например, StoredBlocks).
+
+        Если снимок to_dict() соответствует одному из блоков цепочки,
+        проигрываются только блоки после него.
+        """
+        state = cls(blocks[0], allocations, check_pow, blocks, undo_depth, check_signatures, signature_workers)
+        if snapshot and snapshot["height"] < len(blocks) and blocks[snapshot["height"]].hash == snapshot["tip"]:
+            state._load_snapshot(snapshot)
+        total = len(blocks) - 1
+        for block in blocks.range(state.height + 1) if hasattr(blocks, 'range') else blocks[state.height + 1:]:
+            state.check_block(block)
+            state._apply(block)
+            if progress is not None and block.index % 1000 == 0:
+                progress(block.index, total)
+        return state
+
+    def balance(self, address: str) -> float:
+        return from_units(self.balances.get(address, 0))
+
+    def find_transaction(self, tx_hash: str) -> Optional[Tuple[Any, Dict]]:
+        """Блок и транзакция по хешу транзакции за O(1)"""
+        location = self.tx_index.get(tx_hash)
+        if location is None:
+            return None
+        height, position = location
+        block = self.blocks[height]
+        return block, block.transactions[position]
+
+    # Выходы
+
+    def _add_output(self, outpoint: Outpoint, address: str, units: int) -> None:
+        self.utxos[outpoint] = (address, units)
+        self.address_utxos.setdefault(address, {})[outpoint] = units
+        self.balances[address] = self.balances.get(address, 0) + units
+
+    def _remove_output(self, outpoint: Outpoint) -> Tuple[str, int]:
+        address, units = self.utxos.pop(outpoint)
+        outputs = self.address_utxos[address]
+        del outputs[outpoint]
+        if not outputs:
+            del self.address_utxos[address]
+        self.balances[address] -= units
+        if not self.balances[address]:
+            del self.balances[address]
+        return address, units
+
+    def _select_inputs(self, address: str, units: int,
+                       exclude: Container[Outpoint] = ()) -> Tuple[List[Outpoint], int]:
+        """Старейшие выходы адреса (кроме exclude), покрывающие сумму, и их сумма"""
+        selected, total = [], 0
+        for outpoint, value in self.address_utxos.get(address, {}).items():
+            if total >= units:
+                break
+            if outpoint in exclude:
+                continue
+            selected.append(outpoint)
+            total += value
+        return selected, total
+
+    def select_inputs(self, address: str, amount: float, exclude: Container[Outpoint] = ()) -> List[Outpoint]:
+        """Входы для новой транзакции на сумму amount; exclude - выходы, уже потраченные в пуле"""
+        selected, total = self._select_inputs(address, to_units(amount), exclude)
+        if total < to_units(amount):
+            raise ValidationError(f"У {address[:8]} недостаточно неизрасходованных средств "
+                                  f"({from_units(total):.8g} из {amount:.8g})")
+        return selected
+
+    # Проверка
+
+    def verify_signatures(self, transactions: Sequence[Dict]) -> signatures.VerificationReport:
+        """Проверяет подписи пачкой в пуле потоков"""
+        workers = max(1, self.signature_workers)
+        if workers > 1 and self._executor_workers != workers:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor, self._executor_workers = ThreadPoolExecutor(max_workers=workers), workers
+        report = signatures.verify_batch(transactions, workers, self._executor if workers > 1 else None)
+        position = report.first_invalid()
+        if position is not None:
+            tx_hash = str(transactions[position].get('tx_hash'))
+            raise ValidationError(f"Транзакция {tx_hash[:16]}...: неверная подпись или ключ отправителя")
+        return report
+
+    def check_transactions(self, transactions: Sequence[Dict]) -> Optional[signatures.VerificationReport]:
+        """Проверяет транзакции по порядку, как если бы они вошли в следующий блок.
+
+        Подписи (если их проверка включена) проверяются последними, после
+        дешевых проверок сумм и входов; возвращается отчет об их проверке.
+        """
+        seen = set()
+        used = set()  # выходы, потраченные предыдущими транзакциями
+        for tx in transactions:
+            tx_hash = tx.get('tx_hash')
+            if not tx_hash:
+                raise ValidationError("Транзакция без хеша")
+            if tx_hash in seen or tx_hash in self.tx_index:
+                raise ValidationError(f"Повторная транзакция {tx_hash[:16]}...")
+            seen.add(tx_hash)
+            if tx['sender'] == tx['receiver']:
+                raise ValidationError(f"Транзакция {tx_hash[:16]}...: отправитель совпадает с получателем")
+            amount, fee = to_units(tx['amount']), to_units(tx['fee'])
+            if amount <= 0 or fee < 0:
+                raise ValidationError(f"Транзакция {tx_hash[:16]}...: неположительная сумма или отрицательная комиссия")
+            # Тратить можно только подтвержденные выходы: переводы этого же блока не учитываются.
+            # Явные входы проверяются по индексу выходов, без них входы выбираются как в _apply
+            if 'inputs' in tx:
+                inputs = [tuple(outpoint) for outpoint in tx['inputs']]
+                for outpoint in inputs:
+                    if outpoint in used or self.utxos.get(outpoint, ('',))[0] != tx['sender']:
+                        raise ValidationError(f"Транзакция {tx_hash[:16]}...: вход {outpoint[0][:16]}...:{outpoint[1]} "
+                                              f"уже потрачен или не принадлежит отправителю")
+                    used.add(outpoint)
+                total = sum(self.utxos[outpoint][1] for outpoint in inputs)
+            else:
+                inputs, total = self._select_inputs(tx['sender'], amount + fee, used)
+                used.update(inputs)
+            if total < amount + fee:
+                raise ValidationError(f"Транзакция {tx_hash[:16]}...: у {tx['sender'][:8]} недостаточно средств "
+                                      f"({self.balance(tx['sender']):.8g})")
+        return self.verify_signatures(transactions) if self.check_signatures else None
+
+    def check_block(self, block: Any) -> None:
+        """Проверяет блок как следующий после текущей вершины"""
+        start = time.perf_counter()
+        if block.previous_hash != self.tip.hash:
+            raise ValidationError(f"Блок #{block.index} не продолжает вершину #{self.height}")
+        if block.index != self.height + 1:
+            raise ValidationError(f"Неверная высота блока: {block.index}, ожидалась {self.height + 1}")
+        root = merkle.transaction_root([tx['tx_hash'] for tx in block.transactions]).hex()
+        if block.merkle_root != root:
+            raise ValidationError(f"Корень Меркла блока #{block.index} не совпадает с транзакциями")
+        if self.check_pow:
+            prefix = proof_of_work.header_prefix(block.index, block.previous_hash, block.merkle_root)
+            if proof_of_work.block_hash(prefix, block.nonce).hex() != block.hash:
+                raise ValidationError(f"Хеш блока #{block.index} не совпадает с заголовком")
+            if not proof_of_work.verify(prefix, block.nonce, block.difficulty):
+                raise ValidationError(f"Блок #{block.index} не удовлетворяет сложности {block.difficulty} бит")
+        report = self.check_transactions(block.transactions)
+        self.validations.append(BlockValidation(
+            block.index, len(block.transactions), report.seconds if report else 0.0,
+            time.perf_counter() - start, report.workers if report else 0))
+
+    # Подключение и отключение
+
+    def connect_block(self, block: Any) -> UndoRecord:
+        """Проверяет блок, применяет его к индексам и дописывает в цепочку"""
+        self.check_block(block)
+        record = self._apply(block)
+        self.blocks.append(block)
+        return record
+
+    def connect_blocks(self, blocks: Iterable[Any]) -> int:
+        """Подключает пачку блоков и дописывает их одной записью; возвращает число подключенных.
+
+        Если блок не проходит проверку, предшествующие ему блоки остаются
+        подключенными, а ошибка пробрасывается.
+        """
+        connected = []
+        try:
+            for block in blocks:
+                self.check_block(block)
+                self._apply(block)
+                connected.append(block)
+        finally:
+            self.blocks.extend(connected)
+        return len(connected)
+
+    def _apply(self, block: Any) -> UndoRecord:
+        height = self.height + 1
+        record = UndoRecord(block.hash, [tx['tx_hash'] for tx in block.transactions])
+        fees = 0
+        for position, tx in enumerate(block.transactions):
+            tx_hash = tx['tx_hash']
+            amount, fee = to_units(tx['amount']), to_units(tx['fee'])
+            spent = 0
+            if 'inputs' in tx:
+                inputs = [tuple(outpoint) for outpoint in tx['inputs']]
+            else:
+                inputs = self._select_inputs(tx['sender'], amount + fee)[0]
+            for outpoint in inputs:
+                address, units = self._remove_output(outpoint)
+                record.spent.append((outpoint, address, units))
+                spent += units
+            self._add_output((tx_hash, 0), tx['receiver'], amount)
+            record.created.append((tx_hash, 0))
+            if spent > amount + fee:
+                self._add_output((tx_hash, 1), tx['sender'], spent - amount - fee)
+                record.created.append((tx_hash, 1))
+            self.tx_index[tx_hash] = (height, position)
+            fees += fee
+        if fees:
+            outpoint = (COINBASE_PREFIX + block.hash, 0)
+            self._add_output(outpoint, block.miner, fees)
+            record.created.append(outpoint)
+        self.height, self.tip = height, block
+        self.undo.append(record)
+        return record
+
+    def disconnect_block(self) -> Any:
+        """Отключает вершину по записи отката; возвращает отключенный блок"""
+        if self.height == 0:
+            raise ValidationError("Генезис-блок нельзя отключить")
+        if not self.undo:
+            raise ValidationError(f"Нет записей отката: откат глубже {self.undo.maxlen} блоков невозможен")
+        record = self.undo.pop()
+        block = self.blocks.pop()
+        self.height -= 1
+        self.tip = self.blocks[self.height]
+        for outpoint in reversed(record.created):
+            self._remove_output(outpoint)
+        for outpoint, address, units in reversed(record.spent):
+            self._add_output(outpoint, address, units)
+        for tx_hash in record.tx_hashes:
+            del self.tx_index[tx_hash]
+        return block
+
+    def reorganize(self, fork_height: int, blocks: Sequence[Any]) -> List[Any]:
+        """Заменяет блоки выше fork_height новой веткой.
+
+        Если блок новой ветки не проходит проверку, прежняя цепочка
+        восстанавливается и ошибка пробрасывается. Возвращает отключенные блоки.
+        """
+        if not 0 <= fork_height <= self.height:
+            raise ValidationError(f"Точка ветвления {fork_height} вне цепочки")
+        if self.height - fork_height > len(self.undo):
+            raise ValidationError(f"Реорганизация глубже {len(self.undo)} блоков невозможна")
+        detached = []
+        while self.height > fork_height:
+            detached.append(self.disconnect_block())
+        detached.reverse()
+        connected = 0
+        try:
+            for block in blocks:
+                self.connect_block(block)
+                connected += 1
+        except ValidationError:
+            for _ in range(connected):
+                self.disconnect_block()
+            for block in detached:
+                self.connect_block(block)
+            raise
+        return detached
+
+    # Снимок
+
+    def to_dict(self) -> dict:
+        """Снимок индексов для сохранения в JSON (записи отката не сохраняются)"""
+        return {
+            "height": self.height,
+            "tip": self.tip.hash,
+            "tx_index": self.tx_index,
+            "utxos": [[tx_hash, number, address, units]
+                      for (tx_hash, number), (address, units) in self.utxos.items()],
+        }
+
+    def _load_snapshot(self, snapshot: dict) -> None:
+        self.utxos.clear()
+        self.address_utxos.clear()
+        self.balances.clear()
+        self.undo.clear()
+        for tx_hash, number, address, units in snapshot["utxos"]:
+            self._add_output((tx_hash, number), address, units)
+        self.tx_index = {tx_hash: tuple(location) for tx_hash, location in snapshot["tx_index"].items()}
+        self.height = snapshot["height"]
+        self.tip = self.blocks[self.height]
@@ -0,0 +1,375 @@
+"""Пул неподтвержденных транзакций с приоритетом по ставке комиссии.
+
+Транзакция ссылается на выходы (входы - пары [хеш, номер]); ее размер
+оценивается в виртуальных байтах как у P2WPKH, ставка комиссии - в
+единицах (10^-8 монеты) на vбайт. В пуле поддерживаются:
+
+* индекс трат: выход -> транзакция пула; вторая трата того же выхода
+  принимается только как замена (RBF): ставка выше, чем у всех
+  конфликтующих, и комиссия больше их суммарной комиссии;
+* куча по ставке для вытеснения: при превышении max_vsize удаляются
+  транзакции с наименьшей ставкой, а минимальная ставка входа поднимается
+  до ставки последней вытесненной плюс шаг (как mempoolminfee в Bitcoin Core);
+* жадная сборка шаблона блока: транзакции по убыванию ставки, пока
+  остается вес.
+
+Удаленные из пула транзакции остаются в кучах и пропускаются при
+извлечении (ленивое удаление), поэтому вставка и вытеснение - O(log n).
+
+Замер на синтетических транзакциях без интерфейса:
+
+    python -m modules.protocols.blockchain.mempool --count 100000
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import argparse
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from modules.protocols.blockchain.chain_state import ValidationError, to_units
+
+MAX_BLOCK_WEIGHT = 4_000_000
+DEFAULT_MAX_VSIZE = 50_000_000        # 50 МБ виртуального размера
+INCREMENTAL_FEE_RATE = 1.0            # единиц/vБ: шаг минимальной ставки и надбавка при замене
+TX_OVERHEAD_VSIZE = 10.5
+INPUT_VSIZE = 68.0
+OUTPUT_VSIZE = 31.0
+
+Outpoint = Tuple[str, int]
+
+
+def transaction_vsize(inputs: int, outputs: int = 2) -> int:
+    """Виртуальный размер транзакции P2WPKH (получатель и сдача - два выхода)"""
+    return int(TX_OVERHEAD_VSIZE + INPUT_VSIZE * inputs + OUTPUT_VSIZE * outputs + 0.5)
+
+
+@dataclass
+class MempoolEntry:
+    tx: Dict
+    vsize: int
+    fee: int                 # единиц
+    inputs: List[Outpoint]
+    sequence: int            # порядок поступления - разрывает равенство ставок
+    added: float
+
+    @property
+    def tx_hash(self) -> str:
+        return self.tx['tx_hash']
+
+    @property
+    def fee_rate(self) -> float:
+        return self.fee / self.vsize
+
+    @property
+    def weight(self) -> int:
+        return self.vsize * 4
+
+
+@dataclass
+class BlockTemplate:
+    transactions: List[Dict]
+    weight: int
+    fees: int
+    fee_rates: List[float] = field(default_factory=list)
+
+    @property
+    def min_fee_rate(self) -> float:
+        return min(self.fee_rates) if self.fee_rates else 0.0
+
+
+class Mempool:
+    """Неподтвержденные транзакции, упорядоченные по ставке комиссии"""
+
+    def __init__(self, max_vsize: int = DEFAULT_MAX_VSIZE, min_relay_fee_rate: float = INCREMENTAL_FEE_RATE):
+        self.max_vsize = max_vsize
+        self.min_relay_fee_rate = min_relay_fee_rate
+        self.min_fee_rate = min_relay_fee_rate
+        self.entries: Dict[str, MempoolEntry] = {}
+        self.spends: Dict[Outpoint, str] = {}
+        self.total_vsize = 0
+        self._eviction_heap: List[Tuple[float, int, str]] = []   # наименьшая ставка сверху
+        self._sequence = 0
+        self.evicted = 0
+        self.replaced = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self.entries
+
+    def transactions(self) -> List[Dict]:
+        return [entry.tx for entry in self.entries.values()]
+
+    def add(self, tx: Dict) -> List[Dict]:
+        """Добавляет транзакцию; возвращает вытесненные и замененные ею.
+
+        Транзакция должна содержать inputs и size (vбайт); ValidationError,
+        если она уже в пуле, ставка ниже минимальной, конфликт не проходит
+        правила замены или она сама не умещается в пул даже после
+        вытеснения всех транзакций с меньшей ставкой (тогда пул не меняется).
+        """
+        tx_hash = tx['tx_hash']
+        if tx_hash in self.entries:
+            raise ValidationError(f"Транзакция {tx_hash[:16]}... уже в пуле")
+        inputs = [tuple(outpoint) for outpoint in tx['inputs']]
+        if not inputs or len(set(inputs)) != len(inputs):
+            raise ValidationError(f"Транзакция {tx_hash[:16]}...: нет входов или вход повторяется")
+        entry = MempoolEntry(tx, tx.get('size') or transaction_vsize(len(inputs)), to_units(tx['fee']),
+                             inputs, self._sequence, time.time())
+        if entry.vsize > self.max_vsize:
+            raise ValidationError(f"Транзакция {entry.vsize} vБ больше всего пула ({self.max_vsize} vБ)")
+        if entry.fee_rate < self.min_fee_rate:
+            raise ValidationError(f"Ставка {entry.fee_rate:.2f} ниже минимальной {self.min_fee_rate:.2f} ед./vБ")
+        if self.total_vsize + entry.vsize > self.max_vsize and entry.fee_rate <= self._lowest_fee_rate():
+            raise ValidationError(f"Пул заполнен: ставка {entry.fee_rate:.2f} ед./vБ не выше, чем у вытесняемых")
+
+        conflicts = {self.spends[outpoint] for outpoint in inputs if outpoint in self.spends}
+        if conflicts:
+            replaced = [self.entries[conflict] for conflict in conflicts]
+            if any(entry.fee_rate <= old.fee_rate for old in replaced):
+                raise ValidationError("Двойная трата: ставка замены должна быть выше, чем у заменяемых транзакций")
+            required = sum(old.fee for old in replaced) + INCREMENTAL_FEE_RATE * entry.vsize
+            if entry.fee < required:
+                raise ValidationError(f"Двойная трата: комиссия замены должна быть не меньше {required:.0f} ед.")
+            for old in replaced:
+                self._remove(old.tx_hash)
+        else:
+            replaced = []
+
+        min_fee_rate = self.min_fee_rate
+        self._sequence += 1
+        self._insert(entry)
+        evicted = self._trim()
+        if tx_hash not in self.entries:
+            # Вытеснена сама новая транзакция: возвращаем пул в прежнее состояние
+            for old in replaced + [old for old in evicted if old is not entry]:
+                self._insert(old)
+            self.min_fee_rate = min_fee_rate
+            raise ValidationError(f"Пул заполнен: транзакция со ставкой {entry.fee_rate:.2f} ед./vБ "
+                                  f"не умещается даже после вытеснения более дешевых")
+        self.replaced += len(replaced)
+        self.evicted += len(evicted)
+        return [old.tx for old in replaced + evicted]
+
+    def _insert(self, entry: MempoolEntry) -> None:
+        self.entries[entry.tx_hash] = entry
+        for outpoint in entry.inputs:
+            self.spends[outpoint] = entry.tx_hash
+        self.total_vsize += entry.vsize
+        heapq.heappush(self._eviction_heap, (entry.fee_rate, entry.sequence, entry.tx_hash))
+
+    def _lowest_fee_rate(self) -> float:
+        """Наименьшая ставка в пуле (устаревшие записи кучи снимаются)"""
+        while self._eviction_heap:
+            fee_rate, sequence, tx_hash = self._eviction_heap[0]
+            entry = self.entries.get(tx_hash)
+            if entry is not None and entry.sequence == sequence:
+                return fee_rate
+            heapq.heappop(self._eviction_heap)
+        return 0.0
+
+    def _remove(self, tx_hash: str) -> MempoolEntry:
+        entry = self.entries.pop(tx_hash)
+        for outpoint in entry.inputs:
+            if self.spends.get(outpoint) == tx_hash:
+                del self.spends[outpoint]
+        self.total_vsize -= entry.vsize
+        return entry
+
+    def remove(self, tx_hash: str) -> Optional[Dict]:
+        entry = self.entries.get(tx_hash)
+        return None if entry is None else self._remove(tx_hash).tx
+
+    def _trim(self) -> List[MempoolEntry]:
+        """Вытесняет транзакции с наименьшей ставкой, пока пул не уложится в max_vsize"""
+        evicted = []
+        while self.total_vsize > self.max_vsize:
+            fee_rate, sequence, tx_hash = heapq.heappop(self._eviction_heap)
+            entry = self.entries.get(tx_hash)
+            if entry is None or entry.sequence != sequence:
+                continue  # уже удалена
+            evicted.append(self._remove(tx_hash))
+            self.min_fee_rate = max(self.min_fee_rate, fee_rate + INCREMENTAL_FEE_RATE)
+        if len(self._eviction_heap) > 2 * len(self.entries) + 1024:
+            self._compact()
+        return evicted
+
+    def _compact(self) -> None:
+        """Удаляет из кучи записи удаленных транзакций"""
+        self._eviction_heap = [(entry.fee_rate, entry.sequence, tx_hash) for tx_hash, entry in self.entries.items()]
+        heapq.heapify(self._eviction_heap)
+
+    def remove_for_block(self, transactions: Iterable[Dict]) -> int:
+        """Убирает подтвержденные транзакции и конфликтующие с ними; возвращает число удаленных"""
+        removed = 0
+        for tx in transactions:
+            if tx['tx_hash'] in self.entries:
+                self._remove(tx['tx_hash'])
+                removed += 1
+            for outpoint in tx.get('inputs', ()):
+                conflict = self.spends.get(tuple(outpoint))
+                if conflict is not None:
+                    self._remove(conflict)
+                    removed += 1
+        return removed
+
+    def decay_min_fee_rate(self, factor: float = 0.5) -> None:
+        """Снижает минимальную ставку после блока (в Bitcoin Core - с периодом полураспада 12 часов)"""
+        if self.total_vsize < self.max_vsize // 2:
+            self.min_fee_rate = max(self.min_relay_fee_rate, self.min_fee_rate * factor)
+
+    def block_template(self, max_weight: int = MAX_BLOCK_WEIGHT) -> BlockTemplate:
+        """Жадная сборка: транзакции по убыванию ставки, пока хватает веса"""
+        template = BlockTemplate([], 0, 0)
+        smallest = min((entry.weight for entry in self.entries.values()), default=0)
+        for entry in sorted(self.entries.values(), key=lambda item: (-item.fee_rate, item.sequence)):
+            if template.weight + entry.weight > max_weight:
+                if max_weight - template.weight < smallest:
+                    break  # больше ничего не поместится
+                continue
+            template.transactions.append(entry.tx)
+            template.weight += entry.weight
+            template.fees += entry.fee
+            template.fee_rates.append(entry.fee_rate)
+        return template
+
+    def fee_histogram(self, edges: Sequence[float]) -> np.ndarray:
+        """Суммарный vразмер транзакций по интервалам ставки"""
+        rates = np.fromiter((entry.fee_rate for entry in self.entries.values()), float, len(self.entries))
+        sizes = np.fromiter((entry.vsize for entry in self.entries.values()), float, len(self.entries))
+        return np.histogram(rates, bins=edges, weights=sizes)[0]
+
+
+def synthetic_transactions(count: int, seed: Optional[int] = None, median_fee_rate: float = 10.0,
+                           conflict_share: float = 0.0, start: int = 0,
+                           rng: Optional[np.random.Generator] = None) -> List[Dict]:
+    """Случайные транзакции с номерами start..start+count-1: 1-3 входа, ставка логнормальная
+    с медианой median_fee_rate. Доля conflict_share транзакций тратит вход одной из предыдущих.
+    """
+    rng = rng or np.random.default_rng(seed)
+    input_counts = rng.integers(1, 4, count)
+    fee_rates = np.exp(rng.normal(np.log(median_fee_rate), 1.0, count))
+    conflicts = rng.random(count) < conflict_share
+    transactions = []
+    for number in range(count):
+        tx_hash = f"{start + number:064x}"
+        inputs = [[f"{start + number:060x}ffff", slot] for slot in range(int(input_counts[number]))]
+        if conflicts[number] and number:
+            inputs[0] = list(transactions[int(rng.integers(number))]['inputs'][0])
+        size = transaction_vsize(len(inputs))
+        transactions.append({
+            'sender': 'synthetic',
+            'receiver': 'synthetic',
+            'amount': 0.001,
+            'fee': float(fee_rates[number]) * size / 1e8,
+            'tx_hash': tx_hash,
+            'inputs': inputs,
+            'size': size,
+        })
+    return transactions
+
+
+@dataclass
+class BenchmarkResult:
+    count: int
+    accepted: int
+    rejected: int
+    evicted: int
+    replaced: int
+    insert_seconds: float
+    template_seconds: float
+    template: BlockTemplate
+    min_fee_rate: float
+
+    @property
+    def inserts_per_second(self) -> float:
+        return self.count / self.insert_seconds if self.insert_seconds else 0.0
+
+
+def benchmark(count: int = 100_000, max_vsize: Optional[int] = None, seed: Optional[int] = None,
+              conflict_share: float = 0.02) -> BenchmarkResult:
+    """Вставка count синтетических транзакций в пул вдвое меньшего размера и сборка шаблона"""
+    transactions = synthetic_transactions(count, seed, conflict_share=conflict_share)
+    if max_vsize is None:
+        max_vsize = sum(tx['size'] for tx in transactions) // 2
+    pool = Mempool(max_vsize)
+    rejected = 0
+    start = time.perf_counter()
+    for tx in transactions:
+        try:
+            pool.add(tx)
+        except ValidationError:
+            rejected += 1
+    insert_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    template = pool.block_template()
+    template_seconds = time.perf_counter() - start
+    return BenchmarkResult(count, count - rejected, rejected, pool.evicted, pool.replaced,
+                           insert_seconds, template_seconds, template, pool.min_fee_rate)
+
+
+def simulate_fee_market(blocks: int = 144, arrivals_per_block: Callable[[int], float] = lambda height: 3000.0,
+                        median_fee_rate: float = 10.0, max_weight: int = MAX_BLOCK_WEIGHT,
+                        max_vsize: int = DEFAULT_MAX_VSIZE, seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Рынок комиссий: между блоками приходит Пуассон(arrivals_per_block(высота)) транзакций.
+
+    По каждому блоку возвращаются размер пула, минимальная и медианная
+    ставка вошедших транзакций, минимальная ставка входа и число вытеснений.
+    """
+    rng = np.random.default_rng(seed)
+    pool = Mempool(max_vsize)
+    history = []
+    number = 0
+    for height in range(blocks):
+        count = int(rng.poisson(arrivals_per_block(height)))
+        evicted_before, rejected = pool.evicted, 0
+        for tx in synthetic_transactions(count, median_fee_rate=median_fee_rate, start=number, rng=rng):
+            try:
+                pool.add(tx)
+            except ValidationError:
+                rejected += 1
+        number += count
+        template = pool.block_template(max_weight)
+        pool.remove_for_block(template.transactions)
+        pool.decay_min_fee_rate()
+        rates = template.fee_rates
+        history.append({
+            "height": height,
+            "arrivals": count,
+            "included": len(template.transactions),
+            "mempool_vsize": pool.total_vsize,
+            "mempool_count": len(pool),
+            "min_included_rate": template.min_fee_rate,
+            "median_included_rate": float(np.median(rates)) if rates else 0.0,
+            "min_fee_rate": pool.min_fee_rate,
+            "evicted": pool.evicted - evicted_before,
+            "rejected": rejected,
+            "fees": template.fees,
+        })
+    return history
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Замер пула транзакций на синтетической нагрузке")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--max-vsize", type=int, help="размер пула в vбайтах (по умолчанию - половина нагрузки)")
+    parser.add_argument("--conflicts", type=float, default=0.02, help="доля двойных трат")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    result = benchmark(args.count, args.max_vsize, args.seed, args.conflicts)
+    print(f"Транзакций: {result.count}, принято: {result.accepted}, отклонено: {result.rejected}")
+    print(f"Вытеснено: {result.evicted}, заменено (RBF): {result.replaced}")
+    print(f"Вставка: {result.insert_seconds:.2f} с ({result.inserts_per_second:,.0f} в секунду)".replace(",", " "))
+    print(f"Шаблон блока: {len(result.template.transactions)} транзакций, вес {result.template.weight}, "
+          f"минимальная ставка {result.template.min_fee_rate:.2f} ед./vБ, за {result.template_seconds * 1e3:.1f} мс")
+    print(f"Минимальная ставка входа в пул: {result.min_fee_rate:.2f} ед./vБ")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""Дерево Меркла (RFC 6962/9162) с инкрементным обновлением и доказательствами.
+
+Лист - SHA-256(0x00 || данные), узел - SHA-256(0x01 || левый || правый);
+разные префиксы не дают выдать внутренний узел за лист. Узлы хранятся по
+уровням в плоских bytearray по 32 байта: уровень k содержит
+ceil(n / 2^k) узлов, и непарный последний узел переносится на уровень выше
+без хеширования. Такое дерево совпадает с деревом RFC 6962, а узел
+(k, i) - корень поддерева листьев [i * 2^k, min((i + 1) * 2^k, n)).
+
+Изменение или добавление листа пересчитывает только путь до корня -
+O(log n) хешей. Доказательство включения листа в дерево из n листьев
+содержит не больше ceil(log2 n) хешей (20 для миллиона транзакций),
+доказательство согласованности показывает, что дерево размера m является
+префиксом текущего.
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Union
+import hashlib
+
+DIGEST_SIZE = 32
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+EMPTY_ROOT = hashlib.sha256(b'').digest()
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def _hash_level(level: Union[bytes, bytearray, memoryview]) -> bytearray:
+    """Следующий уровень: хеши пар соседних узлов, непарный последний узел переносится"""
+    view = memoryview(level)
+    count = len(view) // DIGEST_SIZE
+    pair = 2 * DIGEST_SIZE
+    parents = bytearray().join([hashlib.sha256(NODE_PREFIX + view[offset:offset + pair]).digest()
+                                for offset in range(0, (count // 2) * pair, pair)])
+    if count % 2:
+        parents += view[(count - 1) * DIGEST_SIZE:]
+    return parents
+
+
+@dataclass
+class InclusionProof:
+    """Доказательство того, что лист index входит в дерево из size листьев"""
+    index: int
+    size: int
+    leaf: bytes               # хеш листа
+    path: List[bytes]         # хеши соседних поддеревьев снизу вверх
+
+    @property
+    def hashes(self) -> int:
+        """Сколько хешей вычисляет проверяющий"""
+        return len(self.path) + 1
+
+    def root(self) -> bytes:
+        """Корень, восстановленный по пути (RFC 9162, 2.1.3.2)"""
+        if not 0 <= self.index < self.size:
+            raise ValueError("Номер листа вне дерева")
+        index, last = self.index, self.size - 1
+        value = self.leaf
+        for sibling in self.path:
+            if last == 0:
+                raise ValueError("Путь длиннее высоты дерева")
+            if index % 2 or index == last:
+                value = node_hash(sibling, value)
+                while index % 2 == 0 and index:
+                    index, last = index >> 1, last >> 1
+            else:
+                value = node_hash(value, sibling)
+            index, last = index >> 1, last >> 1
+        if last != 0:
+            raise ValueError("Путь короче высоты дерева")
+        return value
+
+    def verify(self, root: bytes) -> bool:
+        try:
+            return self.root() == root
+        except ValueError:
+            return False
+
+
+@dataclass
+class ConsistencyProof:
+    """Доказательство того, что дерево из old_size листьев - префикс дерева из new_size"""
+    old_size: int
+    new_size: int
+    path: List[bytes]
+
+    def verify(self, old_root: bytes, new_root: bytes) -> bool:
+        """Проверка по RFC 9162, 2.1.4.2"""
+        m, n, path = self.old_size, self.new_size, list(self.path)
+        if not 0 < m <= n:
+            return m == 0 and not path
+        if m == n:
+            return not path and old_root == new_root
+        if m & (m - 1) == 0:
+            path.insert(0, old_root)
+        if not path:
+            return False
+        fn, sn = m - 1, n - 1
+        while fn & 1:
+            fn, sn = fn >> 1, sn >> 1
+        old_value = new_value = path[0]
+        for item in path[1:]:
+            if sn == 0:
+                return False
+            if fn & 1 or fn == sn:
+                old_value = node_hash(item, old_value)
+                new_value = node_hash(item, new_value)
+                while fn & 1 == 0 and fn:
+                    fn, sn = fn >> 1, sn >> 1
+            else:
+                new_value = node_hash(new_value, item)
+            fn, sn = fn >> 1, sn >> 1
+        return sn == 0 and old_value == old_root and new_value == new_root
+
+
+class MerkleTree:
+    """Дерево Меркла с плоским хранением уровней"""
+
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        self.levels: List[bytearray] = [bytearray()]
+        self.extend(leaves)
+
+    @classmethod
+    def from_leaf_hashes(cls, hashes: Union[bytes, Sequence[bytes]]) -> "MerkleTree":
+        """Пакетное построение по готовым хешам листьев (склеенным или списком)"""
+        tree = cls()
+        tree.levels[0] = bytearray(hashes if isinstance(hashes, (bytes, bytearray, memoryview))
+                                   else b''.join(hashes))
+        if len(tree.levels[0]) % DIGEST_SIZE:
+            raise ValueError(f"Длина хешей листьев не кратна {DIGEST_SIZE}")
+        tree._rebuild()
+        return tree
+
+    def _rebuild(self) -> None:
+        del self.levels[1:]
+        while len(self.levels[-1]) > DIGEST_SIZE:
+            self.levels.append(_hash_level(self.levels[-1]))
+
+    def __len__(self) -> int:
+        return len(self.levels[0]) // DIGEST_SIZE
+
+    @property
+    def height(self) -> int:
+        return len(self.levels) - 1
+
+    @property
+    def root(self) -> bytes:
+        return bytes(self.levels[-1]) if len(self) else EMPTY_ROOT
+
+    def node(self, level: int, index: int) -> bytes:
+        """Корень поддерева листьев [index * 2^level, min((index + 1) * 2^level, n))"""
+        offset = index * DIGEST_SIZE
+        return bytes(self.levels[level][offset:offset + DIGEST_SIZE])
+
+    def leaf(self, index: int) -> bytes:
+        return self.node(0, index)
+
+    def _set_leaf(self, index: int, digest: bytes) -> None:
+        """Записывает хеш листа и пересчитывает путь до корня (O(log n))"""
+        self.levels[0][index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] = digest
+        level = 0
+        while len(self.levels[level]) > DIGEST_SIZE:
+            count = len(self.levels[level]) // DIGEST_SIZE
+            if level + 1 == len(self.levels):
+                self.levels.append(bytearray())
+            left = index & ~1
+            if left + 1 < count:
+                parent = node_hash(self.node(level, left), self.node(level, left + 1))
+            else:
+                parent = self.node(level, left)
+            index >>= 1
+            self.levels[level + 1][index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE] = parent
+            level += 1
+
+    def append(self, data: bytes) -> int:
+        """Добавляет лист с данными; возвращает его номер"""
+        return self.append_hash(leaf_hash(data))
+
+    def append_hash(self, digest: bytes) -> int:
+        index = len(self)
+        self._set_leaf(index, digest)
+        return index
+
+    def extend(self, leaves: Iterable[bytes]) -> None:
+        """Добавляет много листов сразу: уровни перестраиваются один раз"""
+        hashes = [leaf_hash(data) for data in leaves]
+        if len(hashes) == 1:
+            self.append_hash(hashes[0])
+        elif hashes:
+            self.levels[0] += b''.join(hashes)
+            self._rebuild()
+
+    def update(self, index: int, data: bytes) -> None:
+        """Заменяет данные листа"""
+        if not 0 <= index < len(self):
+            raise IndexError("Номер листа вне дерева")
+        self._set_leaf(index, leaf_hash(data))
+
+    def inclusion_proof(self, index: int) -> InclusionProof:
+        """Хеши соседей на пути от листа к корню"""
+        if not 0 <= index < len(self):
+            raise IndexError("Номер листа вне дерева")
+        path = []
+        position = index
+        for level in range(self.height):
+            sibling = position ^ 1
+            if sibling < len(self.levels[level]) // DIGEST_SIZE:
+                path.append(self.node(level, sibling))
+            position >>= 1
+        return InclusionProof(index, len(self), self.leaf(index), path)
+
+    def consistency_proof(self, old_size: int) -> ConsistencyProof:
+        """Доказательство того, что первые old_size листьев образуют прежнее дерево (RFC 6962, 2.1.2)"""
+        size = len(self)
+        if not 0 <= old_size <= size:
+            raise ValueError("Старый размер больше текущего")
+        if old_size in (0, size):
+            return ConsistencyProof(old_size, size, [])
+        return ConsistencyProof(old_size, size, self._subproof(old_size, 0, size, True))
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        """Корень поддерева [start, end), которое является узлом текущего дерева"""
+        level = max(end - start - 1, 0).bit_length()
+        return self.node(level, start >> level)
+
+    def _subproof(self, m: int, start: int, end: int, complete: bool) -> List[bytes]:
+        n = end - start
+        if m == n:
+            return [] if complete else [self._subtree(start, end)]
+        k = 1 << (n - 1).bit_length() - 1  # наибольшая степень двойки меньше n
+        if m <= k:
+            return self._subproof(m, start, start + k, complete) + [self._subtree(start + k, end)]
+        return self._subproof(m - k, start + k, end, False) + [self._subtree(start, start + k)]
+
+
+def root_of(leaves: Iterable[bytes]) -> bytes:
+    """Корень дерева для данных листьев"""
+    return MerkleTree(leaves).root
+
+
+def verify_inclusion(data: bytes, proof: InclusionProof, root: bytes) -> bool:
+    """Проверяет, что данные - лист proof.index дерева с корнем root"""
+    return leaf_hash(data) == proof.leaf and proof.verify(root)
+
+
+def transaction_root(tx_hashes: Sequence[str], empty: Optional[bytes] = None) -> bytes:
+    """Корень дерева для идентификаторов транзакций в hex"""
+    if not tx_hashes:
+        return EMPTY_ROOT if empty is None else empty
+    return MerkleTree(bytes.fromhex(tx_hash) for tx_hash in tx_hashes).root
@@ -0,0 +1,153 @@
+"""Доказательство работы: перебор nonce с предвычисленным префиксом заголовка.
+
+Заголовок блока - постоянный префикс (номер, хеш предыдущего блока, корень
+Меркла) и 8-байтовый nonce в конце. Префикс хешируется один раз, а для
+каждого nonce копируется состояние SHA-256 (hashlib copy()) и дописываются
+только 8 байт. Хеш сравнивается с целевым числом 2^(256 - bits): сложность
+задается с точностью до бита, а сравнение 32-байтовых строк в big-endian
+равносильно сравнению чисел.
+
+Пространство nonce делится на порции, которые перебираются в пуле процессов
+(не больше 2 * workers порций одновременно). Поиск останавливается при
+первом решении или по таймауту, оставшиеся порции отменяются.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+import hashlib
+import struct
+import time
+
+NONCE = struct.Struct('>Q')
+MAX_NONCE = 1 << 64
+MAX_DIFFICULTY_BITS = 255
+DEFAULT_CHUNK = 1 << 16
+LOCAL_CHUNK = 1 << 12   # порция без пула процессов
+PROGRESS_INTERVAL = 0.1
+
+
+def header_prefix(index: int, previous_hash: str, merkle_root: str) -> bytes:
+    """Постоянная часть заголовка блока"""
+    return f"{index}{previous_hash}{merkle_root}".encode()
+
+
+def target_for_bits(bits: int) -> int:
+    """Целевое число: хеш должен быть меньше 2^(256 - bits)"""
+    if not 1 <= bits <= MAX_DIFFICULTY_BITS:
+        raise ValueError(f"Сложность должна быть от 1 до {MAX_DIFFICULTY_BITS} бит")
+    return 1 << (256 - bits)
+
+
+def block_hash(prefix: bytes, nonce: int) -> bytes:
+    return hashlib.sha256(prefix + NONCE.pack(nonce)).digest()
+
+
+def leading_zero_bits(digest: bytes) -> int:
+    value = int.from_bytes(digest, 'big')
+    return len(digest) * 8 - value.bit_length()
+
+
+def verify(prefix: bytes, nonce: int, bits: int) -> bool:
+    """Удовлетворяет ли nonce сложности bits"""
+    return int.from_bytes(block_hash(prefix, nonce), 'big') < target_for_bits(bits)
+
+
+def search_range(prefix: bytes, bits: int, start: int, count: int) -> Tuple[int, Optional[int], Optional[bytes]]:
+    """Перебирает nonce start..start+count-1 (выполняется и в рабочих процессах).
+
+    Возвращает (проверено_хешей, nonce, хеш) - nonce и хеш None, если решения нет.
+    """
+    target = target_for_bits(bits).to_bytes(32, 'big')
+    midstate = hashlib.sha256(prefix)
+    pack = NONCE.pack
+    for nonce in range(start, min(start + count, MAX_NONCE)):
+        state = midstate.copy()
+        state.update(pack(nonce))
+        digest = state.digest()
+        if digest < target:
+            return nonce - start + 1, nonce, digest
+    return min(count, MAX_NONCE - start), None, None
+
+
+@dataclass
+class MiningResult:
+    """Итог поиска nonce"""
+    bits: int
+    hashes: int
+    elapsed: float
+    nonce: Optional[int] = None
+    digest: Optional[bytes] = None
+    timed_out: bool = False
+
+    @property
+    def found(self) -> bool:
+        return self.nonce is not None
+
+    @property
+    def hash_rate(self) -> float:
+        """Хешей в секунду"""
+        return self.hashes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def expected_hashes(self) -> float:
+        """Ожидаемое число попыток: 2^bits"""
+        return 2.0 ** self.bits
+
+    @property
+    def hex(self) -> str:
+        return self.digest.hex() if self.digest else ""
+
+
+def mine(prefix: bytes, bits: int, workers: int = 1, timeout: Optional[float] = None,
+         start_nonce: int = 0, chunk_size: int = DEFAULT_CHUNK,
+         progress: Optional[Callable[[int, float], None]] = None) -> MiningResult:
+    """Ищет nonce, при котором SHA-256(prefix || nonce) < 2^(256 - bits).
+
+    progress(проверено_хешей, прошло_секунд) вызывается не чаще PROGRESS_INTERVAL.
+    При timeout (секунды) возвращается результат с timed_out=True и без nonce.
+    Если ожидаемая работа меньше одной порции на процесс, пул не создается.
+    """
+    target_for_bits(bits)
+    hashes = 0
+    found: Tuple[Optional[int], Optional[bytes]] = (None, None)
+    timed_out = False
+    start_time = last_report = time.perf_counter()
+
+    def accept(result: Tuple[int, Optional[int], Optional[bytes]]) -> bool:
+        """Учитывает порцию; True - поиск закончен"""
+        nonlocal hashes, found, timed_out, last_report
+        count, nonce, digest = result
+        hashes += count
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress(hashes, now - start_time)
+        if nonce is not None:
+            found = (nonce, digest)
+            return True
+        if timeout is not None and now - start_time >= timeout:
+            timed_out = True
+            return True
+        return False
+
+    if workers > 1 and 2.0 ** bits > chunk_size * workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for start in range(start_nonce, MAX_NONCE, chunk_size):
+                pending.append(executor.submit(search_range, prefix, bits, start, chunk_size))
+                if len(pending) >= 2 * workers and accept(pending.popleft().result()):
+                    break
+            for future in pending:
+                future.cancel()
+    else:
+        # Небольшие порции, чтобы таймаут и прогресс срабатывали вовремя
+        chunk_size = min(chunk_size, LOCAL_CHUNK)
+        for start in range(start_nonce, MAX_NONCE, chunk_size):
+            if accept(search_range(prefix, bits, start, chunk_size)):
+                break
+
+    elapsed = time.perf_counter() - start_time
+    if progress is not None:
+        progress(hashes, elapsed)
+    return MiningResult(bits, hashes, elapsed, found[0], found[1], timed_out)
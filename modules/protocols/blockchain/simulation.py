@@ -0,0 +1,297 @@
+"""Событийная симуляция сети Proof of Work без реального хеширования.
+
+Время нахождения блока майнером с хешрейтом h при цели T распределено
+экспоненциально со средним 2^256 / (h * T). Экспонента не имеет памяти,
+поэтому при смене вершины цепочки или хешрейта время следующей находки
+можно просто разыграть заново. События (находка блока, получение блока
+другим майнером) обрабатываются по очереди с приоритетом в симулируемом
+времени, так что 10 000 блоков считаются за доли секунды.
+
+Каждый майнер добывает на своей вершине и переходит на чужую цепочку,
+только если в ней больше суммарной работы; блок доходит до других
+майнеров с задержкой распространения, поэтому возникают ветвления и
+потерянные (orphan) блоки. Цель пересчитывается, как в Bitcoin, каждые
+retarget_interval блоков по времени предыдущего периода с ограничением
+изменения в max_adjustment раз.
+
+Запуск без интерфейса:
+
+    python -m modules.protocols.blockchain.simulation --blocks 10000 --change 4000:0.5
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+import argparse
+import heapq
+import math
+import sys
+import time
+
+import numpy as np
+
+MAX_TARGET = 1 << 256
+FIND, RECEIVE = 0, 1
+
+
+@dataclass
+class MinerSpec:
+    name: str
+    hashrate: float  # хешей в секунду
+
+
+@dataclass
+class HashrateChange:
+    """С момента, когда сеть достигает высоты at_height, хешрейт майнера умножается на factor"""
+    at_height: int
+    factor: float
+    miner: Optional[str] = None  # None - все майнеры
+
+
+@dataclass
+class SimulationConfig:
+    miners: List[MinerSpec]
+    blocks: int = 10_000
+    target_block_time: float = 600.0
+    retarget_interval: int = 2016
+    max_adjustment: float = 4.0
+    propagation_delay: float = 2.0       # средняя задержка доставки блока, с
+    changes: List[HashrateChange] = field(default_factory=list)
+    initial_target: Optional[int] = None  # по умолчанию - под суммарный хешрейт
+    seed: Optional[int] = None
+
+    @property
+    def total_hashrate(self) -> float:
+        return sum(miner.hashrate for miner in self.miners)
+
+
+def target_bits(target: int) -> float:
+    """Сложность в битах: log2(2^256 / цель) - сколько нулевых старших бит в среднем"""
+    return 256 - math.log2(target)
+
+
+def expected_hashes(target: int) -> float:
+    return MAX_TARGET / target
+
+
+def retarget(target: int, actual_timespan: float, expected_timespan: float, max_adjustment: float) -> int:
+    """Новая цель по времени предыдущего периода (как CalculateNextWorkRequired в Bitcoin)"""
+    timespan = min(max(actual_timespan, expected_timespan / max_adjustment), expected_timespan * max_adjustment)
+    return max(1, min(MAX_TARGET - 1, int(target * timespan / expected_timespan)))
+
+
+@dataclass
+class SimulationResult:
+    """Все блоки симуляции и основная цепочка"""
+    config: SimulationConfig
+    parents: np.ndarray        # номер родительского блока (-1 у генезиса)
+    heights: np.ndarray
+    times: np.ndarray          # симулируемое время находки, с
+    miners: np.ndarray         # номер майнера (-1 у генезиса)
+    bits: np.ndarray           # сложность блока в битах
+    main_chain: np.ndarray     # номера блоков основной цепочки от генезиса
+    hashrate_history: List[tuple]  # (время, суммарный хешрейт)
+
+    @property
+    def total_blocks(self) -> int:
+        return len(self.parents) - 1
+
+    @property
+    def orphans(self) -> int:
+        return self.total_blocks - (len(self.main_chain) - 1)
+
+    @property
+    def orphan_rate(self) -> float:
+        return self.orphans / self.total_blocks if self.total_blocks else 0.0
+
+    @property
+    def block_intervals(self) -> np.ndarray:
+        """Интервалы между блоками основной цепочки, с"""
+        return np.diff(self.times[self.main_chain])
+
+    @property
+    def main_bits(self) -> np.ndarray:
+        return self.bits[self.main_chain]
+
+    def rolling_block_time(self, window: int = 144) -> np.ndarray:
+        """Скользящее среднее интервала по window блокам"""
+        intervals = self.block_intervals
+        window = max(1, min(window, len(intervals)))
+        cumulative = np.concatenate([[0.0], np.cumsum(intervals)])
+        return (cumulative[window:] - cumulative[:-window]) / window
+
+    def miner_stats(self) -> List[Dict[str, float]]:
+        """Доли хешрейта, блоков основной цепочки и потерянных блоков по майнерам"""
+        total_rate = self.config.total_hashrate
+        in_main = np.zeros(len(self.parents), dtype=bool)
+        in_main[self.main_chain] = True
+        stats = []
+        for number, miner in enumerate(self.config.miners):
+            mined = self.miners == number
+            main = int(np.count_nonzero(mined & in_main))
+            orphaned = int(np.count_nonzero(mined & ~in_main))
+            stats.append({
+                "miner": miner.name,
+                "hashrate_share": miner.hashrate / total_rate if total_rate else 0.0,
+                "main_blocks": main,
+                "main_share": main / max(len(self.main_chain) - 1, 1),
+                "orphans": orphaned,
+                "orphan_rate": orphaned / (main + orphaned) if main + orphaned else 0.0,
+            })
+        return stats
+
+
+def simulate(config: SimulationConfig) -> SimulationResult:
+    """Симулирует сеть до появления config.blocks блоков (включая потерянные)"""
+    if not config.miners:
+        raise ValueError("Нужен хотя бы один майнер")
+    if config.retarget_interval < 2:
+        raise ValueError("Период пересчета сложности - не меньше 2 блоков")
+    rng = np.random.default_rng(config.seed)
+    miner_count = len(config.miners)
+    hashrates = [miner.hashrate for miner in config.miners]
+    names = {miner.name: number for number, miner in enumerate(config.miners)}
+    changes = sorted(config.changes, key=lambda change: change.at_height)
+    # Период из N блоков дает N - 1 интервалов между ними; в Bitcoin здесь
+    # ошибка на единицу (делят на N), в симуляции она не воспроизводится
+    expected_timespan = config.target_block_time * (config.retarget_interval - 1)
+
+    initial_target = config.initial_target or int(
+        MAX_TARGET / max(config.total_hashrate * config.target_block_time, 1.0))
+    initial_target = max(1, min(MAX_TARGET - 1, initial_target))
+
+    # Блоки: генезис - номер 0
+    parents, heights, times, miners, targets, work = [-1], [0], [0.0], [-1], [initial_target], [0.0]
+    tips = [0] * miner_count
+    versions = [0] * miner_count  # устаревшие события находки отбрасываются
+    events: list = []
+    now = 0.0
+    best = 0
+    hashrate_history = [(0.0, sum(hashrates))]
+
+    def next_target(parent: int) -> int:
+        """Цель блока, который будет добавлен после parent"""
+        height = heights[parent] + 1
+        if height % config.retarget_interval or height < config.retarget_interval:
+            return targets[parent]
+        # Время периода: от первого до последнего из предыдущих retarget_interval блоков
+        first = parent
+        for _ in range(config.retarget_interval - 1):
+            first = parents[first]
+        return retarget(targets[parent], times[parent] - times[first], expected_timespan, config.max_adjustment)
+
+    def schedule(miner: int) -> None:
+        versions[miner] += 1
+        rate = hashrates[miner] / expected_hashes(next_target(tips[miner]))
+        if rate > 0:
+            heapq.heappush(events, (now + rng.exponential(1 / rate), FIND, miner, versions[miner]))
+
+    for miner in range(miner_count):
+        schedule(miner)
+
+    while len(parents) - 1 < config.blocks and events:
+        now, kind, miner, payload = heapq.heappop(events)
+        if kind == FIND:
+            if payload != versions[miner]:
+                continue
+            parent = tips[miner]
+            block = len(parents)
+            target = next_target(parent)
+            parents.append(parent)
+            heights.append(heights[parent] + 1)
+            times.append(now)
+            miners.append(miner)
+            targets.append(target)
+            work.append(work[parent] + expected_hashes(target))
+            tips[miner] = block
+            if work[block] > work[best]:
+                best = block
+            for other in range(miner_count):
+                if other != miner:
+                    delay = rng.exponential(config.propagation_delay) if config.propagation_delay > 0 else 0.0
+                    heapq.heappush(events, (now + delay, RECEIVE, other, block))
+            while changes and heights[best] >= changes[0].at_height:
+                change = changes.pop(0)
+                affected = range(miner_count) if change.miner is None else [names[change.miner]]
+                for number in affected:
+                    hashrates[number] *= change.factor
+                    schedule(number)
+                hashrate_history.append((now, sum(hashrates)))
+            schedule(miner)
+        else:
+            block = payload
+            if work[block] > work[tips[miner]]:
+                tips[miner] = block
+                schedule(miner)
+
+    main_chain = []
+    block = best
+    while block != -1:
+        main_chain.append(block)
+        block = parents[block]
+
+    return SimulationResult(
+        config=config,
+        parents=np.array(parents),
+        heights=np.array(heights),
+        times=np.array(times),
+        miners=np.array(miners),
+        bits=np.array([target_bits(target) for target in targets]),
+        main_chain=np.array(main_chain[::-1]),
+        hashrate_history=hashrate_history,
+    )
+
+
+def default_miners(total_hashrate: float, shares: Sequence[float] = (0.3, 0.25, 0.2, 0.15, 0.1)) -> List[MinerSpec]:
+    """Пулы с заданными долями суммарного хешрейта"""
+    return [MinerSpec(f"Пул {number + 1}", total_hashrate * share) for number, share in enumerate(shares)]
+
+
+def parse_change(text: str) -> HashrateChange:
+    """'высота:множитель' или 'высота:множитель:майнер'"""
+    parts = text.split(":", 2)
+    if len(parts) < 2:
+        raise argparse.ArgumentTypeError("ожидается высота:множитель[:майнер]")
+    try:
+        return HashrateChange(int(parts[0]), float(parts[1]), parts[2] if len(parts) == 3 else None)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Симуляция сети Proof of Work с пересчетом сложности")
+    parser.add_argument("--blocks", type=int, default=10_000)
+    parser.add_argument("--hashrate", type=float, default=5e20, help="суммарный хешрейт, H/s")
+    parser.add_argument("--shares", nargs="+", type=float, default=[0.3, 0.25, 0.2, 0.15, 0.1],
+                        help="доли хешрейта пулов")
+    parser.add_argument("--block-time", type=float, default=600.0, help="целевой интервал, с")
+    parser.add_argument("--interval", type=int, default=2016, help="период пересчета сложности, блоков")
+    parser.add_argument("--delay", type=float, default=2.0, help="средняя задержка распространения, с")
+    parser.add_argument("--change", type=parse_change, action="append", default=[],
+                        help="изменение хешрейта высота:множитель[:майнер], можно несколько")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    config = SimulationConfig(default_miners(args.hashrate, args.shares), args.blocks, args.block_time,
+                              args.interval, propagation_delay=args.delay, changes=args.change, seed=args.seed)
+    start = time.perf_counter()
+    try:
+        result = simulate(config)
+    except (ValueError, KeyError) as error:
+        print(f"Ошибка: {error}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    intervals = result.block_intervals
+    print(f"Блоков: {result.total_blocks}, в основной цепочке: {len(result.main_chain) - 1}, "
+          f"потеряно: {result.orphans} ({result.orphan_rate:.3%})")
+    print(f"Интервал: среднее {intervals.mean():.1f} с, медиана {np.median(intervals):.1f} с, "
+          f"95-й процентиль {np.percentile(intervals, 95):.1f} с")
+    print(f"Сложность: {result.main_bits[0]:.3f} -> {result.main_bits[-1]:.3f} бит")
+    print(f"Симулировано {result.times[-1] / 86400:.1f} сут. за {elapsed:.2f} с")
+    print(f"\n{'Майнер':10s}{'хешрейт':>10s}{'блоки':>10s}{'потеряно':>10s}")
+    for item in result.miner_stats():
+        print(f"{item['miner']:10s}{item['hashrate_share']:10.1%}{item['main_share']:10.1%}{item['orphans']:10d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,35 @@
 from modules.base_module import CryptoModule
 import streamlit as st
 import secrets
-import hashlib
 import time
 import json
+import os
+import shutil
+import threading
+import weakref
 from typing import List, Tuple, Dict, Optional, Any
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
 import random
 import datetime
 from enum import Enum
+from modules.protocols.blockchain import block_store, chain_state, mempool, merkle, proof_of_work, signatures, simulation
+
+POW_NETWORK_HASHRATE = 5e20   # H/s, порядок хешрейта сети Bitcoin
+POW_JOULES_PER_HASH = 2e-11   # 20 Дж/TH - типичный ASIC-майнер
+INITIAL_WALLET_BALANCE = 100.0
+GENESIS_OUTPUTS = 10         # выходов генезиса на кошелек: можно отправить несколько транзакций до подтверждения
+VISIBLE_BLOCKS = 20          # блоков на схеме цепочки
+EXPLORER_PAGE_SIZE = 20
+GENERATE_BATCH = 1000        # блоков в одной записи на диск при генерации
+DEMO_BLOCK_WEIGHT = 400_000  # лимит веса блока в модели рынка комиссий
+WALLET_SIGNATURE_SCHEME = "secp256k1"  # как в Bitcoin
 
 class TransactionStatus(Enum):
     PENDING = "⏳ Ожидание"
@@ -38,6 +52,7 @@ class Block:
     nonce: int
     difficulty: int
     miner: str
+    merkle_root: str = merkle.EMPTY_ROOT.hex()
 
 @dataclass
 class Transaction:
@@ -65,6 +80,28 @@ class Wallet:
     public_key: str
     balance: float
     transactions: List[Transaction]
+    scheme: str = signatures.DEFAULT_SCHEME
+
+@dataclass
+class StoredChain:
+    """Цепочка в хранилище на диске; у каждой сессии приложения своя"""
+    directory: str
+    blockchain: Blockchain
+    wallets: List[Wallet]
+    state: chain_state.ChainState
+    mempool: mempool.Mempool
+    lock: threading.Lock
+
+SESSION_CHAINS = "sessions"  # подкаталог хранилищ сессий: <pid>-<случайный суффикс>
+
+def encode_block(block: Block) -> Tuple[bytes, bytes]:
+    """Хеш и JSON-представление блока для хранилища"""
+    data = asdict(block)
+    del data['hash']
+    return bytes.fromhex(block.hash), json.dumps(data, separators=(',', ':')).encode()
+
+def decode_block(block_hash: bytes, payload: bytes) -> Block:
+    return Block(hash=block_hash.hex(), **json.loads(payload))
 
 class BlockchainCryptoModule(CryptoModule):
     def __init__(self):
@@ -176,6 +213,7 @@ class BlockchainCryptoModule(CryptoModule):
                 index: номер блока,
                 timestamp: время создания,
                 transactions: список транзакций,
+                merkle_root: корень дерева Меркла транзакций (32 байта),
                 previous_hash: хеш предыдущего блока,
                 hash: хеш текущего блока,
                 nonce: число для Proof of Work,
@@ -201,9 +239,9 @@ class BlockchainCryptoModule(CryptoModule):
         st.markdown("---")
         
         # Основной интерфейс с вкладками
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
             "🔗 Визуализация блокчейна", "💰 Криптовалюты", "⚡ Алгоритмы консенсуса", 
-            "🖋️ Смарт-контракты", "🎮 Демонстрация", "🔮 Будущее"
+            "🖋️ Смарт-контракты", "🎮 Демонстрация", "🌳 Дерево Меркла", "🔮 Будущее"
         ])
 
         with tab1:
@@ -222,18 +260,25 @@ class BlockchainCryptoModule(CryptoModule):
             self.render_demo_section()
             
         with tab6:
+            self.render_merkle_demo()
+            
+        with tab7:
             self.render_future_trends()
 
     def render_blockchain_visualization(self):
         """Интерактивная визуализация блокчейна"""
         st.header("🔗 Визуализация блокчейна")
         
-        # Инициализация блокчейна
-        if 'blockchain' not in st.session_state:
-            st.session_state.blockchain = self.create_genesis_blockchain()
-        
-        if 'wallets' not in st.session_state:
-            st.session_state.wallets = self.create_demo_wallets()
+        # Инициализация блокчейна: блоки читаются с диска по мере обращения
+        if 'stored_chain' not in st.session_state:
+            st.session_state.stored_chain = self.create_session_chain()
+        chain = st.session_state.stored_chain
+        st.caption("Демо-хранилище: цепочка и кошельки принадлежат этой сессии, каталог удаляется "
+                   "после ее завершения, закрытые ключи на диск не записываются.")
+        st.session_state.blockchain = chain.blockchain
+        st.session_state.wallets = chain.wallets
+        st.session_state.chain_state = chain.state
+        state = chain.state
         
         col1, col2 = st.columns([2, 1])
         
@@ -245,17 +290,39 @@ class BlockchainCryptoModule(CryptoModule):
             fig = self.create_blockchain_visualization(blockchain)
             st.plotly_chart(fig, use_container_width=True)
             
-            # Детали выбранного блока
-            selected_block_idx = st.selectbox(
-                "Выберите блок для деталей:",
-                range(len(blockchain.blocks)),
-                format_func=lambda x: f"Блок #{x}",
+            # Детали выбранного блока: выборка по высоте из индекса на диске
+            selected_block_idx = st.number_input(
+                "Высота блока для деталей:",
+                min_value=0,
+                max_value=len(blockchain.blocks) - 1,
+                value=0,
                 key="block_select"
             )
             
             if selected_block_idx < len(blockchain.blocks):
                 block = blockchain.blocks[selected_block_idx]
                 self.display_block_details(block)
+            
+            # Поиск по индексам блоков и транзакций - без перебора цепочки
+            query = st.text_input("🔎 Найти блок или транзакцию по хешу:", key="tx_lookup").strip().lower()
+            if query:
+                found_block = None
+                if len(query) == 64 and all(char in "0123456789abcdef" for char in query):
+                    found_block = blockchain.blocks.by_hash(bytes.fromhex(query))
+                found = state.find_transaction(query)
+                if found_block is not None:
+                    st.success(f"Блок #{found_block.index}")
+                    self.display_block_details(found_block)
+                elif found:
+                    found_block, tx = found
+                    st.success(f"Блок #{found_block.index}: {tx['sender'][:8]} → {tx['receiver'][:8]}, "
+                               f"{tx['amount']} (комиссия {tx['fee']})")
+                else:
+                    st.warning("Блок или транзакция не найдены в цепочке")
+            
+            self.render_block_explorer(chain)
+            self.render_fee_market()
+            self.render_signature_benchmark()
         
         with col2:
             st.subheader("🔄 Создание транзакций")
@@ -266,6 +333,7 @@ class BlockchainCryptoModule(CryptoModule):
                 [wallet.address for wallet in st.session_state.wallets],
                 key="tx_sender"
             )
+            st.caption(f"Баланс: {state.balance(sender):.8g}")
             
             receiver = st.selectbox(
                 "Получатель:",
@@ -293,35 +361,296 @@ class BlockchainCryptoModule(CryptoModule):
             
             if st.button("💸 Создать транзакцию", key="create_tx"):
                 if sender != receiver:
-                    transaction = self.create_transaction(sender, receiver, amount, fee)
-                    if 'pending_transactions' not in st.session_state:
-                        st.session_state.pending_transactions = []
-                    st.session_state.pending_transactions.append(transaction)
-                    st.success("✅ Транзакция создана!")
+                    try:
+                        with chain.lock:
+                            # Входы - подтвержденные выходы отправителя, еще не потраченные в пуле
+                            inputs = state.select_inputs(sender, amount + fee, chain.mempool.spends)
+                            wallet = next(wallet for wallet in chain.wallets if wallet.address == sender)
+                            if not wallet.private_key:
+                                raise chain_state.ValidationError(
+                                    "Закрытый ключ кошелька не сохраняется на диск - подписать нечем")
+                            transaction = self.create_transaction(sender, receiver, amount, fee, inputs, wallet)
+                            state.check_transactions([transaction])
+                            removed = chain.mempool.add(transaction)
+                    except chain_state.ValidationError as error:
+                        st.error(f"❌ {error}")
+                    else:
+                        fee_rate = f"{chain_state.to_units(fee) / transaction['size']:,.0f}".replace(",", " ")
+                        st.success(f"✅ Транзакция создана! {transaction['size']} vБ, ставка {fee_rate} ед./vБ")
+                        if removed:
+                            st.info(f"Вытеснено из пула транзакций: {len(removed)}")
                 else:
                     st.error("❌ Отправитель и получатель не могут быть одинаковыми")
             
+            self.render_mempool_summary(chain.mempool)
+            
             # Майнинг блока
             st.subheader("⛏️ Майнинг блока")
             
+            difficulty_bits = st.slider(
+                "Сложность (нулевых бит хеша):",
+                min_value=1,
+                max_value=40,
+                value=blockchain.difficulty * 4,
+                key="mining_bits",
+                help="Хеш заголовка должен быть меньше 2^(256 - бит); в среднем нужно 2^бит попыток"
+            )
+            mining_timeout = st.slider(
+                "Ограничение времени (с):",
+                min_value=1,
+                max_value=60,
+                value=10,
+                key="mining_timeout"
+            )
+            mining_workers = st.slider(
+                "Процессов:",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 8),
+                value=os.cpu_count() or 1,
+                key="mining_workers"
+            )
+            verify_workers = st.slider(
+                "Потоков проверки подписей:",
+                min_value=1,
+                max_value=max(os.cpu_count() or 1, 8),
+                value=os.cpu_count() or 1,
+                key="verify_workers"
+            )
+            st.caption(f"Ожидается около 2^{difficulty_bits} ≈ {2 ** difficulty_bits:,} хешей".replace(",", " "))
+            
             if st.button("🔄 Добыть блок", key="mine_block"):
-                if 'pending_transactions' in st.session_state and st.session_state.pending_transactions:
+                # Шаблон блока: транзакции пула по убыванию ставки комиссии в пределах веса
+                template = chain.mempool.block_template()
+                if template.transactions:
+                    status = st.empty()
+                    
+                    def report(hash_count, elapsed):
+                        rate = hash_count / elapsed if elapsed else 0
+                        status.text(f"Хешей: {hash_count:,}  |  {rate / 1e6:.2f} млн/с  |  {elapsed:.1f} с".replace(",", " "))
+                    
                     new_block = self.mine_block(
                         st.session_state.blockchain,
-                        st.session_state.pending_transactions,
-                        "Miner_1"
+                        template.transactions,
+                        "Miner_1",
+                        difficulty_bits=difficulty_bits,
+                        workers=mining_workers,
+                        timeout=mining_timeout,
+                        progress=report
                     )
-                    st.session_state.blockchain.blocks.append(new_block)
-                    st.session_state.pending_transactions = []
-                    
-                    # Обновление балансов
-                    self.update_wallet_balances(new_block)
-                    
-                    st.success(f"✅ Блок #{new_block.index} успешно добыт!")
-                    st.balloons()
+                    if new_block is None:
+                        st.error(f"⏱️ Nonce не найден за {mining_timeout} с - уменьшите сложность "
+                                 f"или увеличьте ограничение времени")
+                    else:
+                        try:
+                            # Проверяется только новый блок против индексов состояния,
+                            # затем он дописывается в хранилище
+                            with chain.lock:
+                                state.signature_workers = verify_workers
+                                state.connect_block(new_block)
+                                chain.mempool.remove_for_block(new_block.transactions)
+                                self.save_chain_snapshot(chain)
+                        except chain_state.ValidationError as error:
+                            st.error(f"❌ Блок отклонен: {error}")
+                        else:
+                            # Обновление балансов
+                            self.update_wallet_balances(new_block)
+                            
+                            st.success(f"✅ Блок #{new_block.index} успешно добыт! Nonce: {new_block.nonce}")
+                            validation = state.validations[-1]
+                            rate = f"{validation.signatures_per_second:,.0f}".replace(",", " ")
+                            st.info(f"🔏 Проверка блока: {validation.transactions} подписей за "
+                                    f"{validation.signature_seconds * 1000:.2f} мс ({rate} в секунду), "
+                                    f"{validation.signature_share:.0%} времени проверки блока")
+                            st.balloons()
                 else:
                     st.warning("⚠️ Нет транзакций для включения в блок")
 
+    def render_mempool_summary(self, pool: mempool.Mempool):
+        """Состояние пула неподтвержденных транзакций"""
+        st.subheader("📥 Пул транзакций")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Транзакций", len(pool))
+        col2.metric("Размер", f"{pool.total_vsize:,} vБ".replace(",", " "))
+        col3.metric("Мин. ставка", f"{pool.min_fee_rate:.1f} ед./vБ")
+        if len(pool):
+            top = sorted(pool.entries.values(), key=lambda entry: -entry.fee_rate)[:10]
+            st.dataframe(pd.DataFrame([{
+                "Хеш": entry.tx_hash[:12] + "...",
+                "Ставка (ед./vБ)": round(entry.fee_rate),
+                "vБ": entry.vsize,
+                "Входов": len(entry.inputs)
+            } for entry in top]), use_container_width=True, hide_index=True)
+
+    def render_fee_market(self):
+        """Модель рынка комиссий и замер пула на синтетических транзакциях"""
+        with st.expander("💹 Рынок комиссий"):
+            st.markdown("""
+            Между блоками приходят транзакции со случайной (логнормальной) ставкой комиссии. Майнер
+            собирает шаблон блока из самых выгодных транзакций пула, пока хватает веса. Когда спрос
+            превышает вместимость блоков, пул растет, ставки для попадания в блок повышаются, а при
+            переполнении пула транзакции с наименьшей ставкой вытесняются и минимальная ставка входа растет.
+            """)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                blocks = st.slider("Блоков:", 20, 288, 144, key="fee_blocks")
+                base_rate = st.slider("Транзакций за блок:", 100, 1000, 400, step=50, key="fee_arrivals")
+            with col2:
+                surge = st.slider("Множитель спроса в пик:", 1.0, 5.0, 2.25, step=0.25, key="fee_surge")
+                surge_range = st.slider("Пик (блоки):", 0, blocks, (blocks // 4, blocks // 2), key="fee_surge_range")
+            with col3:
+                pool_size = st.slider("Размер пула (МvБ):", 0.5, 10.0, 2.0, step=0.5, key="fee_pool_size")
+                st.caption(f"Вместимость блока: {DEMO_BLOCK_WEIGHT // 4:,} vБ - около "
+                           f"{DEMO_BLOCK_WEIGHT // 4 // mempool.transaction_vsize(2)} транзакций".replace(",", " "))
+            
+            if st.button("▶️ Смоделировать", key="fee_run"):
+                def arrivals(height: int) -> float:
+                    return base_rate * (surge if surge_range[0] <= height < surge_range[1] else 1.0)
+                
+                with st.spinner("Моделирование..."):
+                    st.session_state.fee_market = pd.DataFrame(mempool.simulate_fee_market(
+                        blocks, arrivals, max_weight=DEMO_BLOCK_WEIGHT, max_vsize=int(pool_size * 1e6)
+                    ))
+            
+            if 'fee_market' in st.session_state:
+                history = st.session_state.fee_market
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=history["height"], y=history["median_included_rate"],
+                                         mode='lines', name='Медианная ставка в блоке'))
+                fig.add_trace(go.Scatter(x=history["height"], y=history["min_included_rate"],
+                                         mode='lines', name='Минимальная ставка в блоке'))
+                fig.add_trace(go.Scatter(x=history["height"], y=history["min_fee_rate"],
+                                         mode='lines', line=dict(dash='dot'), name='Минимальная ставка входа'))
+                fig.add_trace(go.Bar(x=history["height"], y=history["mempool_vsize"] / 1e6,
+                                     name='Пул (МvБ)', yaxis='y2', opacity=0.3))
+                fig.update_layout(
+                    title="Ставки комиссии и размер пула по блокам",
+                    xaxis_title="Блок",
+                    yaxis=dict(title="ед./vБ"),
+                    yaxis2=dict(title="МvБ", overlaying='y', side='right'),
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Вытеснено", int(history["evicted"].sum()))
+                col2.metric("Отклонено при входе", int(history["rejected"].sum()))
+                col3.metric("Комиссии майнеров", f"{history['fees'].sum() / chain_state.UNITS:.4f}")
+            
+            st.markdown("**Замер пула:** 100 000 синтетических транзакций в пул вдвое меньшего размера, 2% - двойные траты")
+            if st.button("⏱️ Запустить замер", key="mempool_benchmark"):
+                with st.spinner("Замер..."):
+                    result = mempool.benchmark(100_000)
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Вставок в секунду", f"{result.inserts_per_second:,.0f}".replace(",", " "))
+                col2.metric("Вытеснено", result.evicted)
+                col3.metric("Заменено (RBF)", result.replaced)
+                col4.metric("Шаблон блока", f"{result.template_seconds * 1e3:.0f} мс")
+
+    def render_signature_benchmark(self):
+        """Стоимость проверки блока: подписи против остальных проверок"""
+        with st.expander("🔏 Проверка подписей в блоке"):
+            st.markdown("""
+            Каждая транзакция подписана ключом отправителя. Проверка блока - связь с вершиной,
+            корень Меркла, Proof of Work и входы по индексу UTXO - стоит микросекунды на транзакцию,
+            а проверка подписи - сотни микросекунд, поэтому подписи составляют почти всю стоимость
+            проверки. Подписи проверяются пачкой в пуле потоков: OpenSSL отпускает GIL,
+            и проверка масштабируется по ядрам.
+            """)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                scheme = st.selectbox("Схема:", signatures.SCHEMES, key="sig_scheme")
+            with col2:
+                count = st.number_input("Транзакций в блоке:", min_value=64, max_value=5000,
+                                        value=1000, step=64, key="sig_count")
+            with col3:
+                max_workers = st.number_input("До потоков:", min_value=1, max_value=32,
+                                              value=max(os.cpu_count() or 1, 4), key="sig_workers")
+            st.caption(f"Ядер процессора: {os.cpu_count() or 1}")
+            
+            if st.button("⏱️ Проверить блок", key="sig_run"):
+                with st.spinner("Подпись транзакций..."):
+                    genesis, block, allocations = self.create_signed_block(scheme, int(count))
+                rows = []
+                workers = 1
+                while workers <= max_workers:
+                    state = chain_state.ChainState(genesis, allocations, check_pow=False, signature_workers=workers)
+                    state.check_block(block)
+                    validation = state.validations[-1]
+                    rows.append({
+                        "Потоков": workers,
+                        "Подписей в секунду": round(validation.signatures_per_second),
+                        "Подписи, мс": round(validation.signature_seconds * 1000, 1),
+                        "Остальные проверки, мс": round((validation.total_seconds - validation.signature_seconds) * 1000, 1),
+                        "Доля подписей": f"{validation.signature_share:.1%}",
+                    })
+                    workers *= 2
+                results = pd.DataFrame(rows)
+                st.dataframe(results, use_container_width=True, hide_index=True)
+                fig = px.bar(results, x="Потоков", y=["Подписи, мс", "Остальные проверки, мс"],
+                             title=f"Время проверки блока из {int(count)} транзакций ({scheme})")
+                fig.update_layout(yaxis_title="мс", xaxis_type="category", legend_title="")
+                st.plotly_chart(fig, use_container_width=True)
+
+    def create_signed_block(self, scheme: str, count: int, senders: int = 16) -> Tuple[Block, Block, Dict[str, List[float]]]:
+        """Генезис, блок из count подписанных переводов и выходы генезиса отправителей"""
+        keys = [signatures.generate_private_key(scheme) for _ in range(senders)]
+        wallets = [Wallet(signatures.address_of(signatures.public_key_of(scheme, key)), key, "", 0.0, [], scheme)
+                   for key in keys]
+        per_sender = -(-count // senders)
+        allocations = {wallet.address: [1.0] * per_sender for wallet in wallets}
+        genesis = self.create_genesis_block()
+        state = chain_state.ChainState(genesis, allocations, check_pow=False)
+        used = set()
+        transactions = []
+        for number in range(count):
+            wallet = wallets[number % senders]
+            inputs = state.select_inputs(wallet.address, 1.0, used)
+            used.update(inputs)
+            receiver = wallets[(number + 1) % senders].address
+            transactions.append(self.create_transaction(wallet.address, receiver, 0.99, 0.01, inputs, wallet))
+        root = merkle.transaction_root([tx['tx_hash'] for tx in transactions]).hex()
+        block = Block(1, time.time(), transactions, genesis.hash, secrets.token_hex(32), 0, 0, "Benchmark", root)
+        return genesis, block, allocations
+
+    def render_block_explorer(self, chain: StoredChain):
+        """Постраничный просмотр цепочки из хранилища и генерация демо-блоков"""
+        blocks = chain.blockchain.blocks
+        store = blocks.store
+        
+        with st.expander("📜 Обозреватель блоков"):
+            block_count = f"{len(blocks):,}".replace(",", " ")
+            st.caption(f"Хранилище: {chain.directory} - {block_count} блоков, "
+                       f"{store.disk_size() / 2**20:.1f} МБ на диске")
+            
+            pages = max(1, -(-len(blocks) // EXPLORER_PAGE_SIZE))
+            page = st.number_input("Страница (1 - вершина цепочки):", min_value=1, max_value=pages,
+                                   value=1, key="explorer_page")
+            stop = len(blocks) - (page - 1) * EXPLORER_PAGE_SIZE
+            start = max(0, stop - EXPLORER_PAGE_SIZE)
+            # Страница читается одним последовательным чтением журнала
+            rows = [{
+                "Высота": block.index,
+                "Хеш": block.hash[:16] + "...",
+                "Транзакций": len(block.transactions),
+                "Сложность (бит)": block.difficulty,
+                "Майнер": block.miner,
+                "Время": datetime.datetime.fromtimestamp(block.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            } for block in blocks[start:stop]]
+            st.dataframe(pd.DataFrame(rows[::-1]), use_container_width=True, hide_index=True)
+            
+            count = st.select_slider(
+                "Сгенерировать пустых блоков:",
+                [1_000, 10_000, 100_000, 1_000_000],
+                value=10_000,
+                key="generate_count",
+                help="Блоки без транзакций со сложностью 1 бит - для проверки работы с длинной цепочкой"
+            )
+            if st.button("🧪 Сгенерировать", key="generate_blocks"):
+                bar = st.progress(0.0)
+                start_time = time.perf_counter()
+                self.generate_empty_blocks(chain, count, lambda done: bar.progress(done / count))
+                st.success(f"✅ Добавлено {count:,} блоков за {time.perf_counter() - start_time:.1f} с"
+                           .replace(",", " "))
+
     def render_cryptocurrencies_section(self):
         """Сравнение криптовалют"""
         st.header("💰 Криптовалюты")
@@ -520,13 +849,137 @@ class BlockchainCryptoModule(CryptoModule):
                 result = st.session_state.mining_result
                 
                 st.write(f"**Алгоритм:** {result['algorithm']}")
-                st.write(f"**Время:** {result['time']} сек")
-                st.write(f"**Энергия:** {result['energy']} кВт·ч")
-                st.write(f"**Награда:** {result['reward']} монет")
+                st.write(f"**Время:** {result['time']:.1f} сек")
+                st.write(f"**Энергия:** {result['energy']:,.2f} кВт·ч")
+                st.write(f"**Награда:** {result['reward']:.2f} монет")
+                if 'orphan_rate' in result:
+                    st.write(f"**Потерянные блоки:** {result['orphan_rate']:.2%}")
                 
                 # Визуализация эффективности
                 efficiency = result['energy'] / result['reward'] if result['reward'] > 0 else 0
-                st.metric("Эффективность", f"{efficiency:.2f} кВт·ч/монета")
+                st.metric("Эффективность", f"{efficiency:,.2f} кВт·ч/монета")
+        
+        self.render_chain_simulation()
+
+    def render_chain_simulation(self):
+        """Событийная симуляция сети PoW: пересчет сложности, потерянные блоки, смена хешрейта"""
+        st.markdown("---")
+        st.subheader("📈 Симуляция сети Proof of Work")
+        
+        st.markdown("""
+        Несколько пулов с заданным хешрейтом добывают блоки в **симулируемом времени**: время находки
+        блока распределено экспоненциально, реальное хеширование не выполняется, поэтому тысячи блоков
+        считаются за доли секунды. Блоки доходят до других пулов с задержкой - так появляются ветвления
+        и потерянные блоки. Каждые N блоков цель пересчитывается по фактическому времени периода
+        (не больше чем в 4 раза за раз), как в Bitcoin.
+        """)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            blocks = st.slider("Блоков:", 1000, 20000, 10000, step=1000, key="sim_blocks")
+            block_time = st.number_input("Целевой интервал (с):", 1.0, 3600.0, 600.0, step=1.0, key="sim_block_time")
+        with col2:
+            interval = st.slider("Пересчет сложности каждые (блоков):", 10, 2016, 2016, key="sim_interval")
+            delay = st.slider("Средняя задержка распространения (с):", 0.0, 60.0, 2.0, step=0.5, key="sim_delay")
+        with col3:
+            change_height = st.slider("Изменение хешрейта на высоте:", 0, blocks, blocks // 3, key="sim_change_height")
+            change_factor = st.select_slider("Множитель хешрейта:", [0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0],
+                                             value=0.5, key="sim_change_factor")
+        
+        miners = st.data_editor(
+            pd.DataFrame({
+                "Пул": [miner.name for miner in simulation.default_miners(1.0)],
+                "Хешрейт (EH/s)": [round(miner.hashrate * POW_NETWORK_HASHRATE / 1e18)
+                                   for miner in simulation.default_miners(1.0)]
+            }),
+            num_rows="dynamic",
+            use_container_width=True,
+            key="sim_miners"
+        )
+        
+        if st.button("▶️ Запустить симуляцию", key="sim_run"):
+            specs = [simulation.MinerSpec(str(row["Пул"]), float(row["Хешрейт (EH/s)"]) * 1e18)
+                     for _, row in miners.dropna().iterrows() if row["Хешрейт (EH/s)"] > 0]
+            if not specs:
+                st.error("Нужен хотя бы один пул с положительным хешрейтом")
+            else:
+                changes = [simulation.HashrateChange(change_height, change_factor)] if change_factor != 1.0 else []
+                config = simulation.SimulationConfig(specs, blocks, block_time, interval,
+                                                     propagation_delay=delay, changes=changes)
+                start_time = time.perf_counter()
+                st.session_state.chain_simulation = simulation.simulate(config)
+                st.session_state.chain_simulation_elapsed = time.perf_counter() - start_time
+        
+        if 'chain_simulation' not in st.session_state:
+            return
+        
+        result = st.session_state.chain_simulation
+        config = result.config
+        intervals = result.block_intervals
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Блоков в основной цепочке", len(result.main_chain) - 1)
+        col2.metric("Потерянные блоки", result.orphans, f"{result.orphan_rate:.2%}", delta_color="off")
+        col3.metric("Средний интервал", f"{intervals.mean():.1f} с",
+                    f"{intervals.mean() - config.target_block_time:+.1f} с", delta_color="off")
+        col4.metric("Сложность", f"{result.main_bits[-1]:.3f} бит",
+                    f"{result.main_bits[-1] - result.main_bits[0]:+.3f}", delta_color="off")
+        st.caption(f"Симулировано {result.times[-1] / 86400:.1f} сут. сети за "
+                   f"{st.session_state.get('chain_simulation_elapsed', 0):.2f} с")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            # Распределение интервалов и экспонента с целевым средним
+            counts, edges = np.histogram(intervals, bins=60, range=(0, config.target_block_time * 6))
+            centers = (edges[:-1] + edges[1:]) / 2
+            width = edges[1] - edges[0]
+            expected = len(intervals) * width / config.target_block_time * np.exp(-centers / config.target_block_time)
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=centers, y=counts, name='Симуляция'))
+            fig.add_trace(go.Scatter(x=centers, y=expected, mode='lines', name='Экспонента'))
+            fig.update_layout(
+                title="Распределение интервалов между блоками",
+                xaxis_title="Интервал (с)",
+                yaxis_title="Блоков",
+                height=350
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            window = min(144, len(intervals))
+            rolling = result.rolling_block_time(window)
+            heights = np.arange(window, window + len(rolling))
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=heights, y=rolling, mode='lines', name=f'Интервал ({window} бл.)'))
+            fig.add_trace(go.Scatter(x=np.arange(len(result.main_bits)), y=result.main_bits,
+                                     mode='lines', name='Сложность (бит)', yaxis='y2'))
+            for change in config.changes:
+                fig.add_vline(x=change.at_height, line_dash="dash", line_color="red")
+            fig.add_hline(y=config.target_block_time, line_dash="dot", line_color="gray")
+            fig.update_layout(
+                title="Интервал и сложность по высоте",
+                xaxis_title="Высота",
+                yaxis=dict(title="Интервал (с)"),
+                yaxis2=dict(title="Бит", overlaying='y', side='right'),
+                height=350
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        
+        stats = pd.DataFrame(result.miner_stats())
+        st.dataframe(
+            pd.DataFrame({
+                "Пул": stats["miner"],
+                "Доля хешрейта": stats["hashrate_share"].map("{:.1%}".format),
+                "Блоков в цепочке": stats["main_blocks"],
+                "Доля блоков": stats["main_share"].map("{:.1%}".format),
+                "Потеряно": stats["orphans"],
+                "Доля потерь": stats["orphan_rate"].map("{:.2%}".format)
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption("Крупные пулы теряют меньше блоков: свои блоки они получают без задержки. "
+                   "После резкого изменения хешрейта интервал отклоняется от целевого до ближайшего пересчета.")
 
     def render_smart_contracts(self):
         """Смарт-контракты"""
@@ -737,6 +1190,132 @@ contract Crowdfunding {
             else:
                 st.info("👆 Создайте блокчейн для просмотра статистики")
 
+    def render_merkle_demo(self):
+        """Дерево Меркла: доказательство включения транзакции"""
+        st.header("🌳 Дерево Меркла")
+        
+        st.markdown("""
+        Заголовок блока хранит не список транзакций, а **корень дерева Меркла** - 32 байта при любом
+        числе транзакций. Чтобы убедиться, что транзакция входит в блок, легкому клиенту достаточно
+        самой транзакции и хешей соседних поддеревьев на пути к корню - около log₂(n) хешей.
+        """)
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            size = st.select_slider(
+                "Транзакций в блоке:",
+                options=[1_000, 10_000, 100_000, 1_000_000],
+                value=10_000,
+                format_func=lambda value: f"{value:,}".replace(",", " "),
+                key="merkle_size",
+                help="Дерево и идентификаторы транзакций хранятся в сессии: около 96 байт на "
+                     "транзакцию, для 1 000 000 - порядка 100 МБ"
+            )
+        with col2:
+            st.write("")
+            build = st.button("🌳 Построить дерево", key="merkle_build", use_container_width=True)
+        
+        if build:
+            with st.spinner("Хешируем транзакции..."):
+                tx_ids = secrets.token_bytes(32 * size)
+                start = time.perf_counter()
+                tree = merkle.MerkleTree(tx_ids[offset:offset + 32] for offset in range(0, len(tx_ids), 32))
+                st.session_state.merkle_demo = {
+                    'tree': tree,
+                    'tx_ids': tx_ids,
+                    'build_seconds': time.perf_counter() - start,
+                }
+        
+        demo = st.session_state.get('merkle_demo')
+        if demo is None:
+            st.info("👆 Постройте дерево для блока с выбранным числом транзакций")
+            return
+        
+        tree = demo['tree']
+        tx_ids = demo['tx_ids']
+        n = len(tree)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Транзакций", f"{n:,}".replace(",", " "))
+        col2.metric("Высота дерева", tree.height)
+        col3.metric("Построение", f"{demo['build_seconds']:.2f} с")
+        col4.metric("Узлы в памяти", f"{sum(len(level) for level in tree.levels) / 2**20:.1f} МБ")
+        st.code(f"Корень Меркла: {tree.root.hex()}")
+        
+        # Доказательство включения
+        st.subheader("🔍 Проверка одной транзакции")
+        index = st.number_input(
+            "Номер транзакции:",
+            min_value=0,
+            max_value=n - 1,
+            value=min(123_456, n - 1),
+            key=f"merkle_index_{n}"
+        )
+        tx_id = tx_ids[index * 32:(index + 1) * 32]
+        proof = tree.inclusion_proof(index)
+        tamper = st.checkbox("Подменить один хеш пути (атака)", key="merkle_tamper")
+        if tamper and proof.path:
+            proof.path[len(proof.path) // 2] = secrets.token_bytes(32)
+        
+        start = time.perf_counter()
+        valid = merkle.verify_inclusion(tx_id, proof, tree.root)
+        verify_seconds = time.perf_counter() - start
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Хешей при проверке", proof.hashes)
+        col2.metric("Размер доказательства", f"{32 * len(proof.path)} байт")
+        col3.metric("Время проверки", f"{verify_seconds * 1e6:.0f} мкс")
+        
+        if valid:
+            st.success(f"✅ Транзакция {tx_id.hex()[:16]}... входит в блок с этим корнем")
+        else:
+            st.error("❌ Восстановленный корень не совпадает с корнем в заголовке блока")
+        
+        with st.expander("📋 Путь доказательства"):
+            position = index
+            rows = []
+            for level in range(tree.height):
+                sibling = position ^ 1
+                if sibling < len(tree.levels[level]) // merkle.DIGEST_SIZE:
+                    rows.append({
+                        'Уровень': level,
+                        'Сосед': 'слева' if sibling < position else 'справа',
+                        'Хеш': proof.path[len(rows)].hex()
+                    })
+                position >>= 1
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        
+        # Изменение транзакции и согласованность
+        st.subheader("✏️ Изменение и дополнение блока")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Изменить выбранную транзакцию", key="merkle_update"):
+                old_root = tree.root
+                replacement = secrets.token_bytes(32)
+                start = time.perf_counter()
+                tree.update(index, replacement)
+                seconds = time.perf_counter() - start
+                demo['tx_ids'] = tx_ids[:index * 32] + replacement + tx_ids[(index + 1) * 32:]
+                st.warning(f"Корень изменился: {old_root.hex()[:16]}... → {tree.root.hex()[:16]}... "
+                           f"(пересчитано {tree.height} узлов за {seconds * 1e6:.0f} мкс)")
+        with col2:
+            old_size = st.number_input(
+                "Размер прежнего дерева:",
+                min_value=1,
+                max_value=n,
+                value=max(1, n // 3),
+                key=f"merkle_old_size_{n}"
+            )
+            if st.button("Проверить согласованность", key="merkle_consistency"):
+                # Корень прежнего дерева строится заново только для проверки демонстрации
+                old_root = merkle.MerkleTree.from_leaf_hashes(tree.levels[0][:old_size * merkle.DIGEST_SIZE]).root
+                consistency = tree.consistency_proof(old_size)
+                if consistency.verify(old_root, tree.root):
+                    st.success(f"✅ Первые {old_size} транзакций - префикс текущего дерева "
+                               f"({len(consistency.path)} хешей в доказательстве согласованности)")
+                else:
+                    st.error("❌ Доказательство согласованности не прошло проверку")
+
     def render_future_trends(self):
         """Будущие тенденции"""
         st.header("🔮 Будущее блокчейнов и криптовалют")
@@ -852,27 +1431,157 @@ contract Crowdfunding {
         """Создание демо кошельков"""
         wallets = []
         for i in range(3):
-            private_key = secrets.token_hex(32)
-            public_key = hashlib.sha256(private_key.encode()).hexdigest()
-            address = public_key[:40]
+            # Адрес - первые 20 байт SHA-256 открытого ключа
+            private_key = signatures.generate_private_key(WALLET_SIGNATURE_SCHEME)
+            public_key = signatures.public_key_of(WALLET_SIGNATURE_SCHEME, private_key)
+            address = signatures.address_of(public_key)
             
             wallet = Wallet(
                 address=address,
                 private_key=private_key,
                 public_key=public_key,
-                balance=100.0,
-                transactions=[]
+                balance=INITIAL_WALLET_BALANCE,
+                transactions=[],
+                scheme=WALLET_SIGNATURE_SCHEME
             )
             wallets.append(wallet)
         
         return wallets
 
+    def create_session_chain(self) -> StoredChain:
+        """Новая цепочка сессии в отдельном каталоге; каталог удаляется вместе с объектом цепочки"""
+        sessions = block_store.default_directory(SESSION_CHAINS)
+        self.remove_stale_session_chains(sessions)
+        directory = os.path.join(sessions, f"{os.getpid()}-{secrets.token_hex(8)}")
+        chain = self.open_stored_chain(directory)
+        weakref.finalize(chain, self.remove_chain_directory, chain.blockchain.blocks.store, directory)
+        return chain
+
+    @staticmethod
+    def remove_chain_directory(store: block_store.BlockStore, directory: str):
+        store.close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    @staticmethod
+    def remove_stale_session_chains(sessions: str):
+        """Удаляет каталоги сессий завершившихся процессов (после аварийной остановки сервера)"""
+        if not os.path.isdir(sessions):
+            return
+        for name in os.listdir(sessions):
+            pid = name.split("-", 1)[0]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(sessions, name), ignore_errors=True)
+            except PermissionError:
+                pass  # процесс жив, но принадлежит другому пользователю
+
+    def open_stored_chain(self, directory: str, reset: bool = False) -> StoredChain:
+        """Открывает (или создает) цепочку в каталоге.
+
+        Существующие блоки удаляются только при reset=True: без метаданных
+        (или без схемы подписи - хранилище создано до появления подписей)
+        цепочку не открыть, и решение о сбросе принимает пользователь.
+        Закрытые ключи кошельков в meta.json не пишутся: у открытой заново
+        цепочки кошельки доступны только для просмотра.
+        """
+        store = block_store.BlockStore(directory)
+        blocks = block_store.StoredBlocks(store, encode_block, decode_block)
+        meta = self.read_json(os.path.join(directory, 'meta.json'))
+        if len(blocks) and (meta is None or "scheme" not in meta) and not reset:
+            store.close()
+            reason = "нет метаданных (meta.json)" if meta is None else "блоки созданы до появления подписей"
+            raise block_store.BlockStoreError(
+                f"Сохраненную цепочку ({len(blocks)} блоков) не открыть: {reason}")
+        created = reset or not len(blocks)
+        if created:
+            store.truncate(0)
+            wallets = self.create_demo_wallets()
+            blockchain = self.create_genesis_blockchain()
+            blocks.append(blockchain.blocks[0])
+            meta = {
+                "name": blockchain.name,
+                "difficulty": blockchain.difficulty,
+                "scheme": WALLET_SIGNATURE_SCHEME,
+                "wallets": [{"address": wallet.address, "public_key": wallet.public_key,
+                             "scheme": wallet.scheme} for wallet in wallets]
+            }
+            self.write_json(os.path.join(directory, 'meta.json'), meta)
+        else:
+            wallets = [Wallet(private_key="", balance=INITIAL_WALLET_BALANCE, transactions=[],
+                              **{name: value for name, value in item.items() if name != "private_key"})
+                       for item in meta["wallets"]]
+        
+        blockchain = Blockchain(
+            name=meta["name"],
+            blocks=blocks,
+            difficulty=meta["difficulty"],
+            consensus=ConsensusAlgorithm.POW,
+            total_supply=1000000
+        )
+        # Индексы восстанавливаются из снимка; проигрываются только блоки после него
+        state = chain_state.ChainState.replay(
+            blocks,
+            {wallet.address: [INITIAL_WALLET_BALANCE / GENESIS_OUTPUTS] * GENESIS_OUTPUTS for wallet in wallets},
+            snapshot=None if created else self.read_json(os.path.join(directory, 'state.json'))
+        )
+        for wallet in wallets:
+            wallet.balance = state.balance(wallet.address)
+        
+        return StoredChain(directory, blockchain, wallets, state, mempool.Mempool(), threading.Lock())
+
+    def save_chain_snapshot(self, chain: StoredChain):
+        """Сохранение снимка индексов состояния рядом с блоками"""
+        self.write_json(os.path.join(chain.directory, 'state.json'), chain.state.to_dict())
+
+    def generate_empty_blocks(self, chain: StoredChain, count: int, progress=None):
+        """Дописывает count пустых блоков со сложностью 1 бит пачками по GENERATE_BATCH.
+
+        Блокировка берется на пачку: между пачками могут пройти транзакции
+        и майнинг, поэтому каждая пачка строится от текущей вершины.
+        """
+        root = merkle.EMPTY_ROOT.hex()
+        state = chain.state
+        done = 0
+        while done < count:
+            with chain.lock:
+                previous = state.tip
+                batch = []
+                for _ in range(min(GENERATE_BATCH, count - done)):
+                    index = previous.index + 1
+                    prefix = proof_of_work.header_prefix(index, previous.hash, root)
+                    _, nonce, digest = proof_of_work.search_range(prefix, 1, 0, proof_of_work.MAX_NONCE)
+                    previous = Block(index, time.time(), [], previous.hash, digest.hex(), nonce, 1, "Generator", root)
+                    batch.append(previous)
+                state.connect_blocks(batch)
+            done += len(batch)
+            if progress is not None:
+                progress(done)
+        with chain.lock:
+            self.save_chain_snapshot(chain)
+
+    def read_json(self, path: str) -> Optional[dict]:
+        try:
+            with open(path, encoding="utf-8") as stream:
+                return json.load(stream)
+        except (OSError, ValueError):
+            return None
+
+    def write_json(self, path: str, data: dict):
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as stream:
+            json.dump(data, stream, ensure_ascii=False)
+        os.replace(temporary, path)
+
     def create_blockchain_visualization(self, blockchain: Blockchain) -> go.Figure:
         """Создание визуализации блокчейна"""
         fig = go.Figure()
         
-        blocks = blockchain.blocks
-        y_positions = list(range(len(blocks)))
+        # Только последние VISIBLE_BLOCKS блоков: остальные остаются на диске
+        blocks = blockchain.blocks[-VISIBLE_BLOCKS:]
+        y_positions = [block.index for block in blocks]
         
         for i, block in enumerate(blocks):
             # Основной блок
@@ -917,8 +1626,9 @@ contract Crowdfunding {
             st.write(f"**Время:** {datetime.datetime.fromtimestamp(block.timestamp)}")
         with col2:
             st.write(f"**Nonce:** {block.nonce}")
-            st.write(f"**Сложность:** {block.difficulty}")
+            st.write(f"**Сложность:** {block.difficulty} бит")
             st.write(f"**Майнер:** {block.miner}")
+        st.write(f"**Корень Меркла:** {block.merkle_root[:16]}...")
         
         st.write(f"**Транзакции:** {len(block.transactions)}")
         if block.transactions:
@@ -926,67 +1636,83 @@ contract Crowdfunding {
                 for tx in block.transactions:
                     st.write(f"- {tx['sender'][:8]} → {tx['receiver'][:8]}: {tx['amount']}")
 
-    def create_transaction(self, sender: str, receiver: str, amount: float, fee: float) -> Dict:
-        """Создание транзакции"""
+    def create_transaction(self, sender: str, receiver: str, amount: float, fee: float,
+                           inputs: Optional[List[Tuple[str, int]]] = None,
+                           wallet: Optional[Wallet] = None) -> Dict:
+        """Создание транзакции (с явными входами - для пула транзакций), подписанной ключом кошелька"""
         tx_data = {
             'sender': sender,
             'receiver': receiver,
             'amount': amount,
             'fee': fee,
-            'timestamp': time.time(),
-            'signature': secrets.token_hex(32),
-            'tx_hash': secrets.token_hex(32)
+            'timestamp': time.time()
         }
-        return tx_data
+        if inputs is not None:
+            tx_data['inputs'] = [list(outpoint) for outpoint in inputs]
+            tx_data['size'] = mempool.transaction_vsize(len(inputs))
+        if wallet is None:
+            tx_data['tx_hash'] = signatures.transaction_hash(tx_data)
+            return tx_data
+        # Подпись покрывает каноническую сериализацию всех полей, включая входы
+        return signatures.sign_transaction(tx_data, wallet.scheme, wallet.private_key)
 
-    def mine_block(self, blockchain: Blockchain, transactions: List[Dict], miner: str) -> Block:
-        """Майнинг нового блока"""
+    def mine_block(self, blockchain: Blockchain, transactions: List[Dict], miner: str,
+                   difficulty_bits: Optional[int] = None, workers: int = 1,
+                   timeout: Optional[float] = None, progress=None) -> Optional[Block]:
+        """Майнинг нового блока; None, если nonce не найден за timeout секунд"""
         previous_block = blockchain.blocks[-1]
         new_index = previous_block.index + 1
+        # Сложность цепочки задана в шестнадцатеричных нулях - 4 бита на каждый
+        bits = difficulty_bits or blockchain.difficulty * 4
         
-        # Упрощенный Proof of Work
-        nonce = 0
-        while True:
-            block_data = f"{new_index}{previous_block.hash}{''.join([tx['tx_hash'] for tx in transactions])}{nonce}"
-            block_hash = hashlib.sha256(block_data.encode()).hexdigest()
-            
-            # Проверка соответствия сложности
-            if block_hash[:blockchain.difficulty] == "0" * blockchain.difficulty:
-                break
-            nonce += 1
+        # Блок фиксирует транзакции 32-байтовым корнем дерева Меркла
+        merkle_root = merkle.transaction_root([tx['tx_hash'] for tx in transactions]).hex()
+        
+        # Proof of Work: префикс заголовка хешируется один раз, перебирается только nonce
+        prefix = proof_of_work.header_prefix(new_index, previous_block.hash, merkle_root)
+        result = proof_of_work.mine(prefix, bits, workers=workers, timeout=timeout, progress=progress)
+        if not result.found:
+            return None
         
         return Block(
             index=new_index,
             timestamp=time.time(),
             transactions=transactions.copy(),
             previous_hash=previous_block.hash,
-            hash=block_hash,
-            nonce=nonce,
-            difficulty=blockchain.difficulty,
-            miner=miner
+            hash=result.hex,
+            nonce=result.nonce,
+            difficulty=bits,
+            miner=miner,
+            merkle_root=merkle_root
         )
 
     def update_wallet_balances(self, block: Block):
-        """Обновление балансов кошельков после майнинга"""
+        """Обновление балансов кошельков после майнинга (из индекса балансов состояния)"""
+        if 'wallet_index' not in st.session_state:
+            st.session_state.wallet_index = {wallet.address: wallet for wallet in st.session_state.wallets}
+        wallets = st.session_state.wallet_index
+        state = st.session_state.chain_state
         for tx in block.transactions:
-            sender_wallet = next((w for w in st.session_state.wallets if w.address == tx['sender']), None)
-            receiver_wallet = next((w for w in st.session_state.wallets if w.address == tx['receiver']), None)
-            
-            if sender_wallet:
-                sender_wallet.balance -= (tx['amount'] + tx['fee'])
-            if receiver_wallet:
-                receiver_wallet.balance += tx['amount']
+            for address in (tx['sender'], tx['receiver']):
+                if address in wallets:
+                    wallets[address].balance = state.balance(address)
 
     def simulate_mining(self, algorithm: str) -> Dict:
         """Симуляция процесса майнинга"""
-        time.sleep(1)  # Имитация времени майнинга
-        
         if algorithm == "POW":
+            # Два периода пересчета сложности сети масштаба Bitcoin без реального хеширования
+            config = simulation.SimulationConfig(
+                miners=simulation.default_miners(POW_NETWORK_HASHRATE),
+                blocks=2 * 2016
+            )
+            result = simulation.simulate(config)
+            block_time = float(result.block_intervals.mean())
             return {
                 'algorithm': 'Proof of Work',
-                'time': random.uniform(5, 15),
-                'energy': random.uniform(50, 200),
-                'reward': 6.25
+                'time': block_time,
+                'energy': POW_NETWORK_HASHRATE * block_time * POW_JOULES_PER_HASH / 3.6e6,
+                'reward': 3.125,
+                'orphan_rate': result.orphan_rate
             }
         elif algorithm == "POS":
             return {
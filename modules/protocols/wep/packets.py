@@ -0,0 +1,98 @@
+"""RC4 и WEP-пакеты, векторизованные по пакетам с помощью NumPy.
+
+Ключ RC4 пакета WEP - IV (3 байта, передается открыто) || секретный ключ
+(5 байт у WEP-40, 13 у WEP-104). Данные пакета - заголовок LLC/SNAP и
+полезная нагрузка, к ним дописывается ICV (CRC-32, little-endian), и все
+вместе складывается по XOR с ключевым потоком.
+
+Для атак нужны тысячи пакетов, поэтому KSA и PRGA выполняются сразу для
+всех пакетов: перестановки S хранятся строками массива (n, 256), и каждый
+шаг алгоритма - одна операция над столбцом. Заголовок SNAP у всех пакетов
+одинаковый и известен атакующему, поэтому первые байты ключевого потока
+получаются как шифртекст XOR заголовок.
+"""
+from typing import Optional, Tuple
+import binascii
+import struct
+
+import numpy as np
+
+IV_SIZE = 3
+KEY_SIZES = {40: 5, 104: 13}  # бит секретного ключа -> байт
+SNAP_IP = bytes.fromhex("aaaa030000000800")   # LLC/SNAP для IPv4
+SNAP_ARP = bytes.fromhex("aaaa030000000806")  # LLC/SNAP для ARP
+CHUNK = 1 << 16  # пакетов в одном проходе: массив S занимает CHUNK * 256 байт
+
+
+def rc4_ksa(keys: np.ndarray, steps: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+    """Первые steps шагов KSA для каждой строки keys (n, длина ключа); перестановки S и индексы j"""
+    keys = np.asarray(keys, dtype=np.uint8)
+    count, length = keys.shape
+    rows = np.arange(count)
+    state = np.tile(np.arange(256, dtype=np.uint8), (count, 1))
+    j = np.zeros(count, dtype=np.uint8)
+    for i in range(steps):
+        column = state[:, i].copy()
+        j += column + keys[:, i % length]  # переполнение uint8 - это и есть mod 256
+        state[:, i] = state[rows, j]
+        state[rows, j] = column
+    return state, j
+
+
+def rc4_keystream(keys: np.ndarray, length: int) -> np.ndarray:
+    """Первые length байт ключевого потока для каждой строки keys"""
+    keys = np.asarray(keys, dtype=np.uint8)
+    output = np.empty((len(keys), length), dtype=np.uint8)
+    for start in range(0, len(keys), CHUNK):
+        state, _ = rc4_ksa(keys[start:start + CHUNK])
+        rows = np.arange(len(state))
+        j = np.zeros(len(state), dtype=np.uint8)
+        for position in range(length):
+            i = (position + 1) & 0xff
+            column = state[:, i].copy()
+            j += column
+            state[:, i] = state[rows, j]
+            state[rows, j] = column
+            output[start:start + len(state), position] = state[rows, column + state[:, i]]
+    return output
+
+
+def packet_keys(key: bytes, ivs: np.ndarray) -> np.ndarray:
+    """Ключи RC4 пакетов: IV || секретный ключ"""
+    ivs = np.asarray(ivs, dtype=np.uint8)
+    secret = np.frombuffer(key, dtype=np.uint8)
+    return np.hstack([ivs, np.broadcast_to(secret, (len(ivs), len(secret)))])
+
+
+def with_icv(data: bytes) -> bytes:
+    return data + struct.pack('<I', binascii.crc32(data) & 0xffffffff)
+
+
+def encrypt_packets(key: bytes, ivs: np.ndarray, payloads: np.ndarray) -> np.ndarray:
+    """Шифрует строки payloads (n, m) с ICV; возвращает шифртексты (n, m + 4)"""
+    payloads = np.asarray(payloads, dtype=np.uint8)
+    plaintexts = np.frombuffer(b''.join(with_icv(row.tobytes()) for row in payloads), dtype=np.uint8)
+    plaintexts = plaintexts.reshape(len(payloads), -1)
+    return plaintexts ^ rc4_keystream(packet_keys(key, ivs), plaintexts.shape[1])
+
+
+def wep_encrypt(data: bytes, key: bytes, iv: bytes) -> Tuple[bytes, bytes]:
+    """Шифртекст одного пакета (данные и ICV) и открытое значение ICV"""
+    ciphertext = encrypt_packets(key, np.frombuffer(iv, dtype=np.uint8)[None, :],
+                                 np.frombuffer(data, dtype=np.uint8)[None, :])
+    return ciphertext[0].tobytes(), with_icv(data)[-4:]
+
+
+def check_key(key: bytes, iv: np.ndarray, ciphertext: np.ndarray) -> bool:
+    """Расшифровывает пакет ключом и сверяет ICV - так проверяется кандидат ключа"""
+    keystream = rc4_keystream(packet_keys(key, np.asarray(iv)[None, :]), len(ciphertext))[0]
+    plaintext = (np.asarray(ciphertext, dtype=np.uint8) ^ keystream).tobytes()
+    return with_icv(plaintext[:-4]) == plaintext
+
+
+def random_payloads(count: int, header: bytes, size: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """count пакетов: известный заголовок и случайные данные, всего size байт"""
+    rng = rng or np.random.default_rng()
+    payloads = rng.integers(0, 256, (count, size), dtype=np.uint8)
+    payloads[:, :len(header)] = np.frombuffer(header, dtype=np.uint8)
+    return payloads
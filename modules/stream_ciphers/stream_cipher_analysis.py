@@ -7,6 +7,7 @@ import hashlib
 from collections import Counter
 import random
 import math
+from modules.protocols.wep import fms, packets
 
 class StreamCipherAnalysisModule(CryptoModule):
     def __init__(self):
@@ -333,19 +334,25 @@ class StreamCipherAnalysisModule(CryptoModule):
         3. Анализируя множество пакетов, можно восстановить ключ по частям
         """)
         
-        # Упрощенная демонстрация
+        # Атака на 40-битный ключ по пакетам со слабыми IV
         if st.button("🎭 Демонстрация атаки FMS", type="primary"):
-            with st.spinner("Моделирую атаку FMS..."):
-                # Генерируем "слабые" IV
-                weak_ivs = self.generate_weak_ivs(50)
+            with st.spinner("Атака FMS на сгенерированные пакеты WEP..."):
+                key = [random.randint(0, 255) for _ in range(packets.KEY_SIZES[40])]
                 
-                # Моделируем атаку
-                recovered_key = self.simulate_fms_attack(weak_ivs)
+                # Все различные слабые IV (A+3, 255, X) для каждого байта ключа
+                weak_ivs = self.generate_weak_ivs(fms.WEAK_IVS_PER_BYTE * len(key))
                 
-                st.success(f"**Восстановленный ключ (первые байты):** {recovered_key[:8]}...")
+                # Голосование по первому байту ключевого потока каждого пакета
+                recovered_key, votes = self.simulate_fms_attack(weak_ivs, key)
+                
+                if recovered_key == key:
+                    st.success(f"**Ключ восстановлен:** {bytes(recovered_key).hex()}")
+                else:
+                    st.warning(f"**Восстановлено:** {bytes(recovered_key).hex()}, **исходный ключ:** {bytes(key).hex()} - "
+                               f"не хватило пакетов, повторите попытку")
                 
                 # Визуализация процесса атаки
-                self.visualize_fms_attack(weak_ivs, recovered_key)
+                self.visualize_fms_attack(weak_ivs, recovered_key, votes)
     
     def render_rc4_key_reuse(self):
         """Атака на повторное использование ключа"""
@@ -690,27 +697,17 @@ class StreamCipherAnalysisModule(CryptoModule):
         
         return output
     
-    def generate_weak_ivs(self, count):
-        """Генерирует слабые IV для демонстрации атаки FMS"""
-        weak_ivs = []
-        for i in range(count):
-            # Слабые IV имеют определенные паттерны
-            iv = [3, 255, i]  # Пример слабого IV
-            weak_ivs.append(iv)
-        return weak_ivs
+    def generate_weak_ivs(self, count, key_size=packets.KEY_SIZES[40]):
+        """Генерирует слабые IV (A+3, 255, X) по очереди для каждого байта ключа A"""
+        return fms.weak_ivs(key_size, count).tolist()
     
-    def simulate_fms_attack(self, weak_ivs):
-        """Упрощенная симуляция атаки FMS"""
-        # В реальной атаке анализируются тысячи пакетов
-        # Здесь просто демонстрируем принцип
-        
-        recovered_key = []
-        for i in range(min(8, len(weak_ivs))):
-            # Упрощенное "восстановление" байта ключа
-            key_byte = (weak_ivs[i][2] + i) % 256
-            recovered_key.append(key_byte)
-        
-        return recovered_key
+    def simulate_fms_attack(self, weak_ivs, key):
+        """Атака FMS: пакеты с SNAP-заголовком шифруются ключом, ключ восстанавливается по голосам"""
+        ivs = np.array(weak_ivs, dtype=np.uint8)
+        payloads = packets.random_payloads(len(ivs), packets.SNAP_IP, fms.PAYLOAD_SIZE)
+        ciphertexts = packets.encrypt_packets(bytes(key), ivs, payloads)
+        result = fms.recover_key(ivs, ciphertexts, len(key))
+        return list(result.key), result.votes
     
     def xor_encrypt(self, plaintext, key_stream):
         """Шифрование XOR"""
@@ -863,7 +860,7 @@ class StreamCipherAnalysisModule(CryptoModule):
         plt.tight_layout()
         st.pyplot(fig)
     
-    def visualize_fms_attack(self, weak_ivs, recovered_key):
+    def visualize_fms_attack(self, weak_ivs, recovered_key, votes):
         """Визуализирует атаку FMS"""
         st.markdown("#### Процесс атаки FMS")
         
@@ -876,10 +873,12 @@ class StreamCipherAnalysisModule(CryptoModule):
         st.write("**Восстановление ключа по байтам:**")
         key_progress = []
         for i in range(len(recovered_key)):
+            # Уверенность - доля голосов за выбранное значение среди всех голосов за байт
             key_progress.append({
                 'Байт': i + 1,
                 'Значение': recovered_key[i],
-                'Уверенность': f"{(i+1)/len(recovered_key)*100:.1f}%"
+                'Голосов': int(votes[i].max()),
+                'Уверенность': f"{votes[i].max() / max(votes[i].sum(), 1) * 100:.1f}%"
             })
         
         st.dataframe(pd.DataFrame(key_progress), use_container_width=True)